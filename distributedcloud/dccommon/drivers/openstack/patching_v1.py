@@ -12,13 +12,14 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 #
+import io
 
 from oslo_log import log
-import requests
 from requests_toolbelt import MultipartEncoder
 
 from dccommon import consts
 from dccommon.drivers import base
+from dccommon import session_pool
 
 LOG = log.getLogger(__name__)
 
@@ -46,6 +47,8 @@ class PatchingClient(base.DriverBase):
             self.endpoint = endpoint
 
         self.token = session.get_token()
+        # Keep-alive HTTP session shared by all the clients of this region
+        self.http_session = session_pool.get_session(region)
 
     def query(self, state=None, release=None, timeout=PATCH_REST_DEFAULT_TIMEOUT):
         """Query patches"""
@@ -55,7 +58,7 @@ class PatchingClient(base.DriverBase):
         if release is not None:
             url += "&release=%s" % release
         headers = {"X-Auth-Token": self.token}
-        response = requests.get(url, headers=headers, timeout=timeout)
+        response = self.http_session.get(url, headers=headers, timeout=timeout)
 
         if response.status_code == 200:
             data = response.json()
@@ -74,7 +77,7 @@ class PatchingClient(base.DriverBase):
         """Query hosts"""
         url = self.endpoint + '/v1/query_hosts'
         headers = {"X-Auth-Token": self.token}
-        response = requests.get(url, headers=headers, timeout=timeout)
+        response = self.http_session.get(url, headers=headers, timeout=timeout)
 
         if response.status_code == 200:
             data = response.json()
@@ -94,7 +97,7 @@ class PatchingClient(base.DriverBase):
         patch_str = "/".join(patches)
         url = self.endpoint + '/v1/apply/%s' % patch_str
         headers = {"X-Auth-Token": self.token}
-        response = requests.post(url, headers=headers, timeout=timeout)
+        response = self.http_session.post(url, headers=headers, timeout=timeout)
 
         if response.status_code == 200:
             data = response.json()
@@ -114,7 +117,7 @@ class PatchingClient(base.DriverBase):
         patch_str = "/".join(patches)
         url = self.endpoint + '/v1/remove/%s' % patch_str
         headers = {"X-Auth-Token": self.token}
-        response = requests.post(url, headers=headers, timeout=timeout)
+        response = self.http_session.post(url, headers=headers, timeout=timeout)
 
         if response.status_code == 200:
             data = response.json()
@@ -134,7 +137,7 @@ class PatchingClient(base.DriverBase):
         patch_str = "/".join(patches)
         url = self.endpoint + '/v1/delete/%s' % patch_str
         headers = {"X-Auth-Token": self.token}
-        response = requests.post(url, headers=headers, timeout=timeout)
+        response = self.http_session.post(url, headers=headers, timeout=timeout)
 
         if response.status_code == 200:
             data = response.json()
@@ -154,7 +157,7 @@ class PatchingClient(base.DriverBase):
         patch_str = "/".join(patches)
         url = self.endpoint + '/v1/commit/%s' % patch_str
         headers = {"X-Auth-Token": self.token}
-        response = requests.post(url, headers=headers, timeout=timeout)
+        response = self.http_session.post(url, headers=headers, timeout=timeout)
 
         if response.status_code == 200:
             data = response.json()
@@ -172,27 +175,36 @@ class PatchingClient(base.DriverBase):
     def upload(self, files, timeout=PATCH_REST_DEFAULT_TIMEOUT):
         """Upload patches"""
 
+        patch_data = dict()
         for file in sorted(list(set(files))):
-            enc = MultipartEncoder(fields={'file': (file,
-                                                    open(file, 'rb'),
-                                                    )})
-            url = self.endpoint + '/v1/upload'
-            headers = {"X-Auth-Token": self.token,
-                       'Content-Type': enc.content_type}
-            response = requests.post(url,
-                                     data=enc,
-                                     headers=headers,
-                                     timeout=timeout)
-
-            if response.status_code == 200:
-                data = response.json()
-                if 'error' in data and data["error"] != "":
-                    message = "upload failed with error: %s" % data["error"]
-                    LOG.error(message)
-                    raise Exception(message)
-                else:
-                    return data.get('pd', [])
-            else:
-                message = "upload failed with RC: %d" % response.status_code
+            with open(file, 'rb') as patch_file:
+                patch_data.update(self._upload(file, patch_file, timeout))
+        return patch_data
+
+    def upload_data(self, filename, data, timeout=PATCH_REST_DEFAULT_TIMEOUT):
+        """Upload a patch from its contents"""
+
+        return self._upload(filename, io.BytesIO(data), timeout)
+
+    def _upload(self, filename, fileobj, timeout):
+        enc = MultipartEncoder(fields={'file': (filename, fileobj)})
+        url = self.endpoint + '/v1/upload'
+        headers = {"X-Auth-Token": self.token,
+                   'Content-Type': enc.content_type}
+        response = self.http_session.post(url,
+                                          data=enc,
+                                          headers=headers,
+                                          timeout=timeout)
+
+        if response.status_code == 200:
+            data = response.json()
+            if 'error' in data and data["error"] != "":
+                message = "upload failed with error: %s" % data["error"]
                 LOG.error(message)
                 raise Exception(message)
+            else:
+                return data.get('pd', [])
+        else:
+            message = "upload failed with RC: %d" % response.status_code
+            LOG.error(message)
+            raise Exception(message)
@@ -0,0 +1,173 @@
+# Copyright (c) 2022 Wind River Systems, Inc.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+"""Per-region pool of keep-alive HTTP sessions.
+
+The drivers that talk to the subcloud REST APIs through raw requests
+calls (patching, dcdbsync) share one requests.Session per region so
+that repeated queries reuse the established TCP/TLS connections rather
+than performing a new handshake per call.
+"""
+
+import threading
+import time
+
+from oslo_log import log as logging
+import requests
+from requests import adapters
+
+LOG = logging.getLogger(__name__)
+
+# Number of distinct hosts kept per session and number of connections
+# kept per host. Requests beyond the pool size are still served, but the
+# extra connections are discarded once the response is consumed.
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 10
+# Sessions not used for this many seconds are closed
+DEFAULT_IDLE_TIMEOUT = 300
+
+
+class CountingHTTPAdapter(adapters.HTTPAdapter):
+    """HTTPAdapter keeping track of connection reuse.
+
+    urllib3 counts, per connection pool, the requests issued and the
+    connections opened. The counters of pools evicted from the pool
+    manager are accumulated so that the totals survive the eviction.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._lock = threading.Lock()
+        self._retired_requests = 0
+        self._retired_connections = 0
+        super(CountingHTTPAdapter, self).__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(CountingHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        pools = self.poolmanager.pools
+        dispose_func = pools.dispose_func
+
+        def _dispose(pool):
+            with self._lock:
+                self._retired_requests += pool.num_requests
+                self._retired_connections += pool.num_connections
+            if dispose_func:
+                dispose_func(pool)
+
+        pools.dispose_func = _dispose
+
+    def get_stats(self):
+        with self._lock:
+            num_requests = self._retired_requests
+            num_connections = self._retired_connections
+        for key in self.poolmanager.pools.keys():
+            pool = self.poolmanager.pools.get(key)
+            if pool is not None:
+                num_requests += pool.num_requests
+                num_connections += pool.num_connections
+        return {'requests': num_requests,
+                'connections': num_connections,
+                'reused': max(num_requests - num_connections, 0)}
+
+
+class _PooledSession(object):
+    def __init__(self, pool_connections, pool_maxsize):
+        self.adapter = CountingHTTPAdapter(pool_connections=pool_connections,
+                                           pool_maxsize=pool_maxsize)
+        self.session = requests.Session()
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+        self.last_used = time.time()
+
+
+class SessionPool(object):
+    """Registry of pooled requests sessions, keyed by region."""
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._sessions = {}
+        # Counters of the sessions already closed
+        self._closed_stats = {'requests': 0, 'connections': 0, 'reused': 0}
+
+    def get_session(self, region):
+        """Return the requests.Session to use for the given region."""
+        now = time.time()
+        with self._lock:
+            self._evict_idle(now)
+            pooled = self._sessions.get(region)
+            if pooled is None:
+                LOG.debug("Creating pooled HTTP session for region %s" %
+                          region)
+                pooled = _PooledSession(self.pool_connections,
+                                        self.pool_maxsize)
+                self._sessions[region] = pooled
+            pooled.last_used = now
+            return pooled.session
+
+    def close_session(self, region):
+        with self._lock:
+            pooled = self._sessions.pop(region, None)
+            if pooled is not None:
+                self._close(pooled)
+
+    def close_all(self):
+        with self._lock:
+            for pooled in self._sessions.values():
+                self._close(pooled)
+            self._sessions.clear()
+
+    def get_stats(self, region=None):
+        """Return the request/connection/reuse counters.
+
+        When region is given, only that region's live session is
+        reported, otherwise the totals of all sessions are returned.
+        """
+        with self._lock:
+            if region is not None:
+                pooled = self._sessions.get(region)
+                if pooled is None:
+                    return {'requests': 0, 'connections': 0, 'reused': 0}
+                return pooled.adapter.get_stats()
+            stats = dict(self._closed_stats)
+            for pooled in self._sessions.values():
+                for key, value in pooled.adapter.get_stats().items():
+                    stats[key] += value
+            return stats
+
+    def _evict_idle(self, now):
+        for region, pooled in list(self._sessions.items()):
+            if now - pooled.last_used > self.idle_timeout:
+                LOG.debug("Closing idle HTTP session for region %s" % region)
+                del self._sessions[region]
+                self._close(pooled)
+
+    def _close(self, pooled):
+        for key, value in pooled.adapter.get_stats().items():
+            self._closed_stats[key] += value
+        pooled.session.close()
+
+
+_session_pool = SessionPool()
+
+
+def get_session(region):
+    return _session_pool.get_session(region)
+
+
+def get_stats(region=None):
+    return _session_pool.get_stats(region)
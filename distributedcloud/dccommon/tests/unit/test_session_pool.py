@@ -0,0 +1,86 @@
+# Copyright (c) 2022 Wind River Systems, Inc.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+import mock
+
+from dccommon import session_pool
+from dccommon.tests import base
+
+
+class FakePool(object):
+    def __init__(self, num_requests, num_connections):
+        self.num_requests = num_requests
+        self.num_connections = num_connections
+
+    def close(self):
+        pass
+
+
+class TestSessionPool(base.DCCommonTestCase):
+    def setUp(self):
+        super(TestSessionPool, self).setUp()
+        self.pool = session_pool.SessionPool(idle_timeout=60)
+
+    def test_session_reused_per_region(self):
+        session_1 = self.pool.get_session('subcloud1')
+        session_2 = self.pool.get_session('subcloud1')
+        session_3 = self.pool.get_session('subcloud2')
+
+        self.assertIs(session_1, session_2)
+        self.assertIsNot(session_1, session_3)
+
+    def test_session_adapter_bounded(self):
+        session = self.pool.get_session('subcloud1')
+
+        adapter = session.get_adapter('https://subcloud1')
+        self.assertIsInstance(adapter, session_pool.CountingHTTPAdapter)
+        self.assertEqual(session_pool.DEFAULT_POOL_MAXSIZE,
+                         adapter._pool_maxsize)
+
+    @mock.patch.object(session_pool.time, 'time')
+    def test_idle_session_evicted(self, mock_time):
+        mock_time.return_value = 1000
+        session_1 = self.pool.get_session('subcloud1')
+        session_1.close = mock.MagicMock()
+
+        mock_time.return_value = 1061
+        session_2 = self.pool.get_session('subcloud1')
+
+        session_1.close.assert_called_once()
+        self.assertIsNot(session_1, session_2)
+
+    @mock.patch.object(session_pool.time, 'time')
+    def test_active_session_not_evicted(self, mock_time):
+        mock_time.return_value = 1000
+        session_1 = self.pool.get_session('subcloud1')
+        mock_time.return_value = 1050
+        self.pool.get_session('subcloud1')
+        mock_time.return_value = 1100
+        session_2 = self.pool.get_session('subcloud1')
+
+        self.assertIs(session_1, session_2)
+
+    def test_stats(self):
+        session = self.pool.get_session('subcloud1')
+        adapter = session.get_adapter('https://subcloud1')
+        adapter.poolmanager.pools['subcloud1'] = FakePool(10, 2)
+
+        self.assertEqual({'requests': 10, 'connections': 2, 'reused': 8},
+                         self.pool.get_stats('subcloud1'))
+
+        # Counters are kept once the connection pool is evicted
+        adapter.poolmanager.pools.clear()
+        self.pool.get_session('subcloud2')
+        self.assertEqual({'requests': 10, 'connections': 2, 'reused': 8},
+                         self.pool.get_stats())
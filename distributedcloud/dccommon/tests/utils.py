@@ -15,7 +15,21 @@
 # under the License.
 #
 
+import contextlib
+import os
+import unittest
+
 from oslo_context import context
+from sqlalchemy import event
+
+# The benchmarks only run when this environment variable is set
+BENCHMARK_ENV_VAR = 'DC_RUN_BENCHMARKS'
+
+# The connection ping and the transaction statements, which are not part
+# of the queries under test
+IGNORED_STATEMENTS = ('SELECT 1',)
+IGNORED_STATEMENT_PREFIXES = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT',
+                              'RELEASE SAVEPOINT')
 
 
 def create_route_dict(data_list):
@@ -52,3 +66,33 @@ def dummy_context(user='test_username', tenant='test_project_id',
         'is_admin': True,
         'region_name': region_name
     })
+
+
+def benchmark(test):
+    """Skip a benchmark test unless the benchmarks are requested"""
+    return unittest.skipUnless(
+        os.environ.get(BENCHMARK_ENV_VAR),
+        'set %s to run the benchmarks' % BENCHMARK_ENV_VAR)(test)
+
+
+@contextlib.contextmanager
+def count_statements(engine):
+    """Record the SQL statements executed on an engine
+
+    Yields the list of statements, leaving out the connection pings and
+    the transaction statements.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statement = statement.strip()
+        if statement.upper() in IGNORED_STATEMENTS or \
+                statement.upper().startswith(IGNORED_STATEMENT_PREFIXES):
+            return
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
@@ -18,11 +18,23 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 
+import itertools
 
+from oslo_log import log as logging
+
+import pecan
+from pecan import jsonify
 from pecan import request
 
 import dcdbsync.common.context as k_context
 
+LOG = logging.getLogger(__name__)
+
+# Size of the chunks of a streamed JSON list
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_END = object()
+
 
 def extract_context_from_environ():
     context_paras = {'auth_token': 'HTTP_X_AUTH_TOKEN',
@@ -44,3 +56,43 @@ def extract_context_from_environ():
 
     context_paras['is_admin'] = 'admin' in role.split(',')
     return k_context.RequestContext(**context_paras)
+
+
+def stream_json_list(records, chunk_size=STREAM_CHUNK_SIZE):
+    """Return a response streaming the records as a JSON list
+
+    The records are encoded and sent as they are produced, so that the
+    complete list is never held in memory. The first record is fetched
+    before the response is returned, so that errors reading the records
+    can still be reported through the response status.
+    """
+    records = iter(records)
+    first = next(records, _END)
+    if first is not _END:
+        records = itertools.chain([first], records)
+
+    def app_iter():
+        chunk = ['[']
+        chunk_len = 1
+        separator = ''
+        try:
+            for record in records:
+                encoded = separator + jsonify.encode(record)
+                separator = ', '
+                chunk.append(encoded)
+                chunk_len += len(encoded)
+                if chunk_len >= chunk_size:
+                    yield ''.join(chunk).encode('utf-8')
+                    chunk = []
+                    chunk_len = 0
+            chunk.append(']')
+            yield ''.join(chunk).encode('utf-8')
+        except Exception as e:
+            # The response status is already sent, the list is left
+            # unterminated for the client to detect the failure
+            LOG.exception(e)
+            yield ''.join(chunk).encode('utf-8')
+
+    return pecan.Response(app_iter=app_iter(),
+                          content_type='application/json',
+                          charset='utf-8')
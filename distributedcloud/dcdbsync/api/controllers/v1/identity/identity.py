@@ -61,7 +61,8 @@ class UsersController(object):
         context = restcomm.extract_context_from_environ()
         try:
             if user_ref is None:
-                return db_api.user_get_all(context)
+                return restcomm.stream_json_list(
+                    db_api.user_get_all_iter(context))
 
             else:
                 user = db_api.user_get(context, user_ref)
@@ -157,7 +158,8 @@ class GroupsController(object):
         context = restcomm.extract_context_from_environ()
         try:
             if group_ref is None:
-                return db_api.group_get_all(context)
+                return restcomm.stream_json_list(
+                    db_api.group_get_all_iter(context))
 
             else:
                 group = db_api.group_get(context, group_ref)
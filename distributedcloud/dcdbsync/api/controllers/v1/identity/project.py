@@ -62,7 +62,8 @@ class ProjectsController(object):
 
         try:
             if project_ref is None:
-                return db_api.project_get_all(context)
+                return restcomm.stream_json_list(
+                    db_api.project_get_all_iter(context))
 
             else:
                 project = db_api.project_get(context, project_ref)
@@ -62,7 +62,8 @@ class RolesController(object):
 
         try:
             if role_ref is None:
-                return db_api.role_get_all(context)
+                return restcomm.stream_json_list(
+                    db_api.role_get_all_iter(context))
 
             else:
                 role = db_api.role_get(context, role_ref)
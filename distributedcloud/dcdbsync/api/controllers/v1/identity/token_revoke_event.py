@@ -87,7 +87,8 @@ class RevokeEventsController(object):
         context = restcomm.extract_context_from_environ()
 
         try:
-            return db_api.revoke_event_get_all(context)
+            return restcomm.stream_json_list(
+                db_api.revoke_event_get_all_iter(context))
 
         except Exception as e:
             LOG.exception(e)
@@ -49,9 +49,9 @@ def get_session():
 
 ###################
 
-def user_get_all(context):
-    """Retrieve all users."""
-    return IMPL.user_get_all(context)
+def user_get_all_iter(context):
+    """Retrieve all users one at a time."""
+    return IMPL.user_get_all_iter(context)
 
 
 def user_get(context, user_id):
@@ -75,9 +75,9 @@ def user_update(context, user_ref, payload):
 
 ###################
 
-def group_get_all(context):
-    """Retrieve all groups."""
-    return IMPL.group_get_all(context)
+def group_get_all_iter(context):
+    """Retrieve all groups one at a time."""
+    return IMPL.group_get_all_iter(context)
 
 
 def group_get(context, group_id):
@@ -101,9 +101,9 @@ def group_update(context, group_ref, payload):
 
 ###################
 
-def project_get_all(context):
-    """Retrieve all projects."""
-    return IMPL.project_get_all(context)
+def project_get_all_iter(context):
+    """Retrieve all projects one at a time."""
+    return IMPL.project_get_all_iter(context)
 
 
 def project_get(context, project_id):
@@ -127,9 +127,9 @@ def project_update(context, project_ref, payload):
 
 ###################
 
-def role_get_all(context):
-    """Retrieve all roles."""
-    return IMPL.role_get_all(context)
+def role_get_all_iter(context):
+    """Retrieve all roles one at a time."""
+    return IMPL.role_get_all_iter(context)
 
 
 def role_get(context, role_id):
@@ -153,9 +153,9 @@ def role_update(context, role_ref, payload):
 
 ###################
 
-def revoke_event_get_all(context):
-    """Retrieve all token revocation events."""
-    return IMPL.revoke_event_get_all(context)
+def revoke_event_get_all_iter(context):
+    """Retrieve all token revocation events one at a time."""
+    return IMPL.revoke_event_get_all_iter(context)
 
 
 def revoke_event_get_by_audit(context, audit_id):
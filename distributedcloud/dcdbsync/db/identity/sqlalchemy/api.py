@@ -22,6 +22,7 @@
 Implementation of SQLAlchemy backend.
 """
 
+import itertools
 import sys
 
 from oslo_db.sqlalchemy import enginefacade
@@ -61,6 +62,8 @@ def _get_context():
 class TableRegistry(object):
     def __init__(self):
         self.metadata = MetaData()
+        # Column names of the reflected tables, in select order
+        self.column_names = {}
 
     def get(self, connection, tablename):
         try:
@@ -73,6 +76,14 @@ class TableRegistry(object):
             )
         return table
 
+    def get_column_names(self, table):
+        try:
+            column_names = self.column_names[table.name]
+        except KeyError:
+            column_names = tuple(c.name for c in table.columns)
+            self.column_names[table.name] = column_names
+        return column_names
+
 registry = TableRegistry()
 
 
@@ -87,22 +98,11 @@ def get_write_connection():
 
 
 def row2dict(table, row):
-    d = {}
-    for c in table.columns:
-        c_value = getattr(row, c.name)
-        d[c.name] = c_value
-
-    return d
+    return dict(zip(registry.get_column_names(table), row))
 
 
 def index2column(r_table, index_name):
-    column = None
-    for c in r_table.columns:
-        if c.name == index_name:
-            column = c
-            break
-
-    return column
+    return r_table.columns.get(index_name)
 
 
 def query(connection, table, index_name=None, index_value=None):
@@ -125,6 +125,22 @@ def query(connection, table, index_name=None, index_value=None):
     return records
 
 
+def query_iter(connection, table):
+    """Yield the records of a table as they are read from the cursor"""
+    global registry
+    r_table = registry.get(connection, table)
+
+    result = connection.execution_options(stream_results=True).execute(
+        select([r_table]))
+    for row in result:
+        yield row2dict(r_table, row)
+
+
+def joined_row2dict(table, row):
+    # Rows of labeled selects are looked up by column
+    return dict((c.name, row[c]) for c in table.columns)
+
+
 def insert(connection, table, data):
     global registry
     r_table = registry.get(connection, table)
@@ -213,29 +229,35 @@ def require_context(f):
 ###################
 
 @require_context
-def user_get_all(context):
-    result = []
+def user_get_all_iter(context):
+    """Yield the consolidated users one at a time
 
+    The users are joined with their local user and passwords by the
+    database, the rows of a local user being consecutive.
+    """
     with get_read_connection() as conn:
-        # user table
-        users = query(conn, 'user')
-        # local_user table
-        local_users = query(conn, 'local_user')
-        # password table
-        passwords = query(conn, 'password')
-
-    for local_user in local_users:
-        user = {'user': user for user in users if user['id']
-                == local_user['user_id']}
-        user_passwords = {'password': [password for password in passwords
-                                       if password['local_user_id'] ==
-                                       local_user['id']]}
-        user_consolidated = dict(list({'local_user': local_user}.items()) +
-                                 list(user.items()) +
-                                 list(user_passwords.items()))
-        result.append(user_consolidated)
-
-    return result
+        user = registry.get(conn, 'user')
+        local_user = registry.get(conn, 'local_user')
+        password = registry.get(conn, 'password')
+
+        stmt = select([local_user, user, password]).select_from(
+            local_user.outerjoin(
+                user, local_user.c.user_id == user.c.id).outerjoin(
+                password, password.c.local_user_id == local_user.c.id)
+        ).order_by(local_user.c.id, password.c.id).apply_labels()
+        result = conn.execution_options(stream_results=True).execute(stmt)
+
+        for _local_user_id, rows in itertools.groupby(
+                result, key=lambda row: row[local_user.c.id]):
+            rows = list(rows)
+            user_consolidated = {
+                'local_user': joined_row2dict(local_user, rows[0])}
+            if rows[0][user.c.id] is not None:
+                user_consolidated['user'] = joined_row2dict(user, rows[0])
+            user_consolidated['password'] = [
+                joined_row2dict(password, row) for row in rows
+                if row[password.c.id] is not None]
+            yield user_consolidated
 
 
 @require_context
@@ -348,26 +370,26 @@ def user_update(context, user_id, payload):
 ###################
 
 @require_context
-def group_get_all(context):
-    result = []
-
+def group_get_all_iter(context):
+    """Yield the consolidated groups one at a time"""
     with get_read_connection() as conn:
-        # groups table
-        groups = query(conn, 'group')
-        # user_group_membership table
-        user_group_memberships = query(conn, 'user_group_membership')
-
-    for group in groups:
-        local_user_id_list = [membership['user_id'] for membership
-                              in user_group_memberships if
-                              membership['group_id'] == group['id']]
-        local_user_id_list.sort()
-        local_user_ids = {'local_user_ids': local_user_id_list}
-        group_consolidated = dict(list({'group': group}.items()) +
-                                  list(local_user_ids.items()))
-        result.append(group_consolidated)
+        group = registry.get(conn, 'group')
+        membership = registry.get(conn, 'user_group_membership')
 
-    return result
+        stmt = select([group, membership.c.user_id]).select_from(
+            group.outerjoin(membership,
+                            membership.c.group_id == group.c.id)
+        ).order_by(group.c.id).apply_labels()
+        result = conn.execution_options(stream_results=True).execute(stmt)
+
+        for _group_id, rows in itertools.groupby(
+                result, key=lambda row: row[group.c.id]):
+            rows = list(rows)
+            local_user_id_list = sorted(
+                row[membership.c.user_id] for row in rows
+                if row[membership.c.user_id] is not None)
+            yield {'group': joined_row2dict(group, rows[0]),
+                   'local_user_ids': local_user_id_list}
 
 
 @require_context
@@ -461,18 +483,11 @@ def group_update(context, group_id, payload):
 ###################
 
 @require_context
-def project_get_all(context):
-    result = []
-
+def project_get_all_iter(context):
+    """Yield the consolidated projects one at a time"""
     with get_read_connection() as conn:
-        # project table
-        projects = query(conn, 'project')
-
-    for project in projects:
-        project_consolidated = {'project': project}
-        result.append(project_consolidated)
-
-    return result
+        for record in query_iter(conn, 'project'):
+            yield {'project': record}
 
 
 @require_context
@@ -569,18 +584,11 @@ def project_update(context, project_id, payload):
 ###################
 
 @require_context
-def role_get_all(context):
-    result = []
-
+def role_get_all_iter(context):
+    """Yield the consolidated roles one at a time"""
     with get_read_connection() as conn:
-        # role table
-        roles = query(conn, 'role')
-
-    for role in roles:
-        role_consolidated = {'role': role}
-        result.append(role_consolidated)
-
-    return result
+        for record in query_iter(conn, 'role'):
+            yield {'role': record}
 
 
 @require_context
@@ -659,18 +667,11 @@ def role_update(context, role_id, payload):
 ##################################
 
 @require_context
-def revoke_event_get_all(context):
-    result = []
-
+def revoke_event_get_all_iter(context):
+    """Yield the consolidated revoke events one at a time"""
     with get_read_connection() as conn:
-        # revocation_event table
-        revoke_events = query(conn, 'revocation_event')
-
-    for revoke_event in revoke_events:
-        revoke_event_consolidated = {'revocation_event': revoke_event}
-        result.append(revoke_event_consolidated)
-
-    return result
+        for record in query_iter(conn, 'revocation_event'):
+            yield {'revocation_event': record}
 
 
 @require_context
@@ -18,10 +18,17 @@
 #
 
 from bs4 import BeautifulSoup
+import codecs
 import json
+import requests
 
 from dcdbsync.dbsyncclient import exceptions
 
+# Size of the chunks read from a streamed response
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_json_decoder = json.JSONDecoder()
+
 
 class Resource(object):
     # This will be overridden by the actual resource
@@ -109,3 +116,62 @@ def get_json(response):
         return response.json()
     else:
         return json.loads(response.content)
+
+
+def iter_json_list(response, chunk_size=STREAM_CHUNK_SIZE):
+    """Parse the JSON list of a streamed response one item at a time.
+
+    Only the item being parsed and the unparsed part of the last chunk
+    read are held in memory, whatever the size of the list.
+    """
+    chunks = response.iter_content(chunk_size=chunk_size)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buf = ''
+    pos = 0
+    eof = False
+    started = False
+    expect_item = True
+
+    while True:
+        # Skip the whitespace preceding the next token
+        while pos < len(buf) and buf[pos] in ' \t\r\n':
+            pos += 1
+        if pos < len(buf):
+            if not started:
+                if buf[pos] != '[':
+                    raise ValueError('Expected a JSON list')
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == ']':
+                return
+            if not expect_item:
+                if buf[pos] != ',':
+                    raise ValueError('Expected , or ] at position %d' % pos)
+                pos += 1
+                expect_item = True
+                continue
+            try:
+                item, end = _json_decoder.raw_decode(buf, pos)
+            except ValueError:
+                # The item is incomplete, unless the response is over
+                end = None
+            # A number at the end of the buffer may be truncated
+            if end is not None and (end < len(buf) or eof):
+                pos = end
+                expect_item = False
+                yield item
+                continue
+        if eof:
+            raise ValueError('Unterminated JSON list')
+        try:
+            chunk = next(chunks, None)
+        except requests.exceptions.RequestException as e:
+            raise exceptions.ConnectFailure(
+                'Unable to read the response from %s: %s' % (response.url, e))
+        if chunk is None:
+            eof = True
+            buf = buf[pos:] + decoder.decode(b'', final=True)
+        else:
+            buf = buf[pos:] + decoder.decode(chunk)
+        pos = 0
@@ -26,6 +26,7 @@ import requests
 
 import logging
 
+from dccommon import session_pool
 from dcdbsync.dbsyncclient import exceptions
 from oslo_utils import importutils
 osprofiler_web = importutils.try_import("osprofiler.web")
@@ -45,13 +46,17 @@ def log_request(func):
 
 class HTTPClient(object):
     def __init__(self, base_url, token=None, project_id=None, user_id=None,
-                 cacert=None, insecure=False, request_timeout=None):
+                 cacert=None, insecure=False, request_timeout=None,
+                 region_name=None):
         self.base_url = base_url
         self.token = token
         self.project_id = project_id
         self.user_id = user_id
         self.ssl_options = {}
         self.request_timeout = request_timeout
+        # Reuse the keep-alive connections of the pooled session of the
+        # region, falling back to the agent url when no region is given
+        self.session = session_pool.get_session(region_name or base_url)
 
         if self.base_url.startswith('https'):
             if cacert and not os.path.exists(cacert):
@@ -66,13 +71,14 @@ class HTTPClient(object):
             self.ssl_options['cert'] = cacert
 
     @log_request
-    def get(self, url, headers=None):
+    def get(self, url, headers=None, stream=False):
         options = self._get_request_options('get', headers)
 
         try:
             url = self.base_url + url
             timeout = self.request_timeout
-            return requests.get(url, timeout=timeout, **options)
+            return self.session.get(url, timeout=timeout, stream=stream,
+                                    **options)
         except requests.exceptions.Timeout:
             msg = 'Request to %s timed out' % url
             raise exceptions.ConnectTimeout(msg)
@@ -90,7 +96,7 @@ class HTTPClient(object):
         try:
             url = self.base_url + url
             timeout = self.request_timeout
-            return requests.post(url, body, timeout=timeout, **options)
+            return self.session.post(url, body, timeout=timeout, **options)
         except requests.exceptions.Timeout:
             msg = 'Request to %s timed out' % url
             raise exceptions.ConnectTimeout(msg)
@@ -108,7 +114,7 @@ class HTTPClient(object):
         try:
             url = self.base_url + url
             timeout = self.request_timeout
-            return requests.put(url, body, timeout=timeout, **options)
+            return self.session.put(url, body, timeout=timeout, **options)
         except requests.exceptions.Timeout:
             msg = 'Request to %s timed out' % url
             raise exceptions.ConnectTimeout(msg)
@@ -126,7 +132,7 @@ class HTTPClient(object):
         try:
             url = self.base_url + url
             timeout = self.request_timeout
-            return requests.patch(url, body, timeout=timeout, **options)
+            return self.session.patch(url, body, timeout=timeout, **options)
         except requests.exceptions.Timeout:
             msg = 'Request to %s timed out' % url
             raise exceptions.ConnectTimeout(msg)
@@ -144,7 +150,7 @@ class HTTPClient(object):
         try:
             url = self.base_url + url
             timeout = self.request_timeout
-            return requests.delete(url, timeout=timeout, **options)
+            return self.session.delete(url, timeout=timeout, **options)
         except requests.exceptions.Timeout:
             msg = 'Request to %s timed out' % url
             raise exceptions.ConnectTimeout(msg)
@@ -95,6 +95,7 @@ class Client(object):
             cacert=cacert,
             insecure=insecure,
             request_timeout=_DEFAULT_REQUEST_TIMEOUT,
+            region_name=kwargs.get('region_name'),
         )
 
         # Create all managers
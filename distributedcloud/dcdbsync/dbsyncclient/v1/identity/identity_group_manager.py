@@ -21,6 +21,7 @@
 
 from dcdbsync.dbsyncclient import base
 from dcdbsync.dbsyncclient.base import get_json
+from dcdbsync.dbsyncclient.base import iter_json_list
 from dcdbsync.dbsyncclient import exceptions
 
 
@@ -64,31 +65,32 @@ class identity_group_manager(base.ResourceManager):
         return json_object
 
     def group_list(self, url):
-        resp = self.http_client.get(url)
-
-        # Unauthorized
-        if resp.status_code == 401:
-            raise exceptions.Unauthorized('Unauthorized request')
-        if resp.status_code != 200:
-            self._raise_api_exception(resp)
-
-        # Converted into python dict
-        json_objects = get_json(resp)
-
-        groups = []
-        for json_object in json_objects:
-            group = Group(
-                self,
-                id=json_object['group']['id'],
-                domain_id=json_object['group']['domain_id'],
-                name=json_object['group']['name'],
-                extra=json_object['group']['extra'],
-                description=json_object['group']['description'],
-                local_user_ids=json_object['local_user_ids'])
-
-            groups.append(group)
-
-        return groups
+        resp = self.http_client.get(url, stream=True)
+
+        try:
+            # Unauthorized
+            if resp.status_code == 401:
+                raise exceptions.Unauthorized('Unauthorized request')
+            if resp.status_code != 200:
+                self._raise_api_exception(resp)
+
+            # Parse the list as it is received and hand each
+            # item to the caller without building a list
+            json_objects = iter_json_list(resp)
+
+            for json_object in json_objects:
+                group = Group(
+                    self,
+                    id=json_object['group']['id'],
+                    domain_id=json_object['group']['domain_id'],
+                    name=json_object['group']['name'],
+                    extra=json_object['group']['extra'],
+                    description=json_object['group']['description'],
+                    local_user_ids=json_object['local_user_ids'])
+
+                yield group
+        finally:
+            resp.close()
 
     def _group_detail(self, url):
         resp = self.http_client.get(url)
@@ -21,6 +21,7 @@
 
 from dcdbsync.dbsyncclient import base
 from dcdbsync.dbsyncclient.base import get_json
+from dcdbsync.dbsyncclient.base import iter_json_list
 from dcdbsync.dbsyncclient import exceptions
 
 
@@ -101,61 +102,62 @@ class identity_user_manager(base.ResourceManager):
         return json_object
 
     def users_list(self, url):
-        resp = self.http_client.get(url)
-
-        # Unauthorized request
-        if resp.status_code == 401:
-            raise exceptions.Unauthorized('Unauthorized request.')
-        if resp.status_code != 200:
-            self._raise_api_exception(resp)
-
-        # Converted into python dict
-        json_objects = get_json(resp)
-
-        users = []
-        for json_object in json_objects:
-            passwords = []
-            for object in json_object['password']:
-                # skip empty password
-                if not object:
-                    continue
-                password = Password(
+        resp = self.http_client.get(url, stream=True)
+
+        try:
+            # Unauthorized request
+            if resp.status_code == 401:
+                raise exceptions.Unauthorized('Unauthorized request.')
+            if resp.status_code != 200:
+                self._raise_api_exception(resp)
+
+            # Parse the list as it is received and hand each
+            # item to the caller without building a list
+            json_objects = iter_json_list(resp)
+
+            for json_object in json_objects:
+                passwords = []
+                for object in json_object['password']:
+                    # skip empty password
+                    if not object:
+                        continue
+                    password = Password(
+                        self,
+                        id=object['id'],
+                        local_user_id=object['local_user_id'],
+                        self_service=object['self_service'],
+                        password_hash=object['password_hash'],
+                        created_at=object['created_at'],
+                        created_at_int=object['created_at_int'],
+                        expires_at=object['expires_at'],
+                        expires_at_int=object['expires_at_int'])
+                    passwords.append(password)
+
+                local_user = LocalUser(
+                    self,
+                    id=json_object['local_user']['id'],
+                    domain_id=json_object['local_user']['domain_id'],
+                    name=json_object['local_user']['name'],
+                    user_id=json_object['local_user']['user_id'],
+                    failed_auth_count=json_object['local_user'][
+                        'failed_auth_count'],
+                    failed_auth_at=json_object['local_user']['failed_auth_at'],
+                    passwords=passwords)
+
+                user = User(
                     self,
-                    id=object['id'],
-                    local_user_id=object['local_user_id'],
-                    self_service=object['self_service'],
-                    password_hash=object['password_hash'],
-                    created_at=object['created_at'],
-                    created_at_int=object['created_at_int'],
-                    expires_at=object['expires_at'],
-                    expires_at_int=object['expires_at_int'])
-                passwords.append(password)
-
-            local_user = LocalUser(
-                self,
-                id=json_object['local_user']['id'],
-                domain_id=json_object['local_user']['domain_id'],
-                name=json_object['local_user']['name'],
-                user_id=json_object['local_user']['user_id'],
-                failed_auth_count=json_object['local_user'][
-                    'failed_auth_count'],
-                failed_auth_at=json_object['local_user']['failed_auth_at'],
-                passwords=passwords)
-
-            user = User(
-                self,
-                id=json_object['user']['id'],
-                domain_id=json_object['user']['domain_id'],
-                default_project_id=json_object['user']['default_project_id'],
-                enabled=json_object['user']['enabled'],
-                created_at=json_object['user']['created_at'],
-                last_active_at=json_object['user']['last_active_at'],
-                extra=json_object['user']['extra'],
-                local_user=local_user)
-
-            users.append(user)
-
-        return users
+                    id=json_object['user']['id'],
+                    domain_id=json_object['user']['domain_id'],
+                    default_project_id=json_object['user']['default_project_id'],
+                    enabled=json_object['user']['enabled'],
+                    created_at=json_object['user']['created_at'],
+                    last_active_at=json_object['user']['last_active_at'],
+                    extra=json_object['user']['extra'],
+                    local_user=local_user)
+
+                yield user
+        finally:
+            resp.close()
 
     def _user_detail(self, url):
         resp = self.http_client.get(url)
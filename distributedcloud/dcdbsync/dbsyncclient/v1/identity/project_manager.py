@@ -21,6 +21,7 @@
 
 from dcdbsync.dbsyncclient import base
 from dcdbsync.dbsyncclient.base import get_json
+from dcdbsync.dbsyncclient.base import iter_json_list
 from dcdbsync.dbsyncclient import exceptions
 
 
@@ -66,34 +67,35 @@ class project_manager(base.ResourceManager):
         return json_object
 
     def projects_list(self, url):
-        resp = self.http_client.get(url)
-
-        # Unauthorized
-        if resp.status_code == 401:
-            raise exceptions.Unauthorized('Unauthorized request')
-        if resp.status_code != 200:
-            self._raise_api_exception(resp)
-
-        # Converted into python dict
-        json_objects = get_json(resp)
-
-        projects = []
-        for json_object in json_objects:
-            json_object = json_object['project']
-            project = Project(
-                self,
-                id=json_object['id'],
-                domain_id=json_object['domain_id'],
-                name=json_object['name'],
-                extra=json_object['extra'],
-                description=json_object['description'],
-                enabled=json_object['enabled'],
-                parent_id=json_object['parent_id'],
-                is_domain=json_object['is_domain'])
-
-            projects.append(project)
-
-        return projects
+        resp = self.http_client.get(url, stream=True)
+
+        try:
+            # Unauthorized
+            if resp.status_code == 401:
+                raise exceptions.Unauthorized('Unauthorized request')
+            if resp.status_code != 200:
+                self._raise_api_exception(resp)
+
+            # Parse the list as it is received and hand each
+            # item to the caller without building a list
+            json_objects = iter_json_list(resp)
+
+            for json_object in json_objects:
+                json_object = json_object['project']
+                project = Project(
+                    self,
+                    id=json_object['id'],
+                    domain_id=json_object['domain_id'],
+                    name=json_object['name'],
+                    extra=json_object['extra'],
+                    description=json_object['description'],
+                    enabled=json_object['enabled'],
+                    parent_id=json_object['parent_id'],
+                    is_domain=json_object['is_domain'])
+
+                yield project
+        finally:
+            resp.close()
 
     def _project_detail(self, url):
         resp = self.http_client.get(url)
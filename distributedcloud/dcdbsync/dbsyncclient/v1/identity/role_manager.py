@@ -20,6 +20,7 @@
 
 from dcdbsync.dbsyncclient import base
 from dcdbsync.dbsyncclient.base import get_json
+from dcdbsync.dbsyncclient.base import iter_json_list
 from dcdbsync.dbsyncclient import exceptions
 
 
@@ -60,31 +61,32 @@ class role_manager(base.ResourceManager):
         return json_object
 
     def roles_list(self, url):
-        resp = self.http_client.get(url)
-
-        # Unauthorized
-        if resp.status_code == 401:
-            raise exceptions.Unauthorized('Unauthorized request')
-        if resp.status_code != 200:
-            self._raise_api_exception(resp)
-
-        # Converted into python dict
-        json_objects = get_json(resp)
-
-        roles = []
-        for json_object in json_objects:
-            json_object = json_object.get('role')
-            role = Role(
-                self,
-                id=json_object['id'],
-                domain_id=json_object['domain_id'],
-                name=json_object['name'],
-                description=json_object['description'],
-                extra=json_object['extra'])
-
-            roles.append(role)
-
-        return roles
+        resp = self.http_client.get(url, stream=True)
+
+        try:
+            # Unauthorized
+            if resp.status_code == 401:
+                raise exceptions.Unauthorized('Unauthorized request')
+            if resp.status_code != 200:
+                self._raise_api_exception(resp)
+
+            # Parse the list as it is received and hand each
+            # item to the caller without building a list
+            json_objects = iter_json_list(resp)
+
+            for json_object in json_objects:
+                json_object = json_object.get('role')
+                role = Role(
+                    self,
+                    id=json_object['id'],
+                    domain_id=json_object['domain_id'],
+                    name=json_object['name'],
+                    description=json_object['description'],
+                    extra=json_object['extra'])
+
+                yield role
+        finally:
+            resp.close()
 
     def _role_detail(self, url):
         resp = self.http_client.get(url)
@@ -21,6 +21,7 @@
 
 from dcdbsync.dbsyncclient import base
 from dcdbsync.dbsyncclient.base import get_json
+from dcdbsync.dbsyncclient.base import iter_json_list
 from dcdbsync.dbsyncclient import exceptions
 
 
@@ -74,39 +75,40 @@ class revoke_event_manager(base.ResourceManager):
         return json_object
 
     def revoke_events_list(self, url):
-        resp = self.http_client.get(url)
-
-        # Unauthorized
-        if resp.status_code == 401:
-            raise exceptions.Unauthorized('Unauthorized request')
-        if resp.status_code != 200:
-            self._raise_api_exception(resp)
-
-        # Converted into python dict
-        json_objects = get_json(resp)
-
-        revoke_events = []
-        for json_object in json_objects:
-            json_object = json_object.get('revocation_event')
-            revoke_event = RevokeEvent(
-                self,
-                id=json_object['id'],
-                domain_id=json_object['domain_id'],
-                project_id=json_object['project_id'],
-                user_id=json_object['user_id'],
-                role_id=json_object['role_id'],
-                trust_id=json_object['trust_id'],
-                consumer_id=json_object['consumer_id'],
-                access_token_id=json_object['access_token_id'],
-                issued_before=json_object['issued_before'],
-                expires_at=json_object['expires_at'],
-                revoked_at=json_object['revoked_at'],
-                audit_id=json_object['audit_id'],
-                audit_chain_id=json_object['audit_chain_id'])
-
-            revoke_events.append(revoke_event)
-
-        return revoke_events
+        resp = self.http_client.get(url, stream=True)
+
+        try:
+            # Unauthorized
+            if resp.status_code == 401:
+                raise exceptions.Unauthorized('Unauthorized request')
+            if resp.status_code != 200:
+                self._raise_api_exception(resp)
+
+            # Parse the list as it is received and hand each
+            # item to the caller without building a list
+            json_objects = iter_json_list(resp)
+
+            for json_object in json_objects:
+                json_object = json_object.get('revocation_event')
+                revoke_event = RevokeEvent(
+                    self,
+                    id=json_object['id'],
+                    domain_id=json_object['domain_id'],
+                    project_id=json_object['project_id'],
+                    user_id=json_object['user_id'],
+                    role_id=json_object['role_id'],
+                    trust_id=json_object['trust_id'],
+                    consumer_id=json_object['consumer_id'],
+                    access_token_id=json_object['access_token_id'],
+                    issued_before=json_object['issued_before'],
+                    expires_at=json_object['expires_at'],
+                    revoked_at=json_object['revoked_at'],
+                    audit_id=json_object['audit_id'],
+                    audit_chain_id=json_object['audit_chain_id'])
+
+                yield revoke_event
+        finally:
+            resp.close()
 
     def _revoke_event_detail(self, url):
         resp = self.http_client.get(url)
@@ -0,0 +1,57 @@
+# Copyright (c) 2022 Wind River Systems, Inc.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+import json
+
+from oslotest import base
+
+from dcdbsync.api.controllers import restcomm
+
+
+class TestStreamJsonList(base.BaseTestCase):
+    def get_body(self, response):
+        return b''.join(response.app_iter).decode('utf-8')
+
+    def test_stream_json_list(self):
+        records = [{'role': {'id': str(i), 'name': 'role-%d' % i}}
+                   for i in range(100)]
+
+        response = restcomm.stream_json_list(iter(records), chunk_size=256)
+        chunks = list(response.app_iter)
+
+        self.assertEqual('application/json', response.content_type)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(records, json.loads(b''.join(chunks)))
+
+    def test_stream_json_list_empty(self):
+        response = restcomm.stream_json_list(iter([]))
+        self.assertEqual([], json.loads(self.get_body(response)))
+
+    def test_stream_json_list_first_record_error(self):
+        def records():
+            raise Exception('DB error')
+            yield
+
+        # The error is raised before the response is returned
+        self.assertRaises(Exception, restcomm.stream_json_list, records())
+
+    def test_stream_json_list_error(self):
+        def records():
+            yield {'role': {'id': '1'}}
+            raise Exception('DB error')
+
+        response = restcomm.stream_json_list(records())
+
+        # The list is left unterminated
+        self.assertRaises(ValueError, json.loads, self.get_body(response))
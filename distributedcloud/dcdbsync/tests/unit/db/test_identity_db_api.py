@@ -0,0 +1,266 @@
+# Copyright (c) 2022 Wind River Systems, Inc.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+import time
+
+import mock
+from oslo_db.sqlalchemy import enginefacade
+from oslo_log import log as logging
+from oslotest import base
+import sqlalchemy
+
+from dccommon.tests import utils as test_utils
+from dcdbsync.common import context
+from dcdbsync.db.identity.sqlalchemy import api as db_api
+
+LOG = logging.getLogger(__name__)
+
+# Size of the synthetic keystone tables used by the benchmark
+NUM_USERS = 20000
+NUM_PASSWORDS_PER_USER = 5
+NUM_GROUPS = 500
+
+
+def make_identity_tables(metadata):
+    # The keystone columns used by the tests
+    sqlalchemy.Table(
+        'user', metadata,
+        sqlalchemy.Column('id', sqlalchemy.String(64), primary_key=True),
+        sqlalchemy.Column('enabled', sqlalchemy.Boolean),
+        sqlalchemy.Column('domain_id', sqlalchemy.String(64)))
+    sqlalchemy.Table(
+        'local_user', metadata,
+        sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column('user_id', sqlalchemy.String(64)),
+        sqlalchemy.Column('domain_id', sqlalchemy.String(64)),
+        sqlalchemy.Column('name', sqlalchemy.String(255)))
+    sqlalchemy.Table(
+        'password', metadata,
+        sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column('local_user_id', sqlalchemy.Integer),
+        sqlalchemy.Column('password_hash', sqlalchemy.String(255)))
+    sqlalchemy.Table(
+        'group', metadata,
+        sqlalchemy.Column('id', sqlalchemy.String(64), primary_key=True),
+        sqlalchemy.Column('domain_id', sqlalchemy.String(64)))
+    sqlalchemy.Table(
+        'user_group_membership', metadata,
+        sqlalchemy.Column('user_id', sqlalchemy.String(64),
+                          primary_key=True),
+        sqlalchemy.Column('group_id', sqlalchemy.String(64),
+                          primary_key=True))
+    sqlalchemy.Table(
+        'project', metadata,
+        sqlalchemy.Column('id', sqlalchemy.String(64), primary_key=True),
+        sqlalchemy.Column('name', sqlalchemy.String(64)),
+        sqlalchemy.Column('domain_id', sqlalchemy.String(64)))
+    sqlalchemy.Table(
+        'role', metadata,
+        sqlalchemy.Column('id', sqlalchemy.String(64), primary_key=True),
+        sqlalchemy.Column('name', sqlalchemy.String(255)))
+    sqlalchemy.Table(
+        'revocation_event', metadata,
+        sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column('user_id', sqlalchemy.String(64)),
+        sqlalchemy.Column('audit_id', sqlalchemy.String(32)))
+
+
+def make_users(num_users, num_passwords_per_user):
+    users = []
+    local_users = []
+    passwords = []
+    for i in range(num_users):
+        user_id = 'user-%d' % i
+        users.append({'id': user_id, 'enabled': True,
+                      'domain_id': 'default'})
+        # A few users are not local users
+        if i % 10 == 9:
+            continue
+        local_users.append({'id': i, 'user_id': user_id,
+                            'domain_id': 'default', 'name': user_id})
+        for j in range(num_passwords_per_user):
+            passwords.append({'id': i * num_passwords_per_user + j,
+                              'local_user_id': i,
+                              'password_hash': 'hash-%d-%d' % (i, j)})
+    # Local user whose user record is missing
+    local_users.append({'id': num_users, 'user_id': 'orphan',
+                        'domain_id': 'default', 'name': 'orphan'})
+    return users, local_users, passwords
+
+
+def make_groups(num_groups, users):
+    groups = []
+    memberships = []
+    for i in range(num_groups):
+        group_id = 'group-%d' % i
+        groups.append({'id': group_id, 'domain_id': 'default'})
+        for user in reversed(users[i::num_groups]):
+            memberships.append({'group_id': group_id,
+                                'user_id': user['id']})
+    return groups, memberships
+
+
+def nested_loop_users(users, local_users, passwords):
+    # Reference implementation, joining the records by scanning them
+    result = []
+    for local_user in local_users:
+        user_consolidated = {'local_user': local_user}
+        for user in users:
+            if user['id'] == local_user['user_id']:
+                user_consolidated['user'] = user
+        user_consolidated['password'] = [
+            password for password in passwords
+            if password['local_user_id'] == local_user['id']]
+        result.append(user_consolidated)
+    return result
+
+
+def nested_loop_groups(groups, memberships):
+    # Reference implementation, joining the records by scanning them
+    return [{'group': group,
+             'local_user_ids': sorted(
+                 membership['user_id'] for membership in memberships
+                 if membership['group_id'] == group['id'])}
+            for group in sorted(groups, key=lambda group: group['id'])]
+
+
+class TestIdentityDBApiIterators(base.BaseTestCase):
+    def setUp(self):
+        super(TestIdentityDBApiIterators, self).setUp()
+
+        context_manager = enginefacade.transaction_context()
+        context_manager.configure(connection='sqlite://')
+        self.engine = context_manager.writer.get_engine()
+        metadata = sqlalchemy.MetaData()
+        make_identity_tables(metadata)
+        metadata.create_all(self.engine)
+        self.tables = metadata.tables
+
+        # Reflect the tables of this database rather than cached ones
+        for name, value in (('_main_context_manager', context_manager),
+                            ('registry', db_api.TableRegistry())):
+            patcher = mock.patch.object(db_api, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.ctx = context.get_admin_context()
+
+    def insert(self, tablename, records):
+        if records:
+            self.engine.execute(self.tables[tablename].insert(), records)
+
+    def test_user_get_all_iter(self):
+        users, local_users, passwords = make_users(100, 3)
+        self.insert('user', users)
+        self.insert('local_user', local_users)
+        self.insert('password', passwords)
+
+        result = list(db_api.user_get_all_iter(self.ctx))
+
+        self.assertEqual(nested_loop_users(users, local_users, passwords),
+                         result)
+        # The orphan local user is reported without its user record
+        self.assertNotIn('user', result[-1])
+        self.assertEqual([], result[-1]['password'])
+
+    def test_user_get_all_iter_single_query(self):
+        users, local_users, passwords = make_users(20, 2)
+        self.insert('user', users)
+        self.insert('local_user', local_users)
+        self.insert('password', passwords)
+        # Reflect the tables beforehand
+        list(db_api.user_get_all_iter(self.ctx))
+
+        with test_utils.count_statements(self.engine) as statements:
+            result = list(db_api.user_get_all_iter(self.ctx))
+
+        self.assertEqual(len(local_users), len(result))
+        self.assertEqual(1, len(statements))
+
+    def test_user_get_all_iter_empty(self):
+        self.assertEqual([], list(db_api.user_get_all_iter(self.ctx)))
+
+    def test_group_get_all_iter(self):
+        users, _local_users, _passwords = make_users(100, 0)
+        groups, memberships = make_groups(10, users)
+        groups.append({'id': 'empty', 'domain_id': 'default'})
+        self.insert('group', groups)
+        self.insert('user_group_membership', memberships)
+
+        result = list(db_api.group_get_all_iter(self.ctx))
+
+        self.assertEqual(nested_loop_groups(groups, memberships), result)
+        self.assertEqual({'group': {'id': 'empty', 'domain_id': 'default'},
+                          'local_user_ids': []}, result[0])
+
+    def test_project_get_all_iter(self):
+        projects = [{'id': 'project-%d' % i, 'name': 'project-%d' % i,
+                     'domain_id': 'default'} for i in range(3)]
+        self.insert('project', projects)
+
+        result = list(db_api.project_get_all_iter(self.ctx))
+
+        self.assertEqual([{'project': project} for project in projects],
+                         result)
+
+    def test_role_get_all_iter(self):
+        roles = [{'id': 'role-%d' % i, 'name': 'role-%d' % i}
+                 for i in range(3)]
+        self.insert('role', roles)
+
+        result = list(db_api.role_get_all_iter(self.ctx))
+
+        self.assertEqual([{'role': role} for role in roles], result)
+
+    def test_revoke_event_get_all_iter(self):
+        revoke_events = [{'id': 1, 'user_id': None, 'audit_id': 'audit-1'},
+                         {'id': 2, 'user_id': 'user-1', 'audit_id': None}]
+        self.insert('revocation_event', revoke_events)
+
+        result = list(db_api.revoke_event_get_all_iter(self.ctx))
+
+        self.assertEqual([{'revocation_event': revoke_event}
+                          for revoke_event in revoke_events], result)
+
+    @test_utils.benchmark
+    def test_get_all_iter_benchmark(self):
+        users, local_users, passwords = make_users(NUM_USERS,
+                                                   NUM_PASSWORDS_PER_USER)
+        groups, memberships = make_groups(NUM_GROUPS, users)
+        self.insert('user', users)
+        self.insert('local_user', local_users)
+        self.insert('password', passwords)
+        self.insert('group', groups)
+        self.insert('user_group_membership', memberships)
+
+        start = time.time()
+        num_users = 0
+        num_passwords = 0
+        for user in db_api.user_get_all_iter(self.ctx):
+            num_users += 1
+            num_passwords += len(user['password'])
+        users_elapsed = time.time() - start
+        start = time.time()
+        num_memberships = sum(
+            len(group['local_user_ids'])
+            for group in db_api.group_get_all_iter(self.ctx))
+        groups_elapsed = time.time() - start
+
+        LOG.info("Joined %d local users and %d passwords in %.3fs, "
+                 "%d groups and %d memberships in %.3fs" %
+                 (len(local_users), len(passwords), users_elapsed,
+                  len(groups), len(memberships), groups_elapsed))
+        self.assertEqual(len(local_users), num_users)
+        self.assertEqual(len(passwords), num_passwords)
+        self.assertEqual(len(memberships), num_memberships)
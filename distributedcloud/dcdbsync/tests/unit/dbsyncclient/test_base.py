@@ -0,0 +1,70 @@
+# Copyright (c) 2022 Wind River Systems, Inc.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+import json
+
+import requests
+
+from oslotest import base
+
+from dcdbsync.dbsyncclient import base as client_base
+from dcdbsync.dbsyncclient import exceptions
+
+
+class FakeStreamedResponse(object):
+    url = 'http://dbsync/v1.0/identity/users/'
+
+    def __init__(self, content, chunk_size, error=None):
+        self.content = content.encode('utf-8')
+        self.chunk_size = chunk_size
+        self.error = error
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.content), self.chunk_size):
+            yield self.content[i:i + self.chunk_size]
+        if self.error:
+            raise self.error
+
+
+class TestIterJsonList(base.BaseTestCase):
+    def test_iter_json_list(self):
+        records = [{'user': {'id': '1', 'name': u'café ]"'}},
+                   {'password': [{'id': 2}, {}]},
+                   12345, 'a, b']
+        content = json.dumps(records)
+
+        # Items and multi-byte characters split across the chunks
+        for chunk_size in (1, 2, 7, len(content)):
+            response = FakeStreamedResponse(content, chunk_size)
+            self.assertEqual(records,
+                             list(client_base.iter_json_list(response)))
+
+    def test_iter_json_list_empty(self):
+        response = FakeStreamedResponse(' [ ] ', 1)
+        self.assertEqual([], list(client_base.iter_json_list(response)))
+
+    def test_iter_json_list_truncated(self):
+        response = FakeStreamedResponse('[{"id": 1}, {"id": 2}', 4)
+        items = client_base.iter_json_list(response)
+
+        self.assertEqual({'id': 1}, next(items))
+        self.assertRaises(ValueError, list, items)
+
+    def test_iter_json_list_connection_error(self):
+        response = FakeStreamedResponse(
+            '[{"id": 1}, {"id"', 4,
+            error=requests.exceptions.ChunkedEncodingError())
+
+        self.assertRaises(exceptions.ConnectFailure, list,
+                          client_base.iter_json_list(response))
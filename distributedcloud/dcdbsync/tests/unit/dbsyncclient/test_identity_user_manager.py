@@ -0,0 +1,89 @@
+# Copyright (c) 2022 Wind River Systems, Inc.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+import json
+
+import mock
+from oslotest import base
+
+from dcdbsync.dbsyncclient import exceptions
+from dcdbsync.dbsyncclient.v1.identity import identity_user_manager
+from dcdbsync.tests.unit.dbsyncclient import test_base
+
+
+def make_user_record(i):
+    return {'user': {'id': 'user-%d' % i, 'domain_id': 'default',
+                     'default_project_id': None, 'enabled': True,
+                     'created_at': None, 'last_active_at': None,
+                     'extra': {}},
+            'local_user': {'id': i, 'domain_id': 'default',
+                           'name': 'user-%d' % i, 'user_id': 'user-%d' % i,
+                           'failed_auth_count': 0, 'failed_auth_at': None},
+            'password': [{'id': i, 'local_user_id': i,
+                          'self_service': False, 'password_hash': 'hash',
+                          'created_at': None, 'created_at_int': 0,
+                          'expires_at': None, 'expires_at_int': None},
+                         {}]}
+
+
+class TestIdentityUserManager(base.BaseTestCase):
+    def setUp(self):
+        super(TestIdentityUserManager, self).setUp()
+        self.http_client = mock.MagicMock()
+        self.manager = identity_user_manager.identity_user_manager(
+            self.http_client)
+
+    def set_response(self, content, status_code=200):
+        response = test_base.FakeStreamedResponse(content, 16)
+        response.status_code = status_code
+        response.close = mock.MagicMock()
+        self.http_client.get.return_value = response
+        return response
+
+    def test_list_users(self):
+        response = self.set_response(
+            json.dumps([make_user_record(i) for i in range(3)]))
+
+        users = self.manager.list_users()
+
+        # Nothing is requested until the users are iterated
+        self.http_client.get.assert_not_called()
+        users = list(users)
+        self.http_client.get.assert_called_once_with('/identity/users/',
+                                                     stream=True)
+        self.assertEqual(['user-0', 'user-1', 'user-2'],
+                         [user.local_user.name for user in users])
+        # The empty password is skipped
+        self.assertEqual([[0], [1], [2]],
+                         [[p.id for p in user.local_user.passwords]
+                          for user in users])
+        response.close.assert_called_once_with()
+
+    def test_list_users_yields_as_parsed(self):
+        content = json.dumps([make_user_record(i) for i in range(2)])
+        # The response is cut in the middle of the second user
+        response = self.set_response(content[:-100])
+
+        users = self.manager.list_users()
+
+        self.assertEqual('user-0', next(users).local_user.name)
+        self.assertRaises(ValueError, next, users)
+        response.close.assert_called_once_with()
+
+    def test_list_users_unauthorized(self):
+        response = self.set_response('', status_code=401)
+
+        self.assertRaises(exceptions.Unauthorized, list,
+                          self.manager.list_users())
+        response.close.assert_called_once_with()
@@ -810,6 +810,86 @@ class SubcloudsController(object):
             LOG.exception(str(e))
             pecan.abort(400, str(e))
 
+    @staticmethod
+    def _get_subcloud_list_filters(context):
+        """Get the subcloud list filters from the request parameters"""
+        filters = dict()
+        for param, key, values in (
+                ('availability', 'availability_status',
+                 [consts.AVAILABILITY_ONLINE, consts.AVAILABILITY_OFFLINE]),
+                ('management', 'management_state',
+                 [consts.MANAGEMENT_MANAGED, consts.MANAGEMENT_UNMANAGED]),
+                ('deploy_status', 'deploy_status', None),
+                ('sync_status', 'sync_status',
+                 [consts.SYNC_STATUS_IN_SYNC, consts.SYNC_STATUS_OUT_OF_SYNC,
+                  consts.SYNC_STATUS_UNKNOWN])):
+            val = request.params.get(param)
+            if val is None:
+                continue
+            if values is not None and val not in values:
+                pecan.abort(400, _('Invalid %s value: %s') % (param, val))
+            filters[key] = val
+
+        group_ref = request.params.get('group')
+        if group_ref is not None:
+            try:
+                if group_ref.isdigit():
+                    group = db_api.subcloud_group_get(context, group_ref)
+                else:
+                    group = db_api.subcloud_group_get_by_name(context,
+                                                              group_ref)
+            except exceptions.NotFound:
+                pecan.abort(400, _('Invalid group: %s') % group_ref)
+            filters['group_id'] = group.id
+        return filters
+
+    def _get_subcloud_list(self, context):
+        """Get the subclouds matching the request parameters
+
+        The subclouds are paginated with limit and marker (the id of the
+        last subcloud of the previous page). Unless compact is requested,
+        the sync status of each endpoint is included.
+        """
+        pagination = dict()
+        for param in ('limit', 'marker'):
+            val = request.params.get(param)
+            if val is None:
+                continue
+            if not val.isdigit() or (param == 'limit' and int(val) == 0):
+                pecan.abort(400, _('Invalid %s value: %s') % (param, val))
+            pagination[param] = int(val)
+        compact = request.params.get('compact', '').lower() in ('true', 't')
+
+        subclouds = db_api.subcloud_get_all_with_sync_status(
+            context, filters=self._get_subcloud_list_filters(context),
+            **pagination)
+
+        endpoint_statuses = dict()
+        if not compact:
+            subcloud_ids = [subcloud.id for subcloud, sync_status in subclouds]
+            for subcloud_status in \
+                    db_api.subcloud_status_get_all_by_subcloud_ids(
+                        context, subcloud_ids):
+                endpoint_statuses.setdefault(
+                    subcloud_status.subcloud_id, []).append(
+                        db_api.subcloud_endpoint_status_db_model_to_dict(
+                            subcloud_status))
+
+        result = dict()
+        result['subclouds'] = []
+        for subcloud, sync_status in subclouds:
+            subcloud_dict = db_api.subcloud_db_model_to_dict(subcloud)
+            subcloud_dict['subcloud_id'] = subcloud.id
+            subcloud_dict[consts.SYNC_STATUS] = sync_status
+            if compact:
+                del subcloud_dict['data_install']
+                del subcloud_dict['data_upgrade']
+            else:
+                subcloud_dict[consts.ENDPOINT_SYNC_STATUS] = \
+                    endpoint_statuses.get(subcloud.id, [])
+            result['subclouds'].append(subcloud_dict)
+        return result
+
     @index.when(method='GET', template='json')
     def get(self, subcloud_ref=None, detail=None):
         """Get details about subcloud.
@@ -820,61 +900,7 @@ class SubcloudsController(object):
 
         if subcloud_ref is None:
             # List of subclouds requested
-            subclouds = db_api.subcloud_get_all_with_status(context)
-            result = dict()
-            result['subclouds'] = []
-            first_time = True
-            subcloud_list = []
-            subcloud_status_list = []
-
-            # We get back a subcloud, subcloud_status pair for every
-            # subcloud_status entry corresponding to a subcloud.  (Subcloud
-            # info repeats)
-            # Aggregate all the sync status for each of the
-            # endpoints per subcloud into an overall sync status
-            for subcloud, subcloud_status in subclouds:
-                subcloud_dict = db_api.subcloud_db_model_to_dict(subcloud)
-                subcloud_status_dict = db_api.subcloud_status_db_model_to_dict(
-                    subcloud_status)
-                subcloud_dict.update(subcloud_status_dict)
-
-                if not first_time:
-                    if subcloud_list[-1]['id'] == subcloud_dict['id']:
-                        # We have a match for this subcloud id already,
-                        # check if we have a same sync_status
-                        if subcloud_list[-1][consts.SYNC_STATUS] != \
-                                subcloud_dict[consts.SYNC_STATUS]:
-                            subcloud_list[-1][consts.SYNC_STATUS] = \
-                                consts.SYNC_STATUS_OUT_OF_SYNC
-
-                        if subcloud_status:
-                            subcloud_status_list.append(
-                                db_api.subcloud_endpoint_status_db_model_to_dict(  # noqa
-                                    subcloud_status))
-                        subcloud_list[-1][
-                            consts.ENDPOINT_SYNC_STATUS] = subcloud_status_list
-
-                    else:
-                        subcloud_status_list = []
-                        if subcloud_status:
-                            subcloud_status_list.append(
-                                db_api.subcloud_endpoint_status_db_model_to_dict(  # noqa
-                                    subcloud_status))
-
-                        subcloud_list.append(subcloud_dict)
-                else:
-                    if subcloud_status:
-                        subcloud_status_list.append(
-                            db_api.subcloud_endpoint_status_db_model_to_dict(
-                                subcloud_status))
-                    subcloud_list.append(subcloud_dict)
-
-                first_time = False
-
-            for s in subcloud_list:
-                result['subclouds'].append(s)
-
-            return result
+            return self._get_subcloud_list(context)
         else:
             # Single subcloud requested
             subcloud = None
@@ -0,0 +1,59 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+import collections
+
+from dcmanager.audit import utils as audit_utils
+
+# Number of subclouds whose sync status is remembered. The audit workers
+# are not told about deleted subclouds, so the least recently audited
+# subclouds are forgotten past this number instead.
+MAX_ENTRIES = 5000
+
+
+class AuditFingerprintCache(object):
+    """Remembers the sync status last computed for each subcloud.
+
+    The status is keyed by the fingerprints of the RegionOne audit data
+    and of the subcloud state it was computed from. As long as neither
+    changes, the status is reused and the comparison is skipped.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self._regionone_data = None
+        self._regionone_fingerprint = None
+        self._max_entries = max_entries
+        # Ordered from the least to the most recently audited subcloud
+        self._entries = collections.OrderedDict()
+
+    def _get_regionone_fingerprint(self, regionone_data):
+        # The audit worker shares the decoded RegionOne audit data between
+        # the subclouds it audits, so it is fingerprinted once per audit.
+        if regionone_data is not self._regionone_data:
+            self._regionone_fingerprint = \
+                audit_utils.get_fingerprint(regionone_data)
+            self._regionone_data = regionone_data
+        return self._regionone_fingerprint
+
+    def get_fingerprint(self, regionone_data, subcloud_data):
+        """Return the fingerprint of the data a sync status is based on."""
+        return (self._get_regionone_fingerprint(regionone_data),
+                audit_utils.get_fingerprint(subcloud_data))
+
+    def get_sync_status(self, subcloud_name, fingerprint):
+        """Return the sync status cached for this fingerprint, if any."""
+        entry = self._entries.pop(subcloud_name, None)
+        if entry is None:
+            return None
+        self._entries[subcloud_name] = entry
+        if entry[0] == fingerprint:
+            return entry[1]
+        return None
+
+    def set_sync_status(self, subcloud_name, fingerprint, sync_status):
+        self._entries.pop(subcloud_name, None)
+        self._entries[subcloud_name] = (fingerprint, sync_status)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
@@ -15,6 +15,8 @@
 # limitations under the License.
 #
 
+import collections
+
 from keystoneauth1 import exceptions as keystone_exceptions
 from oslo_log import log as logging
 
@@ -23,6 +25,7 @@ from dccommon.drivers.openstack.sysinv_v1 import SysinvClient
 
 from dcorch.common import consts as dcorch_consts
 
+from dcmanager.audit import fingerprint_cache
 from dcmanager.common import consts
 
 
@@ -62,8 +65,9 @@ class FirmwareAuditData(object):
 
     @classmethod
     def from_dict(cls, values):
-        if values is None:
-            return None
+        if values is None or isinstance(values, cls):
+            # Already decoded, e.g. by the audit worker snapshot cache
+            return values
         return cls(**values)
 
 
@@ -75,6 +79,7 @@ class FirmwareAudit(object):
         self.context = context
         self.state_rpc_client = dcmanager_state_rpc_client
         self.audit_count = 0
+        self.fingerprint_cache = fingerprint_cache.AuditFingerprintCache()
 
     def _update_subcloud_sync_status(self, sc_name, sc_endpoint_type,
                                      sc_status):
@@ -128,16 +133,15 @@ class FirmwareAudit(object):
                           'skip firmware audit')
         return filtered_images
 
-    def _check_for_label_match(self, subcloud_host_device_label_list,
-                               device_uuid,
-                               label_key, label_value):
-        for device_label in subcloud_host_device_label_list:
-            if device_label.pcidevice_uuid and \
-                device_uuid == device_label.pcidevice_uuid and \
-                label_key == device_label.label_key and \
-                label_value == device_label.label_value:
-                return True
-        return False
+    @staticmethod
+    def _get_image_labels(image):
+        """Return the set of (key, value) labels of an image"""
+        image_labels = set()
+        for image_label in image.applied_labels or []:
+            if image_label:
+                label_key = list(image_label.keys())[0]
+                image_labels.add((label_key, image_label.get(label_key)))
+        return image_labels
 
     def _check_image_match(self,
                            subcloud_image,
@@ -158,8 +162,17 @@ class FirmwareAudit(object):
                                          subcloud_sysinv_client,
                                          image,
                                          enabled_host_device_list,
-                                         subcloud_device_image_states,
-                                         subcloud_device_label_list):
+                                         subcloud_images,
+                                         image_states_by_device,
+                                         labels_by_device):
+        """Check the image is written to all the eligible subcloud devices
+
+        :param subcloud_images: subcloud device images indexed by uuid
+        :param image_states_by_device: subcloud device image states
+               indexed by pcidevice_uuid
+        :param labels_by_device: set of (key, value) subcloud device
+               labels indexed by pcidevice_uuid
+        """
         apply_to_all_devices = False
         if image.applied_labels:
             # Returns true if the list contains at least one empty dict.
@@ -167,63 +180,54 @@ class FirmwareAudit(object):
             # all devices that match the pci vendor and pci device ID.
             apply_to_all_devices = any(not image for image in image.applied_labels)
 
+        if not apply_to_all_devices:
+            # If image has to be applied to devices with a matching label
+            # and the device label list is empty on the subcloud, report
+            # as in-sync
+            if not labels_by_device:
+                return True
+            image_labels = self._get_image_labels(image)
+
         for device in enabled_host_device_list:
-            if not apply_to_all_devices:
-                # If image has to be applied to devices with a matching label
-                # and the device label list is empty on the subcloud, report
-                # as in-sync
-                if not subcloud_device_label_list:
+            # Device is considered eligible if device labels
+            # match at least one of the image labels
+            if not apply_to_all_devices and \
+                    image_labels.isdisjoint(labels_by_device.get(device.uuid,
+                                                                 ())):
+                continue
+
+            if image.pci_vendor != device.pvendor_id or \
+                    image.pci_device != device.pdevice_id:
+                continue
+
+            for device_image_state in image_states_by_device.get(device.uuid,
+                                                                 []):
+                subcloud_image = subcloud_images.get(
+                    device_image_state.image_uuid)
+                if subcloud_image is None:
+                    # The image was created after the images were listed
+                    try:
+                        subcloud_image = subcloud_sysinv_client.\
+                            get_device_image(device_image_state.image_uuid)
+                    except Exception:
+                        LOG.exception('Cannot retrieve device image for '
+                                      'subcloud: %s, skip firmware '
+                                      'audit' % subcloud_name)
+                        return False
+                    subcloud_images[device_image_state.image_uuid] = \
+                        subcloud_image
+
+                if self._check_image_match(subcloud_image, image):
+                    if device_image_state.status != "completed":
+                        # If device image state is not completed it means
+                        # that the image has not been written to the device
+                        # yet
+                        return False
                     break
-
-                # Device is considered eligible if device labels
-                # match at least one of the image labels
-                is_device_eligible = False
-                for image_label in image.applied_labels:
-                    label_key = list(image_label.keys())[0]
-                    label_value = image_label.get(label_key)
-                    is_device_eligible = \
-                        self._check_for_label_match(
-                            subcloud_device_label_list,
-                            device.uuid,
-                            label_key,
-                            label_value)
-                    # If device label matches any image label stop checking
-                    # for any other label matches
-                    if is_device_eligible:
-                        break
-
-                # If this device is not eligible, go to the next device
-                if not is_device_eligible:
-                    continue
-
-            if image.pci_vendor == device.pvendor_id and \
-                image.pci_device == device.pdevice_id:
-                device_image_state = None
-                subcloud_image = None
-                for device_image_state_obj in subcloud_device_image_states:
-                    if device_image_state_obj.pcidevice_uuid == device.uuid:
-                        try:
-                            subcloud_image = subcloud_sysinv_client.\
-                                get_device_image(device_image_state_obj.image_uuid)
-                        except Exception:
-                            LOG.exception('Cannot retrieve device image for '
-                                          'subcloud: %s, skip firmware '
-                                          'audit' % subcloud_name)
-                            return False
-
-                        if self._check_image_match(subcloud_image, image):
-                            device_image_state = device_image_state_obj
-                            break
-                else:
-                    # If no device image state is present in the list that
-                    # means the image hasn't been applied yet
-                    return False
-
-                if device_image_state and \
-                    device_image_state.status != "completed":
-                    # If device image state is not completed it means
-                    # that the image has not been written to the device yet
-                    return False
+            else:
+                # If no device image state is present in the list that
+                # means the image hasn't been applied yet
+                return False
         return True
 
     def subcloud_firmware_audit(self, subcloud_name, audit_data):
@@ -293,6 +297,58 @@ class FirmwareAudit(object):
                           'subcloud: %s, skip firmware audit' % subcloud_name)
             return
 
+        # The device images are only compared again if the devices, their
+        # labels and image states, or the RegionOne images changed.
+        fingerprint = self.fingerprint_cache.get_fingerprint(
+            audit_data,
+            [[(device.uuid, device.pvendor_id, device.pdevice_id)
+              for device in enabled_host_device_list],
+             [(device_image_state.pcidevice_uuid,
+               device_image_state.image_uuid,
+               device_image_state.status)
+              for device_image_state in subcloud_device_image_states],
+             [(device_label.pcidevice_uuid,
+               device_label.label_key,
+               device_label.label_value)
+              for device_label in subcloud_device_label_list]])
+        sync_status = self.fingerprint_cache.get_sync_status(subcloud_name,
+                                                             fingerprint)
+        if sync_status is not None:
+            LOG.debug("Device images of subcloud %s unchanged" %
+                      subcloud_name)
+            self._update_subcloud_sync_status(
+                subcloud_name, dcorch_consts.ENDPOINT_TYPE_FIRMWARE,
+                sync_status)
+            LOG.info('Firmware audit completed for: %s.' % subcloud_name)
+            return
+
+        # Retrieve the device images of this subcloud once, rather than
+        # once per device image state and RegionOne image.
+        try:
+            subcloud_images = dict(
+                (subcloud_image.uuid, subcloud_image) for subcloud_image
+                in sysinv_client.get_device_images())
+        except Exception:
+            LOG.exception('Cannot retrieve device images for '
+                          'subcloud: %s, skip firmware audit' % subcloud_name)
+            return
+
+        # An image created after the images were listed is retrieved on its
+        # own, the status is not cached if that fails.
+        cacheable = all(device_image_state.image_uuid in subcloud_images
+                        for device_image_state in subcloud_device_image_states)
+
+        image_states_by_device = collections.defaultdict(list)
+        for device_image_state in subcloud_device_image_states:
+            image_states_by_device[device_image_state.pcidevice_uuid].append(
+                device_image_state)
+
+        labels_by_device = collections.defaultdict(set)
+        for device_label in subcloud_device_label_list:
+            if device_label.pcidevice_uuid:
+                labels_by_device[device_label.pcidevice_uuid].add(
+                    (device_label.label_key, device_label.label_value))
+
         out_of_sync = False
 
         # Check that all device images applied in RegionOne
@@ -305,18 +361,20 @@ class FirmwareAudit(object):
                                                             sysinv_client,
                                                             image,
                                                             enabled_host_device_list,
-                                                            subcloud_device_image_states,
-                                                            subcloud_device_label_list)
+                                                            subcloud_images,
+                                                            image_states_by_device,
+                                                            labels_by_device)
             if not proceed:
                 out_of_sync = True
                 break
 
         if out_of_sync:
-            self._update_subcloud_sync_status(
-                subcloud_name, dcorch_consts.ENDPOINT_TYPE_FIRMWARE,
-                consts.SYNC_STATUS_OUT_OF_SYNC)
+            sync_status = consts.SYNC_STATUS_OUT_OF_SYNC
         else:
-            self._update_subcloud_sync_status(
-                subcloud_name, dcorch_consts.ENDPOINT_TYPE_FIRMWARE,
-                consts.SYNC_STATUS_IN_SYNC)
+            sync_status = consts.SYNC_STATUS_IN_SYNC
+        if cacheable:
+            self.fingerprint_cache.set_sync_status(subcloud_name,
+                                                   fingerprint, sync_status)
+        self._update_subcloud_sync_status(
+            subcloud_name, dcorch_consts.ENDPOINT_TYPE_FIRMWARE, sync_status)
         LOG.info('Firmware audit completed for: %s.' % subcloud_name)
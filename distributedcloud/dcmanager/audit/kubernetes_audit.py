@@ -44,8 +44,9 @@ class KubernetesAuditData(object):
 
     @classmethod
     def from_dict(cls, values):
-        if values is None:
-            return None
+        if values is None or isinstance(values, cls):
+            # Already decoded, e.g. by the audit worker snapshot cache
+            return values
         return cls(**values)
 
 
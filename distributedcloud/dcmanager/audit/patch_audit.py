@@ -25,6 +25,7 @@ from dccommon.drivers.openstack.sysinv_v1 import SysinvClient
 
 from dcorch.common import consts as dcorch_consts
 
+from dcmanager.audit import fingerprint_cache
 from dcmanager.common import consts
 from dcmanager.common import utils
 
@@ -50,8 +51,9 @@ class PatchAuditData(object):
 
     @classmethod
     def from_dict(cls, values):
-        if values is None:
-            return None
+        if values is None or isinstance(values, cls):
+            # Already decoded, e.g. by the audit worker snapshot cache
+            return values
         return cls(**values)
 
 
@@ -63,6 +65,7 @@ class PatchAudit(object):
         self.context = context
         self.state_rpc_client = dcmanager_state_rpc_client
         self.audit_count = 0
+        self.fingerprint_cache = fingerprint_cache.AuditFingerprintCache()
 
     def _update_subcloud_sync_status(self, sc_name, sc_endpoint_type,
                                      sc_status):
@@ -177,11 +180,64 @@ class PatchAudit(object):
 
         installed_loads = utils.get_loads_for_patching(loads)
 
-        out_of_sync = False
-
         # audit_data will be a dict due to passing through RPC so objectify it
         audit_data = PatchAuditData.from_dict(audit_data)
 
+        # The patches of the subcloud are only compared again if their
+        # state, the installed loads or the RegionOne patches changed.
+        fingerprint = self.fingerprint_cache.get_fingerprint(
+            audit_data,
+            [sorted((patch_id, patch['patchstate'])
+                    for patch_id, patch in subcloud_patches.items()),
+             sorted(installed_loads)])
+        sync_status = self.fingerprint_cache.get_sync_status(subcloud_name,
+                                                             fingerprint)
+        if sync_status is None:
+            sync_status = self._get_patching_sync_status(
+                subcloud_name, subcloud_patches, installed_loads, audit_data)
+            self.fingerprint_cache.set_sync_status(subcloud_name,
+                                                   fingerprint, sync_status)
+        else:
+            LOG.debug("Patches of subcloud %s unchanged" % subcloud_name)
+        self._update_subcloud_sync_status(
+            subcloud_name, dcorch_consts.ENDPOINT_TYPE_PATCHING, sync_status)
+
+        # Check subcloud software version every other audit cycle
+        if do_load_audit:
+            LOG.info('Auditing load of %s' % subcloud_name)
+            try:
+                upgrades = sysinv_client.get_upgrades()
+            except Exception:
+                LOG.warn('Cannot retrieve upgrade info for: %s, skip '
+                         'software version audit' % subcloud_name)
+                return
+
+            if not upgrades:
+                # No upgrade in progress
+                subcloud_software_version = \
+                    sysinv_client.get_system().software_version
+
+                if subcloud_software_version == audit_data.software_version:
+                    self._update_subcloud_sync_status(
+                        subcloud_name, dcorch_consts.ENDPOINT_TYPE_LOAD,
+                        consts.SYNC_STATUS_IN_SYNC)
+                else:
+                    self._update_subcloud_sync_status(
+                        subcloud_name, dcorch_consts.ENDPOINT_TYPE_LOAD,
+                        consts.SYNC_STATUS_OUT_OF_SYNC)
+            else:
+                # As upgrade is still in progress, set the subcloud load
+                # status as out-of-sync.
+                self._update_subcloud_sync_status(
+                    subcloud_name, dcorch_consts.ENDPOINT_TYPE_LOAD,
+                    consts.SYNC_STATUS_OUT_OF_SYNC)
+        LOG.info('Patch audit completed for: %s.' % subcloud_name)
+
+    @staticmethod
+    def _get_patching_sync_status(subcloud_name, subcloud_patches,
+                                  installed_loads, audit_data):
+        out_of_sync = False
+
         # Check that all patches in this subcloud are in the correct
         # state, based on the state of the patch in RegionOne. For the
         # subcloud, we use the patchstate because we care whether the
@@ -228,41 +284,5 @@ class PatchAudit(object):
                 out_of_sync = True
 
         if out_of_sync:
-            self._update_subcloud_sync_status(
-                subcloud_name, dcorch_consts.ENDPOINT_TYPE_PATCHING,
-                consts.SYNC_STATUS_OUT_OF_SYNC)
-        else:
-            self._update_subcloud_sync_status(
-                subcloud_name, dcorch_consts.ENDPOINT_TYPE_PATCHING,
-                consts.SYNC_STATUS_IN_SYNC)
-
-        # Check subcloud software version every other audit cycle
-        if do_load_audit:
-            LOG.info('Auditing load of %s' % subcloud_name)
-            try:
-                upgrades = sysinv_client.get_upgrades()
-            except Exception:
-                LOG.warn('Cannot retrieve upgrade info for: %s, skip '
-                         'software version audit' % subcloud_name)
-                return
-
-            if not upgrades:
-                # No upgrade in progress
-                subcloud_software_version = \
-                    sysinv_client.get_system().software_version
-
-                if subcloud_software_version == audit_data.software_version:
-                    self._update_subcloud_sync_status(
-                        subcloud_name, dcorch_consts.ENDPOINT_TYPE_LOAD,
-                        consts.SYNC_STATUS_IN_SYNC)
-                else:
-                    self._update_subcloud_sync_status(
-                        subcloud_name, dcorch_consts.ENDPOINT_TYPE_LOAD,
-                        consts.SYNC_STATUS_OUT_OF_SYNC)
-            else:
-                # As upgrade is still in progress, set the subcloud load
-                # status as out-of-sync.
-                self._update_subcloud_sync_status(
-                    subcloud_name, dcorch_consts.ENDPOINT_TYPE_LOAD,
-                    consts.SYNC_STATUS_OUT_OF_SYNC)
-        LOG.info('Patch audit completed for: %s.' % subcloud_name)
+            return consts.SYNC_STATUS_OUT_OF_SYNC
+        return consts.SYNC_STATUS_IN_SYNC
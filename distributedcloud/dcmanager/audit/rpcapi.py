@@ -122,10 +122,13 @@ class ManagerAuditWorkerClient(object):
                         firmware_audit_data=None,
                         kubernetes_audit_data=None,
                         do_openstack_audit=False,
-                        kube_rootca_update_data=None):
+                        kube_rootca_update_data=None,
+                        audit_data_digest=None):
         """Tell audit-worker to perform audit on the subclouds with these
 
            subcloud IDs.
+           The audit data is either sent inline or, with audit_data_digest,
+           published beforehand through audit_utils.publish_audit_data.
         """
         return self.cast(ctxt, self.make_msg(
             'audit_subclouds',
@@ -134,4 +137,5 @@ class ManagerAuditWorkerClient(object):
             firmware_audit_data=firmware_audit_data,
             kubernetes_audit_data=kubernetes_audit_data,
             do_openstack_audit=do_openstack_audit,
-            kube_rootca_update_audit_data=kube_rootca_update_data))
+            kube_rootca_update_audit_data=kube_rootca_update_data,
+            audit_data_digest=audit_data_digest))
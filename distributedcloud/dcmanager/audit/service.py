@@ -245,7 +245,8 @@ class DCManagerAuditWorkerService(service.Service):
                         firmware_audit_data,
                         kubernetes_audit_data,
                         do_openstack_audit,
-                        kube_rootca_update_audit_data):
+                        kube_rootca_update_audit_data,
+                        audit_data_digest=None):
         """Used to trigger audits of the specified subcloud(s)"""
         self.subcloud_audit_worker_manager.audit_subclouds(
             context,
@@ -254,4 +255,5 @@ class DCManagerAuditWorkerService(service.Service):
             firmware_audit_data,
             kubernetes_audit_data,
             do_openstack_audit,
-            kube_rootca_update_audit_data)
+            kube_rootca_update_audit_data,
+            audit_data_digest)
@@ -432,6 +432,22 @@ class SubcloudAuditManager(manager.Manager):
                      kubernetes_audit_data,
                      kube_rootca_update_audit_data))
 
+        # Publish the audit data once, the workers are only sent its digest
+        # and load it once for all the subclouds they audit.
+        audit_data_digest = None
+        if any(data is not None for data in (patch_audit_data,
+                                             firmware_audit_data,
+                                             kubernetes_audit_data,
+                                             kube_rootca_update_audit_data)):
+            audit_data_digest = audit_utils.publish_audit_data(
+                self.context,
+                {'patch_audit_data': patch_audit_data,
+                 'firmware_audit_data': firmware_audit_data,
+                 'kubernetes_audit_data': kubernetes_audit_data,
+                 'kube_rootca_update_audit_data':
+                     kube_rootca_update_audit_data})
+            LOG.debug("Published audit data %s" % audit_data_digest)
+
         # We want a chunksize of at least 1 so add the number of workers.
         chunksize = (len(subcloud_audits) + CONF.audit_worker_workers) // CONF.audit_worker_workers
         for audit in subcloud_audits:
@@ -441,11 +457,8 @@ class SubcloudAuditManager(manager.Manager):
                 self.audit_worker_rpc_client.audit_subclouds(
                     self.context,
                     subcloud_ids,
-                    patch_audit_data,
-                    firmware_audit_data,
-                    kubernetes_audit_data,
-                    do_openstack_audit,
-                    kube_rootca_update_audit_data)
+                    do_openstack_audit=do_openstack_audit,
+                    audit_data_digest=audit_data_digest)
                 LOG.debug('Sent subcloud audit request message for subclouds: %s' % subcloud_ids)
                 subcloud_ids = []
         if len(subcloud_ids) > 0:
@@ -453,11 +466,8 @@ class SubcloudAuditManager(manager.Manager):
             self.audit_worker_rpc_client.audit_subclouds(
                 self.context,
                 subcloud_ids,
-                patch_audit_data,
-                firmware_audit_data,
-                kubernetes_audit_data,
-                do_openstack_audit,
-                kube_rootca_update_audit_data)
+                do_openstack_audit=do_openstack_audit,
+                audit_data_digest=audit_data_digest)
             LOG.debug('Sent final subcloud audit request message for subclouds: %s' % subcloud_ids)
         else:
             LOG.debug('Done sending audit request messages.')
@@ -30,6 +30,7 @@ from dcmanager.audit import kube_rootca_update_audit
 from dcmanager.audit import kubernetes_audit
 from dcmanager.audit import patch_audit
 from dcmanager.audit.subcloud_audit_manager import HELM_APP_OPENSTACK
+from dcmanager.audit import utils as audit_utils
 from dcmanager.common import consts
 from dcmanager.common import context
 from dcmanager.common import exceptions
@@ -60,6 +61,12 @@ class SubcloudAuditWorkerManager(manager.Manager):
         self.context = context.get_admin_context()
         self.dcmanager_rpc_client = dcmanager_rpc_client.ManagerClient()
         self.state_rpc_client = dcmanager_rpc_client.SubcloudStateClient()
+        # The audits report their endpoint sync statuses through this
+        # batch. The statuses of a subcloud are sent to dcmanager-state
+        # once its audit is done.
+        self.endpoint_status_batch = \
+            dcmanager_rpc_client.SubcloudEndpointStatusBatch(
+                self.state_rpc_client)
         # Keeps track of greenthreads we create to do work.
         self.thread_group_manager = scheduler.ThreadGroupManager(
             thread_pool_size=100)
@@ -68,16 +75,49 @@ class SubcloudAuditWorkerManager(manager.Manager):
         self.alarm_aggr = alarm_aggregation.AlarmAggregation(self.context)
         # todo(abailey): refactor the design pattern for adding new audits
         self.patch_audit = patch_audit.PatchAudit(
-            self.context, self.state_rpc_client)
+            self.context, self.endpoint_status_batch)
         self.firmware_audit = firmware_audit.FirmwareAudit(
-            self.context, self.state_rpc_client)
+            self.context, self.endpoint_status_batch)
         self.kubernetes_audit = kubernetes_audit.KubernetesAudit(
-            self.context, self.state_rpc_client)
+            self.context, self.endpoint_status_batch)
         self.kube_rootca_update_audit = \
             kube_rootca_update_audit.KubeRootcaUpdateAudit(
                 self.context,
-                self.state_rpc_client)
+                self.endpoint_status_batch)
         self.pid = os.getpid()
+        # Digest and decoded content of the last published audit data
+        self.audit_data_digest = None
+        self.audit_data = None
+
+    def _get_published_audit_data(self, audit_data_digest):
+        """Return the decoded audit data published under the digest.
+
+        The data is loaded and decoded once per digest and then shared by
+        all the subclouds audited with it.
+        """
+        if audit_data_digest != self.audit_data_digest:
+            values = audit_utils.get_published_audit_data(
+                self.context, audit_data_digest)
+            firmware_audit_data = values.get('firmware_audit_data')
+            if firmware_audit_data is not None:
+                firmware_audit_data = [
+                    firmware_audit.FirmwareAuditData.from_dict(image)
+                    for image in firmware_audit_data]
+            kubernetes_audit_data = values.get('kubernetes_audit_data')
+            if kubernetes_audit_data is not None:
+                kubernetes_audit_data = [
+                    kubernetes_audit.KubernetesAuditData.from_dict(result)
+                    for result in kubernetes_audit_data]
+            self.audit_data = (
+                patch_audit.PatchAuditData.from_dict(
+                    values.get('patch_audit_data')),
+                firmware_audit_data,
+                kubernetes_audit_data,
+                values.get('kube_rootca_update_audit_data'))
+            self.audit_data_digest = audit_data_digest
+            LOG.debug("PID: %s, loaded audit data %s" %
+                      (self.pid, audit_data_digest))
+        return self.audit_data
 
     def audit_subclouds(self,
                         context,
@@ -86,12 +126,26 @@ class SubcloudAuditWorkerManager(manager.Manager):
                         firmware_audit_data,
                         kubernetes_audit_data,
                         do_openstack_audit,
-                        kube_rootca_update_audit_data):
+                        kube_rootca_update_audit_data,
+                        audit_data_digest=None):
         """Run audits of the specified subcloud(s)"""
 
         LOG.debug('PID: %s, subclouds to audit: %s, do_openstack_audit: %s' %
                   (self.pid, subcloud_ids, do_openstack_audit))
 
+        if audit_data_digest:
+            try:
+                (patch_audit_data, firmware_audit_data,
+                 kubernetes_audit_data, kube_rootca_update_audit_data) = \
+                    self._get_published_audit_data(audit_data_digest)
+            except exceptions.AuditSnapshotNotFound:
+                # The subclouds are left as they are, and so are audited
+                # again with the data published for the next audit.
+                LOG.error('PID: %s, audit data %s is gone, skipping audit '
+                          'of subclouds: %s' %
+                          (self.pid, audit_data_digest, subcloud_ids))
+                return
+
         for subcloud_id in subcloud_ids:
             # Retrieve the subcloud and subcloud audit info
             try:
@@ -307,6 +361,13 @@ class SubcloudAuditWorkerManager(manager.Manager):
         except Exception:
             LOG.exception("Got exception auditing subcloud: %s" % subcloud.name)
 
+        # Send the endpoint sync statuses reported by the audits
+        try:
+            self.endpoint_status_batch.flush(self.context, subcloud.name)
+        except Exception:
+            LOG.exception("Failed to update the endpoint sync status of "
+                          "subcloud: %s" % subcloud.name)
+
         # Update the audit completion timestamp so it doesn't get
         # audited again for a while.
         db_api.subcloud_audits_end_audit(self.context,
@@ -16,8 +16,16 @@
 # of this software may be licensed only pursuant to the terms
 # of an applicable Wind River license agreement.
 
+import datetime
+import hashlib
+
+from oslo_serialization import jsonutils
+
 from dcmanager.db import api as db_api
 
+# Published audit data not used for this many seconds is removed
+AUDIT_SNAPSHOT_MAX_AGE = 3600
+
 
 def request_subcloud_audits(context,
                             update_subcloud_state=False,
@@ -40,3 +48,40 @@ def request_subcloud_audits(context,
         if audit_kube_rootca:
             values['kube_rootca_update_audit_requested'] = True
         db_api.subcloud_audits_update_all(context, values)
+
+
+def _serialize_audit_data(audit_data):
+    # Serialized the same way as for RPC, with the keys sorted so that
+    # identical data is always serialized identically
+    return jsonutils.dumps(
+        jsonutils.to_primitive(audit_data, convert_instances=True),
+        sort_keys=True)
+
+
+def get_fingerprint(audit_data):
+    """Return a digest of the audit data, identical for identical data."""
+    data = _serialize_audit_data(audit_data)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def publish_audit_data(context, audit_data):
+    """Store the RegionOne audit data and return its digest.
+
+    The data is serialized the same way as for RPC, so the audit workers
+    decode it just like the data they used to receive inline. Identical
+    data maps to the same digest, and so to the same stored snapshot.
+    """
+    data = _serialize_audit_data(audit_data)
+    digest = hashlib.sha256(data.encode('utf-8')).hexdigest()
+    db_api.audit_snapshot_publish(context, digest, data)
+    db_api.audit_snapshot_purge(
+        context,
+        datetime.datetime.utcnow() -
+        datetime.timedelta(seconds=AUDIT_SNAPSHOT_MAX_AGE))
+    return digest
+
+
+def get_published_audit_data(context, digest):
+    """Return the audit data published under the digest."""
+    snapshot = db_api.audit_snapshot_get(context, digest)
+    return jsonutils.loads(snapshot.data)
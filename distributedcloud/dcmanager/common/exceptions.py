@@ -229,6 +229,10 @@ class StrategyStepNameNotFound(NotFound):
     message = _("StrategyStep with name %(name)s doesn't exist.")
 
 
+class AuditSnapshotNotFound(NotFound):
+    message = _("Audit snapshot with digest %(digest)s doesn't exist.")
+
+
 class StrategySkippedException(DCManagerException):
     def __init__(self, details):
         self.details = details
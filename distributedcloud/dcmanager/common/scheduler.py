@@ -12,6 +12,7 @@
 # under the License.
 #
 
+import math
 import time
 
 import eventlet
@@ -68,6 +69,149 @@ class ThreadGroupManager(object):
             eventlet.sleep()
 
 
+class Wait(object):
+    """A task asking to be resumed once a delay has elapsed.
+
+    A task returns a Wait instead of sleeping, so that it does not hold
+    a greenthread while it waits. Resuming it calls func(*args), which
+    may in turn return another Wait.
+    """
+
+    def __init__(self, delay, func, *args):
+        self.delay = delay
+        self.func = func
+        self.args = args
+
+    def resume(self):
+        return self.func(*self.args)
+
+
+class TimerWheel(object):
+    """Hashed timer wheel holding items until they are due.
+
+    Time is divided in ticks of tick_interval seconds, each tick being
+    mapped to one of the num_slots slots of the wheel. Scheduling an
+    item is O(1), and advancing the wheel only visits the slots of the
+    ticks elapsed since it was last advanced, whatever the number of
+    items it holds.
+    """
+
+    def __init__(self, tick_interval=1, num_slots=512, now=None):
+        super(TimerWheel, self).__init__()
+        self.tick_interval = tick_interval
+        self.num_slots = num_slots
+        self._slots = [[] for _ in range(num_slots)]
+        self._count = 0
+        # The last tick the wheel was advanced to
+        self._tick = self._get_tick(wallclock() if now is None else now)
+
+    def __len__(self):
+        return self._count
+
+    def _get_tick(self, now):
+        return int(now // self.tick_interval)
+
+    def schedule(self, delay, item, now=None):
+        """Hold the item until delay seconds from now."""
+        if now is None:
+            now = wallclock()
+        # Round up, so that an item is never due before its delay elapsed
+        expiry = int(math.ceil(float(now + delay) / self.tick_interval))
+        expiry = max(expiry, self._tick + 1)
+        self._slots[expiry % self.num_slots].append((expiry, item))
+        self._count += 1
+
+    def advance(self, now=None):
+        """Advance the wheel to now and return the items that are due."""
+        tick = self._get_tick(wallclock() if now is None else now)
+        due = []
+        if tick <= self._tick:
+            return due
+        # A full turn of the wheel visits every slot
+        for current in range(max(self._tick + 1, tick - self.num_slots + 1),
+                             tick + 1):
+            index = current % self.num_slots
+            if not self._slots[index]:
+                continue
+            remaining = []
+            for expiry, item in self._slots[index]:
+                if expiry <= tick:
+                    due.append(item)
+                else:
+                    # Due on a later turn of the wheel
+                    remaining.append((expiry, item))
+            self._slots[index] = remaining
+        self._tick = tick
+        self._count -= len(due)
+        return due
+
+    def clear(self):
+        self._slots = [[] for _ in range(self.num_slots)]
+        self._count = 0
+
+
+class TaskExecutor(object):
+    """Runs tasks on a bounded greenthread pool, parking those that wait.
+
+    A task that has to wait returns a Wait rather than sleeping. The
+    Wait is parked on a timer wheel, and at every tick the waits that
+    are due are handed back to the pool in one batch. A waiting task
+    does not hold a greenthread, so the pool only bounds the tasks that
+    are actually running.
+    """
+
+    def __init__(self, name, pool_size, tick_interval=1):
+        super(TaskExecutor, self).__init__()
+        self.name = name
+        self.tick_interval = tick_interval
+        self.pool = eventlet.greenpool.GreenPool(pool_size)
+        self.wheel = TimerWheel(tick_interval)
+        self._timer = None
+
+    def start(self):
+        """Start the timer greenthread resuming the waiting tasks."""
+        if self._timer is None:
+            self._timer = eventlet.spawn(self._run_timer)
+
+    def stop(self):
+        """Kill the running tasks and drop the waiting ones."""
+        if self._timer is not None:
+            self._timer.kill()
+            self._timer = None
+        for thread in list(self.pool.coroutines_running):
+            thread.kill()
+        self.wheel.clear()
+
+    def submit(self, func, *args):
+        """Run func(*args) in the pool, resuming it whenever it waits."""
+        return self.pool.spawn(self._run_task, func, args)
+
+    def get_stats(self):
+        """Return the number of running and waiting tasks."""
+        return {'running': self.pool.running(),
+                'waiting': len(self.wheel)}
+
+    def _run_task(self, func, args):
+        try:
+            result = func(*args)
+        except Exception as e:
+            LOG.exception(e)
+            return
+        if isinstance(result, Wait):
+            self.wheel.schedule(result.delay, result)
+
+    def _run_timer(self):
+        while True:
+            eventlet.sleep(self.tick_interval)
+            due = self.wheel.advance()
+            if due:
+                LOG.debug('(%s) Resuming %d waiting tasks'
+                          % (self.name, len(due)))
+            for wait in due:
+                # Blocks while the pool is full
+                self.pool.spawn(self._run_task, wait.resume, ())
+
+
 def reschedule(action, sleep_time=1):
     """Eventlet Sleep for the specified number of seconds.
 
@@ -157,9 +157,40 @@ def subcloud_get_all(context):
     return IMPL.subcloud_get_all(context)
 
 
-def subcloud_get_all_with_status(context):
-    """Retrieve all subclouds and sync statuses."""
-    return IMPL.subcloud_get_all_with_status(context)
+def subcloud_get_all_with_sync_status(context, filters=None, limit=None,
+                                      marker=None):
+    """Retrieve subclouds with their overall sync status.
+
+    Returns (subcloud, sync_status) pairs ordered by subcloud id, the sync
+    status being aggregated from the endpoint sync statuses by the
+    database.
+
+    :param filters: dict of subcloud availability_status,
+           management_state, deploy_status, group_id and sync_status
+           values to match
+    :param limit: maximum number of subclouds to return
+    :param marker: id of the subcloud after which to start
+    """
+    return IMPL.subcloud_get_all_with_sync_status(context, filters, limit,
+                                                  marker)
+
+
+def subcloud_status_get_all_by_subcloud_ids(context, subcloud_ids):
+    """Retrieve all endpoint statuses of the given subclouds."""
+    return IMPL.subcloud_status_get_all_by_subcloud_ids(context,
+                                                        subcloud_ids)
+
+
+def subcloud_get_all_with_endpoint_status(context, endpoint_type,
+                                          group_id=None):
+    """Retrieve the subclouds with their sync status for an endpoint type.
+
+    Returns (subcloud, subcloud_status) pairs ordered by subcloud id, the
+    status being None for a subcloud without this endpoint type. The
+    install and upgrade data of the subclouds are not loaded.
+    """
+    return IMPL.subcloud_get_all_with_endpoint_status(context, endpoint_type,
+                                                      group_id)
 
 
 def subcloud_update(context, subcloud_id, management_state=None,
@@ -249,6 +280,16 @@ def subcloud_status_update_endpoints(context, subcloud_id,
                                                  endpoint_type_list, sync_status)
 
 
+def subcloud_status_bulk_update(context, endpoint_updates):
+    """Update the sync status of many subcloud endpoints at once.
+
+    Return the (subcloud_id, endpoint_type, previous sync_status,
+    new sync_status) of the endpoints that changed.
+    """
+
+    return IMPL.subcloud_status_bulk_update(context, endpoint_updates)
+
+
 def subcloud_status_destroy_all(context, subcloud_id):
     """Destroy all the statuses for a subcloud
 
@@ -404,12 +445,30 @@ def strategy_step_get_all(context):
     return IMPL.strategy_step_get_all(context)
 
 
+def strategy_step_get_all_snapshots(context):
+    """Retrieve the stage and state of all patch strategy steps.
+
+    Only the columns the orchestrator needs to schedule the steps are
+    read, with the name and management state of their subcloud.
+    """
+    return IMPL.strategy_step_get_all_snapshots(context)
+
+
 def strategy_step_create(context, subcloud_id, stage, state, details):
     """Create a patch strategy step."""
     return IMPL.strategy_step_create(context, subcloud_id, stage, state,
                                      details)
 
 
+def strategy_step_bulk_create(context, steps):
+    """Create patch strategy steps in a single transaction.
+
+    :param steps: list of dicts with the subcloud_id, stage, state and
+           details of each step
+    """
+    return IMPL.strategy_step_bulk_create(context, steps)
+
+
 def strategy_step_update(context, subcloud_id, stage=None, state=None,
                          details=None, started_at=None, finished_at=None):
     """Update a patch strategy step or raise if it does not exist."""
@@ -417,6 +476,17 @@ def strategy_step_update(context, subcloud_id, stage=None, state=None,
                                      details, started_at, finished_at)
 
 
+def strategy_step_set(context, subcloud_id, stage=None, state=None,
+                      details=None, started_at=None, finished_at=None):
+    """Update a patch strategy step in a single statement.
+
+    Unlike strategy_step_update, the step is not read back.
+    Will raise if the strategy step does not exist.
+    """
+    return IMPL.strategy_step_set(context, subcloud_id, stage, state,
+                                  details, started_at, finished_at)
+
+
 def strategy_step_destroy_all(context):
     """Destroy all the patch strategy steps."""
     return IMPL.strategy_step_destroy_all(context)
@@ -555,3 +625,20 @@ def subcloud_alarms_update(context, name, values):
 
 def subcloud_alarms_delete(context, name):
     return IMPL.subcloud_alarms_delete(context, name)
+
+
+###################
+
+def audit_snapshot_publish(context, digest, data):
+    """Store the audit data under its digest, unless already stored."""
+    return IMPL.audit_snapshot_publish(context, digest, data)
+
+
+def audit_snapshot_get(context, digest):
+    """Get the audit data stored under a digest."""
+    return IMPL.audit_snapshot_get(context, digest)
+
+
+def audit_snapshot_purge(context, updated_before):
+    """Delete the audit data not published since updated_before."""
+    return IMPL.audit_snapshot_purge(context, updated_before)
@@ -19,6 +19,7 @@
 Implementation of SQLAlchemy backend.
 """
 
+import collections
 import datetime
 import sqlalchemy
 import sys
@@ -31,9 +32,12 @@ from oslo_log import log as logging
 from oslo_utils import strutils
 from oslo_utils import uuidutils
 
+from sqlalchemy import and_
 from sqlalchemy import desc
+from sqlalchemy import func
 from sqlalchemy.orm.exc import MultipleResultsFound
 from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.orm import defer
 from sqlalchemy.orm import joinedload_all
 from sqlalchemy.orm import load_only
 from sqlalchemy.sql.expression import true
@@ -46,6 +50,17 @@ from dcmanager.db.sqlalchemy import models
 
 LOG = logging.getLogger(__name__)
 
+# Maximum number of strategy step rows per multi-row INSERT statement
+STRATEGY_STEP_INSERT_BATCH_SIZE = 100
+
+# The strategy step columns the orchestrator apply loop works with, and
+# those of the subcloud of the step.
+StrategyStepSnapshot = collections.namedtuple(
+    'StrategyStepSnapshot', ['id', 'subcloud_id', 'stage', 'state',
+                             'subcloud'])
+SubcloudSnapshot = collections.namedtuple(
+    'SubcloudSnapshot', ['id', 'name', 'management_state'])
+
 _facade = None
 
 _main_context_manager = None
@@ -324,16 +339,74 @@ def subcloud_get_all(context):
 
 
 @require_context
-def subcloud_get_all_with_status(context):
-    result = model_query(context, models.Subcloud, models.SubcloudStatus). \
-        outerjoin(models.SubcloudStatus,
-                  (models.Subcloud.id == models.SubcloudStatus.subcloud_id) |
-                  (not models.SubcloudStatus.subcloud_id)). \
-        filter(models.Subcloud.deleted == 0). \
-        order_by(models.Subcloud.id). \
+def subcloud_get_all_with_sync_status(context, filters=None, limit=None,
+                                      marker=None):
+    filters = filters or {}
+    with read_session() as session:
+        # The overall sync status of a subcloud is the sync status of its
+        # endpoints when they all agree, out-of-sync otherwise.
+        statuses = session.query(
+            models.SubcloudStatus.subcloud_id.label('subcloud_id'),
+            sqlalchemy.case(
+                [(func.count(sqlalchemy.distinct(
+                    models.SubcloudStatus.sync_status)) > 1,
+                  consts.SYNC_STATUS_OUT_OF_SYNC)],
+                else_=func.min(models.SubcloudStatus.sync_status)).
+            label('sync_status')). \
+            filter(models.SubcloudStatus.deleted == 0). \
+            group_by(models.SubcloudStatus.subcloud_id). \
+            subquery()
+        sync_status = func.coalesce(statuses.c.sync_status,
+                                    consts.SYNC_STATUS_UNKNOWN)
+
+        query = session.query(models.Subcloud, sync_status). \
+            outerjoin(statuses,
+                      models.Subcloud.id == statuses.c.subcloud_id). \
+            filter(models.Subcloud.deleted == 0)
+        for key in ('availability_status', 'management_state',
+                    'deploy_status', 'group_id'):
+            if filters.get(key) is not None:
+                query = query.filter(
+                    getattr(models.Subcloud, key) == filters[key])
+        if filters.get('sync_status') is not None:
+            query = query.filter(sync_status == filters['sync_status'])
+        if marker is not None:
+            query = query.filter(models.Subcloud.id > marker)
+        query = query.order_by(models.Subcloud.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+
+@require_context
+def subcloud_status_get_all_by_subcloud_ids(context, subcloud_ids):
+    if not subcloud_ids:
+        return []
+    return model_query(context, models.SubcloudStatus). \
+        filter_by(deleted=0). \
+        filter(models.SubcloudStatus.subcloud_id.in_(subcloud_ids)). \
+        order_by(models.SubcloudStatus.subcloud_id,
+                 models.SubcloudStatus.id). \
         all()
 
-    return result
+
+@require_context
+def subcloud_get_all_with_endpoint_status(context, endpoint_type,
+                                          group_id=None):
+    with read_session() as session:
+        query = session.query(models.Subcloud, models.SubcloudStatus). \
+            options(defer(models.Subcloud.data_install),
+                    defer(models.Subcloud.data_upgrade)). \
+            outerjoin(models.SubcloudStatus,
+                      and_(models.Subcloud.id ==
+                           models.SubcloudStatus.subcloud_id,
+                           models.SubcloudStatus.endpoint_type ==
+                           endpoint_type,
+                           models.SubcloudStatus.deleted == 0)). \
+            filter(models.Subcloud.deleted == 0)
+        if group_id is not None:
+            query = query.filter(models.Subcloud.group_id == group_id)
+        return query.order_by(models.Subcloud.id).all()
 
 
 @require_admin_context
@@ -495,6 +568,56 @@ def subcloud_status_update_endpoints(context, subcloud_id,
     return result
 
 
+@require_admin_context
+def subcloud_status_bulk_update(context, endpoint_updates):
+    """Update the sync status of many subcloud endpoints.
+
+    The current statuses are read and updated in a single transaction,
+    endpoints whose sync status does not change are not written.
+
+    :param endpoint_updates: list of (subcloud_id, endpoint_type,
+           sync_status) tuples
+    :return: list of (subcloud_id, endpoint_type, previous sync_status,
+             new sync_status) tuples for the endpoints actually updated
+    """
+    if not endpoint_updates:
+        return []
+
+    requested = dict(((subcloud_id, endpoint_type), sync_status)
+                     for subcloud_id, endpoint_type, sync_status
+                     in endpoint_updates)
+    subcloud_ids = set(subcloud_id for subcloud_id, _endpoint in requested)
+
+    transitions = []
+    # Group the endpoints by target status so they are written with one
+    # statement per (endpoint_type, sync_status) pair
+    updates = collections.defaultdict(list)
+    with write_session() as session:
+        statuses = session.query(models.SubcloudStatus). \
+            filter_by(deleted=0). \
+            filter(models.SubcloudStatus.subcloud_id.in_(subcloud_ids)). \
+            with_for_update(). \
+            all()
+        for status in statuses:
+            key = (status.subcloud_id, status.endpoint_type)
+            sync_status = requested.get(key)
+            if sync_status is None or status.sync_status == sync_status:
+                continue
+            transitions.append((status.subcloud_id, status.endpoint_type,
+                                status.sync_status, sync_status))
+            updates[(status.endpoint_type, sync_status)].append(
+                status.subcloud_id)
+
+        for (endpoint_type, sync_status), ids in updates.items():
+            session.query(models.SubcloudStatus). \
+                filter_by(endpoint_type=endpoint_type). \
+                filter(models.SubcloudStatus.subcloud_id.in_(ids)). \
+                update({'sync_status': sync_status},
+                       synchronize_session=False)
+
+    return transitions
+
+
 @require_admin_context
 def subcloud_status_destroy_all(context, subcloud_id):
     with write_session() as session:
@@ -880,6 +1003,30 @@ def strategy_step_get_all(context):
     return result
 
 
+@require_context
+def strategy_step_get_all_snapshots(context):
+    with read_session() as session:
+        rows = session.query(models.StrategyStep.id,
+                             models.StrategyStep.subcloud_id,
+                             models.StrategyStep.stage,
+                             models.StrategyStep.state,
+                             models.Subcloud.name,
+                             models.Subcloud.management_state). \
+            outerjoin(models.Subcloud,
+                      models.StrategyStep.subcloud_id ==
+                      models.Subcloud.id). \
+            filter(models.StrategyStep.deleted == 0). \
+            order_by(models.StrategyStep.id). \
+            all()
+
+    return [StrategyStepSnapshot(
+        step_id, subcloud_id, stage, state,
+        None if subcloud_id is None else
+        SubcloudSnapshot(subcloud_id, name, management_state))
+        for (step_id, subcloud_id, stage, state, name, management_state)
+        in rows]
+
+
 @require_admin_context
 def strategy_step_create(context, subcloud_id, stage, state, details):
     with write_session() as session:
@@ -892,32 +1039,63 @@ def strategy_step_create(context, subcloud_id, stage, state, details):
         return strategy_step_ref
 
 
+@require_admin_context
+def strategy_step_set(context, subcloud_id, stage=None, state=None,
+                      details=None, started_at=None, finished_at=None):
+    values = {}
+    if stage is not None:
+        values['stage'] = stage
+    if state is not None:
+        values['state'] = state
+    if details is not None:
+        values['details'] = details
+    if started_at is not None:
+        values['started_at'] = started_at
+    if finished_at is not None:
+        values['finished_at'] = finished_at
+    if not values:
+        return
+    with write_session() as session:
+        result = session.query(models.StrategyStep). \
+            filter_by(deleted=0). \
+            filter_by(subcloud_id=subcloud_id). \
+            update(values, synchronize_session=False)
+    if not result:
+        raise exception.StrategyStepNotFound(subcloud_id=subcloud_id)
+
+
 @require_admin_context
 def strategy_step_update(context, subcloud_id, stage=None, state=None,
                          details=None, started_at=None, finished_at=None):
+    strategy_step_set(context, subcloud_id, stage, state, details,
+                      started_at, finished_at)
+    return strategy_step_get(context, subcloud_id)
+
+
+@require_admin_context
+def strategy_step_bulk_create(context, steps):
+    now = datetime.datetime.utcnow()
+    rows = [{'subcloud_id': step['subcloud_id'],
+             'stage': step['stage'],
+             'state': step['state'],
+             'details': step['details'],
+             'created_at': now,
+             'deleted': 0}
+            for step in steps]
+    table = models.StrategyStep.__table__
     with write_session() as session:
-        strategy_step_ref = strategy_step_get(context, subcloud_id)
-        if stage is not None:
-            strategy_step_ref.stage = stage
-        if state is not None:
-            strategy_step_ref.state = state
-        if details is not None:
-            strategy_step_ref.details = details
-        if started_at is not None:
-            strategy_step_ref.started_at = started_at
-        if finished_at is not None:
-            strategy_step_ref.finished_at = finished_at
-        strategy_step_ref.save(session)
-        return strategy_step_ref
+        for start in range(0, len(rows), STRATEGY_STEP_INSERT_BATCH_SIZE):
+            session.execute(table.insert().values(
+                rows[start:start + STRATEGY_STEP_INSERT_BATCH_SIZE]))
+    return len(rows)
 
 
 @require_admin_context
 def strategy_step_destroy_all(context):
     with write_session() as session:
-        strategy_step_stages = strategy_step_get_all(context)
-        if strategy_step_stages:
-            for strategy_step_ref in strategy_step_stages:
-                session.delete(strategy_step_ref)
+        session.query(models.StrategyStep). \
+            filter_by(deleted=0). \
+            delete(synchronize_session=False)
 
 
 ##########################
@@ -1025,3 +1203,54 @@ def subcloud_alarms_delete(context, name):
     with write_session() as session:
         session.query(models.SubcloudAlarmSummary).\
             filter_by(name=name).delete()
+
+
+##########################
+
+
+@require_admin_context
+def audit_snapshot_publish(context, digest, data):
+    # The update time is set even if the snapshot already exists, as it
+    # tells when it was last published.
+    values = {'updated_at': datetime.datetime.utcnow()}
+    try:
+        with write_session() as session:
+            snapshot_ref = session.query(models.AuditSnapshot). \
+                filter_by(digest=digest). \
+                first()
+            if snapshot_ref is None:
+                snapshot_ref = models.AuditSnapshot()
+                snapshot_ref.digest = digest
+                snapshot_ref.data = data
+            snapshot_ref.update(values)
+            snapshot_ref.save(session)
+            return snapshot_ref
+    except DBDuplicateEntry:
+        # Another audit published the same data in the meantime
+        with write_session() as session:
+            snapshot_ref = session.query(models.AuditSnapshot). \
+                filter_by(digest=digest). \
+                one()
+            snapshot_ref.update(values)
+            snapshot_ref.save(session)
+            return snapshot_ref
+
+
+@require_context
+def audit_snapshot_get(context, digest):
+    result = model_query(context, models.AuditSnapshot). \
+        filter_by(digest=digest). \
+        first()
+
+    if not result:
+        raise exception.AuditSnapshotNotFound(digest=digest)
+
+    return result
+
+
+@require_admin_context
+def audit_snapshot_purge(context, updated_before):
+    with write_session() as session:
+        return session.query(models.AuditSnapshot).\
+            filter(models.AuditSnapshot.updated_at < updated_before).\
+            delete(synchronize_session=False)
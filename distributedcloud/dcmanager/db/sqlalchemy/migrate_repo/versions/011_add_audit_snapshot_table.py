@@ -0,0 +1,37 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+from sqlalchemy import Column
+from sqlalchemy import DateTime
+from sqlalchemy import Integer
+from sqlalchemy import MetaData
+from sqlalchemy import String
+from sqlalchemy import Table
+from sqlalchemy import Text
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    audit_snapshot = Table(
+        'audit_snapshot', meta,
+        Column('id', Integer, primary_key=True,
+               autoincrement=True, nullable=False),
+        Column('digest', String(64), unique=True, nullable=False),
+        Column('data', Text),
+        Column('created_at', DateTime),
+        Column('updated_at', DateTime),
+        Column('deleted_at', DateTime),
+        Column('deleted', Integer, default=0),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    audit_snapshot.create()
+
+
+def downgrade(migrate_engine):
+    raise NotImplementedError('Database downgrade is unsupported.')
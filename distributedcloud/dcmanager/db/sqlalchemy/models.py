@@ -250,3 +250,17 @@ class SubcloudAlarmSummary(BASE, DCManagerBase):
     minor_alarms = Column('minor_alarms', Integer)
     warnings = Column('warnings', Integer)
     cloud_status = Column('cloud_status', String(64))
+
+
+class AuditSnapshot(BASE, DCManagerBase):
+    """Represents the RegionOne audit data published for an audit cycle
+
+    The audit workers are only sent the digest of the data and load the
+    snapshot once per digest.
+    """
+
+    __tablename__ = 'audit_snapshot'
+
+    id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    digest = Column(String(64), unique=True, nullable=False)
+    data = Column(Text)
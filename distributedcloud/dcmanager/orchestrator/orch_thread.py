@@ -32,6 +32,11 @@ from dcmanager.db import api as db_api
 
 LOG = logging.getLogger(__name__)
 
+# Maximum number of state actions running at the same time. The states
+# waiting on their subcloud do not count against it, only those calling
+# an API or running a playbook do.
+STATE_WORKERS = 50
+
 
 class OrchThread(threading.Thread):
     """Abstract Orchestration Thread
@@ -75,6 +80,11 @@ class OrchThread(threading.Thread):
         # Keeps track of greenthreads we create to do work.
         self.thread_group_manager = scheduler.ThreadGroupManager(
             thread_pool_size=500)
+        # Runs the state actions of the subclouds. A state waiting on its
+        # subcloud is parked on the executor timer wheel rather than
+        # holding one of its greenthreads.
+        self.state_executor = scheduler.TaskExecutor(
+            '%s states' % update_type, pool_size=STATE_WORKERS)
         # Track worker created for each subcloud.
         self.subcloud_workers = dict()
 
@@ -92,8 +102,10 @@ class OrchThread(threading.Thread):
         self._stop.set()
 
     def run(self):
+        self.state_executor.start()
         self.run_orch()
         # Stop any greenthreads that are still running
+        self.state_executor.stop()
         self.thread_group_manager.stop()
         LOG.info("(%s) OrchThread Stopped" % self.update_type)
 
@@ -153,13 +165,12 @@ class OrchThread(threading.Thread):
                        consts.STRATEGY_STATE_ABORTED,
                        consts.STRATEGY_STATE_FAILED]:
             finished_at = datetime.datetime.now()
-        # Return the updated object, in case we need to use its updated values
-        return db_api.strategy_step_update(self.context,
-                                           subcloud_id,
-                                           state=state,
-                                           details=details,
-                                           started_at=started_at,
-                                           finished_at=finished_at)
+        db_api.strategy_step_set(self.context,
+                                 subcloud_id,
+                                 state=state,
+                                 details=details,
+                                 started_at=started_at,
+                                 finished_at=finished_at)
 
     def _delete_subcloud_worker(self, region):
         if region in self.subcloud_workers:
@@ -208,7 +219,7 @@ class OrchThread(threading.Thread):
         """Apply a sw update strategy"""
 
         LOG.debug("(%s) Applying update strategy" % self.update_type)
-        strategy_steps = db_api.strategy_step_get_all(self.context)
+        strategy_steps = db_api.strategy_step_get_all_snapshots(self.context)
 
         # Figure out which stage we are working on
         current_stage = None
@@ -351,9 +362,11 @@ class OrchThread(threading.Thread):
 
                     # We are just getting started, enter the first state
                     # Use the updated value for calling process_update_step
-                    strategy_step = self.strategy_step_update(
+                    self.strategy_step_update(
                         strategy_step.subcloud_id,
                         state=self.starting_state)
+                    strategy_step = strategy_step._replace(
+                        state=self.starting_state)
                     # Starting state should log an error if greenthread exists
                     self.process_update_step(region,
                                              strategy_step,
@@ -370,7 +383,7 @@ class OrchThread(threading.Thread):
 
         # Mark any steps that have not yet started as aborted,
         # so we will not run them later.
-        strategy_steps = db_api.strategy_step_get_all(self.context)
+        strategy_steps = db_api.strategy_step_get_all_snapshots(self.context)
 
         for strategy_step in strategy_steps:
             if strategy_step.state == consts.STRATEGY_STATE_INITIAL:
@@ -393,7 +406,7 @@ class OrchThread(threading.Thread):
 
         LOG.info("(%s) Deleting update strategy" % self.update_type)
 
-        strategy_steps = db_api.strategy_step_get_all(self.context)
+        strategy_steps = db_api.strategy_step_get_all_snapshots(self.context)
 
         for strategy_step in strategy_steps:
             region = self.get_region_name(strategy_step)
@@ -513,29 +526,62 @@ class OrchThread(threading.Thread):
                 # Advance to the next state. The previous greenthread has exited,
                 # create a new one.
                 self.subcloud_workers[region] = \
-                    (strategy_step.state, self.thread_group_manager.start(
-                     self.perform_state_action, strategy_step))
+                    (strategy_step.state, self.state_executor.submit(
+                     self.start_state_action, strategy_step, True))
         else:
             # This is the first state. create a greenthread to start processing
             # the update for the subcloud and invoke the perform_state_action method.
             LOG.debug("Starting a new worker for region %s at state %s"
                       % (region, strategy_step.state))
             self.subcloud_workers[region] = \
-                (strategy_step.state, self.thread_group_manager.start(
-                 self.perform_state_action, strategy_step))
+                (strategy_step.state, self.state_executor.submit(
+                 self.start_state_action, strategy_step, True))
 
     def perform_state_action(self, strategy_step):
-        """Extensible state handler for processing and transitioning states """
+        """Extensible state handler for processing and transitioning states
+
+        Runs the state action to completion, sleeping whenever the state
+        has to wait.
+        """
+        wait = self.start_state_action(strategy_step)
+        while wait is not None:
+            time.sleep(wait.delay)
+            wait = wait.resume()
+
+    def start_state_action(self, strategy_step, refresh=False):
+        """Start the state action of a strategy step
+
+        When refresh is set, strategy_step is a snapshot of the step and
+        the state operator is given the full step read from the database.
+        Returns a Wait to resume the state action with once the state has
+        to wait, otherwise None once the strategy step has been updated.
+        """
+        return self._run_state_action(strategy_step,
+                                      self._start_state_operator,
+                                      strategy_step, refresh)
+
+    def _start_state_operator(self, strategy_step, refresh):
+        LOG.info("(%s) Stage: %s, State: %s, Subcloud: %s"
+                 % (self.update_type,
+                    strategy_step.stage,
+                    strategy_step.state,
+                    self.get_region_name(strategy_step)))
+        if refresh:
+            strategy_step = db_api.strategy_step_get(
+                self.context, strategy_step.subcloud_id)
+        # Instantiate the state operator and perform the state actions
+        state_operator = self.determine_state_operator(strategy_step)
+        state_operator.registerStopEvent(self._stop)
+        return state_operator.perform_state_action(strategy_step)
+
+    def _run_state_action(self, strategy_step, func, *args):
         try:
-            LOG.info("(%s) Stage: %s, State: %s, Subcloud: %s"
-                     % (self.update_type,
-                        strategy_step.stage,
-                        strategy_step.state,
-                        self.get_region_name(strategy_step)))
-            # Instantiate the state operator and perform the state actions
-            state_operator = self.determine_state_operator(strategy_step)
-            state_operator.registerStopEvent(self._stop)
-            next_state = state_operator.perform_state_action(strategy_step)
+            next_state = func(*args)
+            if isinstance(next_state, scheduler.Wait):
+                # The step is updated once the state resumes and completes
+                return scheduler.Wait(next_state.delay,
+                                      self._run_state_action,
+                                      strategy_step, next_state.resume)
             self.strategy_step_update(strategy_step.subcloud_id,
                                       state=next_state,
                                       details="")
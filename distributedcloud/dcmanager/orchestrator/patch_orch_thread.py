@@ -15,6 +15,8 @@
 # limitations under the License.
 #
 import datetime
+import eventlet
+import functools
 import os
 import re
 import threading
@@ -35,9 +37,13 @@ from dcmanager.common import exceptions
 from dcmanager.common import scheduler
 from dcmanager.common import utils
 from dcmanager.db import api as db_api
+from dcmanager.orchestrator.patch_staging import PatchStaging
 
 LOG = logging.getLogger(__name__)
 
+# Maximum number of patches uploaded concurrently to a subcloud
+MAX_PARALLEL_PATCH_UPLOADS = 4
+
 
 class PatchOrchThread(threading.Thread):
     """Patch Orchestration Thread
@@ -76,6 +82,8 @@ class PatchOrchThread(threading.Thread):
         self.regionone_applied_patch_ids = list()
         # Used to store the list patch ids are committed in the central region.
         self.regionone_committed_patch_ids = list()
+        # Used to store the contents of the patch files uploaded to subclouds.
+        self.patch_staging = PatchStaging()
 
     def stopped(self):
         return self._stop.isSet()
@@ -139,7 +147,7 @@ class PatchOrchThread(threading.Thread):
                        consts.STRATEGY_STATE_ABORTED,
                        consts.STRATEGY_STATE_FAILED]:
             finished_at = datetime.datetime.now()
-        db_api.strategy_step_update(
+        db_api.strategy_step_set(
             self.context,
             subcloud_id,
             state=state,
@@ -150,6 +158,9 @@ class PatchOrchThread(threading.Thread):
     def get_region_one_patches(self):
         """Query the RegionOne to determine what patches should be applied/committed."""
 
+        # The patch files of a previous strategy are no longer needed
+        self.patch_staging.clear()
+
         self.regionone_patches = \
             self.get_patching_client(consts.DEFAULT_REGION_NAME).query()
         LOG.debug("regionone_patches: %s" % self.regionone_patches)
@@ -231,7 +242,7 @@ class PatchOrchThread(threading.Thread):
         """Apply a patch strategy"""
 
         LOG.info("Applying patch strategy")
-        strategy_steps = db_api.strategy_step_get_all(self.context)
+        strategy_steps = db_api.strategy_step_get_all_snapshots(self.context)
 
         # Figure out which stage we are working on
         current_stage = None
@@ -256,6 +267,7 @@ class PatchOrchThread(threading.Thread):
                     with self.strategy_lock:
                         db_api.sw_update_strategy_update(
                             self.context, state=consts.SW_UPDATE_STATE_FAILED)
+                    self.patch_staging.clear()
                     # Trigger patch audit to update the sync status for
                     # each subcloud.
                     self.audit_rpc_client.trigger_patch_audit(self.context)
@@ -287,6 +299,7 @@ class PatchOrchThread(threading.Thread):
                 with self.strategy_lock:
                     db_api.sw_update_strategy_update(
                         self.context, state=consts.SW_UPDATE_STATE_COMPLETE)
+            self.patch_staging.clear()
             # Trigger patch audit to update the sync status for each subcloud.
             self.audit_rpc_client.trigger_patch_audit(self.context)
             return
@@ -310,6 +323,7 @@ class PatchOrchThread(threading.Thread):
                 with self.strategy_lock:
                     db_api.sw_update_strategy_update(
                         self.context, state=consts.SW_UPDATE_STATE_FAILED)
+                self.patch_staging.clear()
                 # Trigger patch audit to update the sync status for each
                 # subcloud.
                 self.audit_rpc_client.trigger_patch_audit(self.context)
@@ -560,6 +574,7 @@ class PatchOrchThread(threading.Thread):
         if patches_to_upload:
             LOG.info("Uploading patches %s to subcloud %s" %
                      (patches_to_upload, strategy_step.subcloud.name))
+            patch_files = list()
             for patch in patches_to_upload:
                 patch_sw_version = self.regionone_patches[patch]['sw_version']
                 patch_file = "%s/%s/%s.patch" % (consts.PATCH_VAULT_DIR,
@@ -573,11 +588,18 @@ class PatchOrchThread(threading.Thread):
                         state=consts.STRATEGY_STATE_FAILED,
                         details=message)
                     return
-
-                try:
-                    self.get_patching_client(
-                        strategy_step.subcloud.name).upload([patch_file])
-                except Exception:
+                patch_files.append(patch_file)
+
+            patching_client = self.get_patching_client(
+                strategy_step.subcloud.name)
+            pool = eventlet.greenpool.GreenPool(
+                min(len(patch_files), MAX_PARALLEL_PATCH_UPLOADS))
+            start = time.time()
+            uploaded_bytes = 0
+            upload = functools.partial(self.upload_subcloud_patch,
+                                       patching_client)
+            for patch_file, size in pool.imap(upload, patch_files):
+                if size is None:
                     message = ('Failed to upload patch file %s to subcloud %s'
                                % (patch_file, strategy_step.subcloud.name))
                     LOG.warn(message)
@@ -586,10 +608,17 @@ class PatchOrchThread(threading.Thread):
                         state=consts.STRATEGY_STATE_FAILED,
                         details=message)
                     return
+                uploaded_bytes += size
+            elapsed = max(time.time() - start, 0.001)
+            LOG.info("Uploaded %d patch files (%.1f MB) to subcloud %s in "
+                     "%.1f seconds (%.1f MB/s)" %
+                     (len(patch_files), uploaded_bytes / 1048576.0,
+                      strategy_step.subcloud.name, elapsed,
+                      uploaded_bytes / 1048576.0 / elapsed))
 
-                if self.stopped():
-                    LOG.info("Exiting because task is stopped")
-                    return
+            if self.stopped():
+                LOG.info("Exiting because task is stopped")
+                return
 
         if patches_to_apply:
             LOG.info("Applying patches %s to subcloud %s" %
@@ -658,6 +687,22 @@ class PatchOrchThread(threading.Thread):
             strategy_step.subcloud_id,
             state=consts.STRATEGY_STATE_CREATING_STRATEGY)
 
+    def upload_subcloud_patch(self, patching_client, patch_file):
+        """Upload a staged patch file to a subcloud
+
+        Returns the patch file and the number of bytes uploaded, which is
+        None if the upload failed.
+        """
+        if self.stopped():
+            return patch_file, 0
+        try:
+            data = self.patch_staging.get(patch_file)
+            patching_client.upload_data(patch_file, data)
+        except Exception as e:
+            LOG.exception(e)
+            return patch_file, None
+        return patch_file, len(data)
+
     def create_subcloud_strategy(self, strategy_step):
         """Create the patch strategy in this subcloud
 
@@ -1193,7 +1238,7 @@ class PatchOrchThread(threading.Thread):
 
         # Mark any steps that have not yet started as aborted,
         # so we will not run them later.
-        strategy_steps = db_api.strategy_step_get_all(self.context)
+        strategy_steps = db_api.strategy_step_get_all_snapshots(self.context)
 
         for strategy_step in strategy_steps:
             if strategy_step.state == consts.STRATEGY_STATE_INITIAL:
@@ -1213,7 +1258,7 @@ class PatchOrchThread(threading.Thread):
 
         LOG.info("Deleting patch strategy")
 
-        strategy_steps = db_api.strategy_step_get_all(self.context)
+        strategy_steps = db_api.strategy_step_get_all_snapshots(self.context)
 
         for strategy_step in strategy_steps:
             region = self.get_region_name(strategy_step)
@@ -1249,3 +1294,4 @@ class PatchOrchThread(threading.Thread):
         except Exception as e:
             LOG.exception(e)
             raise e
+        self.patch_staging.clear()
@@ -0,0 +1,33 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+import threading
+
+
+class PatchStaging(object):
+    """Holds the contents of the vault patch files uploaded by a strategy.
+
+    Each patch file is read from disk the first time it is uploaded to a
+    subcloud, and the same contents are then sent to all the subclouds
+    that are missing it. The staging is cleared when the strategy ends.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._contents = {}
+
+    def get(self, patch_file):
+        """Return the contents of a patch file, reading it if not staged."""
+        with self._lock:
+            data = self._contents.get(patch_file)
+            if data is None:
+                with open(patch_file, 'rb') as f:
+                    data = f.read()
+                self._contents[patch_file] = data
+            return data
+
+    def clear(self):
+        with self._lock:
+            self._contents.clear()
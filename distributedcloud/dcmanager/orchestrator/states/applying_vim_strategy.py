@@ -3,8 +3,6 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 #
-import time
-
 from dccommon.drivers.openstack import vim
 from dcmanager.common.exceptions import StrategyStoppedException
 from dcmanager.db import api as db_api
@@ -88,91 +86,89 @@ class ApplyingVIMStrategyState(BaseState):
                                    subcloud_strategy.state))
 
         # wait for new strategy to apply or the existing strategy to complete.
-        # Loop until the strategy applies. Repeatedly query the API
-        # This can take a long time.
+        # Repeatedly query the API until the strategy applies, waiting
+        # before each query. This can take a long time.
         # Waits for up to 60 minutes for the current phase or completion
         # percentage to change before giving up.
+        self.wait_count = 0
+        self.get_fail_count = 0
+        self.last_details = ""
+        return self._wait_for_apply(strategy_step)
+
+    def _wait_for_apply(self, strategy_step):
+        # If event handler stop has been triggered, fail the state
+        if self.stopped():
+            raise StrategyStoppedException()
+        # give up if the max number of attempts is reached
+        self.wait_count += 1
+        if self.wait_count >= self.wait_attempts:
+            raise Exception("Timeout applying (%s) vim strategy."
+                            % self.strategy_name)
+        # every query is preceded by a wait, even the first one
+        return self.wait(self.wait_interval, self._check_apply, strategy_step)
 
-        wait_count = 0
-        get_fail_count = 0
-        last_details = ""
-        while True:
-            # todo(abailey): combine the sleep and stop check into one method
-            # which would allow the longer 60 second sleep to be broken into
-            # multiple smaller sleep calls
-
-            # If event handler stop has been triggered, fail the state
-            if self.stopped():
-                raise StrategyStoppedException()
-            # break out of the loop if the max number of attempts is reached
-            wait_count += 1
-            if wait_count >= self.wait_attempts:
-                raise Exception("Timeout applying (%s) vim strategy."
-                                % self.strategy_name)
-            # every loop we wait, even the first one
-            time.sleep(self.wait_interval)
-
-            # get the strategy
-            try:
-                subcloud_strategy = self.get_vim_client(region).get_strategy(
-                    strategy_name=self.strategy_name,
-                    raise_error_if_missing=False)
-                get_fail_count = 0
-            except Exception:
-                # When applying the strategy to a subcloud, the VIM can
-                # be unreachable for a significant period of time when
-                # there is a controller swact, the VIM service restarts,
-                # or in the case of AIO-SX, when the controller reboots.
-                get_fail_count += 1
-                if get_fail_count >= self.max_failed_queries:
-                    # We have waited too long.
-                    raise Exception("Timeout during recovery of apply "
-                                    "(%s) Vim strategy."
-                                    % self.strategy_name)
-                self.debug_log(strategy_step,
-                               "Unable to get (%s) vim strategy - attempt %d"
-                               % (self.strategy_name, get_fail_count))
-                continue
-            # If an external actor has deleted the strategy, the only option
-            # is to fail this state.
-            if subcloud_strategy is None:
-                raise Exception("(%s) VIM Strategy no longer exists."
-                                % self.strategy_name)
+    def _check_apply(self, strategy_step):
+        region = self.get_region_name(strategy_step)
 
-            elif subcloud_strategy.state == vim.STATE_APPLYING:
-                # Still applying. Update details if it has changed
-                new_details = ("%s phase is %s%% complete" % (
-                    subcloud_strategy.current_phase,
-                    subcloud_strategy.current_phase_completion_percentage))
-                if new_details != last_details:
-                    # Progress is being made.
-                    # Reset the counter and log the progress
-                    last_details = new_details
-                    wait_count = 0
-                    self.info_log(strategy_step, new_details)
-                    db_api.strategy_step_update(self.context,
-                                                strategy_step.subcloud_id,
-                                                details=new_details)
-            elif subcloud_strategy.state == vim.STATE_APPLIED:
-                # Success.
-                self.info_log(strategy_step,
-                              "(%s) Vim strategy has been applied"
-                              % self.strategy_name)
-                break
-            elif subcloud_strategy.state in [vim.STATE_APPLY_FAILED,
-                                             vim.STATE_APPLY_TIMEOUT]:
-                # Explicit known failure states
-                raise Exception("(%s) Vim strategy apply failed. %s. %s"
-                                % (self.strategy_name,
-                                   subcloud_strategy.state,
-                                   subcloud_strategy.apply_phase.reason))
-            else:
-                # Other states are bad
-                raise Exception("(%s) Vim strategy apply failed. "
-                                "Unexpected State: %s."
-                                % (self.strategy_name,
-                                   subcloud_strategy.state))
-            # end of loop
+        # get the strategy
+        try:
+            subcloud_strategy = self.get_vim_client(region).get_strategy(
+                strategy_name=self.strategy_name,
+                raise_error_if_missing=False)
+            self.get_fail_count = 0
+        except Exception:
+            # When applying the strategy to a subcloud, the VIM can
+            # be unreachable for a significant period of time when
+            # there is a controller swact, the VIM service restarts,
+            # or in the case of AIO-SX, when the controller reboots.
+            self.get_fail_count += 1
+            if self.get_fail_count >= self.max_failed_queries:
+                # We have waited too long.
+                raise Exception("Timeout during recovery of apply "
+                                "(%s) Vim strategy."
+                                % self.strategy_name)
+            self.debug_log(strategy_step,
+                           "Unable to get (%s) vim strategy - attempt %d"
+                           % (self.strategy_name, self.get_fail_count))
+            return self._wait_for_apply(strategy_step)
+        # If an external actor has deleted the strategy, the only option
+        # is to fail this state.
+        if subcloud_strategy is None:
+            raise Exception("(%s) VIM Strategy no longer exists."
+                            % self.strategy_name)
 
-        # Success, state machine can proceed to the next state
-        return self.next_state
+        elif subcloud_strategy.state == vim.STATE_APPLYING:
+            # Still applying. Update details if it has changed
+            new_details = ("%s phase is %s%% complete" % (
+                subcloud_strategy.current_phase,
+                subcloud_strategy.current_phase_completion_percentage))
+            if new_details != self.last_details:
+                # Progress is being made.
+                # Reset the counter and log the progress
+                self.last_details = new_details
+                self.wait_count = 0
+                self.info_log(strategy_step, new_details)
+                db_api.strategy_step_update(self.context,
+                                            strategy_step.subcloud_id,
+                                            details=new_details)
+        elif subcloud_strategy.state == vim.STATE_APPLIED:
+            # Success.
+            self.info_log(strategy_step,
+                          "(%s) Vim strategy has been applied"
+                          % self.strategy_name)
+            # Success, state machine can proceed to the next state
+            return self.next_state
+        elif subcloud_strategy.state in [vim.STATE_APPLY_FAILED,
+                                         vim.STATE_APPLY_TIMEOUT]:
+            # Explicit known failure states
+            raise Exception("(%s) Vim strategy apply failed. %s. %s"
+                            % (self.strategy_name,
+                               subcloud_strategy.state,
+                               subcloud_strategy.apply_phase.reason))
+        else:
+            # Other states are bad
+            raise Exception("(%s) Vim strategy apply failed. "
+                            "Unexpected State: %s."
+                            % (self.strategy_name,
+                               subcloud_strategy.state))
+        return self._wait_for_apply(strategy_step)
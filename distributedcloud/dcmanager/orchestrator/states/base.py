@@ -16,6 +16,7 @@ from dccommon.drivers.openstack.sysinv_v1 import SysinvClient
 from dccommon.drivers.openstack.vim import VimClient
 from dcmanager.common import consts
 from dcmanager.common import context
+from dcmanager.common import scheduler
 
 LOG = logging.getLogger(__name__)
 
@@ -44,6 +45,16 @@ class BaseState(object):
         else:
             return False
 
+    @staticmethod
+    def wait(delay, callback, *args):
+        """Return a request to call callback(*args) after delay seconds.
+
+        A state that has to wait returns this from perform_state_action
+        instead of sleeping, so that it does not hold a worker while it
+        waits. The callback returns the next state, or waits again.
+        """
+        return scheduler.Wait(delay, callback, *args)
+
     def debug_log(self, strategy_step, details):
         LOG.debug("Stage: %s, State: %s, Subcloud: %s, Details: %s"
                   % (strategy_step.stage,
@@ -136,7 +147,8 @@ class BaseState(object):
     def perform_state_action(self, strategy_step):
         """Perform the action for this state on the strategy_step
 
-        Returns the next state in the state machine on success.
+        Returns the next state in the state machine on success, or a
+        wait() to be resumed later.
         Any exceptions raised by this method set the strategy to FAILED.
         """
         pass
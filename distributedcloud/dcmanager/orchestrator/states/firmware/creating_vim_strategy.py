@@ -3,8 +3,6 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 #
-import time
-
 from dccommon.drivers.openstack import vim
 from dcmanager.common import consts
 from dcmanager.common.exceptions import StrategyStoppedException
@@ -95,38 +93,44 @@ class CreatingVIMStrategyState(BaseState):
                                                           region)
 
         # A strategy already exists, or is being built
-        # Loop until the strategy is done building Repeatedly query the API
-        counter = 0
-        while True:
-            # If event handler stop has been triggered, fail the state
-            if self.stopped():
-                raise StrategyStoppedException()
-            if counter >= self.max_queries:
-                raise Exception("Timeout building vim strategy. state: %s"
-                                % subcloud_strategy.state)
-            counter += 1
-            time.sleep(self.sleep_duration)
-
-            # query the vim strategy to see if it is in the new state
-            subcloud_strategy = self.get_vim_client(region).get_strategy(
-                strategy_name=vim.STRATEGY_NAME_FW_UPDATE,
-                raise_error_if_missing=True)
-            if subcloud_strategy.state == vim.STATE_READY_TO_APPLY:
-                self.info_log(strategy_step, "VIM strategy has been built")
-                break
-            elif subcloud_strategy.state == vim.STATE_BUILDING:
-                # This is the expected state while creating the strategy
-                pass
-            elif subcloud_strategy.state == vim.STATE_BUILD_FAILED:
-                raise Exception("VIM strategy build failed: %s. %s."
-                                % (subcloud_strategy.state,
-                                   subcloud_strategy.build_phase.reason))
-            elif subcloud_strategy.state == vim.STATE_BUILD_TIMEOUT:
-                raise Exception("VIM strategy build timed out: %s."
-                                % subcloud_strategy.state)
-            else:
-                raise Exception("VIM strategy unexpected build state: %s"
-                                % subcloud_strategy.state)
-
-        # Success, state machine can proceed to the next state
-        return self.next_state
+        # Repeatedly query the API until the strategy is done building,
+        # waiting before each query
+        self.query_counter = 0
+        return self._wait_for_build(strategy_step, subcloud_strategy)
+
+    def _wait_for_build(self, strategy_step, subcloud_strategy):
+        # If event handler stop has been triggered, fail the state
+        if self.stopped():
+            raise StrategyStoppedException()
+        if self.query_counter >= self.max_queries:
+            raise Exception("Timeout building vim strategy. state: %s"
+                            % subcloud_strategy.state)
+        self.query_counter += 1
+        return self.wait(self.sleep_duration, self._check_build,
+                         strategy_step)
+
+    def _check_build(self, strategy_step):
+        region = self.get_region_name(strategy_step)
+
+        # query the vim strategy to see if it is in the new state
+        subcloud_strategy = self.get_vim_client(region).get_strategy(
+            strategy_name=vim.STRATEGY_NAME_FW_UPDATE,
+            raise_error_if_missing=True)
+        if subcloud_strategy.state == vim.STATE_READY_TO_APPLY:
+            self.info_log(strategy_step, "VIM strategy has been built")
+            # Success, state machine can proceed to the next state
+            return self.next_state
+        elif subcloud_strategy.state == vim.STATE_BUILDING:
+            # This is the expected state while creating the strategy
+            pass
+        elif subcloud_strategy.state == vim.STATE_BUILD_FAILED:
+            raise Exception("VIM strategy build failed: %s. %s."
+                            % (subcloud_strategy.state,
+                               subcloud_strategy.build_phase.reason))
+        elif subcloud_strategy.state == vim.STATE_BUILD_TIMEOUT:
+            raise Exception("VIM strategy build timed out: %s."
+                            % subcloud_strategy.state)
+        else:
+            raise Exception("VIM strategy unexpected build state: %s"
+                            % subcloud_strategy.state)
+        return self._wait_for_build(strategy_step, subcloud_strategy)
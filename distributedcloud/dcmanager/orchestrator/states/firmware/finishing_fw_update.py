@@ -3,8 +3,6 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 #
-import time
-
 from dcmanager.common import consts
 from dcmanager.common.exceptions import StrategyStoppedException
 from dcmanager.orchestrator.states.base import BaseState
@@ -53,33 +51,33 @@ class FinishingFwUpdateState(BaseState):
         # - clean up files
         # - report information about the firmware on the subcloud
 
-        region = self.get_region_name(strategy_step)
-
         # FINAL CHECK
         # if any of the device images are in failed state, fail this state
         # only check for enabled devices matching images with applied labels
+        self.fail_counter = 0
+        return self._get_enabled_devices(strategy_step)
 
+    def _get_enabled_devices(self, strategy_step):
+        region = self.get_region_name(strategy_step)
+        # If event handler stop has been triggered, fail the state
+        if self.stopped():
+            raise StrategyStoppedException()
         # get the list of enabled devices on the subcloud
         enabled_host_device_list = []
-        fail_counter = 0
-        while True:
-            # If event handler stop has been triggered, fail the state
-            if self.stopped():
-                raise StrategyStoppedException()
-            try:
-                subcloud_hosts = self.get_sysinv_client(region).get_hosts()
-                for host in subcloud_hosts:
-                    host_devices = self.get_sysinv_client(
-                        region).get_host_device_list(host.uuid)
-                    for device in host_devices:
-                        if device.enabled:
-                            enabled_host_device_list.append(device)
-                break
-            except Exception:
-                if fail_counter >= self.max_failed_queries:
-                    raise Exception("Timeout waiting to query subcloud hosts")
-                fail_counter += 1
-                time.sleep(self.failed_sleep_duration)
+        try:
+            subcloud_hosts = self.get_sysinv_client(region).get_hosts()
+            for host in subcloud_hosts:
+                host_devices = self.get_sysinv_client(
+                    region).get_host_device_list(host.uuid)
+                for device in host_devices:
+                    if device.enabled:
+                        enabled_host_device_list.append(device)
+        except Exception:
+            if self.fail_counter >= self.max_failed_queries:
+                raise Exception("Timeout waiting to query subcloud hosts")
+            self.fail_counter += 1
+            return self.wait(self.failed_sleep_duration,
+                             self._get_enabled_devices, strategy_step)
 
         if not enabled_host_device_list:
             # There are no enabled devices in this subcloud, so break out
@@ -89,26 +87,31 @@ class FinishingFwUpdateState(BaseState):
             self.align_subcloud_status(strategy_step)
             return self.next_state
 
-        fail_counter = 0
-        while True:
-            # If event handler stop has been triggered, fail the state
-            if self.stopped():
-                raise StrategyStoppedException()
-            try:
-                # determine list of applied subcloud images
-                subcloud_images = self.get_sysinv_client(region).get_device_images()
-                applied_subcloud_images = \
-                    utils.filter_applied_images(subcloud_images,
-                                                expected_value=True)
-                # Retrieve the device image states on this subcloud.
-                subcloud_device_image_states = self.get_sysinv_client(
-                    region).get_device_image_states()
-                break
-            except Exception:
-                if fail_counter >= self.max_failed_queries:
-                    raise Exception("Timeout waiting to query subcloud device image info")
-                fail_counter += 1
-                time.sleep(self.failed_sleep_duration)
+        self.fail_counter = 0
+        return self._get_device_images(strategy_step,
+                                       enabled_host_device_list)
+
+    def _get_device_images(self, strategy_step, enabled_host_device_list):
+        region = self.get_region_name(strategy_step)
+        # If event handler stop has been triggered, fail the state
+        if self.stopped():
+            raise StrategyStoppedException()
+        try:
+            # determine list of applied subcloud images
+            subcloud_images = self.get_sysinv_client(region).get_device_images()
+            applied_subcloud_images = \
+                utils.filter_applied_images(subcloud_images,
+                                            expected_value=True)
+            # Retrieve the device image states on this subcloud.
+            subcloud_device_image_states = self.get_sysinv_client(
+                region).get_device_image_states()
+        except Exception:
+            if self.fail_counter >= self.max_failed_queries:
+                raise Exception("Timeout waiting to query subcloud device image info")
+            self.fail_counter += 1
+            return self.wait(self.failed_sleep_duration,
+                             self._get_device_images, strategy_step,
+                             enabled_host_device_list)
 
         device_map = utils.to_uuid_map(enabled_host_device_list)
         image_map = utils.to_uuid_map(applied_subcloud_images)
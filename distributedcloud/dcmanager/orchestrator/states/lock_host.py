@@ -3,8 +3,6 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 #
-import time
-
 from dcmanager.common import consts
 from dcmanager.common.exceptions import StrategyStoppedException
 from dcmanager.orchestrator.states.base import BaseState
@@ -51,27 +49,27 @@ class LockHostState(BaseState):
             raise Exception("Unable to lock host %s" % self.target_hostname)
 
         # this action is asynchronous, query until it completes or times out
-        counter = 0
-        while True:
-            # If event handler stop has been triggered, fail the state
-            if self.stopped():
-                raise StrategyStoppedException()
-            # query the administrative state to see if it is the new state.
-            host = self.get_sysinv_client(
-                strategy_step.subcloud.name).get_host(self.target_hostname)
-            if host.administrative == consts.ADMIN_LOCKED:
-                msg = "Host: %s is now: %s" % (self.target_hostname,
-                                               host.administrative)
-                self.info_log(strategy_step, msg)
-                break
-            counter += 1
-            if counter >= self.max_queries:
-                raise Exception("Timeout waiting for lock to complete. "
-                                "Please check sysinv.log on the subcloud "
-                                "for details.")
-            time.sleep(self.sleep_duration)
+        self.query_counter = 0
+        return self._check_lock(strategy_step)
 
-        # If we are here, the loop broke out cleanly and the action succeeded
-        # When we return from this method without throwing an exception, the
-        # state machine can proceed to the next state
-        return self.next_state
+    def _check_lock(self, strategy_step):
+        # If event handler stop has been triggered, fail the state
+        if self.stopped():
+            raise StrategyStoppedException()
+        # query the administrative state to see if it is the new state.
+        host = self.get_sysinv_client(
+            strategy_step.subcloud.name).get_host(self.target_hostname)
+        if host.administrative == consts.ADMIN_LOCKED:
+            msg = "Host: %s is now: %s" % (self.target_hostname,
+                                           host.administrative)
+            self.info_log(strategy_step, msg)
+            # The action succeeded, the state machine can proceed to the
+            # next state
+            return self.next_state
+        self.query_counter += 1
+        if self.query_counter >= self.max_queries:
+            raise Exception("Timeout waiting for lock to complete. "
+                            "Please check sysinv.log on the subcloud "
+                            "for details.")
+        return self.wait(self.sleep_duration, self._check_lock,
+                         strategy_step)
@@ -3,8 +3,6 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 #
-import time
-
 from dcmanager.common import consts
 from dcmanager.common.exceptions import StrategyStoppedException
 from dcmanager.orchestrator.states.base import BaseState
@@ -60,45 +58,46 @@ class SwactHostState(BaseState):
             raise Exception("Unable to swact to host %s" % self.active)
 
         # Allow separate durations for failures and api retries
-        fail_counter = 0
-        api_counter = 0
-
-        while True:
-            # If event handler stop has been triggered, fail the state
-            if self.stopped():
-                raise StrategyStoppedException()
-            try:
-                # query the administrative state to see if it is the new state.
-                host = self.get_sysinv_client(region).get_host(self.active)
-                if host.capabilities.get('Personality') == consts.PERSONALITY_CONTROLLER_ACTIVE:
-                    msg = "Host: %s is now the active controller." % (self.active)
-                    self.info_log(strategy_step, msg)
-                    break
-                fail_counter = 0
-            except Exception:
-                # Handle other exceptions due to being unreachable
-                # for a significant period of time when there is a
-                # controller swact
-                fail_counter += 1
-                if fail_counter >= self.max_failed_queries:
-                    raise Exception("Timeout waiting for swact to complete")
-                time.sleep(self.failed_sleep_duration)
-                # skip the api_counter
-                continue
-            api_counter += 1
-            if api_counter >= self.max_queries:
-                raise Exception("Timeout waiting for swact to complete. "
-                                "Please check sysinv.log on the subcloud "
-                                "for details.")
-            time.sleep(self.sleep_duration)
+        self.fail_counter = 0
+        self.api_counter = 0
+        return self._check_swact(strategy_step)
 
-        # If we are here, the loop broke out cleanly and the action succeeded
-        # When we return from this method without throwing an exception, the
-        # state machine can proceed to the next state
-        # Adding a 2 minute delay (DEFAULT_SWACT_SLEEP) before moving to the
-        # next state
-        self.info_log(strategy_step,
-                      "Waiting %s seconds before proceeding"
-                      % DEFAULT_SWACT_SLEEP)
-        time.sleep(DEFAULT_SWACT_SLEEP)
+    def _check_swact(self, strategy_step):
+        region = self.get_region_name(strategy_step)
+        # If event handler stop has been triggered, fail the state
+        if self.stopped():
+            raise StrategyStoppedException()
+        try:
+            # query the administrative state to see if it is the new state.
+            host = self.get_sysinv_client(region).get_host(self.active)
+            if host.capabilities.get('Personality') == consts.PERSONALITY_CONTROLLER_ACTIVE:
+                msg = "Host: %s is now the active controller." % (self.active)
+                self.info_log(strategy_step, msg)
+                # The action succeeded. Adding a 2 minute delay
+                # (DEFAULT_SWACT_SLEEP) before moving to the next state
+                self.info_log(strategy_step,
+                              "Waiting %s seconds before proceeding"
+                              % DEFAULT_SWACT_SLEEP)
+                return self.wait(DEFAULT_SWACT_SLEEP, self._swact_settled)
+            self.fail_counter = 0
+        except Exception:
+            # Handle other exceptions due to being unreachable
+            # for a significant period of time when there is a
+            # controller swact
+            self.fail_counter += 1
+            if self.fail_counter >= self.max_failed_queries:
+                raise Exception("Timeout waiting for swact to complete")
+            # skip the api_counter
+            return self.wait(self.failed_sleep_duration, self._check_swact,
+                             strategy_step)
+        self.api_counter += 1
+        if self.api_counter >= self.max_queries:
+            raise Exception("Timeout waiting for swact to complete. "
+                            "Please check sysinv.log on the subcloud "
+                            "for details.")
+        return self.wait(self.sleep_duration, self._check_swact,
+                         strategy_step)
+
+    def _swact_settled(self):
+        # The state machine can proceed to the next state
         return self.next_state
@@ -3,8 +3,6 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 #
-import time
-
 import retrying
 
 from dcmanager.common import consts
@@ -75,69 +73,69 @@ class UnlockHostState(BaseState):
         # Invoke the action
         # ihost_action is 'unlock' and task is set to 'Unlocking'
         # handle possible unlock failures that can occur in corner cases
-        unlock_counter = 0
-
-        while True:
-            try:
-                response = self.get_sysinv_client(
-                    strategy_step.subcloud.name).unlock_host(host.id)
-                if (response.ihost_action != 'unlock' or response.task != 'Unlocking'):
-                    raise Exception("Unable to unlock host %s" % self.target_hostname)
-                break
-            except Exception as e:
-                if unlock_counter >= self.max_unlock_retries:
-                    raise
-                unlock_counter += 1
-                self.error_log(strategy_step, str(e))
-                time.sleep(self.unlock_sleep_duration)
+        self.unlock_counter = 0
+        return self._unlock(strategy_step, host)
+
+    def _unlock(self, strategy_step, host):
+        try:
+            response = self.get_sysinv_client(
+                strategy_step.subcloud.name).unlock_host(host.id)
+            if (response.ihost_action != 'unlock' or response.task != 'Unlocking'):
+                raise Exception("Unable to unlock host %s" % self.target_hostname)
+        except Exception as e:
+            if self.unlock_counter >= self.max_unlock_retries:
+                raise
+            self.unlock_counter += 1
+            self.error_log(strategy_step, str(e))
+            return self.wait(self.unlock_sleep_duration, self._unlock,
+                             strategy_step, host)
 
         # unlock triggers a reboot.
         # must ignore certain errors until the system completes the reboot
         # or a timeout occurs
 
         # Allow separate durations for failures (ie: reboot) and api retries
-        api_counter = 0
-        fail_counter = 0
-
-        while True:
-            # If event handler stop has been triggered, fail the state
-            if self.stopped():
-                raise StrategyStoppedException()
-            try:
-                # query the administrative state to see if it is the new state.
-                host = self.get_sysinv_client(
-                    strategy_step.subcloud.name).get_host(self.target_hostname)
-                if self.check_host_ready(host):
-                    # Success. Break out of the loop.
-                    msg = "Host: %s is now: %s %s %s" % (self.target_hostname,
-                                                         host.administrative,
-                                                         host.operational,
-                                                         host.availability)
-                    self.info_log(strategy_step, msg)
-                    break
-                # no exception was raised so reset fail checks
-                fail_counter = 0
-            except Exception:
-                # Handle other exceptions due to being unreachable
-                # for a significant period of time when there is a
-                # controller swact, or in the case of AIO-SX,
-                # when the controller reboots.
-                fail_counter += 1
-                if fail_counter >= self.max_failed_queries:
-                    raise Exception("Timeout waiting for reboot to complete")
-                time.sleep(self.failed_sleep_duration)
-                # skip the api_counter
-                continue
-            # If the max counter is exceeeded, raise a timeout exception
-            api_counter += 1
-            if api_counter >= self.max_api_queries:
-                raise Exception("Timeout waiting for unlock to complete")
-            time.sleep(self.api_sleep_duration)
-
-        # If we are here, the loop broke out cleanly and the action succeeded
-        # When we return from this method without throwing an exception, the
-        # state machine can proceed to the next state
-        return self.next_state
+        self.api_counter = 0
+        self.fail_counter = 0
+        return self._check_unlock(strategy_step)
+
+    def _check_unlock(self, strategy_step):
+        # If event handler stop has been triggered, fail the state
+        if self.stopped():
+            raise StrategyStoppedException()
+        try:
+            # query the administrative state to see if it is the new state.
+            host = self.get_sysinv_client(
+                strategy_step.subcloud.name).get_host(self.target_hostname)
+            if self.check_host_ready(host):
+                # Success.
+                msg = "Host: %s is now: %s %s %s" % (self.target_hostname,
+                                                     host.administrative,
+                                                     host.operational,
+                                                     host.availability)
+                self.info_log(strategy_step, msg)
+                # The action succeeded, the state machine can proceed to
+                # the next state
+                return self.next_state
+            # no exception was raised so reset fail checks
+            self.fail_counter = 0
+        except Exception:
+            # Handle other exceptions due to being unreachable
+            # for a significant period of time when there is a
+            # controller swact, or in the case of AIO-SX,
+            # when the controller reboots.
+            self.fail_counter += 1
+            if self.fail_counter >= self.max_failed_queries:
+                raise Exception("Timeout waiting for reboot to complete")
+            # skip the api_counter
+            return self.wait(self.failed_sleep_duration, self._check_unlock,
+                             strategy_step)
+        # If the max counter is exceeeded, raise a timeout exception
+        self.api_counter += 1
+        if self.api_counter >= self.max_api_queries:
+            raise Exception("Timeout waiting for unlock to complete")
+        return self.wait(self.api_sleep_duration, self._check_unlock,
+                         strategy_step)
 
     @retrying.retry(stop_max_attempt_number=consts.PLATFORM_RETRY_MAX_ATTEMPTS,
                     wait_fixed=consts.PLATFORM_RETRY_SLEEP_MILLIS)
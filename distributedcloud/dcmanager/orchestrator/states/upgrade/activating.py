@@ -3,8 +3,6 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 #
-import time
-
 from dcmanager.common import consts
 from dcmanager.common.exceptions import StrategyStoppedException
 from dcmanager.orchestrator.states.base import BaseState
@@ -66,78 +64,79 @@ class ActivatingUpgradeState(BaseState):
                           "Already in an activating state:%s" % upgrade_state)
             return self.next_state
 
-        # Need to loop
+        # Need to
         # - attempt an initial activate one or more times
-        # - loop until state changed to a activating completed state
+        # - query until state changed to a activating completed state
         # - re-attempt activate if activation fails
-        audit_counter = 0
-        activate_retry_counter = 0
-        first_activate = True
-        while True:
-            # If event handler stop has been triggered, fail the state
-            if self.stopped():
-                raise StrategyStoppedException()
-
-            # if max retries have occurred, fail the state
-            if activate_retry_counter >= self.max_failed_retries:
-                raise Exception("Failed to activate upgrade. Please check "
-                                "sysinv.log on the subcloud for details.")
-
-            # We may need multiple attempts to issue the first activate
-            # if keystone is down, impacting the ability to send the activate
-            if first_activate:
-                # invoke the API 'upgrade-activate'.
-                # Normally only auth failures deserve retry
-                # (no upgrade found, bad host state, auth)
-                try:
-                    self.get_sysinv_client(
-                        strategy_step.subcloud.name).upgrade_activate()
-                    first_activate = False  # clear first activation flag
-                    activate_retry_counter = 0  # reset activation retries
-                except Exception as exception:
-                    # increment the retry counter on failure
-                    activate_retry_counter += 1
-                    self.warn_log(strategy_step,
-                                  "Encountered exception: %s, "
-                                  "retry upgrade activation for subcloud %s."
-                                  % (str(exception),
-                                     strategy_step.subcloud.name))
-                    # cannot flow into the remaining code. sleep  / continue
-                    time.sleep(self.sleep_duration)
-                    continue
-
-            upgrade_state = self.get_upgrade_state(strategy_step)
-            if upgrade_state in ACTIVATING_RETRY_STATES:
-                # We failed.  Better try again
-                activate_retry_counter += 1
-                self.info_log(strategy_step,
-                              "Activation failed, retrying... State=%s"
-                              % upgrade_state)
-                try:
-                    self.get_sysinv_client(
-                        strategy_step.subcloud.name).upgrade_activate()
-                except Exception as exception:
-                    self.warn_log(strategy_step,
-                                  "Encountered exception: %s, "
-                                  "retry upgrade activation for subcloud %s."
-                                  % (str(exception),
-                                     strategy_step.subcloud.name))
-            elif upgrade_state in ACTIVATING_IN_PROGRESS_STATES:
-                self.info_log(strategy_step,
-                              "Activation in progress, waiting... State=%s"
-                              % upgrade_state)
-            elif upgrade_state in ACTIVATING_COMPLETED_STATES:
-                self.info_log(strategy_step,
-                              "Activation completed. State=%s"
-                              % upgrade_state)
-                break
-            audit_counter += 1
-            if audit_counter >= self.max_queries:
-                raise Exception("Timeout waiting for activation to complete. "
-                                "Please check sysinv.log on the subcloud for "
-                                "details.")
-            time.sleep(self.sleep_duration)
-
-        # When we return from this method without throwing an exception, the
-        # state machine can proceed to the next state
-        return self.next_state
+        self.audit_counter = 0
+        self.activate_retry_counter = 0
+        self.first_activate = True
+        return self._check_activation(strategy_step)
+
+    def _check_activation(self, strategy_step):
+        # If event handler stop has been triggered, fail the state
+        if self.stopped():
+            raise StrategyStoppedException()
+
+        # if max retries have occurred, fail the state
+        if self.activate_retry_counter >= self.max_failed_retries:
+            raise Exception("Failed to activate upgrade. Please check "
+                            "sysinv.log on the subcloud for details.")
+
+        # We may need multiple attempts to issue the first activate
+        # if keystone is down, impacting the ability to send the activate
+        if self.first_activate:
+            # invoke the API 'upgrade-activate'.
+            # Normally only auth failures deserve retry
+            # (no upgrade found, bad host state, auth)
+            try:
+                self.get_sysinv_client(
+                    strategy_step.subcloud.name).upgrade_activate()
+                self.first_activate = False  # clear first activation flag
+                self.activate_retry_counter = 0  # reset activation retries
+            except Exception as exception:
+                # increment the retry counter on failure
+                self.activate_retry_counter += 1
+                self.warn_log(strategy_step,
+                              "Encountered exception: %s, "
+                              "retry upgrade activation for subcloud %s."
+                              % (str(exception),
+                                 strategy_step.subcloud.name))
+                # cannot flow into the remaining code. wait / retry
+                return self.wait(self.sleep_duration,
+                                 self._check_activation, strategy_step)
+
+        upgrade_state = self.get_upgrade_state(strategy_step)
+        if upgrade_state in ACTIVATING_RETRY_STATES:
+            # We failed.  Better try again
+            self.activate_retry_counter += 1
+            self.info_log(strategy_step,
+                          "Activation failed, retrying... State=%s"
+                          % upgrade_state)
+            try:
+                self.get_sysinv_client(
+                    strategy_step.subcloud.name).upgrade_activate()
+            except Exception as exception:
+                self.warn_log(strategy_step,
+                              "Encountered exception: %s, "
+                              "retry upgrade activation for subcloud %s."
+                              % (str(exception),
+                                 strategy_step.subcloud.name))
+        elif upgrade_state in ACTIVATING_IN_PROGRESS_STATES:
+            self.info_log(strategy_step,
+                          "Activation in progress, waiting... State=%s"
+                          % upgrade_state)
+        elif upgrade_state in ACTIVATING_COMPLETED_STATES:
+            self.info_log(strategy_step,
+                          "Activation completed. State=%s"
+                          % upgrade_state)
+            # When we return from this method without throwing an
+            # exception, the state machine can proceed to the next state
+            return self.next_state
+        self.audit_counter += 1
+        if self.audit_counter >= self.max_queries:
+            raise Exception("Timeout waiting for activation to complete. "
+                            "Please check sysinv.log on the subcloud for "
+                            "details.")
+        return self.wait(self.sleep_duration, self._check_activation,
+                         strategy_step)
@@ -4,7 +4,6 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 import retrying
-import time
 
 from dcmanager.common import consts
 from dcmanager.common.exceptions import StrategyStoppedException
@@ -99,22 +98,23 @@ class CompletingUpgradeState(BaseState):
         # We will re-attempt even if that failure is encountered
         self._upgrade_complete(strategy_step)
 
-        # 'completion' deletes the upgrade. Need to loop until it is deleted
-        counter = 0
-        while True:
-            # If event handler stop has been triggered, fail the state
-            if self.stopped():
-                raise StrategyStoppedException()
-
-            upgrades = self._get_upgrades(strategy_step)
-            if len(upgrades) == 0:
-                self.info_log(strategy_step, "Upgrade completed.")
-                break
-            counter += 1
-            if counter >= self.max_queries:
-                raise Exception("Timeout waiting for completion to complete")
-            time.sleep(self.sleep_duration)
-
-        # When we return from this method without throwing an exception, the
-        # state machine can proceed to the next state
-        return self.finalize_upgrade(strategy_step)
+        # 'completion' deletes the upgrade. Need to query until it is deleted
+        self.query_counter = 0
+        return self._check_completion(strategy_step)
+
+    def _check_completion(self, strategy_step):
+        # If event handler stop has been triggered, fail the state
+        if self.stopped():
+            raise StrategyStoppedException()
+
+        upgrades = self._get_upgrades(strategy_step)
+        if len(upgrades) == 0:
+            self.info_log(strategy_step, "Upgrade completed.")
+            # When we return from this method without throwing an
+            # exception, the state machine can proceed to the next state
+            return self.finalize_upgrade(strategy_step)
+        self.query_counter += 1
+        if self.query_counter >= self.max_queries:
+            raise Exception("Timeout waiting for completion to complete")
+        return self.wait(self.sleep_duration, self._check_completion,
+                         strategy_step)
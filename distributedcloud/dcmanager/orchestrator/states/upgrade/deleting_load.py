@@ -3,8 +3,6 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 #
-import time
-
 from dcmanager.common import consts
 from dcmanager.common.exceptions import StrategyStoppedException
 from dcmanager.orchestrator.states.base import BaseState
@@ -45,25 +43,29 @@ class DeletingLoadState(BaseState):
         if load_id:
             sysinv_client.delete_load(load_id)
 
-            counter = 0
-            while True:
-                # If event handler stop has been triggered, fail the state
-                if self.stopped():
-                    raise StrategyStoppedException()
-
-                # Get a sysinv client each time. It will automatically renew the
-                # token if it is about to expire.
-                sysinv_client = self.get_sysinv_client(strategy_step.subcloud.name)
-                if len(sysinv_client.get_loads()) == 1:
-                    msg = "Load %s deleted." % load_version
-                    self.info_log(strategy_step, msg)
-                    break
-
-                counter += 1
-                if counter >= self.max_queries:
-                    raise Exception("Timeout waiting for load delete to complete")
-                time.sleep(self.sleep_duration)
+            self.query_counter = 0
+            return self._check_load_deleted(strategy_step, load_version)
 
         # When we return from this method without throwing an exception, the
         # state machine can proceed to the next state
         return self.next_state
+
+    def _check_load_deleted(self, strategy_step, load_version):
+        # If event handler stop has been triggered, fail the state
+        if self.stopped():
+            raise StrategyStoppedException()
+
+        # Get a sysinv client each time. It will automatically renew the
+        # token if it is about to expire.
+        sysinv_client = self.get_sysinv_client(strategy_step.subcloud.name)
+        if len(sysinv_client.get_loads()) == 1:
+            msg = "Load %s deleted." % load_version
+            self.info_log(strategy_step, msg)
+            # The state machine can proceed to the next state
+            return self.next_state
+
+        self.query_counter += 1
+        if self.query_counter >= self.max_queries:
+            raise Exception("Timeout waiting for load delete to complete")
+        return self.wait(self.sleep_duration, self._check_load_deleted,
+                         strategy_step, load_version)
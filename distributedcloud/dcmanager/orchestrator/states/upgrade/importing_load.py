@@ -4,12 +4,12 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 from dccommon.exceptions import LoadMaxReached
-import time
 
 from dcmanager.common import consts
 from dcmanager.common.exceptions import StrategyStoppedException
 from dcmanager.common.exceptions import VaultLoadMissingError
 
+from dcmanager.common import scheduler
 from dcmanager.common import utils
 from dcmanager.orchestrator.states.base import BaseState
 
@@ -72,26 +72,53 @@ class ImportingLoadState(BaseState):
         # return False to allow for retry if not at limit
         return False
 
-    def _wait_for_request_to_complete(self, strategy_step, request_info):
-        counter = 0
-        request_type = request_info.get('type')
+    def _wait_for_request_to_complete(self, strategy_step, request_info,
+                                      on_complete=None, *args):
+        """Wait for a load request to complete
 
-        while True:
-            # If event handler stop has been triggered, fail the state
-            if self.stopped():
-                raise StrategyStoppedException()
+        Returns on_complete(*args) once the request has completed, or the
+        next state if there is nothing else to do. Returns a wait() until
+        the request has completed.
+        """
+        self.query_counter = 0
+        return self._check_request(strategy_step, request_info,
+                                   on_complete, *args)
 
-            # query for load operation success
-            if self.get_load(strategy_step, request_info):
-                break
+    def _check_request(self, strategy_step, request_info, on_complete, *args):
+        request_type = request_info.get('type')
 
-            counter += 1
-            self.debug_log(strategy_step,
-                           "Waiting for load %s to complete, iter=%d" % (request_type, counter))
-            if counter >= self.max_queries:
-                raise Exception("Timeout waiting for %s to complete"
-                                % request_type)
-            time.sleep(self.sleep_duration)
+        # If event handler stop has been triggered, fail the state
+        if self.stopped():
+            raise StrategyStoppedException()
+
+        # query for load operation success
+        if self.get_load(strategy_step, request_info):
+            if on_complete is None:
+                return self.next_state
+            return on_complete(*args)
+
+        self.query_counter += 1
+        self.debug_log(strategy_step,
+                       "Waiting for load %s to complete, iter=%d"
+                       % (request_type, self.query_counter))
+        if self.query_counter >= self.max_queries:
+            raise Exception("Timeout waiting for %s to complete"
+                            % request_type)
+        return self.wait(self.sleep_duration, self._check_request,
+                         strategy_step, request_info, on_complete, *args)
+
+    def _fail_import_on_error(self, strategy_step, func, *args):
+        """Call func(*args) and its continuations, failing on any error"""
+        try:
+            result = func(*args)
+        except Exception as e:
+            self.error_log(strategy_step, str(e))
+            raise Exception("Failed to import load. Please check sysinv.log on "
+                            "the subcloud for details.")
+        if isinstance(result, scheduler.Wait):
+            return self.wait(result.delay, self._fail_import_on_error,
+                             strategy_step, result.resume)
+        return result
 
     def _get_subcloud_load_info(self, strategy_step, target_version):
         load_info = {}
@@ -137,12 +164,15 @@ class ImportingLoadState(BaseState):
             self.get_sysinv_client(
                 strategy_step.subcloud.name).delete_load(load_id_to_be_deleted)
             req_info['type'] = LOAD_DELETE_REQUEST_TYPE
-            self._wait_for_request_to_complete(strategy_step, req_info)
+            return self._wait_for_request_to_complete(
+                strategy_step, req_info,
+                self._import_load, strategy_step, target_version, req_info)
+
+        return self._import_load(strategy_step, target_version, req_info)
 
+    def _import_load(self, strategy_step, target_version, req_info):
         subcloud_type = self.get_sysinv_client(
             strategy_step.subcloud.name).get_system().system_mode
-        load_import_retry_counter = 0
-        load = None
         if subcloud_type == consts.SYSTEM_MODE_SIMPLEX:
             # For simplex we only import the load record, not the entire ISO
             loads = self.get_sysinv_client(consts.DEFAULT_REGION_NAME).get_loads()
@@ -156,78 +186,79 @@ class ImportingLoadState(BaseState):
             self.info_log(strategy_step,
                           "Load: %s is now: %s" % (
                               load.software_version, load.state))
-        else:
-            while True:
-                # If event handler stop has been triggered, fail the state
-                if self.stopped():
-                    raise StrategyStoppedException()
-
-                load_import_retry_counter += 1
-                try:
-                    # ISO and SIG files are found in the vault under a version directory
-                    self.info_log(strategy_step, "Getting vault load files...")
-                    iso_path, sig_path = utils.get_vault_load_files(target_version)
-
-                    if not iso_path:
-                        message = ("Failed to get upgrade load info for subcloud %s" %
-                                   strategy_step.subcloud.name)
-                        raise Exception(message)
-
-                    # Call the API. import_load blocks until the load state is 'importing'
-                    self.info_log(strategy_step, "Sending load import request...")
-                    load = self.get_sysinv_client(
-                        strategy_step.subcloud.name).import_load(iso_path, sig_path)
-
-                    break
-                except VaultLoadMissingError:
-                    raise
-                except LoadMaxReached:
-                    # A prior import request may have encountered an exception but the request actually
-                    # continued with the import operation in the subcloud. This has been observed when performing
-                    # multiple parallel upgrade in which resource/link may be saturated. In such case allow continue
-                    # for further checks (i.e. at wait_for_request_to_complete)
-                    self.info_log(strategy_step,
-                                  "Load at max number of loads")
-                    break
-                except Exception as e:
-                    self.warn_log(strategy_step,
-                                  "load import retry required due to %s iter: %d" %
-                                  (e, load_import_retry_counter))
-                    if load_import_retry_counter >= self.max_load_import_retries:
-                        self.error_log(strategy_step, str(e))
-                        raise Exception("Failed to import load. Please check sysinv.log on "
-                                        "the subcloud for details.")
-
-                time.sleep(self.sleep_duration)
-
-            if load is None:
-                _, load_info = self._get_subcloud_load_info(strategy_step, target_version)
-                load_id = load_info.get('load_id')
-                software_version = load_info['load_version']
-            else:
-                load_id = load.id
-                software_version = load.software_version
+            # When we return from this method without throwing an
+            # exception, the state machine can proceed to the next state
+            return self.next_state
 
-            if not load_id:
-                raise Exception("The subcloud load was not found.")
+        self.load_import_retry_counter = 0
+        return self._request_load_import(strategy_step, target_version,
+                                         req_info)
 
-            if software_version != target_version:
-                raise Exception("The imported load was not the expected version.")
-            try:
-                self.info_log(strategy_step,
-                              "Load import request accepted, load software version = %s"
-                              % software_version)
-                req_info['load_id'] = load_id
-                req_info['load_version'] = target_version
-                req_info['type'] = LOAD_IMPORT_REQUEST_TYPE
-                self.info_log(strategy_step,
-                              "Waiting for state to change from importing to imported...")
-                self._wait_for_request_to_complete(strategy_step, req_info)
-            except Exception as e:
+    def _request_load_import(self, strategy_step, target_version, req_info):
+        # If event handler stop has been triggered, fail the state
+        if self.stopped():
+            raise StrategyStoppedException()
+
+        self.load_import_retry_counter += 1
+        load = None
+        try:
+            # ISO and SIG files are found in the vault under a version directory
+            self.info_log(strategy_step, "Getting vault load files...")
+            iso_path, sig_path = utils.get_vault_load_files(target_version)
+
+            if not iso_path:
+                message = ("Failed to get upgrade load info for subcloud %s" %
+                           strategy_step.subcloud.name)
+                raise Exception(message)
+
+            # Call the API. import_load blocks until the load state is 'importing'
+            self.info_log(strategy_step, "Sending load import request...")
+            load = self.get_sysinv_client(
+                strategy_step.subcloud.name).import_load(iso_path, sig_path)
+        except VaultLoadMissingError:
+            raise
+        except LoadMaxReached:
+            # A prior import request may have encountered an exception but the request actually
+            # continued with the import operation in the subcloud. This has been observed when performing
+            # multiple parallel upgrade in which resource/link may be saturated. In such case allow continue
+            # for further checks (i.e. at wait_for_request_to_complete)
+            self.info_log(strategy_step,
+                          "Load at max number of loads")
+        except Exception as e:
+            self.warn_log(strategy_step,
+                          "load import retry required due to %s iter: %d" %
+                          (e, self.load_import_retry_counter))
+            if self.load_import_retry_counter >= self.max_load_import_retries:
                 self.error_log(strategy_step, str(e))
                 raise Exception("Failed to import load. Please check sysinv.log on "
                                 "the subcloud for details.")
+            return self.wait(self.sleep_duration, self._request_load_import,
+                             strategy_step, target_version, req_info)
 
-        # When we return from this method without throwing an exception, the
+        if load is None:
+            _, load_info = self._get_subcloud_load_info(strategy_step, target_version)
+            load_id = load_info.get('load_id')
+            software_version = load_info['load_version']
+        else:
+            load_id = load.id
+            software_version = load.software_version
+
+        if not load_id:
+            raise Exception("The subcloud load was not found.")
+
+        if software_version != target_version:
+            raise Exception("The imported load was not the expected version.")
+
+        self.info_log(strategy_step,
+                      "Load import request accepted, load software version = %s"
+                      % software_version)
+        req_info['load_id'] = load_id
+        req_info['load_version'] = target_version
+        req_info['type'] = LOAD_IMPORT_REQUEST_TYPE
+        self.info_log(strategy_step,
+                      "Waiting for state to change from importing to imported...")
+        # When the import completes without throwing an exception, the
         # state machine can proceed to the next state
-        return self.next_state
+        return self._fail_import_on_error(
+            strategy_step, self._wait_for_request_to_complete,
+            strategy_step, req_info)
@@ -4,7 +4,6 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 import os
-import time
 
 from dccommon.exceptions import PlaybookExecutionFailed
 from dccommon.utils import run_playbook
@@ -58,57 +57,70 @@ class MigratingDataState(BaseState):
         self.failed_sleep_duration = DEFAULT_FAILED_SLEEP
 
     def wait_for_unlock(self, strategy_step):
-        """This method returns successfully when the unlock completes.
+        """This method waits for the unlock to complete.
 
+        It returns the next state once the unlock completes and the data
+        migration is recorded, or a wait() until then.
         An exception is raised if it does not recover on time.
         """
 
         # This code is 'borrowed' from the unlock_host state
         # Allow separate durations for failures (ie: reboot) and api retries
-        api_counter = 0
-        fail_counter = 0
+        self.api_counter = 0
+        self.fail_counter = 0
+        return self._check_unlock(strategy_step)
+
+    def _check_unlock(self, strategy_step):
         # todo(abailey): only supports AIO-SX here
         target_hostname = 'controller-0'
-        while True:
-            # If event handler stop has been triggered, fail the state
-            if self.stopped():
-                raise StrategyStoppedException()
-            try:
-                # query the administrative state to see if it is the new state.
-                host = self.get_sysinv_client(
-                    strategy_step.subcloud.name).get_host(target_hostname)
-                if (host.administrative == consts.ADMIN_UNLOCKED and
-                        host.operational == consts.OPERATIONAL_ENABLED):
-                    # Success. Break out of the loop.
-                    msg = "Host: %s is now: %s %s" % (target_hostname,
-                                                      host.administrative,
-                                                      host.operational)
-                    self.info_log(strategy_step, msg)
-                    break
-                # no exception was raised so reset fail and auth checks
-                fail_counter = 0
-            except Exception:
-                # Handle other exceptions due to being unreachable
-                # for a significant period of time when there is a
-                # controller swact, or in the case of AIO-SX,
-                # when the controller reboots.
-                fail_counter += 1
-                if fail_counter >= self.max_failed_queries:
-                    db_api.subcloud_update(
-                        self.context, strategy_step.subcloud_id,
-                        deploy_status=consts.DEPLOY_STATE_DATA_MIGRATION_FAILED)
-                    raise Exception("Timeout waiting on reboot to complete")
-                time.sleep(self.failed_sleep_duration)
-                # skip the api_counter
-                continue
-            # If the max counter is exceeeded, raise a timeout exception
-            api_counter += 1
-            if api_counter >= self.max_api_queries:
+        # If event handler stop has been triggered, fail the state
+        if self.stopped():
+            raise StrategyStoppedException()
+        try:
+            # query the administrative state to see if it is the new state.
+            host = self.get_sysinv_client(
+                strategy_step.subcloud.name).get_host(target_hostname)
+        except Exception:
+            # Handle other exceptions due to being unreachable
+            # for a significant period of time when there is a
+            # controller swact, or in the case of AIO-SX,
+            # when the controller reboots.
+            self.fail_counter += 1
+            if self.fail_counter >= self.max_failed_queries:
                 db_api.subcloud_update(
                     self.context, strategy_step.subcloud_id,
                     deploy_status=consts.DEPLOY_STATE_DATA_MIGRATION_FAILED)
-                raise Exception("Timeout waiting for unlock to complete")
-            time.sleep(self.api_sleep_duration)
+                raise Exception("Timeout waiting on reboot to complete")
+            # skip the api_counter
+            return self.wait(self.failed_sleep_duration, self._check_unlock,
+                             strategy_step)
+        if (host.administrative == consts.ADMIN_UNLOCKED and
+                host.operational == consts.OPERATIONAL_ENABLED):
+            # Success.
+            msg = "Host: %s is now: %s %s" % (target_hostname,
+                                              host.administrative,
+                                              host.operational)
+            self.info_log(strategy_step, msg)
+            return self._complete_migration(strategy_step)
+        # no exception was raised so reset fail and auth checks
+        self.fail_counter = 0
+        # If the max counter is exceeeded, raise a timeout exception
+        self.api_counter += 1
+        if self.api_counter >= self.max_api_queries:
+            db_api.subcloud_update(
+                self.context, strategy_step.subcloud_id,
+                deploy_status=consts.DEPLOY_STATE_DATA_MIGRATION_FAILED)
+            raise Exception("Timeout waiting for unlock to complete")
+        return self.wait(self.api_sleep_duration, self._check_unlock,
+                         strategy_step)
+
+    def _complete_migration(self, strategy_step):
+        db_api.subcloud_update(
+            self.context, strategy_step.subcloud_id,
+            deploy_status=consts.DEPLOY_STATE_MIGRATED)
+
+        self.info_log(strategy_step, "Data migration completed.")
+        return self.next_state
 
     def perform_state_action(self, strategy_step):
         """Migrate data for an upgrade on a subcloud
@@ -162,15 +174,7 @@ class MigratingDataState(BaseState):
             raise
 
         # Ansible invokes an unlock. Need to wait for the unlock to complete.
-        # Wait for 3 minutes for mtc/scripts to shut down services
-        # todo(abailey): split this into smaller sleeps to allow stopping early
-        time.sleep(self.ansible_sleep)
+        # Wait for 3 minutes for mtc/scripts to shut down services, then
         # wait up to 60 minutes for reboot to complete
-        self.wait_for_unlock(strategy_step)
-
-        db_api.subcloud_update(
-            self.context, strategy_step.subcloud_id,
-            deploy_status=consts.DEPLOY_STATE_MIGRATED)
-
-        self.info_log(strategy_step, "Data migration completed.")
-        return self.next_state
+        return self.wait(self.ansible_sleep, self.wait_for_unlock,
+                         strategy_step)
@@ -3,8 +3,6 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 #
-import time
-
 from dccommon.drivers.openstack.vim import ALARM_RESTRICTIONS_RELAXED
 from dcmanager.common import consts
 from dcmanager.common.exceptions import StrategyStoppedException
@@ -88,40 +86,41 @@ class StartingUpgradeState(BaseState):
                 strategy_step.subcloud.name).upgrade_start(force=force_flag)
 
         # Do not move to the next state until the upgrade state is correct
-        counter = 0
-        retry_counter = 0
-        while True:
-            # If event handler stop has been triggered, fail the state
-            if self.stopped():
-                raise StrategyStoppedException()
-            upgrade_state = self.get_upgrade_state(strategy_step)
-            if upgrade_state in UPGRADE_STARTED_STATES:
-                self.info_log(strategy_step,
-                              "Upgrade started. State=%s" % upgrade_state)
-                break
-            if upgrade_state in UPGRADE_RETRY_STATES:
-                retry_counter += 1
-                if retry_counter >= self.max_failed_retries:
-                    raise Exception("Failed to start upgrade. Please "
-                                    "check sysinv.log on the subcloud for "
-                                    "details.")
-                self.warn_log(strategy_step,
-                              "Upgrade start failed, retrying... State=%s"
-                              % upgrade_state)
-                try:
-                    self.get_sysinv_client(
-                        strategy_step.subcloud.name).upgrade_start(force=force_flag)
-                except Exception as exception:
-                    self.warn_log(strategy_step,
-                                  "Encountered exception: %s, "
-                                  "during upgrade start for subcloud %s."
-                                  % (str(exception),
-                                     strategy_step.subcloud.name))
-            counter += 1
-            if counter >= self.max_queries:
-                raise Exception("Timeout waiting for upgrade to start")
-            time.sleep(self.sleep_duration)
+        self.query_counter = 0
+        self.retry_counter = 0
+        return self._check_upgrade_started(strategy_step, force_flag)
 
-        # When we return from this method without throwing an exception, the
-        # state machine can proceed to the next state
-        return self.next_state
+    def _check_upgrade_started(self, strategy_step, force_flag):
+        # If event handler stop has been triggered, fail the state
+        if self.stopped():
+            raise StrategyStoppedException()
+        upgrade_state = self.get_upgrade_state(strategy_step)
+        if upgrade_state in UPGRADE_STARTED_STATES:
+            self.info_log(strategy_step,
+                          "Upgrade started. State=%s" % upgrade_state)
+            # When we return from this method without throwing an
+            # exception, the state machine can proceed to the next state
+            return self.next_state
+        if upgrade_state in UPGRADE_RETRY_STATES:
+            self.retry_counter += 1
+            if self.retry_counter >= self.max_failed_retries:
+                raise Exception("Failed to start upgrade. Please "
+                                "check sysinv.log on the subcloud for "
+                                "details.")
+            self.warn_log(strategy_step,
+                          "Upgrade start failed, retrying... State=%s"
+                          % upgrade_state)
+            try:
+                self.get_sysinv_client(
+                    strategy_step.subcloud.name).upgrade_start(force=force_flag)
+            except Exception as exception:
+                self.warn_log(strategy_step,
+                              "Encountered exception: %s, "
+                              "during upgrade start for subcloud %s."
+                              % (str(exception),
+                                 strategy_step.subcloud.name))
+        self.query_counter += 1
+        if self.query_counter >= self.max_queries:
+            raise Exception("Timeout waiting for upgrade to start")
+        return self.wait(self.sleep_duration, self._check_upgrade_started,
+                         strategy_step, force_flag)
@@ -4,7 +4,6 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 import os
-import time
 
 from dccommon.drivers.openstack import patching_v1
 from dcmanager.common import consts
@@ -167,37 +166,38 @@ class UpdatingPatchesState(BaseState):
         # Now that we have applied/removed/uploaded patches, we need to give
         # the patch controller on this subcloud time to determine whether
         # each host on that subcloud is patch current.
-        wait_count = 0
-        while True:
-            subcloud_hosts = self.get_patching_client(
-                region).query_hosts()
-
-            self.debug_log(strategy_step,
-                           "query_hosts for subcloud: %s" % subcloud_hosts)
-            for host in subcloud_hosts:
-                if host['interim_state']:
-                    # This host is not yet ready.
-                    self.debug_log(strategy_step,
-                                   "Host %s in subcloud in interim state" %
-                                   (host["hostname"]))
-                    break
-            else:
-                # All hosts in the subcloud are updated
-                break
-            wait_count += 1
-            if wait_count >= 6:
-                # We have waited at least 60 seconds. This is too long. We
-                # will just log it and move on without failing the step.
-                message = ("Too much time expired after applying patches to "
-                           "subcloud - continuing.")
-                self.warn_log(strategy_step, message)
-                break
+        self.wait_count = 0
+        return self._check_hosts_patch_current(strategy_step)
 
-            if self.stopped():
-                self.info_log(strategy_step, "Exiting because task is stopped")
-                raise StrategyStoppedException()
+    def _check_hosts_patch_current(self, strategy_step):
+        region = self.get_region_name(strategy_step)
+        subcloud_hosts = self.get_patching_client(
+            region).query_hosts()
+
+        self.debug_log(strategy_step,
+                       "query_hosts for subcloud: %s" % subcloud_hosts)
+        for host in subcloud_hosts:
+            if host['interim_state']:
+                # This host is not yet ready.
+                self.debug_log(strategy_step,
+                               "Host %s in subcloud in interim state" %
+                               (host["hostname"]))
+                break
+        else:
+            # All hosts in the subcloud are updated
+            return self.next_state
+        self.wait_count += 1
+        if self.wait_count >= 6:
+            # We have waited at least 60 seconds. This is too long. We
+            # will just log it and move on without failing the step.
+            message = ("Too much time expired after applying patches to "
+                       "subcloud - continuing.")
+            self.warn_log(strategy_step, message)
+            return self.next_state
 
-            # Wait 10 seconds before doing another query.
-            time.sleep(10)
+        if self.stopped():
+            self.info_log(strategy_step, "Exiting because task is stopped")
+            raise StrategyStoppedException()
 
-        return self.next_state
+        # Wait 10 seconds before doing another query.
+        return self.wait(10, self._check_hosts_patch_current, strategy_step)
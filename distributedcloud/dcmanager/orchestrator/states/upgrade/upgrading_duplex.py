@@ -3,8 +3,6 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 #
-import time
-
 from dcmanager.common import consts
 from dcmanager.common.exceptions import StrategyStoppedException
 from dcmanager.orchestrator.states.base import BaseState
@@ -50,41 +48,46 @@ class UpgradingDuplexState(BaseState):
         # this action is asynchronous, query until it completes or times out
 
         # Allow separate durations for failures (ie: reboot) and api retries
-        fail_counter = 0
-        api_counter = 0
-
-        while True:
-            # If event handler stop has been triggered, fail the state
-            if self.stopped():
-                raise StrategyStoppedException()
-            try:
-                upgrades = self.get_sysinv_client(region).get_upgrades()
-
-                if len(upgrades) != 0:
-                    if (upgrades[0].state == consts.UPGRADE_STATE_DATA_MIGRATION_FAILED or
-                            upgrades[0].state == consts.UPGRADE_STATE_DATA_MIGRATION_COMPLETE):
-                        msg = "Upgrade state is %s now" % (upgrades[0].state)
-                        self.info_log(strategy_step, msg)
-                        break
-                fail_counter = 0
-            except Exception:
-                # Handle other exceptions due to being unreachable
-                # for a significant period of time when there is a
-                # controller swact
-                fail_counter += 1
-                if fail_counter >= self.max_failed_queries:
-                    raise Exception("Timeout waiting for reboot to complete")
-                time.sleep(self.failed_sleep_duration)
-                # skip the api_counter
-                continue
-            api_counter += 1
-            if api_counter >= self.max_queries:
-                raise Exception("Timeout waiting for update state to be updated to "
-                                "updated to 'data-migration-failed' or 'data-migration-complete'."
-                                "Please check sysinv.log on the subcloud "
-                                "for details.")
-            time.sleep(self.sleep_duration)
+        self.fail_counter = 0
+        self.api_counter = 0
+        return self._check_host_upgraded(strategy_step)
 
+    def _check_host_upgraded(self, strategy_step):
+        region = self.get_region_name(strategy_step)
+        # If event handler stop has been triggered, fail the state
+        if self.stopped():
+            raise StrategyStoppedException()
+        try:
+            upgrades = self.get_sysinv_client(region).get_upgrades()
+
+            if len(upgrades) != 0:
+                if (upgrades[0].state == consts.UPGRADE_STATE_DATA_MIGRATION_FAILED or
+                        upgrades[0].state == consts.UPGRADE_STATE_DATA_MIGRATION_COMPLETE):
+                    msg = "Upgrade state is %s now" % (upgrades[0].state)
+                    self.info_log(strategy_step, msg)
+                    return self._check_data_migration(strategy_step)
+            self.fail_counter = 0
+        except Exception:
+            # Handle other exceptions due to being unreachable
+            # for a significant period of time when there is a
+            # controller swact
+            self.fail_counter += 1
+            if self.fail_counter >= self.max_failed_queries:
+                raise Exception("Timeout waiting for reboot to complete")
+            # skip the api_counter
+            return self.wait(self.failed_sleep_duration,
+                             self._check_host_upgraded, strategy_step)
+        self.api_counter += 1
+        if self.api_counter >= self.max_queries:
+            raise Exception("Timeout waiting for update state to be updated to "
+                            "updated to 'data-migration-failed' or 'data-migration-complete'."
+                            "Please check sysinv.log on the subcloud "
+                            "for details.")
+        return self.wait(self.sleep_duration, self._check_host_upgraded,
+                         strategy_step)
+
+    def _check_data_migration(self, strategy_step):
+        region = self.get_region_name(strategy_step)
         # If the upgrade state is 'data-migration-complete' we move to the
         # next state, else if it is 'data-migration-failed' we go to the failed
         # state.
@@ -39,6 +39,18 @@ from dcorch.common import consts as dcorch_consts
 
 LOG = logging.getLogger(__name__)
 
+# The endpoint whose sync status decides which subclouds a strategy updates
+STRATEGY_ENDPOINT_TYPES = {
+    consts.SW_UPDATE_TYPE_PATCH: dcorch_consts.ENDPOINT_TYPE_PATCHING,
+    consts.SW_UPDATE_TYPE_UPGRADE: dcorch_consts.ENDPOINT_TYPE_LOAD,
+    consts.SW_UPDATE_TYPE_FIRMWARE: dcorch_consts.ENDPOINT_TYPE_FIRMWARE,
+    consts.SW_UPDATE_TYPE_KUBERNETES: dcorch_consts.ENDPOINT_TYPE_KUBERNETES,
+    consts.SW_UPDATE_TYPE_KUBE_ROOTCA_UPDATE:
+        dcorch_consts.ENDPOINT_TYPE_KUBE_ROOTCA,
+    # For prestage we reuse the ENDPOINT_TYPE_LOAD.
+    consts.SW_UPDATE_TYPE_PRESTAGE: dcorch_consts.ENDPOINT_TYPE_LOAD,
+}
+
 
 class SwUpdateManager(manager.Manager):
     """Manages tasks related to software updates."""
@@ -416,16 +428,17 @@ class SwUpdateManager(manager.Manager):
         # Don't create a strategy if any of the subclouds is online and the
         # relevant sync status is unknown. Offline subcloud is skipped unless
         # --force option is specified and strategy type is upgrade.
-        if single_group:
-            subclouds = []
-            for sb in db_api.subcloud_get_for_group(context, single_group.id):
-                statuses = db_api.subcloud_status_get_all(context, sb.id)
-                for status in statuses:
-                    subclouds.append((sb, status))
-        else:
-            subclouds = db_api.subcloud_get_all_with_status(context)
-
-        subclouds_processed = list()
+        # The subclouds are fetched once, each with the sync status of the
+        # endpoint this strategy type keys off. Subclouds without that
+        # status are never part of the strategy.
+        subclouds = [
+            (subcloud, subcloud_status) for subcloud, subcloud_status in
+            db_api.subcloud_get_all_with_endpoint_status(
+                context, STRATEGY_ENDPOINT_TYPES.get(strategy_type),
+                group_id=single_group.id if single_group else None)
+            if subcloud_status is not None]
+
+        subclouds_processed = set()
         for subcloud, subcloud_status in subclouds:
             if (cloud_name and subcloud.name != cloud_name or
                     subcloud.management_state != consts.MANAGEMENT_MANAGED):
@@ -497,13 +510,12 @@ class SwUpdateManager(manager.Manager):
                         LOG.warn("Excluding subcloud from prestage strategy: %s",
                                  subcloud.name)
                         continue
-            subclouds_processed.append(subcloud.name)
+            subclouds_processed.add(subcloud.name)
 
         # handle extra_args processing such as staging to the vault
         self._process_extra_args_creation(strategy_type, extra_args)
 
         current_stage_counter = 0
-        strategy_step_created = False
         # Create the strategy
         strategy = db_api.sw_update_strategy_create(
             context,
@@ -517,15 +529,15 @@ class SwUpdateManager(manager.Manager):
         # For 'patch', always create a strategy step for the system controller
         # A strategy step for the system controller is not added for:
         # 'upgrade', 'firmware', 'kube upgrade', 'kube rootca update'
+        steps = []
         if strategy_type == consts.SW_UPDATE_TYPE_PATCH:
             current_stage_counter += 1
-            db_api.strategy_step_create(
-                context,
-                None,  # None means not a subcloud. ie: SystemController
-                stage=current_stage_counter,
-                state=consts.STRATEGY_STATE_INITIAL,
-                details='')
-            strategy_step_created = True
+            steps.append({
+                # None means not a subcloud. ie: SystemController
+                'subcloud_id': None,
+                'stage': current_stage_counter,
+                'state': consts.STRATEGY_STATE_INITIAL,
+                'details': ''})
 
         # Create a strategy step for each subcloud that is managed, online and
         # out of sync
@@ -541,14 +553,19 @@ class SwUpdateManager(manager.Manager):
             # Fetch all subcloud groups
             groups = db_api.subcloud_group_get_all(context)
 
+        # Group the subclouds fetched above, keeping their order
+        subclouds_by_group = dict()
+        for subcloud, subcloud_status in subclouds:
+            subclouds_by_group.setdefault(subcloud.group_id, []).append(
+                (subcloud, subcloud_status))
+
         for group in groups:
-            # Fetch subcloud list for each group
-            subclouds_list = db_api.subcloud_get_for_group(context, group.id)
+            subclouds_list = subclouds_by_group.get(group.id, [])
             if use_group_max_parallel:
                 max_parallel_subclouds = group.max_parallel_subclouds
             if use_group_apply_type:
                 subcloud_apply_type = group.update_apply_type
-            for subcloud in subclouds_list:
+            for subcloud, status in subclouds_list:
                 stage_updated = False
                 if (cloud_name and subcloud.name != cloud_name or
                         subcloud.management_state != consts.MANAGEMENT_MANAGED):
@@ -562,37 +579,32 @@ class SwUpdateManager(manager.Manager):
                     else:
                         continue
 
-                subcloud_status = db_api.subcloud_status_get_all(context,
-                                                                 subcloud.id)
-                for status in subcloud_status:
-                    if self._validate_subcloud_status_sync(strategy_type,
-                                                           status,
-                                                           force,
-                                                           subcloud.availability_status):
-                        LOG.debug("Creating strategy_step for endpoint_type: %s, "
-                                  "sync_status: %s, subcloud: %s, id: %s",
-                                  status.endpoint_type, status.sync_status,
-                                  subcloud.name, subcloud.id)
-                        db_api.strategy_step_create(
-                            context,
-                            subcloud.id,
-                            stage=current_stage_counter,
-                            state=consts.STRATEGY_STATE_INITIAL,
-                            details='')
-                        strategy_step_created = True
-
-                        # We have added a subcloud to this stage
-                        stage_size += 1
-                        if consts.SUBCLOUD_APPLY_TYPE_SERIAL in subcloud_apply_type:
-                            # For serial apply type always move to next stage
-                            stage_updated = True
-                            current_stage_counter += 1
-                        elif stage_size >= max_parallel_subclouds:
-                            # For parallel apply type, move to next stage if we have
-                            # reached the maximum subclouds for this stage
-                            stage_updated = True
-                            current_stage_counter += 1
-                            stage_size = 0
+                if self._validate_subcloud_status_sync(strategy_type,
+                                                       status,
+                                                       force,
+                                                       subcloud.availability_status):
+                    LOG.debug("Creating strategy_step for endpoint_type: %s, "
+                              "sync_status: %s, subcloud: %s, id: %s",
+                              status.endpoint_type, status.sync_status,
+                              subcloud.name, subcloud.id)
+                    steps.append({
+                        'subcloud_id': subcloud.id,
+                        'stage': current_stage_counter,
+                        'state': consts.STRATEGY_STATE_INITIAL,
+                        'details': ''})
+
+                    # We have added a subcloud to this stage
+                    stage_size += 1
+                    if consts.SUBCLOUD_APPLY_TYPE_SERIAL in subcloud_apply_type:
+                        # For serial apply type always move to next stage
+                        stage_updated = True
+                        current_stage_counter += 1
+                    elif stage_size >= max_parallel_subclouds:
+                        # For parallel apply type, move to next stage if we have
+                        # reached the maximum subclouds for this stage
+                        stage_updated = True
+                        current_stage_counter += 1
+                        stage_size = 0
 
             # Reset the stage_size before iterating through a new subcloud group
             stage_size = 0
@@ -604,7 +616,9 @@ class SwUpdateManager(manager.Manager):
             if not stage_updated:
                 current_stage_counter += 1
 
-        if strategy_step_created:
+        if steps:
+            # All the steps are inserted at once
+            db_api.strategy_step_bulk_create(context, steps)
             strategy_dict = db_api.sw_update_strategy_db_model_to_dict(
                 strategy)
             return strategy_dict
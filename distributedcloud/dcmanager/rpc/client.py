@@ -16,6 +16,8 @@
 Client side of the DC Manager RPC API.
 """
 
+import collections
+
 from oslo_log import log as logging
 
 from dcmanager.common import consts
@@ -105,6 +107,56 @@ class SubcloudStateClient(RPCClient):
                                              sync_status=sync_status,
                                              ignore_endpoints=ignore_endpoints))
 
+    def bulk_update_subcloud_endpoint_status(self, ctxt, endpoint_updates):
+        # Note: This is an asynchronous operation.
+        # endpoint_updates is a list of
+        # (subcloud_name, endpoint_type, sync_status)
+        return self.cast(ctxt, self.make_msg(
+            'bulk_update_subcloud_endpoint_status',
+            endpoint_updates=endpoint_updates))
+
+
+class SubcloudEndpointStatusBatch(object):
+    """Buffer of subcloud endpoint sync status updates.
+
+    Exposes the update_subcloud_endpoint_status method of the
+    SubcloudStateClient so it can be handed to the audits in its place.
+    Single endpoint updates are buffered per subcloud, the last status
+    reported for a given subcloud endpoint winning, and the updates of a
+    subcloud are sent to dcmanager-state in a single bulk request on
+    flush().
+    """
+
+    def __init__(self, state_rpc_client):
+        self.state_rpc_client = state_rpc_client
+        self._endpoint_updates = dict()
+
+    def update_subcloud_endpoint_status(self, ctxt, subcloud_name=None,
+                                        endpoint_type=None,
+                                        sync_status=consts.
+                                        SYNC_STATUS_OUT_OF_SYNC,
+                                        ignore_endpoints=None):
+        if subcloud_name is None or endpoint_type is None:
+            # Fleet or subcloud wide updates are not batched
+            return self.state_rpc_client.update_subcloud_endpoint_status(
+                ctxt, subcloud_name=subcloud_name,
+                endpoint_type=endpoint_type, sync_status=sync_status,
+                ignore_endpoints=ignore_endpoints)
+        self._endpoint_updates.setdefault(
+            subcloud_name, collections.OrderedDict())[endpoint_type] = \
+            sync_status
+
+    def flush(self, ctxt, subcloud_name):
+        """Send the buffered updates of a subcloud"""
+        subcloud_updates = self._endpoint_updates.pop(subcloud_name, None)
+        if not subcloud_updates:
+            return
+        endpoint_updates = [
+            (subcloud_name, endpoint_type, sync_status)
+            for endpoint_type, sync_status in subcloud_updates.items()]
+        self.state_rpc_client.bulk_update_subcloud_endpoint_status(
+            ctxt, endpoint_updates)
+
 
 class ManagerClient(RPCClient):
     """Client side of the DC Manager rpc API.
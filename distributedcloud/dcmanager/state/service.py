@@ -129,26 +129,44 @@ class DCManagerStateService(service.Service):
                                             alarmable,
                                             ignore_endpoints)
 
+        if sync_status == consts.SYNC_STATUS_UNKNOWN:
+            self._trigger_endpoint_audit(context, endpoint_type)
+
+        return
+
+    @request_context
+    def bulk_update_subcloud_endpoint_status(self, context, endpoint_updates):
+        # Updates the sync status of many subcloud endpoints
+        LOG.info("Handling bulk_update_subcloud_endpoint_status request for "
+                 "%d endpoints" % len(endpoint_updates))
+
+        self.subcloud_state_manager. \
+            bulk_update_subcloud_endpoint_status(context, endpoint_updates)
+
+        # Trigger each audit once, whatever the number of subclouds
+        # reporting an unknown sync status for its endpoint
+        unknown_endpoint_types = set(
+            endpoint_type for _name, endpoint_type, sync_status
+            in endpoint_updates if sync_status == consts.SYNC_STATUS_UNKNOWN)
+        for endpoint_type in unknown_endpoint_types:
+            self._trigger_endpoint_audit(context, endpoint_type)
+
+    def _trigger_endpoint_audit(self, context, endpoint_type):
         # If the patching sync status is being set to unknown, trigger the
         # patching audit so it can update the sync status ASAP.
-        if endpoint_type == dcorch_consts.ENDPOINT_TYPE_PATCHING and \
-                sync_status == consts.SYNC_STATUS_UNKNOWN:
+        if endpoint_type == dcorch_consts.ENDPOINT_TYPE_PATCHING:
             self.audit_rpc_client.trigger_patch_audit(context)
 
         # If the firmware sync status is being set to unknown, trigger the
         # firmware audit so it can update the sync status ASAP.
-        if endpoint_type == dcorch_consts.ENDPOINT_TYPE_FIRMWARE and \
-                sync_status == consts.SYNC_STATUS_UNKNOWN:
+        elif endpoint_type == dcorch_consts.ENDPOINT_TYPE_FIRMWARE:
             self.audit_rpc_client.trigger_firmware_audit(context)
 
         # If the kubernetes sync status is being set to unknown, trigger the
         # kubernetes audit so it can update the sync status ASAP.
-        if endpoint_type == dcorch_consts.ENDPOINT_TYPE_KUBERNETES and \
-                sync_status == consts.SYNC_STATUS_UNKNOWN:
+        elif endpoint_type == dcorch_consts.ENDPOINT_TYPE_KUBERNETES:
             self.audit_rpc_client.trigger_kubernetes_audit(context)
 
-        return
-
     @request_context
     def update_subcloud_availability(self, context,
                                      subcloud_name,
@@ -17,6 +17,8 @@
 # of an applicable Wind River license agreement.
 #
 
+import collections
+
 from oslo_log import log as logging
 
 from dcorch.common import consts as dcorch_consts
@@ -68,6 +70,28 @@ class SubcloudStateManager(manager.Manager):
         self.fm_api = fm_api.FaultAPIs()
         self.audit_rpc_client = dcmanager_audit_rpc_client.ManagerAuditClient()
 
+    @staticmethod
+    def _should_update_sync_status(subcloud, endpoint_type, sync_status):
+        # Rules for updating sync status:
+        #
+        # Always update if not in-sync.
+        #
+        # Otherwise, only update the sync status if managed and online
+        # (unless dc-cert).
+        #
+        # Most endpoints are audited only when the subcloud is managed and
+        # online. An exception is the dc-cert endpoint, which is audited
+        # whenever the subcloud is online (managed or unmanaged).
+        #
+        # This means if a subcloud is going offline or unmanaged, then
+        # the sync status update must be done first.
+        #
+        return (sync_status != consts.SYNC_STATUS_IN_SYNC or
+                ((subcloud.availability_status ==
+                  consts.AVAILABILITY_ONLINE) and
+                 (subcloud.management_state == consts.MANAGEMENT_MANAGED
+                  or endpoint_type == dcorch_consts.ENDPOINT_TYPE_DC_CERT)))
+
     def _do_update_subcloud_endpoint_status(self, context, subcloud_id,
                                             endpoint_type, sync_status,
                                             alarmable, ignore_endpoints=None):
@@ -290,24 +314,8 @@ class SubcloudStateManager(manager.Manager):
             LOG.exception(e)
             raise e
 
-        # Rules for updating sync status:
-        #
-        # Always update if not in-sync.
-        #
-        # Otherwise, only update the sync status if managed and online
-        # (unless dc-cert).
-        #
-        # Most endpoints are audited only when the subcloud is managed and
-        # online. An exception is the dc-cert endpoint, which is audited
-        # whenever the subcloud is online (managed or unmanaged).
-        #
-        # This means if a subcloud is going offline or unmanaged, then
-        # the sync status update must be done first.
-        #
-        if (sync_status != consts.SYNC_STATUS_IN_SYNC or
-            ((subcloud.availability_status == consts.AVAILABILITY_ONLINE) and
-             (subcloud.management_state == consts.MANAGEMENT_MANAGED
-              or endpoint_type == dcorch_consts.ENDPOINT_TYPE_DC_CERT))):
+        if self._should_update_sync_status(subcloud, endpoint_type,
+                                           sync_status):
             # update a single subcloud
             try:
                 self._do_update_subcloud_endpoint_status(context,
@@ -357,6 +365,120 @@ class SubcloudStateManager(manager.Manager):
                     context, subcloud.name, endpoint_type, sync_status,
                     alarmable, ignore_endpoints)
 
+    def bulk_update_subcloud_endpoint_status(self, context,
+                                             endpoint_updates,
+                                             alarmable=True):
+        """Update the sync status of many subcloud endpoints
+
+        The statuses of each subcloud are written in a single transaction,
+        under the per-subcloud lock, and alarms are only raised or cleared
+        for the endpoints whose sync status actually changed.
+
+        :param context: request context object
+        :param endpoint_updates: list of (subcloud_name, endpoint_type,
+               sync_status) entries
+        :param alarmable: controls raising an alarm if applicable
+        """
+
+        subcloud_updates = collections.OrderedDict()
+        for subcloud_name, endpoint_type, sync_status in endpoint_updates:
+            subcloud_updates.setdefault(subcloud_name, []).append(
+                (endpoint_type, sync_status))
+
+        for subcloud_name, updates in subcloud_updates.items():
+            try:
+                self._bulk_update_subcloud_endpoint_status(
+                    context, subcloud_name, updates, alarmable)
+            except Exception as e:
+                LOG.exception(e)
+
+    @sync_update_subcloud_endpoint_status
+    def _bulk_update_subcloud_endpoint_status(self, context, subcloud_name,
+                                              updates, alarmable):
+        """Update the sync status of the endpoints of a subcloud
+
+        The subcloud is read under the lock, so its availability and
+        management state cannot change before the statuses are written.
+
+        :param context: request context object
+        :param subcloud_name: name of subcloud to update
+        :param updates: list of (endpoint_type, sync_status) entries
+        :param alarmable: controls raising an alarm if applicable
+        """
+
+        try:
+            subcloud = db_api.subcloud_get_by_name(context, subcloud_name)
+        except exceptions.SubcloudNameNotFound:
+            LOG.error("Subcloud not found:%s" % subcloud_name)
+            return
+
+        status_updates = []
+        for endpoint_type, sync_status in updates:
+            if not self._should_update_sync_status(subcloud, endpoint_type,
+                                                   sync_status):
+                LOG.info("Ignoring subcloud sync_status update for "
+                         "subcloud:%s availability:%s management:%s "
+                         "endpoint:%s sync:%s" %
+                         (subcloud_name, subcloud.availability_status,
+                          subcloud.management_state, endpoint_type,
+                          sync_status))
+                continue
+            status_updates.append((subcloud.id, endpoint_type, sync_status))
+
+        transitions = db_api.subcloud_status_bulk_update(context,
+                                                         status_updates)
+
+        for subcloud_id, endpoint_type, original_status, sync_status in \
+                transitions:
+            LOG.info("Updated subcloud:%s endpoint:%s sync:%s" %
+                     (subcloud_name, endpoint_type, sync_status))
+
+            # Trigger subcloud patch and load audits for the subcloud after
+            # its identity endpoint turns to other status from unknown
+            if endpoint_type == dcorch_consts.ENDPOINT_TYPE_IDENTITY \
+                and sync_status != consts.SYNC_STATUS_UNKNOWN \
+                and original_status == consts.SYNC_STATUS_UNKNOWN:
+                LOG.debug('Request for patch and load audit for %s after '
+                          'updating identity out of unknown' % subcloud_name)
+                self.audit_rpc_client.trigger_subcloud_patch_load_audits(
+                    context, subcloud_id)
+
+            self._update_endpoint_sync_alarm(subcloud_name, endpoint_type,
+                                             sync_status, alarmable)
+
+    def _update_endpoint_sync_alarm(self, subcloud_name, endpoint_type,
+                                    sync_status, alarmable):
+        """Raise or clear the out-of-sync alarm after a status transition
+
+        Raising an alarm which is already raised or clearing one which
+        does not exist are both harmless, so no get_fault is needed.
+        """
+        entity_instance_id = "subcloud=%s.resource=%s" % \
+                             (subcloud_name, endpoint_type)
+        try:
+            if sync_status != consts.SYNC_STATUS_OUT_OF_SYNC:
+                self.fm_api.clear_fault(
+                    fm_const.FM_ALARM_ID_DC_SUBCLOUD_RESOURCE_OUT_OF_SYNC,
+                    entity_instance_id)
+            elif alarmable:
+                fault = fm_api.Fault(
+                    alarm_id=fm_const.FM_ALARM_ID_DC_SUBCLOUD_RESOURCE_OUT_OF_SYNC,  # noqa
+                    alarm_state=fm_const.FM_ALARM_STATE_SET,
+                    entity_type_id=fm_const.FM_ENTITY_TYPE_SUBCLOUD,
+                    entity_instance_id=entity_instance_id,
+                    severity=fm_const.FM_ALARM_SEVERITY_MAJOR,
+                    reason_text=("%s %s sync_status is out-of-sync" %
+                                 (subcloud_name, endpoint_type)),
+                    alarm_type=fm_const.FM_ALARM_TYPE_0,
+                    probable_cause=fm_const.ALARM_PROBABLE_CAUSE_2,
+                    proposed_repair_action="If problem persists "
+                                           "contact next level "
+                                           "of support",
+                    service_affecting=False)
+                self.fm_api.set_fault(fault)
+        except Exception as e:
+            LOG.exception(e)
+
     def _update_subcloud_state(self, context, subcloud_name,
                                management_state, availability_status):
         try:
@@ -933,6 +933,109 @@ class TestSubcloudAPIOther(testroot.DCManagerApiTest):
         response = self.app.get(get_url, headers=FAKE_HEADERS)
         self.assertEqual(response.json['subclouds'][0]['name'], subcloud.name)
 
+    def create_subclouds_with_status(self):
+        subcloud1 = fake_subcloud.create_fake_subcloud(self.ctx)
+        db_api.subcloud_update(self.ctx, subcloud1.id,
+                               availability_status=consts.AVAILABILITY_ONLINE)
+        for endpoint_type in ('patching', 'load'):
+            db_api.subcloud_status_create(self.ctx, subcloud1.id,
+                                          endpoint_type)
+            db_api.subcloud_status_update(self.ctx, subcloud1.id,
+                                          endpoint_type,
+                                          consts.SYNC_STATUS_IN_SYNC)
+        subcloud2 = fake_subcloud.create_fake_subcloud(
+            self.ctx, name='subcloud2',
+            management_start_ip="192.168.101.60",
+            management_end_ip="192.168.101.70")
+        for endpoint_type in ('patching', 'load'):
+            db_api.subcloud_status_create(self.ctx, subcloud2.id,
+                                          endpoint_type)
+        db_api.subcloud_status_update(self.ctx, subcloud2.id, 'load',
+                                      consts.SYNC_STATUS_IN_SYNC)
+        subcloud3 = fake_subcloud.create_fake_subcloud(
+            self.ctx, name='subcloud3',
+            management_start_ip="192.168.101.80",
+            management_end_ip="192.168.101.90")
+        return subcloud1, subcloud2, subcloud3
+
+    @mock.patch.object(rpc_client, 'ManagerClient')
+    def test_get_subcloud_all_sync_status(self, mock_rpc_client):
+        subcloud1, subcloud2, subcloud3 = self.create_subclouds_with_status()
+        response = self.app.get(FAKE_URL, headers=FAKE_HEADERS)
+
+        subclouds = response.json['subclouds']
+        self.assertEqual([subcloud1.id, subcloud2.id, subcloud3.id],
+                         [s['id'] for s in subclouds])
+        self.assertEqual([consts.SYNC_STATUS_IN_SYNC,
+                          consts.SYNC_STATUS_OUT_OF_SYNC,
+                          consts.SYNC_STATUS_UNKNOWN],
+                         [s[consts.SYNC_STATUS] for s in subclouds])
+        self.assertEqual(
+            [{'endpoint_type': 'patching',
+              'sync_status': consts.SYNC_STATUS_UNKNOWN},
+             {'endpoint_type': 'load',
+              'sync_status': consts.SYNC_STATUS_IN_SYNC}],
+            subclouds[1][consts.ENDPOINT_SYNC_STATUS])
+        self.assertEqual([], subclouds[2][consts.ENDPOINT_SYNC_STATUS])
+        self.assertEqual('data from install', subclouds[0]['data_install'])
+
+    @mock.patch.object(rpc_client, 'ManagerClient')
+    def test_get_subcloud_all_paginated(self, mock_rpc_client):
+        subcloud1, subcloud2, subcloud3 = self.create_subclouds_with_status()
+        response = self.app.get(FAKE_URL + '?limit=2', headers=FAKE_HEADERS)
+        self.assertEqual([subcloud1.name, subcloud2.name],
+                         [s['name'] for s in response.json['subclouds']])
+
+        response = self.app.get(FAKE_URL + '?limit=2&marker=%d' %
+                                subcloud2.id, headers=FAKE_HEADERS)
+        self.assertEqual([subcloud3.name],
+                         [s['name'] for s in response.json['subclouds']])
+
+    @mock.patch.object(rpc_client, 'ManagerClient')
+    def test_get_subcloud_all_bad_pagination(self, mock_rpc_client):
+        for query in ('limit=0', 'limit=-1', 'marker=subcloud1'):
+            six.assertRaisesRegex(self, webtest.app.AppError, "400 *",
+                                  self.app.get, FAKE_URL + '?' + query,
+                                  headers=FAKE_HEADERS)
+
+    @mock.patch.object(rpc_client, 'ManagerClient')
+    def test_get_subcloud_all_filtered(self, mock_rpc_client):
+        subcloud1, subcloud2, subcloud3 = self.create_subclouds_with_status()
+        for query, expected in (
+                ('availability=online', [subcloud1]),
+                ('sync_status=out-of-sync', [subcloud2]),
+                ('sync_status=unknown&availability=offline', [subcloud3]),
+                ('management=managed', []),
+                ('deploy_status=%s' % consts.DEPLOY_STATE_DONE,
+                 [subcloud1, subcloud2, subcloud3]),
+                ('group=Default', [subcloud1, subcloud2, subcloud3]),
+                ('group=1&limit=1', [subcloud1])):
+            response = self.app.get(FAKE_URL + '?' + query,
+                                    headers=FAKE_HEADERS)
+            self.assertEqual([s.name for s in expected],
+                             [s['name'] for s in response.json['subclouds']])
+
+    @mock.patch.object(rpc_client, 'ManagerClient')
+    def test_get_subcloud_all_bad_filter(self, mock_rpc_client):
+        for query in ('availability=bad', 'sync_status=bad', 'group=bad'):
+            six.assertRaisesRegex(self, webtest.app.AppError, "400 *",
+                                  self.app.get, FAKE_URL + '?' + query,
+                                  headers=FAKE_HEADERS)
+
+    @mock.patch.object(rpc_client, 'ManagerClient')
+    def test_get_subcloud_all_compact(self, mock_rpc_client):
+        self.create_subclouds_with_status()
+        response = self.app.get(FAKE_URL + '?compact=true',
+                                headers=FAKE_HEADERS)
+
+        subclouds = response.json['subclouds']
+        self.assertEqual(3, len(subclouds))
+        self.assertEqual(consts.SYNC_STATUS_IN_SYNC,
+                         subclouds[0][consts.SYNC_STATUS])
+        for subcloud in subclouds:
+            self.assertNotIn(consts.ENDPOINT_SYNC_STATUS, subcloud)
+            self.assertNotIn('data_install', subcloud)
+
     @mock.patch.object(rpc_client, 'ManagerClient')
     @mock.patch.object(subclouds.SubcloudsController, '_get_patch_data')
     def test_patch_subcloud(self, mock_get_patch_data,
@@ -62,7 +62,8 @@ class DeviceImage(object):
                  key_signature,
                  revoke_key_id, applied,
                  pci_vendor, pci_device,
-                 applied_labels):
+                 applied_labels, uuid=None):
+        self.uuid = uuid
         self.bitstream_type = bitstream_type
         self.bitstream_id = bitstream_id
         self.bmc = bmc
@@ -100,6 +101,8 @@ class DeviceLabels(object):
 HOST1 = Host('04ae0e01-13b6-4105',
              'controller-0')
 
+DEVICE_IMAGE_UUID = '04ae0e01-13b6-4105'
+
 # Device not enabled
 PCI_DEVICE1 = PCIDevice('06789e01-13b6-2345',
                         'pci_0000_00_01_0',
@@ -142,7 +145,8 @@ DEVICE_IMAGE1 = DeviceImage('functional',
                             True,
                             '1111',
                             '2222',
-                            [{}])
+                            [{}],
+                            DEVICE_IMAGE_UUID)
 
 # Device image has not been applied
 DEVICE_IMAGE2 = DeviceImage('functional',
@@ -166,7 +170,8 @@ DEVICE_IMAGE3 = DeviceImage('functional',
                             True,
                             '1111',
                             '2222',
-                            [{"key1": "value1"}])
+                            [{"key1": "value1"}],
+                            DEVICE_IMAGE_UUID)
 
 DEVICE_LABEL1 = DeviceLabels('06789e01-13b6-2347',
                              'key1',
@@ -174,13 +179,13 @@ DEVICE_LABEL1 = DeviceLabels('06789e01-13b6-2347',
 
 # Device image state where image is written to device
 DEVICE_IMAGE_STATE1 = DeviceImageState(PCI_DEVICE4.uuid,
-                                       '04ae0e01-13b6-4105',
+                                       DEVICE_IMAGE_UUID,
                                        'completed')
 
 # Device image state where image is applied but not written
 # to the device
 DEVICE_IMAGE_STATE2 = DeviceImageState(PCI_DEVICE4.uuid,
-                                       '04ae0e01-13b6-4105',
+                                       DEVICE_IMAGE_UUID,
                                        'pending')
 
 
@@ -398,6 +403,25 @@ class FakeSysinvClientNoMatchingDeviceId(object):
         return self.device_labels
 
 
+class FakeSysinvClientManyDevices(FakeSysinvClientImageWithLabels):
+    def __init__(self, region, session, endpoint):
+        super(FakeSysinvClientManyDevices, self).__init__(region, session,
+                                                          endpoint)
+        self.pci_devices = []
+        self.device_image_states = []
+        self.device_labels = []
+        for index in range(10):
+            device_uuid = 'device-%d' % index
+            self.pci_devices.append(
+                PCIDevice(device_uuid, 'pci_%d' % index, '0000:00:%d.0' % index,
+                          '1111', '2222', True))
+            self.device_image_states.append(
+                DeviceImageState(device_uuid, DEVICE_IMAGE_UUID, 'completed'))
+            self.device_labels.append(
+                DeviceLabels(device_uuid, 'key1', 'value1'))
+        self.get_device_image = mock.MagicMock()
+
+
 class TestFirmwareAudit(base.DCManagerTestCase):
     def setUp(self):
         super(TestFirmwareAudit, self).setUp()
@@ -689,3 +713,101 @@ class TestFirmwareAudit(base.DCManagerTestCase):
                           sync_status=consts.SYNC_STATUS_IN_SYNC)]
             self.fake_dcmanager_state_api.update_subcloud_endpoint_status. \
                 assert_has_calls(expected_calls)
+
+    @mock.patch.object(patch_audit, 'SysinvClient')
+    @mock.patch.object(patch_audit, 'PatchingClient')
+    @mock.patch.object(patch_audit, 'OpenStackDriver')
+    @mock.patch.object(firmware_audit, 'SysinvClient')
+    @mock.patch.object(firmware_audit, 'OpenStackDriver')
+    @mock.patch.object(subcloud_audit_manager, 'context')
+    def test_device_images_retrieved_once(self, mock_context,
+                                          mock_fw_openstack_driver,
+                                          mock_fw_sysinv_client,
+                                          mock_openstack_driver,
+                                          mock_patching_client,
+                                          mock_sysinv_client):
+        mock_context.get_admin_context.return_value = self.ctxt
+        sysinv_clients = []
+
+        def create_sysinv_client(*args, **kwargs):
+            sysinv_client = FakeSysinvClientManyDevices(*args, **kwargs)
+            sysinv_clients.append(sysinv_client)
+            return sysinv_client
+        mock_fw_sysinv_client.side_effect = create_sysinv_client
+
+        fm = firmware_audit.FirmwareAudit(self.ctxt,
+                                          self.fake_dcmanager_state_api)
+        am = subcloud_audit_manager.SubcloudAuditManager()
+        am.firmware_audit = fm
+        firmware_audit_data = self.get_fw_audit_data(am)
+
+        fm.subcloud_firmware_audit('subcloud1', firmware_audit_data)
+
+        self.fake_dcmanager_state_api.update_subcloud_endpoint_status. \
+            assert_called_once_with(
+                mock.ANY,
+                subcloud_name='subcloud1',
+                endpoint_type=dcorch_consts.ENDPOINT_TYPE_FIRMWARE,
+                sync_status=consts.SYNC_STATUS_IN_SYNC)
+        # The subcloud images are listed, never fetched one by one
+        sysinv_clients[-1].get_device_image.assert_not_called()
+
+    @mock.patch.object(patch_audit, 'SysinvClient')
+    @mock.patch.object(patch_audit, 'PatchingClient')
+    @mock.patch.object(patch_audit, 'OpenStackDriver')
+    @mock.patch.object(firmware_audit, 'SysinvClient')
+    @mock.patch.object(firmware_audit, 'OpenStackDriver')
+    @mock.patch.object(subcloud_audit_manager, 'context')
+    def test_unchanged_subcloud_not_compared_again(self, mock_context,
+                                                   mock_fw_openstack_driver,
+                                                   mock_fw_sysinv_client,
+                                                   mock_openstack_driver,
+                                                   mock_patching_client,
+                                                   mock_sysinv_client):
+        mock_context.get_admin_context.return_value = self.ctxt
+        sysinv_clients = []
+
+        def create_sysinv_client(*args, **kwargs):
+            sysinv_client = FakeSysinvClientManyDevices(*args, **kwargs)
+            sysinv_client.get_device_images = mock.MagicMock(
+                wraps=sysinv_client.get_device_images)
+            sysinv_clients.append(sysinv_client)
+            return sysinv_client
+        mock_fw_sysinv_client.side_effect = create_sysinv_client
+
+        fm = firmware_audit.FirmwareAudit(self.ctxt,
+                                          self.fake_dcmanager_state_api)
+        am = subcloud_audit_manager.SubcloudAuditManager()
+        am.firmware_audit = fm
+        firmware_audit_data = self.get_fw_audit_data(am)
+
+        fm.subcloud_firmware_audit('subcloud1', firmware_audit_data)
+        sysinv_clients[-1].get_device_images.assert_called_once_with()
+
+        # Nothing changed, the sync status of the last audit is reported
+        # without retrieving the subcloud images to compare them.
+        fm.subcloud_firmware_audit('subcloud1', firmware_audit_data)
+        sysinv_clients[-1].get_device_images.assert_not_called()
+        expected_calls = [
+            mock.call(mock.ANY,
+                      subcloud_name='subcloud1',
+                      endpoint_type=dcorch_consts.ENDPOINT_TYPE_FIRMWARE,
+                      sync_status=consts.SYNC_STATUS_IN_SYNC)] * 2
+        self.fake_dcmanager_state_api.update_subcloud_endpoint_status. \
+            assert_has_calls(expected_calls)
+
+        # A device image state changed, the subcloud is compared again
+        def create_sysinv_client_not_written(*args, **kwargs):
+            sysinv_client = create_sysinv_client(*args, **kwargs)
+            sysinv_client.device_image_states[0].status = 'pending'
+            return sysinv_client
+        mock_fw_sysinv_client.side_effect = create_sysinv_client_not_written
+
+        fm.subcloud_firmware_audit('subcloud1', firmware_audit_data)
+        sysinv_clients[-1].get_device_images.assert_called_once_with()
+        self.fake_dcmanager_state_api.update_subcloud_endpoint_status. \
+            assert_called_with(
+                mock.ANY,
+                subcloud_name='subcloud1',
+                endpoint_type=dcorch_consts.ENDPOINT_TYPE_FIRMWARE,
+                sync_status=consts.SYNC_STATUS_OUT_OF_SYNC)
@@ -19,6 +19,7 @@ from oslo_config import cfg
 import sys
 sys.modules['fm_core'] = mock.Mock()
 
+from dcmanager.audit import fingerprint_cache
 from dcmanager.audit import patch_audit
 from dcmanager.audit import subcloud_audit_manager
 from dcmanager.common import consts
@@ -498,3 +499,69 @@ class TestPatchAudit(base.DCManagerTestCase):
         ]
         self.fake_dcmanager_state_api.update_subcloud_endpoint_status.\
             assert_has_calls(expected_calls)
+
+    @mock.patch.object(patch_audit, 'SysinvClient')
+    @mock.patch.object(patch_audit, 'PatchingClient')
+    @mock.patch.object(patch_audit, 'OpenStackDriver')
+    @mock.patch.object(subcloud_audit_manager, 'context')
+    def test_periodic_patch_audit_unchanged_patches(self, mock_context,
+                                                    mock_openstack_driver,
+                                                    mock_patching_client,
+                                                    mock_sysinv_client):
+        mock_context.get_admin_context.return_value = self.ctxt
+        pm = patch_audit.PatchAudit(self.ctxt,
+                                    self.fake_dcmanager_state_api)
+        am = subcloud_audit_manager.SubcloudAuditManager()
+        am.patch_audit = pm
+        mock_patching_client.side_effect = FakePatchingClientInSync
+        mock_sysinv_client.side_effect = FakeSysinvClientOneLoad
+        patch_audit_data = self.get_patch_audit_data(am)
+        update_status = \
+            self.fake_dcmanager_state_api.update_subcloud_endpoint_status
+        patching_in_sync = mock.call(
+            mock.ANY, subcloud_name='subcloud1',
+            endpoint_type=dcorch_consts.ENDPOINT_TYPE_PATCHING,
+            sync_status=consts.SYNC_STATUS_IN_SYNC)
+
+        with mock.patch.object(
+                pm, '_get_patching_sync_status',
+                wraps=pm._get_patching_sync_status) as mock_compare:
+            # The patches are not compared again while they are unchanged,
+            # but the sync status is still reported
+            for _audit in range(2):
+                pm.subcloud_patch_audit('subcloud1', patch_audit_data, False)
+            self.assertEqual(1, mock_compare.call_count)
+            self.assertEqual([patching_in_sync, patching_in_sync],
+                             update_status.call_args_list)
+
+            # A change of the subcloud patches is audited
+            mock_patching_client.side_effect = FakePatchingClientOutOfSync
+            pm.subcloud_patch_audit('subcloud1', patch_audit_data, False)
+            self.assertEqual(2, mock_compare.call_count)
+            update_status.assert_called_with(
+                mock.ANY, subcloud_name='subcloud1',
+                endpoint_type=dcorch_consts.ENDPOINT_TYPE_PATCHING,
+                sync_status=consts.SYNC_STATUS_OUT_OF_SYNC)
+
+            # And so is a change of the RegionOne patches
+            patch_audit_data = self.get_patch_audit_data(am)
+            pm.subcloud_patch_audit('subcloud1', patch_audit_data, False)
+            self.assertEqual(3, mock_compare.call_count)
+
+    def test_fingerprint_cache_bounded(self):
+        cache = fingerprint_cache.AuditFingerprintCache(max_entries=2)
+        cache.set_sync_status('subcloud1', 'fp1', consts.SYNC_STATUS_IN_SYNC)
+        cache.set_sync_status('subcloud2', 'fp2', consts.SYNC_STATUS_IN_SYNC)
+        # subcloud1 is now the most recently audited subcloud
+        self.assertEqual(consts.SYNC_STATUS_IN_SYNC,
+                         cache.get_sync_status('subcloud1', 'fp1'))
+
+        cache.set_sync_status('subcloud3', 'fp3',
+                              consts.SYNC_STATUS_OUT_OF_SYNC)
+
+        self.assertIsNone(cache.get_sync_status('subcloud2', 'fp2'))
+        self.assertEqual(consts.SYNC_STATUS_IN_SYNC,
+                         cache.get_sync_status('subcloud1', 'fp1'))
+        self.assertEqual(consts.SYNC_STATUS_OUT_OF_SYNC,
+                         cache.get_sync_status('subcloud3', 'fp3'))
+        self.assertIsNone(cache.get_sync_status('subcloud3', 'other'))
@@ -38,6 +38,7 @@ class FakeDCManagerStateAPI(object):
     def __init__(self):
         self.update_subcloud_availability = mock.MagicMock()
         self.update_subcloud_endpoint_status = mock.MagicMock()
+        self.bulk_update_subcloud_endpoint_status = mock.MagicMock()
 
 
 class FakeAuditWorkerAPI(object):
@@ -1138,3 +1139,45 @@ class TestAuditWorkerManager(base.DCManagerTestCase):
         self.assertEqual(audits.firmware_audit_requested, True)
         self.assertEqual(audits.kubernetes_audit_requested, True)
         self.assertEqual(audits.kube_rootca_update_audit_requested, True)
+
+    @mock.patch.object(subcloud_audit_worker_manager.audit_utils,
+                       'get_published_audit_data')
+    def test_audit_subclouds_with_published_audit_data(
+            self, mock_get_published_audit_data):
+        subcloud1 = self.create_subcloud_static(
+            self.ctx, name='subcloud1', deploy_status=consts.DEPLOY_STATE_DONE)
+        subcloud2 = self.create_subcloud_static(
+            self.ctx, name='subcloud2', deploy_status=consts.DEPLOY_STATE_DONE)
+        mock_get_published_audit_data.return_value = {
+            'patch_audit_data': {'software_version': '22.06'},
+            'firmware_audit_data': [{'bitstream_type': 'root-key'}],
+            'kubernetes_audit_data': None,
+            'kube_rootca_update_audit_data': None}
+
+        wm = subcloud_audit_worker_manager.SubcloudAuditWorkerManager()
+        wm.thread_group_manager = mock.MagicMock()
+
+        # Two batches of subclouds audited with the same data
+        wm.audit_subclouds(self.ctx, [subcloud1.id], None, None, None,
+                           False, None, audit_data_digest='digest1')
+        wm.audit_subclouds(self.ctx, [subcloud2.id], None, None, None,
+                           False, None, audit_data_digest='digest1')
+
+        # The audit data is loaded and decoded only once
+        mock_get_published_audit_data.assert_called_once_with(
+            self.ctx, 'digest1')
+        self.mock_patch_audit.PatchAuditData.from_dict.\
+            assert_called_once_with({'software_version': '22.06'})
+        self.mock_firmware_audit.FirmwareAuditData.from_dict.\
+            assert_called_once_with({'bitstream_type': 'root-key'})
+
+        # And shared by the audits of both subclouds
+        patch_audit_data = \
+            self.mock_patch_audit.PatchAuditData.from_dict.return_value
+        firmware_audit_data = \
+            self.mock_firmware_audit.FirmwareAuditData.from_dict.return_value
+        self.assertEqual(wm.thread_group_manager.start.call_count, 2)
+        for call in wm.thread_group_manager.start.call_args_list:
+            self.assertEqual(call[0][4], patch_audit_data)
+            self.assertEqual(call[0][5], [firmware_audit_data])
+            self.assertIsNone(call[0][6])
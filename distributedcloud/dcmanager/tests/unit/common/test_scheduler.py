@@ -0,0 +1,90 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+import eventlet
+
+from dcmanager.common import scheduler
+from dcmanager.tests import base
+
+
+class TestTimerWheel(base.DCManagerTestCase):
+
+    def test_items_due_in_order(self):
+        wheel = scheduler.TimerWheel(tick_interval=1, num_slots=8, now=100)
+        wheel.schedule(3, 'c', now=100)
+        wheel.schedule(1, 'a', now=100)
+        wheel.schedule(2, 'b', now=100)
+        self.assertEqual(3, len(wheel))
+
+        self.assertEqual([], wheel.advance(100.5))
+        self.assertEqual(['a'], wheel.advance(101))
+        self.assertEqual(['b', 'c'], wheel.advance(103.2))
+        self.assertEqual(0, len(wheel))
+
+    def test_item_not_due_before_its_delay(self):
+        wheel = scheduler.TimerWheel(tick_interval=1, num_slots=8, now=100)
+        wheel.schedule(1, 'a', now=100.5)
+
+        self.assertEqual([], wheel.advance(101))
+        self.assertEqual(['a'], wheel.advance(102))
+
+    def test_item_due_on_later_turn(self):
+        wheel = scheduler.TimerWheel(tick_interval=1, num_slots=8, now=100)
+        # Both items share a slot, one of them a full turn later
+        wheel.schedule(2, 'a', now=100)
+        wheel.schedule(10, 'b', now=100)
+
+        self.assertEqual(['a'], wheel.advance(105))
+        self.assertEqual(1, len(wheel))
+        self.assertEqual(['b'], wheel.advance(130))
+
+    def test_clear(self):
+        wheel = scheduler.TimerWheel(tick_interval=1, num_slots=8, now=100)
+        wheel.schedule(1, 'a', now=100)
+        wheel.clear()
+
+        self.assertEqual(0, len(wheel))
+        self.assertEqual([], wheel.advance(101))
+
+
+class TestTaskExecutor(base.DCManagerTestCase):
+
+    def setUp(self):
+        super(TestTaskExecutor, self).setUp()
+        self.events = []
+        self.executor = scheduler.TaskExecutor('Test', pool_size=1,
+                                               tick_interval=0.01)
+        self.executor.start()
+        self.addCleanup(self.executor.stop)
+
+    def poll(self, name, count):
+        self.events.append(name)
+        if count > 1:
+            return scheduler.Wait(0.01, self.poll, name, count - 1)
+
+    def test_waiting_tasks_do_not_hold_the_pool(self):
+        self.executor.submit(self.poll, 'a', 3)
+        self.executor.submit(self.poll, 'b', 3)
+        # The second task starts while the first one is waiting
+        eventlet.sleep(0)
+        self.assertEqual(['a', 'b'], self.events)
+        self.assertEqual(2, self.executor.get_stats()['waiting'])
+
+        for _ in range(100):
+            if len(self.events) == 6:
+                break
+            eventlet.sleep(0.01)
+        self.assertEqual(3, self.events.count('a'))
+        self.assertEqual(3, self.events.count('b'))
+        self.assertEqual(0, self.executor.get_stats()['waiting'])
+
+    def test_stop_drops_waiting_tasks(self):
+        self.executor.submit(self.poll, 'a', 3)
+        eventlet.sleep(0)
+        self.executor.stop()
+        eventlet.sleep(0.05)
+
+        self.assertEqual(['a'], self.events)
+        self.assertEqual(0, self.executor.get_stats()['waiting'])
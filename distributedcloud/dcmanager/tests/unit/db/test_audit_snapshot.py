@@ -0,0 +1,67 @@
+# Copyright (c) 2022 Wind River Systems, Inc.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+import datetime
+
+from dcmanager.audit import utils as audit_utils
+from dcmanager.common import exceptions as exception
+from dcmanager.db.sqlalchemy import api as db_api
+from dcmanager.tests import base
+
+
+class DBAPIAuditSnapshotTest(base.DCManagerTestCase):
+
+    def test_audit_snapshot_publish_and_get(self):
+        db_api.audit_snapshot_publish(self.ctx, 'digest1', '{"a": 1}')
+        result = db_api.audit_snapshot_get(self.ctx, 'digest1')
+        self.assertEqual(result['data'], '{"a": 1}')
+        self.assertIsNotNone(result['updated_at'])
+
+    def test_audit_snapshot_get_not_found(self):
+        self.assertRaises(exception.AuditSnapshotNotFound,
+                          db_api.audit_snapshot_get,
+                          self.ctx, 'digest1')
+
+    def test_audit_snapshot_publish_existing(self):
+        db_api.audit_snapshot_publish(self.ctx, 'digest1', '{"a": 1}')
+        first = db_api.audit_snapshot_get(self.ctx, 'digest1')
+        db_api.audit_snapshot_publish(self.ctx, 'digest1', '{"a": 1}')
+        result = db_api.audit_snapshot_get(self.ctx, 'digest1')
+        self.assertEqual(result['id'], first['id'])
+        self.assertGreaterEqual(result['updated_at'], first['updated_at'])
+
+    def test_audit_snapshot_purge(self):
+        db_api.audit_snapshot_publish(self.ctx, 'digest1', '{"a": 1}')
+        count = db_api.audit_snapshot_purge(
+            self.ctx,
+            datetime.datetime.utcnow() - datetime.timedelta(seconds=100))
+        self.assertEqual(count, 0)
+        count = db_api.audit_snapshot_purge(
+            self.ctx,
+            datetime.datetime.utcnow() + datetime.timedelta(seconds=100))
+        self.assertEqual(count, 1)
+        self.assertRaises(exception.AuditSnapshotNotFound,
+                          db_api.audit_snapshot_get,
+                          self.ctx, 'digest1')
+
+    def test_publish_audit_data(self):
+        audit_data = {'patch_audit_data': {'software_version': '22.06'},
+                      'firmware_audit_data': None}
+        digest = audit_utils.publish_audit_data(self.ctx, audit_data)
+        # The same data is published under the same digest
+        self.assertEqual(
+            digest, audit_utils.publish_audit_data(self.ctx, dict(audit_data)))
+        self.assertEqual(
+            audit_utils.get_published_audit_data(self.ctx, digest),
+            audit_data)
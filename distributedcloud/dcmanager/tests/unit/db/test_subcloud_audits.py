@@ -150,13 +150,15 @@ class DBAPISubcloudAuditsTest(base.DCManagerTestCase):
         # schema change.
         #
         # Manually revert back to schema version 7 (pre-dates audit table)
-        # The schema changes for 8, 9, 10 need to be manually un-done here
+        # The schema changes for 8, 9, 10, 11 need to be manually un-done here
         # 8 adds subcloud_audits table
         # 9 changes subcloud_audits table (undone as part of dropping table)
         # 10 adds a column to sw_update_strategy
+        # 11 adds audit_snapshot table
         engine = get_engine()
         with engine.connect() as conn:
             conn.execute('drop table subcloud_audits;')
+            conn.execute('drop table audit_snapshot;')
             conn.execute('update migrate_version set version=7;')
         # sqlite does not support drop column for un-doing schema change 10
         meta = sqlalchemy.MetaData()
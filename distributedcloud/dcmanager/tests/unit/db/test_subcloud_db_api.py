@@ -14,19 +14,29 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 #
+import time
+
 from oslo_db import exception as db_exception
+from oslo_log import log as logging
 
+from dccommon.tests import utils as test_utils
 from dcmanager.common import config
 from dcmanager.common import consts
 from dcmanager.common import exceptions
 from dcmanager.db import api as api
 from dcmanager.db.sqlalchemy import api as db_api
+from dcmanager.db.sqlalchemy import models
 from dcmanager.tests import base
 from dcmanager.tests import utils
 
 config.register_options()
 get_engine = api.get_engine
 
+LOG = logging.getLogger(__name__)
+
+# Number of strategy steps of the orchestrator apply loop benchmark
+NUM_BENCHMARK_STEPS = 5000
+
 # Enable foreign key support in sqlite - see:
 # http://docs.sqlalchemy.org/en/latest/dialects/sqlite.html
 from sqlalchemy.engine import Engine
@@ -362,6 +372,52 @@ class DBAPISubcloudTest(base.DCManagerTestCase):
                           self.ctx, subcloud.id,
                           endpoint_type_list, sync_status)
 
+    def test_subcloud_status_bulk_update(self):
+        subcloud1 = self.create_subcloud_static(self.ctx, name='subcloud1')
+        subcloud2 = self.create_subcloud_static(self.ctx, name='subcloud2')
+        for subcloud in [subcloud1, subcloud2]:
+            for endpoint_type in ['endpoint1', 'endpoint2']:
+                self.create_subcloud_status(self.ctx,
+                                            subcloud_id=subcloud.id,
+                                            endpoint_type=endpoint_type)
+        db_api.subcloud_status_update(self.ctx, subcloud2.id, 'endpoint1',
+                                      consts.SYNC_STATUS_IN_SYNC)
+
+        transitions = db_api.subcloud_status_bulk_update(
+            self.ctx,
+            [(subcloud1.id, 'endpoint1', consts.SYNC_STATUS_IN_SYNC),
+             (subcloud1.id, 'endpoint2', consts.SYNC_STATUS_OUT_OF_SYNC),
+             # No change
+             (subcloud2.id, 'endpoint1', consts.SYNC_STATUS_IN_SYNC),
+             (subcloud2.id, 'endpoint2', consts.SYNC_STATUS_IN_SYNC)])
+
+        self.assertEqual(
+            sorted([(subcloud1.id, 'endpoint1', consts.SYNC_STATUS_UNKNOWN,
+                     consts.SYNC_STATUS_IN_SYNC),
+                    (subcloud1.id, 'endpoint2', consts.SYNC_STATUS_UNKNOWN,
+                     consts.SYNC_STATUS_OUT_OF_SYNC),
+                    (subcloud2.id, 'endpoint2', consts.SYNC_STATUS_UNKNOWN,
+                     consts.SYNC_STATUS_IN_SYNC)]),
+            sorted(transitions))
+        self.assertEqual(consts.SYNC_STATUS_OUT_OF_SYNC,
+                         db_api.subcloud_status_get(
+                             self.ctx, subcloud1.id,
+                             'endpoint2').sync_status)
+        self.assertEqual(consts.SYNC_STATUS_IN_SYNC,
+                         db_api.subcloud_status_get(
+                             self.ctx, subcloud2.id,
+                             'endpoint2').sync_status)
+
+    def test_subcloud_status_bulk_update_no_change(self):
+        subcloud = self.create_subcloud_static(self.ctx)
+        self.create_subcloud_status(self.ctx, subcloud_id=subcloud.id)
+
+        transitions = db_api.subcloud_status_bulk_update(
+            self.ctx, [(subcloud.id, 'sysinv', consts.SYNC_STATUS_UNKNOWN),
+                       (subcloud.id, 'missing', consts.SYNC_STATUS_IN_SYNC)])
+
+        self.assertEqual([], transitions)
+
     def test_delete_subcloud_status(self):
         fake_subcloud = utils.create_subcloud_dict(base.SUBCLOUD_SAMPLE_DATA_0)
         subcloud = self.create_subcloud(self.ctx, fake_subcloud)
@@ -618,3 +674,225 @@ class DBAPISubcloudTest(base.DCManagerTestCase):
         self.assertRaises(exceptions.StrategyStepNotFound,
                           db_api.strategy_step_get,
                           self.ctx, subcloud.id)
+
+    def test_strategy_step_get_all_snapshots(self):
+        subcloud1 = self.create_subcloud_static(self.ctx,
+                                                name='subcloud one')
+        db_api.subcloud_update(self.ctx, subcloud1.id,
+                               management_state=consts.MANAGEMENT_MANAGED)
+        self.create_subcloud_static(self.ctx, name='subcloud two',
+                                    management_start_ip="192.168.101.60",
+                                    management_end_ip="192.168.101.70")
+        self.create_strategy_step(self.ctx, subcloud_id=None, stage=0)
+        self.create_strategy_step(self.ctx, subcloud_id=2, stage=2)
+        self.create_strategy_step(self.ctx, subcloud_id=1, stage=1,
+                                  state=consts.STRATEGY_STATE_COMPLETE)
+
+        with test_utils.count_statements(get_engine()) as statements:
+            snapshots = db_api.strategy_step_get_all_snapshots(self.ctx)
+
+        self.assertEqual(1, len(statements))
+        self.assertTrue(statements[0].startswith('SELECT'))
+        self.assertEqual([(1, None, 0, consts.STRATEGY_STATE_INITIAL, None),
+                          (2, 2, 2, consts.STRATEGY_STATE_INITIAL,
+                           (2, 'subcloud two',
+                            consts.MANAGEMENT_UNMANAGED)),
+                          (3, 1, 1, consts.STRATEGY_STATE_COMPLETE,
+                           (1, 'subcloud one', consts.MANAGEMENT_MANAGED))],
+                         snapshots)
+        self.assertEqual('subcloud two', snapshots[1].subcloud.name)
+
+    def test_strategy_step_set(self):
+        subcloud = self.create_subcloud_static(self.ctx, name='testname')
+        self.create_strategy_step(self.ctx, stage=1, details="Bart was here")
+
+        with test_utils.count_statements(get_engine()) as statements:
+            db_api.strategy_step_set(self.ctx, subcloud.id,
+                                     state=consts.STRATEGY_STATE_COMPLETE,
+                                     details="")
+
+        self.assertEqual(1, len(statements))
+        self.assertTrue(statements[0].startswith('UPDATE'))
+        strategy_step = db_api.strategy_step_get(self.ctx, subcloud.id)
+        self.assertEqual(1, strategy_step.stage)
+        self.assertEqual(consts.STRATEGY_STATE_COMPLETE, strategy_step.state)
+        self.assertEqual("", strategy_step.details)
+
+    def test_strategy_step_set_not_exists(self):
+        self.assertRaises(exceptions.StrategyStepNotFound,
+                          db_api.strategy_step_set,
+                          self.ctx, 1, state=consts.STRATEGY_STATE_COMPLETE)
+
+    @test_utils.benchmark
+    def test_strategy_step_apply_loop_benchmark(self):
+        # A fleet of subclouds with their install data, and a strategy
+        # step for each of them
+        data_install = '{"image": "%s"}' % ('x' * 1024)
+        with get_engine().begin() as conn:
+            conn.execute(models.Subcloud.__table__.insert(), [
+                {'id': i, 'name': 'subcloud%d' % i,
+                 'management_start_ip': '10.%d.%d.2' % (i // 256, i % 256),
+                 'management_end_ip': '10.%d.%d.50' % (i // 256, i % 256),
+                 'management_state': consts.MANAGEMENT_MANAGED,
+                 'data_install': data_install,
+                 'group_id': 1}
+                for i in range(1, NUM_BENCHMARK_STEPS + 1)])
+            conn.execute(models.StrategyStep.__table__.insert(), [
+                {'id': i, 'subcloud_id': i, 'stage': 1 + i // 100,
+                 'state': consts.STRATEGY_STATE_INITIAL, 'details': ''}
+                for i in range(1, NUM_BENCHMARK_STEPS + 1)])
+
+        start = time.time()
+        strategy_steps = db_api.strategy_step_get_all(self.ctx)
+        get_all_elapsed = time.time() - start
+        with test_utils.count_statements(get_engine()) as statements:
+            start = time.time()
+            snapshots = db_api.strategy_step_get_all_snapshots(self.ctx)
+            snapshots_elapsed = time.time() - start
+        self.assertEqual(1, len(statements))
+        self.assertTrue(statements[0].startswith('SELECT'))
+        self.assertEqual(len(strategy_steps), len(snapshots))
+
+        # The steps of a stage are updated by the apply loop
+        stage = [step.subcloud_id for step in snapshots if step.stage == 1]
+        with test_utils.count_statements(get_engine()) as update_statements:
+            start = time.time()
+            for subcloud_id in stage:
+                db_api.strategy_step_update(
+                    self.ctx, subcloud_id,
+                    state=consts.STRATEGY_STATE_UPDATING_PATCHES)
+            update_elapsed = time.time() - start
+        with test_utils.count_statements(get_engine()) as set_statements:
+            start = time.time()
+            for subcloud_id in stage:
+                db_api.strategy_step_set(
+                    self.ctx, subcloud_id,
+                    state=consts.STRATEGY_STATE_CREATING_STRATEGY)
+            set_elapsed = time.time() - start
+        self.assertEqual(len(stage), len(set_statements))
+        self.assertTrue(all(statement.startswith('UPDATE')
+                            for statement in set_statements))
+
+        LOG.info("Apply loop tick over %d strategy steps: full steps "
+                 "read in %.3fs, snapshots read in %.3fs. %d step "
+                 "updates: %d statements in %.3fs read back, %d "
+                 "statements in %.3fs not read back" %
+                 (len(snapshots), get_all_elapsed, snapshots_elapsed,
+                  len(stage), len(update_statements), update_elapsed,
+                  len(set_statements), set_elapsed))
+
+    def test_subcloud_get_all_with_endpoint_status(self):
+        group = db_api.subcloud_group_create(
+            self.ctx, 'group2', 'Second group',
+            consts.SUBCLOUD_APPLY_TYPE_PARALLEL, 2)
+        self.create_subcloud_static(self.ctx, name='subcloud1')
+        self.create_subcloud_static(self.ctx, name='subcloud2',
+                                    management_start_ip="192.168.101.60",
+                                    management_end_ip="192.168.101.70",
+                                    group_id=group.id)
+        self.create_subcloud_status(self.ctx, subcloud_id=1,
+                                    endpoint_type='patching')
+        self.create_subcloud_status(self.ctx, subcloud_id=1,
+                                    endpoint_type='load')
+        self.create_subcloud_status(self.ctx, subcloud_id=2,
+                                    endpoint_type='load')
+
+        with test_utils.count_statements(get_engine()) as statements:
+            subclouds = db_api.subcloud_get_all_with_endpoint_status(
+                self.ctx, 'patching')
+        self.assertEqual(1, len(statements))
+        self.assertTrue(statements[0].startswith('SELECT'))
+        self.assertEqual(['subcloud1', 'subcloud2'],
+                         [subcloud.name for subcloud, _ in subclouds])
+        self.assertEqual('patching', subclouds[0][1].endpoint_type)
+        self.assertIsNone(subclouds[1][1])
+
+        subclouds = db_api.subcloud_get_all_with_endpoint_status(
+            self.ctx, 'load', group_id=group.id)
+        self.assertEqual(1, len(subclouds))
+        self.assertEqual('subcloud2', subclouds[0][0].name)
+        self.assertEqual('load', subclouds[0][1].endpoint_type)
+
+    def test_strategy_step_bulk_create(self):
+        num_steps = db_api.STRATEGY_STEP_INSERT_BATCH_SIZE + 1
+        with get_engine().begin() as conn:
+            conn.execute(models.Subcloud.__table__.insert(), [
+                {'id': i, 'name': 'subcloud%d' % i,
+                 'management_start_ip': '10.0.%d.2' % i,
+                 'management_end_ip': '10.0.%d.50' % i,
+                 'group_id': 1}
+                for i in range(1, num_steps)])
+        steps = [{'subcloud_id': None, 'stage': 1,
+                  'state': consts.STRATEGY_STATE_INITIAL, 'details': ''}]
+        steps.extend({'subcloud_id': i, 'stage': 2,
+                      'state': consts.STRATEGY_STATE_INITIAL, 'details': ''}
+                     for i in range(1, num_steps))
+
+        with test_utils.count_statements(get_engine()) as statements:
+            db_api.strategy_step_bulk_create(self.ctx, steps)
+
+        self.assertEqual(2, len(statements))
+        self.assertTrue(all(statement.startswith('INSERT')
+                            for statement in statements))
+        strategy_steps = db_api.strategy_step_get_all(self.ctx)
+        self.assertEqual(num_steps, len(strategy_steps))
+        self.assertIsNone(strategy_steps[0].subcloud_id)
+        self.assertEqual(1, strategy_steps[0].stage)
+        self.assertEqual(num_steps - 1, strategy_steps[-1].subcloud_id)
+        self.assertEqual(2, strategy_steps[-1].stage)
+        self.assertIsNotNone(strategy_steps[-1].created_at)
+
+    def test_strategy_step_destroy_all(self):
+        self.create_subcloud_static(self.ctx, name='subcloud1')
+        self.create_subcloud_static(self.ctx, name='subcloud2',
+                                    management_start_ip="192.168.101.60",
+                                    management_end_ip="192.168.101.70")
+        self.create_strategy_step(self.ctx, subcloud_id=None)
+        self.create_strategy_step(self.ctx, subcloud_id=1)
+        self.create_strategy_step(self.ctx, subcloud_id=2)
+
+        with test_utils.count_statements(get_engine()) as statements:
+            db_api.strategy_step_destroy_all(self.ctx)
+
+        self.assertEqual(1, len(statements))
+        self.assertTrue(statements[0].startswith('DELETE'))
+        self.assertEqual([], db_api.strategy_step_get_all(self.ctx))
+
+    def test_subcloud_get_all_with_sync_status(self):
+        self.create_subcloud_static(self.ctx, name='subcloud1')
+        self.create_subcloud_static(self.ctx, name='subcloud2',
+                                    management_start_ip="192.168.101.60",
+                                    management_end_ip="192.168.101.70")
+        self.create_subcloud_static(self.ctx, name='subcloud3',
+                                    management_start_ip="192.168.101.80",
+                                    management_end_ip="192.168.101.90")
+        for subcloud_id in (1, 2):
+            for endpoint_type in ('patching', 'load'):
+                self.create_subcloud_status(self.ctx,
+                                            subcloud_id=subcloud_id,
+                                            endpoint_type=endpoint_type)
+                db_api.subcloud_status_update(self.ctx, subcloud_id,
+                                              endpoint_type,
+                                              consts.SYNC_STATUS_IN_SYNC)
+        db_api.subcloud_status_update(self.ctx, 2, 'load',
+                                      consts.SYNC_STATUS_OUT_OF_SYNC)
+
+        with test_utils.count_statements(get_engine()) as statements:
+            subclouds = db_api.subcloud_get_all_with_sync_status(self.ctx)
+        self.assertEqual(1, len(statements))
+        self.assertTrue(statements[0].startswith('SELECT'))
+        self.assertEqual([('subcloud1', consts.SYNC_STATUS_IN_SYNC),
+                          ('subcloud2', consts.SYNC_STATUS_OUT_OF_SYNC),
+                          ('subcloud3', consts.SYNC_STATUS_UNKNOWN)],
+                         [(subcloud.name, sync_status)
+                          for subcloud, sync_status in subclouds])
+
+        subclouds = db_api.subcloud_get_all_with_sync_status(
+            self.ctx, filters={'sync_status': consts.SYNC_STATUS_UNKNOWN})
+        self.assertEqual(['subcloud3'],
+                         [subcloud.name for subcloud, _ in subclouds])
+
+        subclouds = db_api.subcloud_get_all_with_sync_status(
+            self.ctx, limit=1, marker=1)
+        self.assertEqual(['subcloud2'],
+                         [subcloud.name for subcloud, _ in subclouds])
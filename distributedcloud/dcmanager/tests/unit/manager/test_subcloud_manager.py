@@ -907,6 +907,71 @@ class TestSubcloudManager(base.DCManagerTestCase):
                 self.assertEqual(updated_subcloud_status.sync_status,
                                  consts.SYNC_STATUS_OUT_OF_SYNC)
 
+    def test_bulk_update_subcloud_endpoint_status(self):
+        subcloud1 = self.create_subcloud_static(self.ctx, name='subcloud1')
+        subcloud2 = self.create_subcloud_static(self.ctx, name='subcloud2')
+        db_api.subcloud_update(self.ctx, subcloud1.id,
+                               management_state=consts.MANAGEMENT_MANAGED,
+                               availability_status=consts.AVAILABILITY_ONLINE)
+        endpoints = [dcorch_consts.ENDPOINT_TYPE_IDENTITY,
+                     dcorch_consts.ENDPOINT_TYPE_PATCHING]
+        for subcloud in [subcloud1, subcloud2]:
+            for endpoint in endpoints:
+                db_api.subcloud_status_create(self.ctx, subcloud.id, endpoint)
+
+        ssm = subcloud_state_manager.SubcloudStateManager()
+        ssm.fm_api = mock.MagicMock()
+        with mock.patch.object(lockutils, 'internal_fair_lock') as mock_lock:
+            ssm.bulk_update_subcloud_endpoint_status(
+                self.ctx,
+                [(subcloud1.name, dcorch_consts.ENDPOINT_TYPE_IDENTITY,
+                  consts.SYNC_STATUS_IN_SYNC),
+                 (subcloud1.name, dcorch_consts.ENDPOINT_TYPE_PATCHING,
+                  consts.SYNC_STATUS_OUT_OF_SYNC),
+                 # Not allowed for an offline/unmanaged subcloud
+                 (subcloud2.name, dcorch_consts.ENDPOINT_TYPE_IDENTITY,
+                  consts.SYNC_STATUS_IN_SYNC),
+                 # Not a change
+                 (subcloud2.name, dcorch_consts.ENDPOINT_TYPE_PATCHING,
+                  consts.SYNC_STATUS_UNKNOWN),
+                 ('unknown-subcloud', dcorch_consts.ENDPOINT_TYPE_PATCHING,
+                  consts.SYNC_STATUS_IN_SYNC)])
+            # The statuses of each subcloud are updated under its lock
+            for name in [subcloud1.name, subcloud2.name, 'unknown-subcloud']:
+                mock_lock.assert_any_call(name)
+
+        expected = {
+            (subcloud1.id, dcorch_consts.ENDPOINT_TYPE_IDENTITY):
+                consts.SYNC_STATUS_IN_SYNC,
+            (subcloud1.id, dcorch_consts.ENDPOINT_TYPE_PATCHING):
+                consts.SYNC_STATUS_OUT_OF_SYNC,
+            (subcloud2.id, dcorch_consts.ENDPOINT_TYPE_IDENTITY):
+                consts.SYNC_STATUS_UNKNOWN,
+            (subcloud2.id, dcorch_consts.ENDPOINT_TYPE_PATCHING):
+                consts.SYNC_STATUS_UNKNOWN,
+        }
+        for (subcloud_id, endpoint), sync_status in expected.items():
+            self.assertEqual(sync_status, db_api.subcloud_status_get(
+                self.ctx, subcloud_id, endpoint).sync_status)
+
+        # Alarms are only updated for the two transitions
+        ssm.fm_api.get_fault.assert_not_called()
+        ssm.fm_api.clear_fault.assert_called_once_with(
+            mock.ANY, "subcloud=subcloud1.resource=%s" %
+            dcorch_consts.ENDPOINT_TYPE_IDENTITY)
+        ssm.fm_api.set_fault.assert_called_once()
+        # Identity left the unknown state
+        self.fake_dcmanager_audit_api.trigger_subcloud_patch_load_audits.\
+            assert_called_once_with(self.ctx, subcloud1.id)
+
+        # Repeating the update is a no-op
+        ssm.fm_api.reset_mock()
+        ssm.bulk_update_subcloud_endpoint_status(
+            self.ctx,
+            [(subcloud1.name, dcorch_consts.ENDPOINT_TYPE_PATCHING,
+              consts.SYNC_STATUS_OUT_OF_SYNC)])
+        ssm.fm_api.set_fault.assert_not_called()
+
     def test_update_subcloud_availability_go_online(self):
         # create a subcloud
         subcloud = self.create_subcloud_static(self.ctx, name='subcloud1')
@@ -7,6 +7,7 @@ import itertools
 import mock
 
 from dcmanager.common import consts
+from dcmanager.common import scheduler
 from dcmanager.orchestrator.states import lock_host
 
 from dcmanager.tests.unit.orchestrator.states.fakes import FakeController
@@ -77,6 +78,29 @@ class TestSwUpgradeLockSimplexStage(TestSwUpgradeState):
         self.assert_step_updated(self.strategy_step.subcloud_id,
                                  self.on_success_state)
 
+    def test_lock_waits_for_host(self):
+        """Test the lock returns a wait while the host is locking"""
+
+        self.sysinv_client.get_host.side_effect = [self.CONTROLLER_UNLOCKED,
+                                                   self.CONTROLLER_LOCKING,
+                                                   self.CONTROLLER_LOCKED]
+        self.sysinv_client.lock_host.return_value = self.CONTROLLER_LOCKING
+
+        # start the strategy state operation, without resuming it
+        wait = self.worker.start_state_action(self.strategy_step)
+
+        # verify the state is waiting for the host to lock
+        self.assertIsInstance(wait, scheduler.Wait)
+        self.assertEqual(lock_host.DEFAULT_SLEEP_DURATION, wait.delay)
+        self.assertEqual(2, self.sysinv_client.get_host.call_count)
+        self.assert_step_updated(self.strategy_step.subcloud_id, self.state)
+
+        # resuming it finds the host locked and moves to the next state
+        self.assertIsNone(wait.resume())
+        self.assertEqual(3, self.sysinv_client.get_host.call_count)
+        self.assert_step_updated(self.strategy_step.subcloud_id,
+                                 self.on_success_state)
+
     def test_lock_skipped_when_already_locked(self):
         """Test the lock command skips if host is already locked"""
 
@@ -0,0 +1,44 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+import os
+import shutil
+import tempfile
+
+from dcmanager.orchestrator.patch_staging import PatchStaging
+from dcmanager.tests import base
+
+
+class TestPatchStaging(base.DCManagerTestCase):
+
+    def setUp(self):
+        super(TestPatchStaging, self).setUp()
+        self.vault_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.vault_dir)
+        self.patch_file = os.path.join(self.vault_dir, 'DC.1.patch')
+        self.write_patch_file(b'DC.1 contents')
+        self.staging = PatchStaging()
+
+    def write_patch_file(self, data):
+        with open(self.patch_file, 'wb') as f:
+            f.write(data)
+
+    def test_patch_file_read_once(self):
+        self.assertEqual(b'DC.1 contents', self.staging.get(self.patch_file))
+
+        self.write_patch_file(b'DC.1 new contents')
+        self.assertEqual(b'DC.1 contents', self.staging.get(self.patch_file))
+
+    def test_clear(self):
+        self.staging.get(self.patch_file)
+        self.write_patch_file(b'DC.1 new contents')
+        self.staging.clear()
+
+        self.assertEqual(b'DC.1 new contents',
+                         self.staging.get(self.patch_file))
+
+    def test_missing_patch_file(self):
+        self.assertRaises(IOError, self.staging.get,
+                          os.path.join(self.vault_dir, 'DC.2.patch'))
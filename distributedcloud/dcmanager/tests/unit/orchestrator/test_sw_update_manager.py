@@ -1909,12 +1909,13 @@ class TestSwUpdateManager(base.DCManagerTestCase):
         mock_sysinv_client.side_effect = FakeSysinvClientOneLoad
         FakePatchingClientOutOfSync.apply = mock.Mock()
         FakePatchingClientOutOfSync.remove = mock.Mock()
-        FakePatchingClientOutOfSync.upload = mock.Mock()
+        FakePatchingClientOutOfSync.upload_data = mock.Mock()
         sw_update_manager.PatchOrchThread.stopped = lambda x: False
         mock_strategy_lock = mock.Mock()
         pot = sw_update_manager.PatchOrchThread(mock_strategy_lock,
                                                 self.fake_dcmanager_audit_api)
         pot.get_ks_client = mock.Mock()
+        pot.patch_staging.get = mock.Mock(return_value=b'DC.8 contents')
         # invoke get_region_one_patches once to update required attributes
         pot.get_region_one_patches()
         pot.update_subcloud_patches(strategy_step)
@@ -1923,8 +1924,8 @@ class TestSwUpdateManager(base.DCManagerTestCase):
             FakePatchingClientOutOfSync.remove.call_args_list[0],
             ['DC.5', 'DC.6']
         ))
-        FakePatchingClientOutOfSync.upload.assert_called_with(
-            [consts.PATCH_VAULT_DIR + '/17.07/DC.8.patch'])
+        FakePatchingClientOutOfSync.upload_data.assert_called_with(
+            consts.PATCH_VAULT_DIR + '/17.07/DC.8.patch', b'DC.8 contents')
         assert(compare_call_with_unsorted_list(
             FakePatchingClientOutOfSync.apply.call_args_list[0],
             ['DC.2', 'DC.3', 'DC.8']
@@ -86,3 +86,36 @@ class ManagerRpcAPITestCase(base.DCManagerTestCase):
         new_client.cast.assert_called_once_with(self.context, 'fake_method',
                                                 key='value')
         self.assertEqual(res, new_client.cast.return_value)
+
+
+class SubcloudEndpointStatusBatchTestCase(base.DCManagerTestCase):
+
+    def test_flush_sends_the_updates_of_one_subcloud(self):
+        state_rpc_client = mock.Mock()
+        batch = rpc_client.SubcloudEndpointStatusBatch(state_rpc_client)
+        context = utils.dummy_context()
+
+        batch.update_subcloud_endpoint_status(
+            context, subcloud_name='subcloud1', endpoint_type='patching',
+            sync_status='in-sync')
+        batch.update_subcloud_endpoint_status(
+            context, subcloud_name='subcloud2', endpoint_type='patching',
+            sync_status='out-of-sync')
+        batch.update_subcloud_endpoint_status(
+            context, subcloud_name='subcloud1', endpoint_type='load',
+            sync_status='in-sync')
+        batch.flush(context, 'subcloud1')
+
+        state_rpc_client.bulk_update_subcloud_endpoint_status.\
+            assert_called_once_with(context, [
+                ('subcloud1', 'patching', 'in-sync'),
+                ('subcloud1', 'load', 'in-sync')])
+
+        state_rpc_client.reset_mock()
+        batch.flush(context, 'subcloud1')
+        state_rpc_client.bulk_update_subcloud_endpoint_status.\
+            assert_not_called()
+        batch.flush(context, 'subcloud2')
+        state_rpc_client.bulk_update_subcloud_endpoint_status.\
+            assert_called_once_with(context, [
+                ('subcloud2', 'patching', 'out-of-sync')])
@@ -38,7 +38,6 @@ import dcorch.common.context as k_context
 from dcorch.common import exceptions as exception
 from dcorch.common import utils
 from dcorch.rpc import client as rpc_client
-from eventlet.green import subprocess
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_service.wsgi import Request
@@ -91,6 +90,7 @@ class APIController(Middleware):
         return construct_url(environ)
 
     def notify(self, environ, endpoint_type):
+        self.rpc_client.invalidate_master_resources(self.ctxt, endpoint_type)
         self.rpc_client.sync_request(self.ctxt, endpoint_type)
 
     def process_request(self, req):
@@ -120,11 +120,20 @@ class APIController(Middleware):
             return response
 
         resource_info = response_data[resource_type]
+        # Use the usage collected by the periodic quota sync when fresh
+        # enough, the engine collects it from all the regions otherwise
         try:
-            usage_dict = self.rpc_client.get_usage_for_project_and_user(
+            usage_dict = utils.get_cached_quota_usage(
                 self.ctxt, CONF.type, project_id, user_id)
-        except Exception:
-            return response
+        except Exception as e:
+            LOG.warning("Failed to read the cached usage: %s", e)
+            usage_dict = None
+        if usage_dict is None:
+            try:
+                usage_dict = self.rpc_client.get_usage_for_project_and_user(
+                    self.ctxt, CONF.type, project_id, user_id)
+            except Exception:
+                return response
 
         usage_info = json.dumps(usage_dict)
         LOG.info("Project (%s) User (%s) aggregated usage: (%s)",
@@ -151,8 +160,11 @@ class APIController(Middleware):
         if CONF.show_request:
             self.print_request(req)
         environ = req.environ
-        # copy the request body
-        request_body = req.body
+        # copy the request body, uploads are forwarded as they are read
+        # since the response handlers only parse JSON bodies
+        request_body = None
+        if not proxy_utils.is_streamed_body(environ):
+            request_body = req.body
         application = self.process_request(req)
         response = req.get_response(application)
         return self.process_response(environ, request_body, response)
@@ -174,7 +186,8 @@ class APIController(Middleware):
         for k, v in req.headers.items():
             LOG.info("  %s: %s\n", k, v)
         self.print_environ(environ)
-        self.print_request_body(req.body)
+        if not proxy_utils.is_streamed_body(environ):
+            self.print_request_body(req.body)
 
 
 class ComputeAPIController(APIController):
@@ -399,21 +412,24 @@ class SysinvAPIController(APIController):
         if CONF.show_request:
             self.print_request(req)
         environ = req.environ
-        # copy the request and the request body
         request = req
-        request.body = req.body
 
         # load-import is stored in dc-vault and on /scratch temporary
         # folder to be processed by sysinv
         if self._is_load_import(request.path):
             req_body = self._store_load_to_vault(req)
-            if 'active' in request.POST:
-                req_body['active'] = request.POST['active']
 
             # sysinv will handle a simple application/json request
             # with the file location
             req.content_type = "application/json"
             req.body = json.dumps(req_body)
+        elif self._is_device_image_upload(environ):
+            # the device image is spooled once to /scratch, forwarded from
+            # there and written to the vault when accepted by sysinv
+            self._spool_request_body(req)
+        else:
+            # copy the request body
+            request.body = req.body
 
         application = self.process_request(req)
         response = req.get_response(application)
@@ -478,6 +494,13 @@ class SysinvAPIController(APIController):
     def _is_load_import(self, path):
         return path in proxy_consts.LOAD_PATHS
 
+    def _is_device_image_upload(self, environ):
+        return (proxy_utils.get_operation_type(environ) ==
+                consts.OPERATION_TYPE_POST and
+                proxy_utils.is_streamed_body(environ) and
+                self._get_resource_type_from_environ(environ) ==
+                consts.RESOURCE_TYPE_SYSINV_DEVICE_IMAGE)
+
     def _is_active_load(self, sw_version):
         if sw_version == tsc.SW_VERSION:
             return True
@@ -560,19 +583,6 @@ class SysinvAPIController(APIController):
             if os.path.exists(proxy_consts.LOAD_VAULT_TMP_DIR):
                 shutil.rmtree(proxy_consts.LOAD_VAULT_TMP_DIR)
 
-    def _copy_device_image_to_vault(self, src_filepath, dst_filename):
-        try:
-            if not os.path.isdir(proxy_consts.DEVICE_IMAGE_VAULT_DIR):
-                os.makedirs(proxy_consts.DEVICE_IMAGE_VAULT_DIR)
-            image_file_path = os.path.join(proxy_consts.DEVICE_IMAGE_VAULT_DIR,
-                                           dst_filename)
-            shutil.copyfile(src_filepath, image_file_path)
-            LOG.info("copied %s to %s" % (src_filepath, image_file_path))
-        except Exception:
-            msg = _("Failed to store device image in vault. Please check "
-                    "dcorch log for details.")
-            raise webob.exc.HTTPInsufficientStorage(explanation=msg)
-
     def _copy_load_to_vault_for_validation(self, src_filepath):
         try:
             validation_vault_dir = proxy_consts.LOAD_VAULT_TMP_DIR
@@ -580,7 +590,7 @@ class SysinvAPIController(APIController):
                 os.makedirs(validation_vault_dir)
             load_file_path = os.path.join(validation_vault_dir,
                                           os.path.basename(src_filepath))
-            shutil.copyfile(src_filepath, load_file_path)
+            proxy_utils.link_or_copy_file(src_filepath, load_file_path)
             LOG.info("copied %s to %s" % (src_filepath, load_file_path))
         except Exception:
             msg = _("Failed to store load in vault. Please check "
@@ -588,73 +598,92 @@ class SysinvAPIController(APIController):
             raise webob.exc.HTTPInsufficientStorage(explanation=msg)
         return load_file_path
 
+    def _get_staging_dir(self):
+        staging_dir = proxy_consts.LOAD_FILES_STAGING_DIR
+        # Need to change the permission on temporary folder to sysinv,
+        # sysinv might need to remove the temporary folder
+        if not os.path.isdir(staging_dir):
+            os.makedirs(staging_dir)
+            os.chown(staging_dir, pwd.getpwnam('sysinv').pw_uid,
+                     grp.getgrnam('sysinv').gr_gid)
+        return staging_dir
+
+    def _check_staging_space(self, environ):
+        # Only proceed if there is space available for the upload
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        if not proxy_utils.is_space_available('/scratch', length):
+            LOG.error("Failed to upload %d bytes, not enough space on "
+                      "/scratch partition: %d bytes available " %
+                      (length, psutil.disk_usage('/scratch').free))
+            msg = _("Not enough space to upload the files. Please check "
+                    "dcorch logs for details.")
+            raise webob.exc.HTTPInsufficientStorage(explanation=msg)
+
+    def _spool_request_body(self, request):
+        self._check_staging_space(request.environ)
+        try:
+            proxy_utils.spool_request_body(request.environ,
+                                           self._get_staging_dir())
+        except Exception:
+            LOG.exception("Failed to spool the request body")
+            proxy_utils.cleanup(request.environ)
+            msg = _("Failed to save the uploaded file to disk. Please "
+                    "check dcorch logs for details.")
+            raise webob.exc.HTTPInternalServerError(explanation=msg)
+
     def _upload_file(self, file_item):
+        staging_file = None
         try:
-            staging_dir = proxy_consts.LOAD_FILES_STAGING_DIR
-            # Need to change the permission on temporary folder to sysinv,
-            # sysinv might need to remove the temporary folder
+            staging_dir = self._get_staging_dir()
             sysinv_user_id = pwd.getpwnam('sysinv').pw_uid
             sysinv_group_id = grp.getgrnam('sysinv').gr_gid
-            if not os.path.isdir(staging_dir):
-                os.makedirs(staging_dir)
-                os.chown(staging_dir, sysinv_user_id, sysinv_group_id)
 
-            source_file = file_item.file
             staging_file = os.path.join(staging_dir,
                                         os.path.basename(file_item.filename))
 
-            if source_file is None:
+            if file_item.file is None:
                 LOG.error("Failed to upload load file %s, invalid file object"
                           % staging_file)
                 return None
 
-            if hasattr(source_file, 'fileno'):
-                # Only proceed if there is space available for copying
-                file_size = os.fstat(source_file.fileno()).st_size
-                avail_space = psutil.disk_usage('/scratch').free
-                if (avail_space < file_size):
-                    LOG.error("Failed to upload load file %s, not enough space on /scratch"
-                              " partition: %d bytes available "
-                              % (staging_file, avail_space))
-                    return None
-
-                # Large iso file, allocate the required space
-                subprocess.check_call(["/usr/bin/fallocate",  # pylint: disable=not-callable
-                                       "-l " + str(file_size), staging_file])
-
-            with open(staging_file, 'wb') as destination_file:
-                shutil.copyfileobj(source_file, destination_file)
-                os.chown(staging_file, sysinv_user_id, sysinv_group_id)
-
-        except subprocess.CalledProcessError as e:
-            LOG.error("Failed to upload load file %s, /usr/bin/fallocate error: %s"
-                      % (staging_file, e.output))
-            if os.path.isfile(staging_file):
-                os.remove(staging_file)
-            return None
+            # The large files are already written to the staging area as
+            # the request body is parsed
+            proxy_utils.save_upload(file_item, staging_file)
+            os.chown(staging_file, sysinv_user_id, sysinv_group_id)
+
         except Exception:
-            if os.path.isfile(staging_file):
+            if staging_file and os.path.isfile(staging_file):
                 os.remove(staging_file)
             LOG.exception("Failed to upload load file %s" % file_item.filename)
             return None
 
         return staging_file
 
+    def _parse_load_import(self, request):
+        # The uploaded files are written once to the staging area while
+        # the multipart body is read, rather than buffered and copied
+        self._check_staging_space(request.environ)
+        staging_dir = self._get_staging_dir()
+        return proxy_utils.parse_multipart_files(
+            request.environ, request.body_file_raw,
+            lambda filename: os.path.join(staging_dir,
+                                          os.path.basename(filename)))
+
     def _store_load_to_vault(self, request):
         load_files = dict()
         try:
+            form = self._parse_load_import(request)
             for file in proxy_consts.IMPORT_LOAD_FILES:
-                if file not in request.POST:
+                if file not in form:
                     msg = _("Missing required file for %s" % file)
                     raise webob.exc.HTTPInternalServerError(explanation=msg)
 
-                file_item = request.POST[file]
+                file_item = form[file]
                 if not file_item.filename:
                     msg = _("No %s file uploaded" % file)
                     raise webob.exc.HTTPInternalServerError(explanation=msg)
 
                 staging_file = self._upload_file(file_item)
-                request.POST[file] = staging_file
                 if staging_file:
                     self._copy_load_to_vault_for_validation(staging_file)
                     load_files.update({file: staging_file})
@@ -664,6 +693,8 @@ class SysinvAPIController(APIController):
                     raise webob.exc.HTTPInternalServerError(explanation=msg)
 
             LOG.info("Load files: %s saved to disk." % load_files)
+            if 'active' in form:
+                load_files['active'] = form['active']
         except Exception:
             if os.path.exists(proxy_consts.LOAD_FILES_STAGING_DIR):
                 shutil.rmtree(proxy_consts.LOAD_FILES_STAGING_DIR)
@@ -671,28 +702,34 @@ class SysinvAPIController(APIController):
             raise webob.exc.HTTPInternalServerError(explanation=msg)
         return load_files
 
-    def _store_image_file(self, file_item, dst_filename):
-        # First, upload file to a temporary location
-        fn = self._upload_file(file_item)
-
-        # copy the device image to the vault
+    def _store_image_file(self, request, dst_filename):
+        # The device image is written to the vault straight from the
+        # request body spooled to the staging area
         try:
-            if fn:
-                self._copy_device_image_to_vault(fn, dst_filename)
-            else:
-                msg = _("Failed to save file %s to disk. Please check dcorch"
-                        " logs for details." % file_item.filename)
-                raise webob.exc.HTTPInternalServerError(explanation=msg)
+            if not os.path.isdir(proxy_consts.DEVICE_IMAGE_VAULT_DIR):
+                os.makedirs(proxy_consts.DEVICE_IMAGE_VAULT_DIR)
+            image_file_path = os.path.join(proxy_consts.DEVICE_IMAGE_VAULT_DIR,
+                                           dst_filename)
+            body_file = request.environ[proxy_utils.SPOOLED_BODY_KEY]
+            body_file.seek(0)
+            form = proxy_utils.parse_multipart_files(
+                request.environ, body_file, lambda filename: image_file_path)
+            proxy_utils.save_upload(form['file'], image_file_path)
+            LOG.info("stored device image %s" % image_file_path)
+        except Exception:
+            LOG.exception("Failed to store device image %s" % dst_filename)
+            msg = _("Failed to store device image in vault. Please check "
+                    "dcorch log for details.")
+            raise webob.exc.HTTPInsufficientStorage(explanation=msg)
         finally:
             shutil.rmtree(proxy_consts.LOAD_FILES_STAGING_DIR)
 
     def _device_image_upload_req(self, request, response):
         # stores device image in the vault storage
-        file_item = request.POST['file']
         try:
             resource = json.loads(response.body)[consts.RESOURCE_TYPE_SYSINV_DEVICE_IMAGE]
             dst_filename = self._get_device_image_filename(resource)
-            self._store_image_file(file_item, dst_filename)
+            self._store_image_file(request, dst_filename)
         except Exception:
             LOG.exception("Failed to store the device image to vault")
         proxy_utils.cleanup(request.environ)
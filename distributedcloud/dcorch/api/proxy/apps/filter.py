@@ -69,11 +69,10 @@ class ApiFiller(Middleware):
     def __call__(self, req):
         # Only check space for load-import request
         if is_load_import(req.content_type, req.path):
-            # 3 times the file size is needed:
-            # 2 times on webob temporary copies
-            # 1 time on internal temporary copy to be shared with sysinv
+            # The load files are written once to the internal temporary
+            # copy shared with sysinv as the request body is read
             if not utils.is_space_available("/scratch",
-                                            3 * req.content_length):
+                                            req.content_length):
                 msg = _("Insufficient space on /scratch for request %s"
                         % req.path)
                 raise webob.exc.HTTPInternalServerError(explanation=msg)
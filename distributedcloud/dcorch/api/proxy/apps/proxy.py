@@ -13,25 +13,200 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from dcorch.api.proxy.common.service import Application
+import threading
+
+from oslo_config import cfg
 from oslo_log import log as logging
-from paste.proxy import TransparentProxy
+from six.moves.urllib.parse import quote
+import urllib3
+import webob.exc
+
+from dcorch.api.proxy.common import constants as proxy_consts
+from dcorch.api.proxy.common.service import Application
 
 
 LOG = logging.getLogger(__name__)
 
+proxy_opts = [
+    cfg.IntOpt('forward_pool_size',
+               default=64,
+               help='Maximum number of connections, and so of requests in '
+                    'flight, to each upstream host and port'),
+    cfg.IntOpt('forward_pool_timeout',
+               default=60,
+               help='Seconds a request waits for a free connection to the '
+                    'upstream host before being rejected'),
+]
+
+CONF = cfg.CONF
+CONF.register_opts(proxy_opts)
+
+# Hop-by-hop headers of the upstream response not passed to the client
+FILTERED_HEADERS = (
+    'transfer-encoding',
+    'connection',
+    'keep-alive',
+    'proxy-authenticate',
+    'proxy-authorization',
+    'te',
+    'trailers',
+    'upgrade',
+)
+
+
+def _get_host_port(host, scheme):
+    # Same parsing as http.client, including the bracketed IPv6 addresses
+    port = 443 if scheme == 'https' else 80
+    i = host.rfind(':')
+    j = host.rfind(']')
+    if i > j:
+        port = int(host[i + 1:])
+        host = host[:i]
+    if host.startswith('[') and host.endswith(']'):
+        host = host[1:-1]
+    return host, port
+
+
+class _RequestBody(object):
+    """Read at most length bytes of the request input."""
+
+    def __init__(self, body_file, length):
+        self.body_file = body_file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        if size <= 0:
+            return b''
+        data = self.body_file.read(size)
+        self.remaining -= len(data)
+        return data
+
+
+class _ResponseBody(object):
+    """Iterate over the upstream response body as it is received.
+
+    The connection goes back to the pool once the body is fully read. It
+    is closed if the client goes away first, as it can't be reused.
+    """
+
+    def __init__(self, response):
+        self.response = response
+
+    def __iter__(self):
+        return self.response.stream(proxy_consts.UPLOAD_CHUNK_SIZE,
+                                    decode_content=False)
+
+    def close(self):
+        if not self.response.closed:
+            self.response.close()
+        self.response.release_conn()
+
+
+class ConnectionPools(object):
+    """Keep-alive connection pools shared by the proxies, keyed by upstream.
+
+    Each pool holds at most forward_pool_size connections and blocks the
+    requests beyond that, which bounds the concurrency towards a service.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools = {}
+
+    def get_pool(self, scheme, host, port):
+        key = (scheme, host, port)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                LOG.debug("Creating connection pool to %s://%s:%s" % key)
+                pool_class = urllib3.HTTPConnectionPool
+                if scheme == 'https':
+                    pool_class = urllib3.HTTPSConnectionPool
+                pool = pool_class(host, port,
+                                  maxsize=CONF.forward_pool_size,
+                                  block=True,
+                                  timeout=urllib3.Timeout(connect=None,
+                                                          read=None),
+                                  retries=False)
+                self._pools[key] = pool
+            return pool
+
+    def close_all(self):
+        with self._lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
+
+
+_connection_pools = ConnectionPools()
+
 
 class Proxy(Application):
     """A proxy that sends the request just as it was given,
 
     including respecting HTTP_HOST, wsgi.url_scheme, etc.
+    The connections to the upstream services are kept alive and the
+    request and response bodies are streamed rather than buffered.
     """
 
     def __init__(self):
-        self.proxy_app = TransparentProxy()
+        self.pools = _connection_pools
 
     def __call__(self, environ, start_response):
         LOG.debug("Proxy the request to the remote host: (%s)", environ[
             'HTTP_HOST'])
-        result = self.proxy_app(environ, start_response)
-        return result
+        scheme = environ['wsgi.url_scheme']
+        if scheme not in ['http', 'https']:
+            raise ValueError("Unknown scheme %r" % scheme)
+        host = environ['HTTP_HOST']
+        pool = self.pools.get_pool(scheme, *_get_host_port(host, scheme))
+
+        headers = {}
+        for key, value in environ.items():
+            if key.startswith('HTTP_'):
+                key = key[5:].lower().replace('_', '-')
+                headers[key] = value
+        headers['host'] = host
+        if 'REMOTE_ADDR' in environ and 'HTTP_X_FORWARDED_FOR' not in environ:
+            headers['x-forwarded-for'] = environ['REMOTE_ADDR']
+        if environ.get('CONTENT_TYPE'):
+            headers['content-type'] = environ['CONTENT_TYPE']
+
+        body = None
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        if length > 0:
+            headers['content-length'] = str(length)
+            body = _RequestBody(environ['wsgi.input'], length)
+            if length <= proxy_consts.UPLOAD_CHUNK_SIZE:
+                # Small bodies go out with the headers
+                body = body.read()
+
+        path = quote(environ.get('SCRIPT_NAME', '') +
+                     environ.get('PATH_INFO', ''))
+        if environ.get('QUERY_STRING'):
+            path += '?' + environ['QUERY_STRING']
+
+        try:
+            response = pool.urlopen(
+                environ['REQUEST_METHOD'], path, body=body, headers=headers,
+                retries=False, redirect=False, assert_same_host=False,
+                preload_content=False, decode_content=False,
+                pool_timeout=CONF.forward_pool_timeout)
+        except urllib3.exceptions.EmptyPoolError:
+            LOG.warning("No connection available to %s after %ss" %
+                        (host, CONF.forward_pool_timeout))
+            return webob.exc.HTTPServiceUnavailable()(environ,
+                                                      start_response)
+        except urllib3.exceptions.HTTPError as e:
+            LOG.error("Failed to forward the request to %s: %s" % (host, e))
+            return webob.exc.HTTPBadGateway()(environ, start_response)
+
+        # iteritems() keeps repeated headers, such as Set-Cookie, apart
+        headers_out = [(header, value)
+                       for header, value in response.headers.iteritems()
+                       if header.lower() not in FILTERED_HEADERS]
+        start_response('%s %s' % (response.status, response.reason),
+                       headers_out)
+        return _ResponseBody(response)
@@ -113,6 +113,11 @@ IMPORTED_LOAD_MAX_COUNT = 1
 
 DEVICE_IMAGE_VAULT_DIR = '/opt/dc-vault/device_images'
 
+# The request bodies of these content types are uploads, they are not
+# buffered in memory by the proxy
+STREAMED_CONTENT_TYPES = ['multipart/form-data', 'application/octet-stream']
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
 # Cinder
 CINDER_QUOTA_PATHS = [
     '/{version}/{admin_project_id}/os-quota-sets/{project_id}',
@@ -14,17 +14,25 @@
 # limitations under the License.
 
 import base64
+import cgi
 from cryptography import fernet
+import errno
+import fcntl
 import msgpack
+import os
 import psutil
+import shutil
 import six
 from six.moves.urllib.parse import urlparse
+import tempfile
+from webob import multidict
 
 from keystoneauth1 import exceptions as keystone_exceptions
 from oslo_log import log as logging
 
 from dccommon import consts as dccommon_consts
 from dccommon.drivers.openstack import sdk_platform as sdk
+from dcorch.api.proxy.common import constants as proxy_consts
 from dcorch.common import consts
 
 LOG = logging.getLogger(__name__)
@@ -242,3 +250,142 @@ def cleanup(environ):
             item = post_vars[f]
             if hasattr(item, 'file'):
                 item.file.close()
+
+    # the request body spooled to disk is not needed anymore
+    spooled_body = environ.pop(SPOOLED_BODY_KEY, None)
+    if spooled_body is not None:
+        spooled_body.close()
+        if os.path.isfile(spooled_body.name):
+            os.remove(spooled_body.name)
+
+
+# ioctl cloning a file into another one sharing its extents (reflink)
+FICLONE = 0x40049409
+
+SPOOLED_BODY_KEY = 'dcorch.spooled_body'
+
+
+def is_streamed_body(environ):
+    """Whether the request body is an upload which is not buffered."""
+    content_type = environ.get('CONTENT_TYPE', '').split(';')[0].strip()
+    return content_type.lower() in proxy_consts.STREAMED_CONTENT_TYPES
+
+
+def spool_request_body(environ, spool_dir):
+    """Write the request body to a file and forward the request from it.
+
+    The body is written as it is read, so only one chunk is in memory
+    whatever the size of the upload. The file is removed by cleanup().
+    """
+    remaining = int(environ.get('CONTENT_LENGTH') or 0)
+    body_file = tempfile.NamedTemporaryFile(prefix='request_body_',
+                                            dir=spool_dir, delete=False)
+    environ[SPOOLED_BODY_KEY] = body_file
+
+    request_input = environ['wsgi.input']
+    while remaining > 0:
+        chunk = request_input.read(min(remaining,
+                                       proxy_consts.UPLOAD_CHUNK_SIZE))
+        if not chunk:
+            raise IOError("Request body truncated, %d bytes missing" %
+                          remaining)
+        body_file.write(chunk)
+        remaining -= len(chunk)
+    body_file.flush()
+    body_file.seek(0)
+
+    environ['wsgi.input'] = body_file
+    environ['webob.is_body_seekable'] = True
+    return body_file
+
+
+def parse_multipart_files(environ, body_file, get_file_path):
+    """Parse a multipart/form-data body writing the files where they go.
+
+    :param environ: the environment of the request
+    :param body_file: file object to read the body from
+    :param get_file_path: called with the name of each uploaded file,
+                          returns the path the file is written to
+    :return: a MultiDict of the form fields, the uploaded files being
+             FieldStorage items to pass to save_upload()
+    """
+    class UploadFieldStorage(cgi.FieldStorage):
+        def make_file(self):
+            if self.filename:
+                return open(get_file_path(self.filename), 'w+b')
+            return super(UploadFieldStorage, self).make_file()
+
+    fs_environ = {'REQUEST_METHOD': 'POST',
+                  'QUERY_STRING': '',
+                  'CONTENT_TYPE': environ.get('CONTENT_TYPE', ''),
+                  'CONTENT_LENGTH': environ.get('CONTENT_LENGTH') or '0'}
+    fs_kwargs = {}
+    if six.PY3:
+        # py2's FieldStorage keeps the field values as bytes
+        fs_kwargs['encoding'] = 'utf8'
+    fs = UploadFieldStorage(fp=body_file, environ=fs_environ,
+                            keep_blank_values=True, **fs_kwargs)
+    return multidict.MultiDict.from_fieldstorage(fs)
+
+
+def save_upload(file_item, path):
+    """Complete the write of a file parsed by parse_multipart_files().
+
+    Large files are already written to their path while the body is
+    parsed, only the small files kept in memory by the parser are copied.
+    """
+    source_file = file_item.file
+    if getattr(source_file, 'name', None) != path:
+        source_file.seek(0)
+        with open(path, 'wb') as destination_file:
+            shutil.copyfileobj(source_file, destination_file)
+    source_file.close()
+
+
+def link_or_copy_file(src, dst):
+    """Copy a file without reading its content through the proxy.
+
+    dst is a hard link to src when both are on the same file system.
+    Otherwise the extents of src are shared with a reflink when the file
+    system supports it, else the content is copied in kernel with
+    copy_file_range, a regular copy being the last resort.
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return
+    except OSError as e:
+        if e.errno not in [errno.EXDEV, errno.EPERM, errno.EMLINK,
+                           errno.EOPNOTSUPP]:
+            raise
+
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return
+        except (IOError, OSError):
+            # py2 raises IOError
+            pass
+
+        if hasattr(os, 'copy_file_range'):
+            remaining = os.fstat(fsrc.fileno()).st_size
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(),
+                                                fdst.fileno(), remaining)
+                    if not copied:
+                        break
+                    remaining -= copied
+                if remaining <= 0:
+                    return
+            except OSError as e:
+                if e.errno not in [errno.EXDEV, errno.ENOSYS, errno.EINVAL,
+                                   errno.EOPNOTSUPP]:
+                    raise
+            # start over with a regular copy
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+
+        shutil.copyfileobj(fsrc, fdst, proxy_consts.UPLOAD_CHUNK_SIZE)
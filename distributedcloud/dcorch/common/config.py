@@ -204,7 +204,21 @@ common_opts = [
                help='hostname of the machine'),
     cfg.StrOpt('disable_audit_endpoints',
                default='',
-               help='endpoints for which audit is disabled')
+               help='endpoints for which audit is disabled'),
+    cfg.IntOpt('master_resource_cache_ttl',
+               default=600,
+               help='Seconds the master cloud resources fetched by the sync '
+                    'audit are cached and shared across subcloud audits'),
+    cfg.IntOpt('quota_usage_cache_ttl',
+               default=3600,
+               help='Seconds the project usage summed across all the '
+                    'regions by the quota sync is served to the quota '
+                    'queries before being collected again'),
+    cfg.IntOpt('audit_request_pool_size',
+               default=10,
+               help='Maximum number of concurrent requests made to a cloud '
+                    'by the audit of a subcloud when resources have to be '
+                    'fetched one user or one resource at a time')
 ]
 
 fernet_opts = [
@@ -18,12 +18,11 @@ import six.moves
 
 from dcorch.common import consts
 from dcorch.common import exceptions
-from dcorch.objects import orchjob
-from dcorch.objects import orchrequest
-from dcorch.objects import resource
-from dcorch.objects import subcloud as subcloud_obj
+from dcorch.db import api as db_api
+from oslo_config import cfg
 from oslo_db import exception as oslo_db_exception
 from oslo_log import log as logging
+from oslo_utils import timeutils
 
 LOG = logging.getLogger(__name__)
 
@@ -52,6 +51,32 @@ def validate_quota_limits(payload):
             raise exceptions.InvalidInputError
 
 
+def get_endpoint_quota_usage(endpoint_type, usages):
+    # The usage summed across the regions includes the fields of all the
+    # endpoint types, so keep only the ones of the given endpoint type.
+    desired_fields = consts.ENDPOINT_QUOTA_MAPPING[endpoint_type]
+    return dict((k, v) for k, v in usages.items() if k in desired_fields)
+
+
+def get_cached_quota_usage(context, endpoint_type, project_id, user_id):
+    """Get the usage of a project/user collected by the quota manager
+
+    :param context: authorization context
+    :param endpoint_type: consts.ENDPOINT_TYPE_*
+    :param project_id: project id in system controller
+    :param user_id: user id in system controller, None for the project usage
+    :return: the usage of the endpoint type, or None if it was not
+             collected in the last quota_usage_cache_ttl seconds
+    """
+    usage_ref = db_api.quota_usage_get(context, project_id, user_id)
+    if usage_ref is None or usage_ref.updated_at is None:
+        return None
+    if timeutils.is_older_than(usage_ref.updated_at,
+                               cfg.CONF.quota_usage_cache_ttl):
+        return None
+    return get_endpoint_quota_usage(endpoint_type, usage_ref.usages or {})
+
+
 def keypair_construct_id(name, user_id):
     # Keypair has a unique name per user.
     # Hence, keypair id stored in dcorch DB is of the format
@@ -128,59 +153,30 @@ def enqueue_work(context, endpoint_type,
                              "removeTenantAccess": {"tenant": "new_tenant"}}')
 
     """
-    if operation_type in [consts.OPERATION_TYPE_CREATE,
-                          consts.OPERATION_TYPE_PATCH]:
-        try:
-            rsrc = resource.Resource(
-                context=context, resource_type=resource_type,
-                master_id=source_resource_id)
-            rsrc.create()
-            LOG.info("Resource created in DB {}/{}/{}/{}".format(
-                rsrc.id,  # pylint: disable=E1101
-                resource_type, source_resource_id, operation_type))
-        except oslo_db_exception.DBDuplicateEntry:
-            # In case of discrepancies found during audit, resource might
-            # be already present in DB, but not its dependent resources.
-            # A retry of create should work, in such cases.
-            # Another scenario handled here is that of two threads trying to
-            # create the resource at the same time. One will fail due to unique
-            # constraint uniq_resource0resource_type0master_id0deleted
-            rsrc = resource.Resource.get_by_type_and_master_id(
-                context, resource_type, source_resource_id)
-            LOG.info("Resource already in DB {}/{}/{}/{}".format(
-                rsrc.id, resource_type, source_resource_id, operation_type))
-        except Exception as e:
-            LOG.exception(e)
-            return
-    else:
-        try:
-            rsrc = resource.Resource.get_by_type_and_master_id(
-                context, resource_type, source_resource_id)
-        except exceptions.ResourceNotFound:
-            # Some resources do not go through a create
-            LOG.info("Resource not in DB {}/{}/{}".format(
-                resource_type, source_resource_id, operation_type))
-            rsrc = resource.Resource(
-                context=context, resource_type=resource_type,
-                master_id=source_resource_id)
-            rsrc.create()
-
-    # todo: user_id and project_id are not used, to be removed from model
-    orch_job = orchjob.OrchJob(
-        context=context, user_id='', project_id='',
-        endpoint_type=endpoint_type, source_resource_id=source_resource_id,
-        operation_type=operation_type, resource_id=rsrc.id,
-        resource_info=resource_info)
-    orch_job.create()
+    # The resource, the orch_job and the orch_requests for all the target
+    # subclouds are created in a single transaction, so the cost of this
+    # call does not grow with the number of subclouds.
     if subcloud:
-        subclouds = [subcloud]
+        target_region_names = [subcloud.region_name]
     else:
-        subclouds = subcloud_obj.SubcloudList.get_all(context)
-    for sc in subclouds:
-        orch_req = orchrequest.OrchRequest(
-            context=context, state=consts.ORCH_REQUEST_QUEUED,
-            target_region_name=sc.region_name,
-            orch_job_id=orch_job.id)  # pylint: disable=E1101
-        orch_req.create()
+        target_region_names = None
+    # todo: user_id and project_id are not used, to be removed from model
+    values = {'user_id': '', 'project_id': '',
+              'source_resource_id': source_resource_id,
+              'resource_info': resource_info}
+    try:
+        orch_job = db_api.orch_job_enqueue(
+            context, resource_type, source_resource_id, endpoint_type,
+            operation_type, values, target_region_names=target_region_names)
+    except (oslo_db_exception.DBDuplicateEntry,
+            exceptions.ResourceNotFound) as e:
+        # The resource was created or deleted concurrently, even after
+        # a retry. This is only tolerated for a create or a patch.
+        if operation_type not in [consts.OPERATION_TYPE_CREATE,
+                                  consts.OPERATION_TYPE_PATCH]:
+            raise
+        LOG.exception(e)
+        return
     LOG.info("Work order created for {}:{}/{}/{}/{}".format(
-        subcloud, rsrc.id, resource_type, source_resource_id, operation_type))
+        subcloud, orch_job.resource_id, resource_type, source_resource_id,
+        operation_type))
@@ -104,6 +104,21 @@ def quota_class_update(context, class_name, resource, limit):
     return IMPL.quota_class_update(context, class_name, resource, limit)
 
 
+def quota_usage_get(context, project_id, user_id):
+    """Retrieve the usage of a project/user across all regions or None."""
+    return IMPL.quota_usage_get(context, project_id, user_id)
+
+
+def quota_usage_update(context, project_id, user_id, usages):
+    """Create or update the usage of a project/user across all regions."""
+    return IMPL.quota_usage_update(context, project_id, user_id, usages)
+
+
+def quota_usage_purge(context, updated_before):
+    """Purge the usage not updated since the given time."""
+    return IMPL.quota_usage_purge(context, updated_before)
+
+
 def db_sync(engine, version=None):
     """Migrate the database to `version` or the most recent version."""
     return IMPL.db_sync(engine, version=version)
@@ -283,11 +298,40 @@ def orch_request_get_by_attrs(context,
         states=states)
 
 
+def orch_request_get_source_resource_ids_by_attrs(context,
+                                                  endpoint_type,
+                                                  resource_type=None,
+                                                  target_region_name=None,
+                                                  states=None):
+    """Query the source resource ids of OrchRequests by attributes.
+
+    :param context:  authorization context
+    :param endpoint_type: OrchJob.endpoint_type
+    :param resource_type: Resource.resource_type
+    :param target_region_name: OrchRequest target_region_name
+    :param states: [OrchRequest.state] note: must be a list
+    :return: [OrchJob.source_resource_id] sorted by OrchRequest.id
+    """
+    return IMPL.orch_request_get_source_resource_ids_by_attrs(
+        context,
+        endpoint_type,
+        resource_type=resource_type,
+        target_region_name=target_region_name,
+        states=states)
+
+
 def orch_request_create(context, orch_job_id, target_region_name, values):
     return IMPL.orch_request_create(context, orch_job_id,
                                     target_region_name, values)
 
 
+def orch_job_enqueue(context, resource_type, master_id, endpoint_type,
+                     operation_type, values, target_region_names=None):
+    return IMPL.orch_job_enqueue(context, resource_type, master_id,
+                                 endpoint_type, operation_type, values,
+                                 target_region_names=target_region_names)
+
+
 def orch_request_update(context, orch_request_id, values):
     return IMPL.orch_request_update(context, orch_request_id, values)
 
@@ -336,11 +380,34 @@ def subcloud_sync_get(context, subcloud_name, endpoint_type):
     return IMPL.subcloud_sync_get(context, subcloud_name, endpoint_type)
 
 
+def subcloud_sync_get_pending(context, sync_requests,
+                              management_state=None,
+                              availability_status=None,
+                              initial_sync_state=None):
+    return IMPL.subcloud_sync_get_pending(
+        context, sync_requests,
+        management_state=management_state,
+        availability_status=availability_status,
+        initial_sync_state=initial_sync_state)
+
+
 def subcloud_sync_update(context, subcloud_name, endpoint_type, values):
     return IMPL.subcloud_sync_update(context, subcloud_name, endpoint_type,
                                      values)
 
 
+def subcloud_sync_update_endpoints(context, subcloud_name,
+                                   endpoint_type_list, values):
+    return IMPL.subcloud_sync_update_endpoints(
+        context, subcloud_name, endpoint_type_list, values)
+
+
+def subcloud_sync_update_all(context, management_state, endpoint_type,
+                             values):
+    return IMPL.subcloud_sync_update_all(
+        context, management_state, endpoint_type, values)
+
+
 def subcloud_sync_create(context, subcloud_name, endpoint_type, values):
     return IMPL.subcloud_sync_create(context, subcloud_name, endpoint_type,
                                      values)
@@ -38,7 +38,8 @@ from sqlalchemy import desc
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm.exc import MultipleResultsFound
 from sqlalchemy.orm.exc import NoResultFound
-from sqlalchemy.orm import joinedload_all
+from sqlalchemy.orm import contains_eager
+from sqlalchemy.orm import joinedload
 
 from dcorch.common import consts
 from dcorch.common import exceptions as exception
@@ -79,6 +80,9 @@ def write_session():
 
 _DEFAULT_QUOTA_NAME = 'default'
 
+# Maximum number of orch_request rows per multi-row INSERT statement
+ORCH_REQUEST_INSERT_BATCH_SIZE = 100
+
 
 def get_backend():
     """The backend is this module itself."""
@@ -86,12 +90,18 @@ def get_backend():
 
 
 def model_query(context, *args, **kwargs):
+    """Query helper.
+
+    Relationships are not eagerly loaded, the caller passes the loading
+    strategies it needs through the options keyword argument.
+    """
     session = kwargs.get('session')
+    options = kwargs.get('options', [])
     if session:
-        return session.query(*args).options(joinedload_all('*'))
+        return session.query(*args).options(*options)
     else:
         with read_session() as session:
-            return session.query(*args).options(joinedload_all('*'))
+            return session.query(*args).options(*options)
 
 
 def _session(context):
@@ -305,6 +315,55 @@ def quota_class_destroy_all(context, class_name):
             raise exception.QuotaClassNotFound()
 
 
+##########################
+
+@require_context
+def quota_usage_get(context, project_id, user_id):
+    return model_query(context, models.QuotaUsage). \
+        filter_by(project_id=project_id). \
+        filter_by(user_id=user_id or ''). \
+        first()
+
+
+@require_admin_context
+def quota_usage_update(context, project_id, user_id, usages):
+    # The update time is set even if the usage didn't change, as it tells
+    # the readers how fresh the usage is.
+    values = {'usages': usages, 'updated_at': timeutils.utcnow()}
+    try:
+        with write_session() as session:
+            usage_ref = session.query(models.QuotaUsage). \
+                filter_by(project_id=project_id). \
+                filter_by(user_id=user_id or ''). \
+                first()
+            if usage_ref is None:
+                usage_ref = models.QuotaUsage()
+                usage_ref.project_id = project_id
+                usage_ref.user_id = user_id or ''
+            usage_ref.update(values)
+            usage_ref.save(session)
+            return usage_ref
+    except db_exc.DBDuplicateEntry:
+        # Another engine created the row in the meantime
+        with write_session() as session:
+            usage_ref = session.query(models.QuotaUsage). \
+                filter_by(project_id=project_id). \
+                filter_by(user_id=user_id or ''). \
+                one()
+            usage_ref.update(values)
+            usage_ref.save(session)
+            return usage_ref
+
+
+@require_admin_context
+def quota_usage_purge(context, updated_before):
+    with write_session() as session:
+        count = session.query(models.QuotaUsage). \
+            filter(models.QuotaUsage.updated_at < updated_before). \
+            delete(synchronize_session=False)
+    LOG.info('%d stale records were purged from quota_usage table.', count)
+
+
 def db_sync(engine, version=None):
     """Migrate the database to `version` or the most recent version."""
     return migration.db_sync(engine, version=version)
@@ -772,7 +831,8 @@ def add_orch_request_filter_by_resource(query, value):
 
 @require_context
 def _orch_request_get(context, orch_request_id, session=None):
-    query = model_query(context, models.OrchRequest, session=session). \
+    query = model_query(context, models.OrchRequest, session=session,
+                        options=[joinedload(models.OrchRequest.orch_job)]). \
         filter_by(deleted=0)
     query = add_identity_filter(query, orch_request_id)
     try:
@@ -788,7 +848,8 @@ def orch_request_get(context, orch_request_id):
 
 @require_context
 def orch_request_get_most_recent_failed_request(context):
-    query = model_query(context, models.OrchRequest). \
+    query = model_query(context, models.OrchRequest,
+                        options=[joinedload(models.OrchRequest.orch_job)]). \
         filter_by(deleted=0). \
         filter_by(state=consts.ORCH_REQUEST_STATE_FAILED)
 
@@ -802,10 +863,11 @@ def orch_request_get_most_recent_failed_request(context):
 def orch_request_get_all(context, orch_job_id=None):
     query = model_query(context, models.OrchRequest). \
         filter_by(deleted=0)
+    query = (query.join(models.OrchJob,
+                        models.OrchJob.id ==
+                        models.OrchRequest.orch_job_id).
+             options(contains_eager(models.OrchRequest.orch_job)))
     if orch_job_id:
-        query = (query.join(models.OrchJob,
-                            models.OrchJob.id ==
-                            models.OrchRequest.orch_job_id))
         query, field = add_filter_by_many_identities(
             query, models.OrchJob, [orch_job_id])
     return query.all()
@@ -836,9 +898,12 @@ def orch_request_get_by_attrs(context,
         states = set(states)
         query = query.filter(models.OrchRequest.state.in_(states))
 
+    # The orch_job is populated from the join used for filtering, its
+    # own orch_requests are never loaded.
     query = query.join(models.OrchJob,
                        models.OrchJob.id == models.OrchRequest.orch_job_id). \
-        filter_by(endpoint_type=endpoint_type)
+        filter_by(endpoint_type=endpoint_type). \
+        options(contains_eager(models.OrchRequest.orch_job))
 
     if resource_type is not None:
         query = query.join(models.Resource,
@@ -851,6 +916,43 @@ def orch_request_get_by_attrs(context,
     return query
 
 
+@require_context
+def orch_request_get_source_resource_ids_by_attrs(context,
+                                                  endpoint_type,
+                                                  resource_type=None,
+                                                  target_region_name=None,
+                                                  states=None):
+    """Query the source resource ids of OrchRequests by attributes.
+
+    Same filtering as orch_request_get_by_attrs(), but only the
+    OrchJob.source_resource_id column is selected.
+
+    :return: [OrchJob.source_resource_id] sorted by OrchRequest.id
+    """
+    with read_session() as session:
+        query = session.query(models.OrchJob.source_resource_id). \
+            join(models.OrchRequest,
+                 models.OrchJob.id == models.OrchRequest.orch_job_id). \
+            filter(models.OrchRequest.deleted == 0). \
+            filter(models.OrchJob.endpoint_type == endpoint_type)
+
+        if target_region_name:
+            query = query.filter(
+                models.OrchRequest.target_region_name == target_region_name)
+
+        if states:
+            query = query.filter(models.OrchRequest.state.in_(set(states)))
+
+        if resource_type is not None:
+            query = query.join(
+                models.Resource,
+                models.Resource.id == models.OrchJob.resource_id). \
+                filter(models.Resource.resource_type == resource_type)
+
+        query = query.order_by(asc(models.OrchRequest.id))
+        return [source_resource_id for source_resource_id, in query]
+
+
 @require_admin_context
 def orch_request_create(context, orch_job_id, target_region_name, values):
     with write_session() as session:
@@ -869,6 +971,88 @@ def orch_request_create(context, orch_job_id, target_region_name, values):
         return result
 
 
+def _orch_job_enqueue(context, resource_type, master_id, endpoint_type,
+                      operation_type, values, target_region_names):
+    with write_session() as session:
+        resource_ref = session.query(models.Resource). \
+            filter_by(deleted=0). \
+            filter_by(resource_type=resource_type). \
+            filter_by(master_id=master_id). \
+            first()
+        if not resource_ref:
+            resource_ref = models.Resource()
+            resource_ref.resource_type = resource_type
+            resource_ref.master_id = master_id
+            resource_ref.uuid = uuidutils.generate_uuid()
+            session.add(resource_ref)
+            session.flush()
+
+        orch_job_ref = models.OrchJob()
+        orch_job_ref.resource_id = resource_ref.id
+        orch_job_ref.endpoint_type = endpoint_type
+        orch_job_ref.operation_type = operation_type
+        if not values.get('uuid'):
+            values['uuid'] = uuidutils.generate_uuid()
+        values.setdefault('source_resource_id', master_id)
+        orch_job_ref.update(values)
+        session.add(orch_job_ref)
+        session.flush()
+
+        if target_region_names is None:
+            target_region_names = [
+                region_name for region_name, in
+                session.query(models.Subcloud.region_name).
+                filter_by(deleted=0)]
+
+        now = timeutils.utcnow()
+        rows = [{'uuid': uuidutils.generate_uuid(),
+                 'state': consts.ORCH_REQUEST_QUEUED,
+                 'try_count': 0,
+                 'target_region_name': region_name,
+                 'orch_job_id': orch_job_ref.id,
+                 'created_at': now,
+                 'deleted': 0}
+                for region_name in target_region_names]
+        table = models.OrchRequest.__table__
+        for start in range(0, len(rows), ORCH_REQUEST_INSERT_BATCH_SIZE):
+            session.execute(table.insert().values(
+                rows[start:start + ORCH_REQUEST_INSERT_BATCH_SIZE]))
+        return orch_job_ref
+
+
+@require_admin_context
+def orch_job_enqueue(context, resource_type, master_id, endpoint_type,
+                     operation_type, values, target_region_names=None):
+    """Enqueue a sync job for a set of subclouds in a single transaction.
+
+    The resource is looked up by type and master id, and created if it
+    does not exist yet. The orch_job is then created, along with one
+    queued orch_request per target region, using multi-row inserts.
+
+    :param context: authorization context
+    :param resource_type: Resource.resource_type
+    :param master_id: Resource.master_id
+    :param endpoint_type: OrchJob.endpoint_type
+    :param operation_type: OrchJob.operation_type
+    :param values: other OrchJob values
+    :param target_region_names: list of subcloud region names, all the
+                                subclouds when None
+    :return: the created OrchJob
+    """
+    try:
+        return _orch_job_enqueue(context, resource_type, master_id,
+                                 endpoint_type, operation_type, values,
+                                 target_region_names)
+    except db_exc.DBDuplicateEntry:
+        # Another thread created the same resource at the same time, it
+        # will be found when retrying.
+        LOG.info("Resource %s/%s created concurrently, retrying",
+                 resource_type, master_id)
+        return _orch_job_enqueue(context, resource_type, master_id,
+                                 endpoint_type, operation_type, values,
+                                 target_region_names)
+
+
 @require_admin_context
 def orch_request_update(context, orch_request_id, values):
     with write_session() as session:
@@ -1058,6 +1242,37 @@ def subcloud_sync_get(context, subcloud_name, endpoint_type):
     return _subcloud_sync_get(context, subcloud_name, endpoint_type)
 
 
+@require_context
+def subcloud_sync_get_pending(context, sync_requests,
+                              management_state=None,
+                              availability_status=None,
+                              initial_sync_state=None):
+    """Return the (subcloud_name, endpoint_type) with a pending sync
+
+    The sync_request is looked up through its index, the subcloud table
+    being only joined to filter on the subcloud states.
+    """
+    query = model_query(context, models.SubcloudSync.subcloud_name,
+                        models.SubcloudSync.endpoint_type). \
+        join(models.Subcloud,
+             models.Subcloud.region_name ==
+             models.SubcloudSync.subcloud_name). \
+        filter(models.SubcloudSync.sync_request.in_(sync_requests)). \
+        filter(models.Subcloud.deleted == 0)
+
+    if management_state:
+        query = query.filter(
+            models.Subcloud.management_state == management_state)
+    if availability_status:
+        query = query.filter(
+            models.Subcloud.availability_status == availability_status)
+    if initial_sync_state:
+        query = query.filter(
+            models.Subcloud.initial_sync_state == initial_sync_state)
+    return [(subcloud_name, endpoint_type)
+            for subcloud_name, endpoint_type in query.all()]
+
+
 def subcloud_sync_create(context, subcloud_name, endpoint_type, values):
     with write_session() as session:
         result = models.SubcloudSync()
@@ -1082,6 +1297,41 @@ def subcloud_sync_update(context, subcloud_name, endpoint_type, values):
         return result
 
 
+def subcloud_sync_update_endpoints(context, subcloud_name,
+                                   endpoint_type_list, values):
+    """Update the sync of the endpoints in endpoint_type_list of a subcloud.
+
+    Will raise if the subcloud sync does not exist.
+    """
+    with write_session() as session:
+        result = session.query(models.SubcloudSync). \
+            filter_by(subcloud_name=subcloud_name). \
+            filter(models.SubcloudSync.endpoint_type.in_(endpoint_type_list)). \
+            update(values, synchronize_session=False)
+    if not result:
+        raise exception.SubcloudSyncNotFound(subcloud_name=subcloud_name,
+                                             endpoint_type="any")
+
+    return result
+
+
+def subcloud_sync_update_all(context, management_state, endpoint_type,
+                             values):
+    """Update the endpoint sync of all subclouds in a management state.
+
+    The subclouds are selected through a subquery so that a single UPDATE
+    statement is issued whatever the number of subclouds.
+    """
+    with write_session() as session:
+        subclouds = session.query(models.Subcloud.region_name). \
+            filter_by(deleted=0). \
+            filter_by(management_state=management_state)
+        return session.query(models.SubcloudSync). \
+            filter_by(endpoint_type=endpoint_type). \
+            filter(models.SubcloudSync.subcloud_name.in_(subclouds)). \
+            update(values, synchronize_session=False)
+
+
 def subcloud_sync_delete(context, subcloud_name, endpoint_type):
     with write_session() as session:
         results = session.query(models.SubcloudSync). \
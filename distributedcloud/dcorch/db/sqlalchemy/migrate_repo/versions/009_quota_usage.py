@@ -0,0 +1,49 @@
+# Copyright (c) 2022 Wind River Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sqlalchemy
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    quota_usage = sqlalchemy.Table(
+        'quota_usage', meta,
+        sqlalchemy.Column('id', sqlalchemy.Integer,
+                          primary_key=True, nullable=False),
+        sqlalchemy.Column('project_id', sqlalchemy.String(255),
+                          nullable=False),
+        sqlalchemy.Column('user_id', sqlalchemy.String(255),
+                          nullable=False),
+        sqlalchemy.Column('usages', sqlalchemy.Text),
+        sqlalchemy.Column('created_at', sqlalchemy.DateTime),
+        sqlalchemy.Column('updated_at', sqlalchemy.DateTime),
+        sqlalchemy.Column('deleted_at', sqlalchemy.DateTime),
+        sqlalchemy.Column('deleted', sqlalchemy.Integer),
+
+        sqlalchemy.UniqueConstraint(
+            'project_id', 'user_id',
+            name='uniq_quota_usage0project_id0user_id'),
+
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    quota_usage.create()
+
+
+def downgrade(migrate_engine):
+    raise NotImplementedError('Database downgrade not supported - '
+                              'would drop all tables')
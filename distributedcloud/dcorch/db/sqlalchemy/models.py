@@ -138,6 +138,29 @@ class QuotaClass(BASE, OrchestratorBase):
     capabilities = Column(JSONEncodedDict)
 
 
+class QuotaUsage(BASE, OrchestratorBase):
+    """Represents the usage of a project/user summed across all the regions.
+
+    The usage is collected by the quota manager of the engine and read by
+    the API proxies. The user_id is empty for the overall project usage.
+    """
+
+    __tablename__ = 'quota_usage'
+
+    __table_args__ = (
+        UniqueConstraint('project_id', 'user_id',
+                         name='uniq_quota_usage0project_id0user_id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    project_id = Column(String(255), nullable=False)
+
+    user_id = Column(String(255), nullable=False, default='')
+
+    usages = Column(JSONEncodedDict)
+
+
 class Service(BASE, OrchestratorBase):
     """"Orchestrator service engine registry"""
 
@@ -318,6 +341,10 @@ class SubcloudSync(BASE, OrchestratorBase):
 
     __tablename__ = 'subcloud_sync'
 
+    __table_args__ = (
+        Index('subcloud_sync_sync_request_idx', 'sync_request'),
+    )
+
     id = Column(Integer, primary_key=True)
     subcloud_id = Column('subcloud_id', Integer,
                          ForeignKey('subcloud.id', ondelete='CASCADE'))
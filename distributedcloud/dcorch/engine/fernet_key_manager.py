@@ -29,6 +29,7 @@ from dcorch.common import exceptions
 from dcorch.common.i18n import _
 from dcorch.common import manager
 from dcorch.common import utils
+from dcorch.rpc import client as rpc_client
 
 
 FERNET_REPO_MASTER_ID = "keys"
@@ -51,6 +52,7 @@ class FernetKeyManager(manager.Manager):
         self.context = context.get_admin_context()
         self.endpoint_type = consts.ENDPOINT_TYPE_PLATFORM
         self.resource_type = consts.RESOURCE_TYPE_SYSINV_FERNET_REPO
+        self.rpc_client = rpc_client.EngineClient()
 
     @classmethod
     def to_resource_info(cls, key_list):
@@ -81,7 +83,10 @@ class FernetKeyManager(manager.Manager):
                                operation_type,
                                resource_info=jsonutils.dumps(resource_info),
                                subcloud=subcloud)
-            # wake up sync thread
+            # drop the master keys cached by the audit and wake up
+            # sync thread
+            self.rpc_client.invalidate_master_resources(self.context,
+                                                        self.endpoint_type)
             if self.gsm:
                 self.gsm.sync_request(self.context, self.endpoint_type)
         except Exception as e:
@@ -38,8 +38,11 @@ from dcorch.objects import subcloud
 LOG = logging.getLogger(__name__)
 
 CHECK_AUDIT_INTERVAL = 300  # frequency to check for audit work
+CHECK_SYNC_INTERVAL = 5  # frequency to check for sync work when not woken
 SYNC_TIMEOUT = 600  # Timeout for subcloud sync
 AUDIT_INTERVAL = 1200  # Default audit interval
+SYNC_POOL_SIZE = 100  # Maximum number of concurrent subcloud syncs
+AUDIT_POOL_SIZE = 100  # Maximum number of concurrent subcloud audits
 
 # sync object endpoint type and subclass mappings
 sync_object_class_map = {
@@ -56,18 +59,19 @@ class GenericSyncManager(object):
         super(GenericSyncManager, self).__init__()
         self.context = context.get_admin_context()
         self.engine_id = engine_id
-        # Keeps track of greenthreads we create to do the sync work.
-        self.thread_group_manager = scheduler.ThreadGroupManager(
-            thread_pool_size=100)
-        # Keeps track of greenthreads we create to do the audit work.
-        self.audit_thread_group_manager = scheduler.ThreadGroupManager(
-            thread_pool_size=100)
+        # Schedules the sync work, per subcloud endpoint type.
+        self.sync_scheduler = scheduler.WorkQueueScheduler(
+            'Sync', SYNC_POOL_SIZE, deadline=SYNC_TIMEOUT,
+            on_timeout=self._sync_timed_out)
+        # Schedules the audit work, per subcloud endpoint type.
+        self.audit_scheduler = scheduler.WorkQueueScheduler(
+            'Audit', AUDIT_POOL_SIZE, deadline=SYNC_TIMEOUT,
+            on_timeout=self._audit_timed_out)
         # this needs to map a name to a dictionary
         # stores the sync object per region per endpoint type
         self.sync_objs = collections.defaultdict(dict)
-        # Track greenthreads created for each subcloud.
-        self.subcloud_threads = list()
-        self.subcloud_audit_threads = list()
+        # Signaled when sync work has been requested to this engine
+        self.sync_wakeup = eventlet.event.Event()
 
     def init_from_db(self, context):
         subclouds = subcloud.SubcloudList.get_all(context)
@@ -99,8 +103,15 @@ class GenericSyncManager(object):
 
         while True:
             try:
+                # Reset the wakeup before looking for work so that the
+                # requests made while syncing are not missed
+                self.sync_wakeup = eventlet.event.Event()
                 self.sync_subclouds(engine_id)
-                eventlet.greenthread.sleep(5)
+                # Wait to be woken by a sync request, still checking
+                # periodically for work requested to the other engines
+                # and for failed syncs to retry
+                with eventlet.timeout.Timeout(CHECK_SYNC_INTERVAL, False):
+                    self.sync_wakeup.wait()
             except eventlet.greenlet.GreenletExit:
                 # We have been told to exit
                 return
@@ -121,103 +132,86 @@ class GenericSyncManager(object):
                 LOG.exception(e)
 
     def sync_subclouds(self, engine_id):
-        # get a list of subclouds that is online, managed and initial_sync is
-        # completed, than check if subcloud_name in self.sync_objs
-        # When the subcloud is managed, it will be returned in the list in the
-        # next cycle. When the subcloud is unmanaged, it will not be included
-        # in the list in the next cycle
-        # get the subcloud/endpoint list has sync_request set to requested
-        #
-        subclouds = db_api.subcloud_get_all(
+        # get the subcloud/endpoint list that has sync_request set to
+        # requested or failed, for the subclouds that are online, managed
+        # and whose initial_sync is completed.
+        # When the subcloud is managed, it will be returned in the list in
+        # the next cycle. When the subcloud is unmanaged, it will not be
+        # included in the list in the next cycle
+        pending = db_api.subcloud_sync_get_pending(
             self.context,
+            [dco_consts.SYNC_STATUS_REQUESTED, dco_consts.SYNC_STATUS_FAILED],
             management_state=dcm_consts.MANAGEMENT_MANAGED,
             availability_status=dcm_consts.AVAILABILITY_ONLINE,
             initial_sync_state=dco_consts.INITIAL_SYNC_STATE_COMPLETED)
         # randomize to reduce likelihood of sync_lock contention
-        random.shuffle(subclouds)
-        sc_names = []
-        for sc in subclouds:
-            if sc.region_name in self.sync_objs:
-                sc_names.append(sc.region_name)
-                for ept in self.sync_objs[sc.region_name].keys():
-                    try:
-                        self.sync_subcloud(self.context, engine_id, sc.region_name,
-                                           ept, 'sync')
-                    except exceptions.SubcloudSyncNotFound:
-                        # The endpoint in subcloud_sync has been removed
-                        LOG.info("Engine id:(%s/%s) SubcloudSyncNotFound "
-                                 "remove from sync_obj endpoint_type %s" %
-                                 (engine_id, sc.region_name, ept))
-                        self.sync_objs[sc.region_name].pop(ept, None)
-
-        LOG.debug('Engine id:(%s) Waiting for sync_subclouds %s to complete.'
-                  % (engine_id, sc_names))
-        for thread in self.subcloud_threads:
-            thread.wait()
-
-        # Clear the list of threads before next interval
-        self.subcloud_threads = list()
-        LOG.debug('Engine id:(%s): All subcloud syncs have completed.'
-                  % engine_id)
+        random.shuffle(pending)
+        for subcloud_name, ept in pending:
+            if ept not in self.sync_objs.get(subcloud_name, {}):
+                continue
+            # The work already queued or running is not queued again
+            self.sync_scheduler.submit(
+                subcloud_name, ept, self._sync_subcloud, self.context,
+                engine_id, subcloud_name, ept)
+
+        LOG.debug('Engine id:(%s) sync scheduler: %s' %
+                  (engine_id, self.sync_scheduler.get_stats()))
 
     def _get_endpoint_sync_request(self, subcloud_name, endpoint_type):
         sc = subcloud.Subcloud.get_by_name(self.context, subcloud_name)
         return sc.sync_request.get(endpoint_type)
 
     @subcloud_lock.sync_subcloud
-    def mutex_start_thread(self, context, engine_id, subcloud_name,
-                           endpoint_type, action):
+    def mutex_start_sync(self, context, engine_id, subcloud_name,
+                         endpoint_type, action):
         # Double check whether still need while locked this time
         subcloud_sync = db_api.subcloud_sync_get(context, subcloud_name,
                                                  endpoint_type)
         if subcloud_sync.sync_request in [dco_consts.SYNC_STATUS_REQUESTED,
                                           dco_consts.SYNC_STATUS_FAILED]:
-            thread = self.thread_group_manager.start(
-                self._sync_subcloud, context, engine_id, subcloud_name,
-                endpoint_type)
-            self.subcloud_threads.append(thread)
-        else:
-            LOG.debug("mutex_start_thread Engine id: %s/%s sync not required" %
-                      (engine_id, subcloud_name))
-
-    def sync_subcloud(self, context, engine_id, subcloud_name, endpoint_type,
-                      action):
-        # precheck if the sync_state is still started
-        subcloud_sync = db_api.subcloud_sync_get(context, subcloud_name,
-                                                 endpoint_type)
-
-        if subcloud_sync.sync_request in [dco_consts.SYNC_STATUS_REQUESTED,
-                                          dco_consts.SYNC_STATUS_FAILED]:
-            self.mutex_start_thread(
-                context, engine_id, subcloud_name, endpoint_type, action)
-        else:
-            LOG.debug("Engine id: %s/%s sync not required" %
-                      (engine_id, subcloud_name))
+            db_api.subcloud_sync_update(
+                context, subcloud_name, endpoint_type,
+                values={'sync_request': dco_consts.SYNC_STATUS_IN_PROGRESS})
+            return True
+        LOG.debug("mutex_start_sync Engine id: %s/%s sync not required" %
+                  (engine_id, subcloud_name))
+        return False
 
     def _sync_subcloud(self, context, engine_id, subcloud_name, endpoint_type):
-        db_api.subcloud_sync_update(
-            context, subcloud_name, endpoint_type,
-            values={'sync_request': dco_consts.SYNC_STATUS_IN_PROGRESS})
-        obj = self.sync_objs[subcloud_name][endpoint_type]
+        # The subcloud may have been removed while the sync was queued
+        obj = self.sync_objs.get(subcloud_name, {}).get(endpoint_type)
+        if obj is None:
+            return
+        try:
+            if not self.mutex_start_sync(context, engine_id, subcloud_name,
+                                         endpoint_type, 'sync'):
+                return
+        except exceptions.SubcloudSyncNotFound:
+            # The endpoint in subcloud_sync has been removed
+            LOG.info("Engine id:(%s/%s) SubcloudSyncNotFound "
+                     "remove from sync_obj endpoint_type %s" %
+                     (engine_id, subcloud_name, endpoint_type))
+            self.sync_objs.get(subcloud_name, {}).pop(endpoint_type, None)
+            return
+
+        # The sync is interrupted by the scheduler past SYNC_TIMEOUT
         new_state = dco_consts.SYNC_STATUS_COMPLETED
-        timeout = eventlet.timeout.Timeout(SYNC_TIMEOUT)
         try:
             obj.sync(engine_id)
-        except eventlet.timeout.Timeout as t:
-            if t is not timeout:
-                raise  # not my timeout
-            new_state = dco_consts.SYNC_STATUS_FAILED
         except Exception as e:
             LOG.exception('Sync failed for %s/%s: %s',
                           subcloud_name, endpoint_type, e)
             new_state = dco_consts.SYNC_STATUS_FAILED
-        finally:
-            timeout.cancel()
 
         db_api.subcloud_sync_update(
             context, subcloud_name, endpoint_type,
             values={'sync_request': new_state})
 
+    def _sync_timed_out(self, subcloud_name, endpoint_type):
+        db_api.subcloud_sync_update(
+            self.context, subcloud_name, endpoint_type,
+            values={'sync_request': dco_consts.SYNC_STATUS_FAILED})
+
     def add_subcloud(self, context, name, version):
         # create subcloud in DB and create the sync objects
         LOG.info('adding subcloud %(sc)s' % {'sc': name})
@@ -253,12 +247,16 @@ class GenericSyncManager(object):
 
     def sync_request(self, ctxt, endpoint_type):
         # Someone has enqueued a sync job. set the endpoint sync_request to
-        # requested
-        subclouds = db_api.subcloud_get_all(
-            ctxt, management_state=dcm_consts.MANAGEMENT_MANAGED)
-        for sc in subclouds:
-            GenericSyncManager.set_sync_request(ctxt, sc.region_name,
-                                                endpoint_type)
+        # requested for all the managed subclouds at once
+        db_api.subcloud_sync_update_all(
+            ctxt, dcm_consts.MANAGEMENT_MANAGED, endpoint_type,
+            values={'sync_request': dco_consts.SYNC_STATUS_REQUESTED})
+        self.wakeup_sync()
+
+    def wakeup_sync(self):
+        # Start looking for sync work without waiting for the next check
+        if not self.sync_wakeup.ready():
+            self.sync_wakeup.send()
 
     @classmethod
     def set_sync_request(cls, ctxt, subcloud_name, endpoint_type):
@@ -309,13 +307,12 @@ class GenericSyncManager(object):
                  {'sc': subcloud_name})
 
         endpoint_type_list = dco_consts.SYNC_ENDPOINT_TYPES_LIST[:]
-        for endpoint_type in endpoint_type_list:
-            db_api.subcloud_sync_update(
-                self.context, subcloud_name, endpoint_type,
-                values={'audit_status': dco_consts.AUDIT_STATUS_NONE,
-                        'sync_status_reported': dco_consts.SYNC_STATUS_NONE,
-                        'sync_status_report_time': None,
-                        'last_audit_time': None})
+        db_api.subcloud_sync_update_endpoints(
+            self.context, subcloud_name, endpoint_type_list,
+            values={'audit_status': dco_consts.AUDIT_STATUS_NONE,
+                    'sync_status_reported': dco_consts.SYNC_STATUS_NONE,
+                    'sync_status_report_time': None,
+                    'last_audit_time': None})
 
     def enable_subcloud(self, context, subcloud_name):
         LOG.info('enabling subcloud %(sc)s' % {'sc': subcloud_name})
@@ -490,8 +487,8 @@ class GenericSyncManager(object):
                           {'sc': subcloud_name})
 
     @subcloud_lock.sync_subcloud
-    def audit_subcloud(self, context, engine_id, subcloud_name, endpoint_type,
-                       action):
+    def mutex_start_audit(self, context, engine_id, subcloud_name,
+                          endpoint_type, action):
         subcloud_sync = db_api.subcloud_sync_get(context, subcloud_name,
                                                  endpoint_type)
         # check if the last audit time is equal or greater than the audit
@@ -514,37 +511,50 @@ class GenericSyncManager(object):
             audit = True
 
         if audit:
-            thread = self.thread_group_manager.start(
-                self._audit_subcloud, engine_id, subcloud_name, endpoint_type)
-            self.subcloud_audit_threads.append(thread)
+            # The last_audit_time is set while locked in order to ensure
+            # the check for in progress and last_audit_time of the other
+            # engines sees this audit
+            db_api.subcloud_sync_update(
+                context, subcloud_name, endpoint_type,
+                values={'audit_status': dco_consts.AUDIT_STATUS_IN_PROGRESS,
+                        'last_audit_time': timeutils.utcnow()})
+        return audit
 
     def _audit_subcloud(self, engine_id, subcloud_name, endpoint_type):
-        # The last_audit_time is set up front in order to ensure synchronous
-        # audit_subcloud() check for in progress and last_audit_time
-        db_api.subcloud_sync_update(
-            context, subcloud_name, endpoint_type,
-            values={'audit_status': dco_consts.AUDIT_STATUS_IN_PROGRESS,
-                    'last_audit_time': timeutils.utcnow()})
-        obj = self.sync_objs[subcloud_name][endpoint_type]
+        # The subcloud may have been removed while the audit was queued
+        obj = self.sync_objs.get(subcloud_name, {}).get(endpoint_type)
+        if obj is None:
+            return
+        if not self.mutex_start_audit(self.context, engine_id, subcloud_name,
+                                      endpoint_type, 'audit'):
+            return
+
+        # The audit is interrupted by the scheduler past SYNC_TIMEOUT
         new_state = dco_consts.AUDIT_STATUS_COMPLETED
-        timeout = eventlet.timeout.Timeout(SYNC_TIMEOUT)
         try:
             obj.run_sync_audit(engine_id)
-        except eventlet.timeout.Timeout as t:
-            if t is not timeout:
-                raise  # not my timeout
-            new_state = dco_consts.AUDIT_STATUS_FAILED
         except Exception as e:
             LOG.exception('Audit failed for %s/%s: %s',
                           subcloud_name, endpoint_type, e)
             new_state = dco_consts.AUDIT_STATUS_FAILED
-        finally:
-            timeout.cancel()
 
         db_api.subcloud_sync_update(
-            context, subcloud_name, endpoint_type,
+            self.context, subcloud_name, endpoint_type,
             values={'audit_status': new_state})
 
+    def _audit_timed_out(self, subcloud_name, endpoint_type):
+        db_api.subcloud_sync_update(
+            self.context, subcloud_name, endpoint_type,
+            values={'audit_status': dco_consts.AUDIT_STATUS_FAILED})
+
+    def _submit_audits(self, engine_id, subcloud_name):
+        for e in self.sync_objs[subcloud_name].keys():
+            LOG.debug("Attempt audit_subcloud: %s/%s/%s",
+                      engine_id, subcloud_name, e)
+            self.audit_scheduler.submit(
+                subcloud_name, e, self._audit_subcloud, engine_id,
+                subcloud_name, e)
+
     def run_sync_audit(self, engine_id):
         LOG.info('run_sync_audit %(id)s' % {'id': engine_id})
         # get a list of subclouds that are enabled
@@ -558,11 +568,7 @@ class GenericSyncManager(object):
         random.shuffle(subclouds)
         for sc in subclouds:
             if sc.region_name in list(self.sync_objs.keys()):
-                for e in self.sync_objs[sc.region_name].keys():
-                    LOG.debug("Attempt audit_subcloud: %s/%s/%s",
-                              engine_id, sc.region_name, e)
-                    self.audit_subcloud(self.context, engine_id,
-                                        sc.region_name, e, 'audit')
+                self._submit_audits(engine_id, sc.region_name)
             else:
                 # In this case, distribution of sync objects are
                 # to each worker.  If needed in future implementation,
@@ -576,22 +582,11 @@ class GenericSyncManager(object):
                 self.create_sync_objects(sc.region_name, capabilities)
                 # self.sync_objs stores the sync object per endpoint
                 if sc.region_name in list(self.sync_objs.keys()):
-                    for e in self.sync_objs[sc.region_name].keys():
-                        LOG.debug("Attempt audit_subcloud: %s/%s/%s",
-                                  engine_id, sc.region_name, e)
-                        self.audit_subcloud(self.context, engine_id,
-                                            sc.region_name, e, 'audit')
+                    self._submit_audits(engine_id, sc.region_name)
                 else:
                     LOG.error('Run sync audit subcloud %(sc)s '
                               'sync_objs not found' %
                               {'sc': sc.region_name})
 
-        LOG.debug('Engine id:(%s) Waiting for audit_subclouds to complete.'
-                  % engine_id)
-        for thread in self.subcloud_audit_threads:
-            thread.wait()
-
-        # Clear the list of threads before next interval
-        self.subcloud_audit_threads = list()
-        LOG.info('Engine id:(%s): All subcloud audit have completed.'
-                 % engine_id)
+        LOG.info('Engine id:(%s): Subcloud audits queued, audit scheduler: '
+                 '%s' % (engine_id, self.audit_scheduler.get_stats()))
@@ -30,6 +30,8 @@ LOG = logging.getLogger(__name__)
 SYNC_INTERVAL = 10
 # How long to wait after a failed sync before retrying
 SYNC_FAIL_HOLD_OFF = 60
+# Maximum number of concurrent initial syncs
+SYNC_POOL_SIZE = 50
 
 
 class InitialSyncManager(object):
@@ -40,11 +42,9 @@ class InitialSyncManager(object):
         self.gsm = gsm
         self.fkm = fkm
         self.context = context.get_admin_context()
-        # Keeps track of greenthreads we create to do work.
-        self.thread_group_manager = scheduler.ThreadGroupManager(
-            thread_pool_size=50)
-        # Track greenthreads created for each subcloud.
-        self.subcloud_threads = dict()
+        # Schedules the initial sync of the subclouds.
+        self.scheduler = scheduler.WorkQueueScheduler('Initial sync',
+                                                      SYNC_POOL_SIZE)
 
     def init_actions(self, engine_id):
         """Perform actions on initialization"""
@@ -93,25 +93,15 @@ class InitialSyncManager(object):
         for subcloud in db_api.subcloud_get_all(
                 self.context,
                 initial_sync_state=consts.INITIAL_SYNC_STATE_REQUESTED):
-            # Create a new greenthread for each subcloud to allow the
-            # initial syncs to be done in parallel. If there are not enough
-            # greenthreads in the pool, this will block until one becomes
-            # available.
-            self.subcloud_threads[subcloud.region_name] = \
-                self.thread_group_manager.start(
-                    self._initial_sync_subcloud, self.context, engine_id,
-                    subcloud.region_name, 'none', 'none')
-
-        # Wait for all greenthreads to complete. This both throttles the
-        # initial syncs and ensures we don't attempt to do an initial sync
-        # for a subcloud before a previous initial sync completes.
-        LOG.debug('Waiting for initial syncs to complete.')
-        for thread in self.subcloud_threads.values():
-            thread.wait()
-
-        # Clear the list of threads before next audit
-        self.subcloud_threads = dict()
-        LOG.debug('All subcloud initial syncs have completed.')
+            # Queue the initial sync of each subcloud, it is started as
+            # soon as a greenthread is available. An initial sync still
+            # queued or in progress for the subcloud is not queued again.
+            self.scheduler.submit(
+                subcloud.region_name, 'initial_sync',
+                self._initial_sync_subcloud, self.context, engine_id,
+                subcloud.region_name, 'none', 'none')
+
+        LOG.debug('Initial sync scheduler: %s' % self.scheduler.get_stats())
 
     @subcloud_lock.sync_subcloud
     def _initial_sync_subcloud(self, context, engine_id, subcloud_name,
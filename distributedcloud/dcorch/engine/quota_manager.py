@@ -15,13 +15,16 @@
 
 import collections
 import copy
+import datetime
 import re
-from six.moves.queue import Queue
 import threading
 import time
 
+import eventlet
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_utils import timeutils
+import six
 
 from dccommon import consts as dccommon_consts
 from dccommon import endpoint_cache
@@ -42,8 +45,12 @@ LOG = logging.getLogger(__name__)
 # number of projects in each batch
 batch_opts = [
     cfg.IntOpt('batch_size',
-               default=3,
-               help='Batch size number of projects will be synced at a time')
+               default=100,
+               help='Batch size number of projects will be synced at a time'),
+    cfg.IntOpt('worker_pool_size',
+               default=20,
+               help='Maximum number of concurrent requests made to the '
+                    'regions by the quota sync')
 ]
 
 batch_opt_group = cfg.OptGroup('batch')
@@ -64,6 +71,8 @@ class QuotaManager(manager.Manager):
     # tuples.  (Where the user-ID can be None for project-only usage.)
     total_project_usages = {}
     regions_usage_dict = {}
+    # Time (from time.time()) at which the usage was last collected.
+    usage_update_times = {}
 
     def __init__(self, *args, **kwargs):
         LOG.debug(_('QuotaManager initialization...'))
@@ -72,6 +81,9 @@ class QuotaManager(manager.Manager):
                                            *args, **kwargs)
         self.context = context.get_admin_context()
         self.endpoints = endpoint_cache.EndpointCache()
+        # Bounded pool running the requests made to the regions
+        self.pool = eventlet.greenpool.GreenPool(
+            cfg.CONF.batch.worker_pool_size)
 
         # This lock is used to ensure we only have one quota sync audit at
         # a time.  For better efficiency we could use per-project locks
@@ -144,7 +156,6 @@ class QuotaManager(manager.Manager):
                       )
             return
         LOG.info("Successfully acquired lock")
-        projects_thread_list = []
 
         # Generate a list of project_id/user_id tuples that need to have their
         # quotas updated.  This is basically all projects, and the
@@ -163,58 +174,242 @@ class QuotaManager(manager.Manager):
             # The same keys should be in QuotaManager.total_project_usages
             # so we only need to look at one of them.
             to_delete = [k for k in QuotaManager.regions_usage_dict
-                         if k not in project_user_mod_list]
+                         if k not in project_user_list]
             for k in to_delete:
                 del QuotaManager.regions_usage_dict[k]
                 del QuotaManager.total_project_usages[k]
+                QuotaManager.usage_update_times.pop(k, None)
 
-        # Iterate through project list and call sync project for each project
-        # using threads
-        # Divide list of projects into batches and perfrom quota sync
-        # for one batch at a time.
+        # Divide list of projects into batches and perform quota sync
+        # for one batch at a time. The usage of a batch is read from each
+        # region at once, and the ids of the projects and users in the
+        # subclouds are looked up once for the whole run.
+        region_ids = {}
         for current_batch_projects_users in utils.get_batch_projects(
                 cfg.CONF.batch.batch_size, project_user_list):
             # "current_batch_projects_users" may have some None entries that
             # we don't want to iterate over.
             current_batch_projects_users = [
-                x for x in current_batch_projects_users if x is not None]
+                x for x in current_batch_projects_users
+                if x is not None and x[0]]
             LOG.info("Syncing quota for current batch with projects: %s",
                      current_batch_projects_users)
-            for project_id, user_id in current_batch_projects_users:
-                if project_id:
-                    thread = threading.Thread(
-                        target=self.quota_sync_for_project,
-                        args=(project_id, user_id,))
-                    projects_thread_list.append(thread)
-                    thread.start()
-                # Wait for all the threads to complete
-                # the job(sync all projects quota)
-                for current_thread in projects_thread_list:
-                    current_thread.join()
+            self._balance_projects(current_batch_projects_users, region_ids)
+
+        # The usage of the projects/users still around has just been
+        # collected, what is left is from deleted projects or users.
+        try:
+            db_api.quota_usage_purge(
+                self.context,
+                timeutils.utcnow() - datetime.timedelta(
+                    seconds=CONF.quota_usage_cache_ttl))
+        except Exception as e:
+            LOG.error("Failed to purge the stale quota usage: %s", str(e))
         dc_orch_lock.sync_lock_release(engine_id, TASK_TYPE,
                                        self.quota_audit_lock)
 
-    def read_quota_usage(self, project_id, user_id, region, usage_queue):
-        # Writes usage dict to the Queue in the following format
-        # {'region_name': (<nova_usages>, <neutron_usages>, <cinder_usages>)}
-        LOG.info("Reading quota usage for project: %(project_id)s and user: "
-                 "%(user_id)s in %(region)s",
-                 {'project_id': project_id, 'user_id': user_id,
-                  'region': region}
-                 )
-        os_client = sdk.OpenStackDriver(region)
+    def _run_in_pool(self, func, args_list):
+        # Runs func(*args) for each args of the list in the bounded pool.
+        # Returns the results in order, None for the calls that failed.
+        def run(args):
+            try:
+                return func(*args)
+            except Exception as e:
+                # Only the region, project and user ids are logged, not
+                # the names and limits passed along with them.
+                ids = [arg for arg in args
+                       if isinstance(arg, six.string_types)]
+                LOG.error("%s(%s) failed: %s", func.__name__,
+                          ', '.join(ids), str(e))
+                return None
+        return list(self.pool.imap(run, args_list))
+
+    def _get_projects_info(self, os_driver, project_user_list):
+        # Returns the regions of each project, and the names of the
+        # projects and users, which are needed to find them in the
+        # subclouds.  The names are listed at once rather than per id.
+        project_ids = sorted(set(p for p, _ in project_user_list))
+        user_ids = sorted(set(u for _, u in project_user_list if u))
+
+        project_regions = dict(zip(project_ids, self._run_in_pool(
+            os_driver.get_all_regions_for_project,
+            [(project_id,) for project_id in project_ids])))
+
+        project_names = dict(
+            (project.id, project.name) for project in
+            os_driver.get_enabled_projects(id_only=False) or [])
+        user_names = {}
+        if user_ids:
+            user_names = dict(
+                (user.id, user.name) for user in
+                os_driver.get_enabled_users(id_only=False) or [])
+        # Disabled projects and users aren't listed
+        for project_id in project_ids:
+            if project_id not in project_names:
+                project = os_driver.get_project_by_id(project_id)
+                project_names[project_id] = getattr(project, 'name', None)
+        for user_id in user_ids:
+            if user_id not in user_names:
+                user = os_driver.get_user_by_id(user_id)
+                user_names[user_id] = getattr(user, 'name', None)
+        return project_regions, project_names, user_names
+
+    def _get_region_ids(self, os_client, region, region_ids):
+        # Returns the ids of the projects and users of the region, by name
+        ids = region_ids.get(region)
+        if ids is None:
+            ids = (dict((project.name, project.id) for project in
+                        os_client.get_enabled_projects(id_only=False) or []),
+                   dict((user.name, user.id) for user in
+                        os_client.get_enabled_users(id_only=False) or []))
+            # Don't keep the result of a failed listing
+            if ids[0]:
+                region_ids[region] = ids
+        return ids
+
+    def read_quota_usage(self, os_client, project_id, user_id):
+        # Returns the usage dict of the project/user in the region of the
+        # client, merging the nova, neutron and cinder usages.
         (nova_usage, neutron_usage, cinder_usage) = \
             os_client.get_resource_usages(project_id, user_id)
         total_region_usage = collections.defaultdict(dict)
-        # region_usage[0], region_usage[1], region_usage[3] are
-        # nova, neutron & cinder usages respectively
         if nova_usage:
             total_region_usage.update(nova_usage)
         if neutron_usage:
             total_region_usage.update(neutron_usage)
         if cinder_usage:
             total_region_usage.update(cinder_usage)
-        usage_queue.put({region: total_region_usage})
+        return total_region_usage
+
+    def _read_region_usages(self, region, project_user_list, project_names,
+                            user_names, region_ids):
+        # Returns the usage of the projects/users in the region, keyed by
+        # the project-ID/user-ID tuples of the master cloud.
+        LOG.info("Reading quota usage of %(count)d projects/users in "
+                 "%(region)s", {'count': len(project_user_list),
+                                'region': region})
+        os_client = sdk.OpenStackDriver(region)
+        is_master = region == dccommon_consts.VIRTUAL_MASTER_CLOUD
+        if not is_master:
+            sc_project_ids, sc_user_ids = self._get_region_ids(
+                os_client, region, region_ids)
+        usages = {}
+        for project_id, user_id in project_user_list:
+            if is_master:
+                sc_project_id, sc_user_id = project_id, user_id
+            else:
+                sc_project_id = sc_project_ids.get(
+                    project_names.get(project_id))
+                if not sc_project_id:
+                    LOG.info("Cannot find project %s in subcloud %s. "
+                             "Skipping quota usage for this project on "
+                             "subcloud", project_names.get(project_id),
+                             region)
+                    continue
+                sc_user_id = None
+                if user_id:
+                    sc_user_id = sc_user_ids.get(user_names.get(user_id))
+            try:
+                usages[(project_id, user_id)] = self.read_quota_usage(
+                    os_client, sc_project_id, sc_user_id)
+            except Exception as e:
+                LOG.error("quota usage %s: %s", region, str(e))
+        return usages
+
+    def _collect_usage_matrix(self, project_user_list, project_regions,
+                              project_names, user_names, region_ids):
+        # Returns a dict where the keys are the region names and the
+        # values the usage of the projects/users in that region.  Each
+        # region is read once for all the projects/users of the list.
+        region_projects = collections.defaultdict(list)
+        for project_id, user_id in project_user_list:
+            for region in project_regions.get(project_id) or []:
+                region_projects[region].append((project_id, user_id))
+        regions = sorted(region_projects)
+        results = self._run_in_pool(
+            self._read_region_usages,
+            [(region, region_projects[region], project_names, user_names,
+              region_ids) for region in regions])
+        return dict((region, usages) for region, usages
+                    in zip(regions, results) if usages is not None)
+
+    @staticmethod
+    def _get_regions_usage(project_id, user_id, project_regions,
+                           usage_matrix):
+        # Returns the per-region usage of the project/user, or an empty
+        # dict unless it was read from all the regions of the project.
+        regions_usage_dict = collections.defaultdict(dict)
+        for region in project_regions.get(project_id) or []:
+            usage = usage_matrix.get(region, {}).get((project_id, user_id))
+            if usage is None:
+                return collections.defaultdict(dict)
+            regions_usage_dict[region] = usage
+        return regions_usage_dict
+
+    def _balance_projects(self, project_user_list, region_ids=None):
+        # Sync the quota limits of the projects/users in all the regions.
+        # Global remaining limit =
+        #   DC Orchestrator global limit - Summation of usages
+        #                          in all the regions
+        # New quota limit = Global remaining limit + usage in that region
+        if region_ids is None:
+            region_ids = {}
+        os_driver = sdk.OpenStackDriver()
+        project_regions, project_names, user_names = \
+            self._get_projects_info(os_driver, project_user_list)
+        usage_matrix = self._collect_usage_matrix(
+            project_user_list, project_regions, project_names, user_names,
+            region_ids)
+
+        # Get the global limits from the master cloud.
+        global_limits = self._run_in_pool(
+            self.get_overall_tenant_quota_limits, project_user_list)
+
+        limits_to_write = []
+        for (project_id, user_id), dc_orch_global_limits in zip(
+                project_user_list, global_limits):
+            total_project_usages, regions_usage_dict = \
+                self.quota_usage_update(
+                    project_id, user_id,
+                    self._get_regions_usage(project_id, user_id,
+                                            project_regions, usage_matrix))
+            if total_project_usages is None or dc_orch_global_limits is None:
+                continue
+
+            # Calculate how much of the various limits have not yet been
+            # used.
+            unused_global_limits = collections.Counter(
+                dc_orch_global_limits) - collections.Counter(
+                    total_project_usages)
+
+            for current_region in regions_usage_dict:
+                # Skip the master region.  Its quotas should already be
+                # up to date for managed resources.
+                if current_region == dccommon_consts.VIRTUAL_MASTER_CLOUD:
+                    continue
+                # (NOTE: knasim-wrs): The Master Cloud's Project ID and
+                # User ID dont mean anything for the subcloud, so use the
+                # IDs of the same project and user names in that subcloud.
+                sc_project_ids, sc_user_ids = region_ids.get(
+                    current_region, ({}, {}))
+                sc_project_id = sc_project_ids.get(project_names[project_id])
+                if not sc_project_id:
+                    continue
+                sc_user_id = None
+                if user_id:
+                    sc_user_id = sc_user_ids.get(user_names.get(user_id))
+                # Calculate the new limit for this region.
+                region_new_limits = dict(
+                    unused_global_limits + collections.Counter(
+                        regions_usage_dict[current_region]))
+                # Reformat the limits
+                region_new_limits = self._arrange_quotas_by_service_name(
+                    region_new_limits)
+                limits_to_write.append((sc_project_id, sc_user_id,
+                                        region_new_limits, current_region))
+
+        # Update the subclouds with the new limits
+        self._run_in_pool(self.update_quota_limits, limits_to_write)
 
     def get_summation(self, regions_dict):
         # Adds resources usages from different regions
@@ -287,10 +482,13 @@ class QuotaManager(manager.Manager):
         os_client = sdk.OpenStackDriver(current_region)
         os_client.write_quota_limits(project_id, user_id, region_new_limit)
 
-    def quota_usage_update(self, project_id, user_id):
-        # Update the quota usage for the specified project/user
-        regions_usage_dict = self.get_tenant_quota_usage_per_region(project_id,
-                                                                    user_id)
+    def quota_usage_update(self, project_id, user_id,
+                           regions_usage_dict=None):
+        # Update the quota usage for the specified project/user, reading
+        # the per-region usage unless it is given.
+        if regions_usage_dict is None:
+            regions_usage_dict = self.get_tenant_quota_usage_per_region(
+                project_id, user_id)
         if not regions_usage_dict:
             # Skip syncing for the project if not able to read regions usage
             LOG.error("Error reading regions usage for the project: "
@@ -325,85 +523,26 @@ class QuotaManager(manager.Manager):
                 copy.deepcopy(total_project_usages)
             QuotaManager.regions_usage_dict[(project_id, user_id)] = \
                 copy.deepcopy(regions_usage_dict)
+            QuotaManager.usage_update_times[(project_id, user_id)] = \
+                time.time()
+
+        # Share the global usage with the API proxies so they can answer
+        # the quota queries without asking the engine.
+        try:
+            db_api.quota_usage_update(self.context, project_id, user_id,
+                                      total_project_usages)
+        except Exception as e:
+            LOG.error("Failed to save the usage of project: %(project)s "
+                      "user: %(user)s: %(error)s",
+                      {'project': project_id, 'user': user_id,
+                       'error': str(e)})
 
         return total_project_usages, regions_usage_dict
 
     def quota_sync_for_project(self, project_id, user_id):
-        # Sync quota limits for the project according to below formula
-        # Global remaining limit =
-        #   DC Orchestrator global limit - Summation of usages
-        #                          in all the regions
-        # New quota limit = Global remaining limit + usage in that region
         LOG.info("Quota sync called for project: %(project)s user: %(user)s",
                  {'project': project_id, 'user': user_id})
-        regions_thread_list = []
-        # Retrieve regions for the project.  This is also done in
-        # get_tenant_quota_usage_per_region() so we may be able to only do
-        # it once. Would have to consider the failure  modes though.
-        os_driver = sdk.OpenStackDriver()
-        region_lists = os_driver.get_all_regions_for_project(
-            project_id)
-
-        total_project_usages, regions_usage_dict = self.quota_usage_update(
-            project_id, user_id)
-        if ((total_project_usages, regions_usage_dict) == (None, None)):
-            return
-
-        # Get the global limit for this project from the master subcloud.
-        dc_orch_global_limits = self.get_overall_tenant_quota_limits(
-            project_id, user_id)
-        # Calculate how much of the various limits have not yet been used.
-        unused_global_limits = collections.Counter(
-            dc_orch_global_limits) - collections.Counter(total_project_usages)
-
-        # Remove the master region from the list.  Its quotas should already
-        # be up to date for managed resources.
-        region_lists.remove(dccommon_consts.VIRTUAL_MASTER_CLOUD)
-
-        # (NOTE: knasim-wrs): The Master Cloud's Project ID and User ID
-        # dont mean anything for the subcloud, so we need to first resolve
-        # the project name, and username and then determine the specific
-        # IDs for that subcloud
-        qproject = os_driver.get_project_by_id(project_id)
-        quser = os_driver.get_user_by_id(user_id)
-
-        for current_region in region_lists:
-            # Calculate the new limit for this region.
-            region_new_limits = dict(
-                unused_global_limits + collections.Counter(
-                    regions_usage_dict[current_region]))
-            # Reformat the limits
-            region_new_limits = self._arrange_quotas_by_service_name(
-                region_new_limits)
-            # Update the subcloud with the new limit
-            try:
-                # First find this project and user in this subcloud
-                sc_user_id = None
-                sc_os_driver = sdk.OpenStackDriver(current_region)
-                sc_project = sc_os_driver.get_project_by_name(qproject.name)
-                if not sc_project:
-                    LOG.info("Cannot find project %s in subcloud %s. Skipping "
-                             "quota sync for this project on subcloud",
-                             qproject.name, current_region)
-                    continue
-                sc_project_id = sc_project.id
-                if quser:
-                    sc_user = sc_os_driver.get_user_by_name(quser.name)
-                    sc_user_id = getattr(sc_user, 'id', None)
-            except Exception as e:
-                LOG.error("quota sync %s: %s", current_region, str(e))
-                continue
-
-            thread = threading.Thread(target=self.update_quota_limits,
-                                      args=(sc_project_id, sc_user_id,
-                                            region_new_limits,
-                                            current_region,))
-            regions_thread_list.append(thread)
-            thread.start()
-
-        # Wait for all the threads to update quota
-        for current_thread in regions_thread_list:
-            current_thread.join()
+        self._balance_projects([(project_id, user_id)])
 
     def get_overall_tenant_quota_limits(self, project_id, user_id):
         # Return quota limits in the master cloud.  These are the overall
@@ -414,64 +553,34 @@ class QuotaManager(manager.Manager):
 
     def get_tenant_quota_usage_per_region(self, project_id, user_id):
         # Return quota usage dict with keys as region name & values as usages.
-        # Calculates the usage from each region concurrently using threads.
+        # The regions are read concurrently using the bounded pool.
         os_driver = sdk.OpenStackDriver()
-        # Retrieve regions for the project
-        region_lists = os_driver.get_all_regions_for_project(
-            project_id)
-        usage_queue = Queue()
-        regions_usage_dict = collections.defaultdict(dict)
-        regions_thread_list = []
-        qproject = os_driver.get_project_by_id(project_id)
-        quser = os_driver.get_user_by_id(user_id)
-
-        for current_region in region_lists:
-            # First find this project and user in this subcloud
-            try:
-                sc_user_id = None
-                sc_os_driver = sdk.OpenStackDriver(current_region)
-                sc_project = sc_os_driver.get_project_by_name(qproject.name)
-                if not sc_project:
-                    LOG.info("Cannot find project %s in subcloud %s. Skipping "
-                             "quota usage for this project on subcloud",
-                             qproject.name, current_region)
-                    continue
-                sc_project_id = sc_project.id
-                if quser:
-                    sc_user = sc_os_driver.get_user_by_name(quser.name)
-                    sc_user_id = getattr(sc_user, 'id', None)
-            except Exception as e:
-                LOG.error("quota usage %s: %s", current_region, str(e))
-                continue
-
-            thread = threading.Thread(target=self.read_quota_usage,
-                                      args=(sc_project_id, sc_user_id,
-                                            current_region, usage_queue))
-            regions_thread_list.append(thread)
-            thread.start()
-        # Wait for all the threads to finish reading usages
-        for current_thread in regions_thread_list:
-            current_thread.join()
-        # Check If all the regions usages are read
-        if len(region_lists) == usage_queue.qsize():
-            for i in range(usage_queue.qsize()):
-                # Read Queue
-                current_region_data = usage_queue.get()
-                regions_usage_dict.update(current_region_data)
-        return regions_usage_dict
+        project_regions, project_names, user_names = \
+            self._get_projects_info(os_driver, [(project_id, user_id)])
+        usage_matrix = self._collect_usage_matrix(
+            [(project_id, user_id)], project_regions, project_names,
+            user_names, {})
+        return self._get_regions_usage(project_id, user_id, project_regions,
+                                       usage_matrix)
 
     def get_usage_for_project_and_user(self, endpoint_type,
                                        project_id, user_id):
         # Returns cached quota usage for a project and user.  If there
-        # is no cached usage information then update the cache.
+        # is no cached usage information or if it is older than
+        # quota_usage_cache_ttl then update the cache.
 
         with QuotaManager.usage_lock:
             # First, try to get a copy of the usage from the last quota audit.
             total_project_usages = copy.deepcopy(
                 QuotaManager.total_project_usages.get((project_id, user_id),
                                                       None))
+            update_time = QuotaManager.usage_update_times.get(
+                (project_id, user_id), 0)
+        if (total_project_usages is not None and
+                time.time() - update_time > CONF.quota_usage_cache_ttl):
+            total_project_usages = None
         if total_project_usages is None:
-            # This project/user doesn't have any cached usage information,
+            # This project/user doesn't have any fresh usage information,
             # so we need to query it.
             try:
                 total_project_usages, regions_usage_dict = \
@@ -479,14 +588,8 @@ class QuotaManager(manager.Manager):
             except exceptions.ProjectNotFound:
                 total_project_usages = {}
 
-        # "total_project_usages" includes fields from multiple
-        # endpoint types, so we need to figure out which ones we want.
-        desired_fields = consts.ENDPOINT_QUOTA_MAPPING[endpoint_type]
-        usage_dict = {}
-        for k, v in total_project_usages.items():
-            if k in desired_fields:
-                usage_dict[k] = v
-        return usage_dict
+        return utils.get_endpoint_quota_usage(endpoint_type,
+                                              total_project_usages or {})
 
 
 def list_opts():
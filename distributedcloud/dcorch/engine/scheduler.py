@@ -13,6 +13,7 @@
 # Copyright (c) 2020 Wind River Systems, Inc.
 #
 
+import collections
 import time
 
 import eventlet
@@ -89,6 +90,108 @@ class ThreadGroupManager(object):
             eventlet.sleep()
 
 
+class WorkQueueScheduler(object):
+    """Continuous scheduler of the work done for the subclouds.
+
+    The work is queued per subcloud and work id, the work id being the
+    endpoint type for the sync and audit work. It is started as soon as
+    a greenthread of the bounded pool is free, in the order it was
+    queued. The work of different endpoints of a subcloud runs
+    concurrently, but a work item already queued or running for the
+    same subcloud and work id is not queued again.
+
+    When a deadline is given, a work item running for longer is
+    interrupted and on_timeout(subcloud_name, work_id) is called.
+    """
+
+    def __init__(self, name, pool_size, deadline=None, on_timeout=None):
+        super(WorkQueueScheduler, self).__init__()
+        self.name = name
+        self.deadline = deadline
+        self.on_timeout = on_timeout
+        self.pool = eventlet.greenpool.GreenPool(pool_size)
+        # Queued work items per (subcloud, work id), in turn order
+        self._queued = collections.OrderedDict()
+        # (subcloud, work id) of the running work items
+        self._running = set()
+        self._started = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def submit(self, subcloud_name, work_id, func, *args):
+        """Queue func(*args) for the subcloud.
+
+        Returns False when the same work is already queued or running.
+        """
+        key = (subcloud_name, work_id)
+        if key in self._running or key in self._queued:
+            return False
+
+        self._queued[key] = (func, args, wallclock())
+        self._dispatch()
+        return True
+
+    def get_stats(self):
+        """Return the queue depth and queue wait time metrics."""
+        return {'queued': len(self._queued),
+                'queued_subclouds': len(set(
+                    subcloud_name for subcloud_name, _ in self._queued)),
+                'running': len(self._running),
+                'started': self._started,
+                'timeouts': self._timeouts,
+                'wait_avg': (self._wait_total / self._started
+                             if self._started else 0.0),
+                'wait_max': self._wait_max}
+
+    def waitall(self):
+        """Wait for the queued and running work to complete."""
+        while self._queued or self._running:
+            self.pool.waitall()
+            eventlet.sleep(0)
+
+    def _dispatch(self):
+        while self._queued and self.pool.free() > 0:
+            key, (func, args, queued_at) = self._queued.popitem(last=False)
+
+            wait = wallclock() - queued_at
+            self._started += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+            self._running.add(key)
+            thread = self.pool.spawn(self._run, key, func, args)
+            # Start the next work item once the greenthread is returned
+            # to the pool
+            thread.link(lambda _thread: self._dispatch())
+
+    def _run(self, key, func, args):
+        subcloud_name, work_id = key
+        timeout = None
+        if self.deadline:
+            timeout = eventlet.timeout.Timeout(self.deadline)
+        try:
+            func(*args)
+        except eventlet.timeout.Timeout as t:
+            if t is not timeout:
+                raise  # not my timeout
+            self._timeouts += 1
+            LOG.warning('%s of subcloud %s (%s) exceeded its deadline of '
+                        '%s seconds' % (self.name, subcloud_name, work_id,
+                                        self.deadline))
+            if self.on_timeout:
+                try:
+                    self.on_timeout(subcloud_name, work_id)
+                except Exception as e:
+                    LOG.exception(e)
+        except Exception as e:
+            LOG.exception(e)
+        finally:
+            if timeout:
+                timeout.cancel()
+            self._running.discard(key)
+
+
 def reschedule(action, sleep_time=1):
     """Eventlet Sleep for the specified number of seconds.
 
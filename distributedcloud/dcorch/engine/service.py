@@ -35,6 +35,7 @@ from dcorch.engine.generic_sync_manager import GenericSyncManager
 from dcorch.engine.initial_sync_manager import InitialSyncManager
 from dcorch.engine.quota_manager import QuotaManager
 from dcorch.engine import scheduler
+from dcorch.engine.sync_thread import SyncThread
 from dcorch.objects import service as service_obj
 from oslo_service import service
 from oslo_utils import timeutils
@@ -300,6 +301,12 @@ class EngineService(service.Service):
     def sync_request(self, ctxt, endpoint_type):
         self.gsm.sync_request(ctxt, endpoint_type)
 
+    @request_context
+    # The master cloud resources have changed, drop the cached copies
+    # used by the sync audit.
+    def invalidate_master_resources(self, ctxt, endpoint_type):
+        SyncThread.invalidate_master_resources(endpoint_type)
+
     def _stop_rpc_server(self):
         # Stop RPC connection to prevent new requests
         LOG.debug(_("Attempting to stop engine service..."))
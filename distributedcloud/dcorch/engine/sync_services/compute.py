@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import eventlet
 import six
 
 from keystoneauth1 import exceptions as keystone_exceptions
@@ -20,6 +21,7 @@ from novaclient import client as novaclient
 from novaclient import exceptions as novaclient_exceptions
 from novaclient import utils as novaclient_utils
 
+from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_serialization import jsonutils
 
@@ -155,6 +157,8 @@ class ComputeSyncThread(SyncThread):
             return self.get_flavor_resources(self.m_nova_client)
         elif resource_type == consts.RESOURCE_TYPE_COMPUTE_QUOTA_CLASS_SET:
             return self.get_quota_class_resources(self.m_nova_client)
+        elif resource_type == consts.RESOURCE_TYPE_COMPUTE_KEYPAIR:
+            return self.get_master_keypair_resources()
         else:
             LOG.error("Wrong resource type {}".format(resource_type),
                       extra=self.log_extra)
@@ -355,29 +359,39 @@ class ComputeSyncThread(SyncThread):
                          .format(list(metadata.keys()), rsrc, action_dict),
                          extra=self.log_extra)
 
+    def fan_out(self, func, items):
+        # Call func on each item, at most audit_request_pool_size at a
+        # time, and return the results in order. Used for the resources
+        # that can only be retrieved one user or one flavor at a time.
+        pool = eventlet.greenpool.GreenPool(cfg.CONF.audit_request_pool_size)
+        return list(pool.imap(func, items))
+
+    def attach_flavor_details(self, nc, flavor):
+        # Attach flavor access list to flavor object, so that
+        # it can be audited later in audit_dependants()
+        if not flavor.is_public:
+            try:
+                fa_list = nc.flavor_access.list(flavor=flavor.id)
+                flavor.attach_fa = fa_list
+            except novaclient_exceptions.NotFound:
+                # flavor/flavor_access just got deleted
+                # (after flavors.list)
+                LOG.info("Flavor/flavor_access not found [{}]"
+                         .format(flavor.id),
+                         extra=self.log_extra)
+                flavor.attach_fa = []
+        else:
+            flavor.attach_fa = []
+
+        # Attach extra_spec dict to flavor object, so that
+        # it can be audited later in audit_dependants()
+        flavor.attach_es = flavor.get_keys()
+
     def get_flavor_resources(self, nc):
         try:
             flavors = nc.flavors.list(is_public=None)
-            for flavor in flavors:
-                # Attach flavor access list to flavor object, so that
-                # it can be audited later in audit_dependants()
-                if not flavor.is_public:
-                    try:
-                        fa_list = nc.flavor_access.list(flavor=flavor.id)
-                        flavor.attach_fa = fa_list
-                    except novaclient_exceptions.NotFound:
-                        # flavor/flavor_access just got deleted
-                        # (after flavors.list)
-                        LOG.info("Flavor/flavor_access not found [{}]"
-                                 .format(flavor.id),
-                                 extra=self.log_extra)
-                        flavor.attach_fa = []
-                else:
-                    flavor.attach_fa = []
-
-                # Attach extra_spec dict to flavor object, so that
-                # it can be audited later in audit_dependants()
-                flavor.attach_es = flavor.get_keys()
+            self.fan_out(lambda flavor: self.attach_flavor_details(nc, flavor),
+                         flavors)
             return flavors
         except (keystone_exceptions.connection.ConnectTimeout,
                 keystone_exceptions.ConnectFailure) as e:
@@ -557,28 +571,27 @@ class ComputeSyncThread(SyncThread):
         if resource_type == consts.RESOURCE_TYPE_COMPUTE_KEYPAIR:
             # Keypair has unique id (name) per user. And, there is no API to
             # retrieve all keypairs at once. So, keypair for each user is
-            # retrieved individually.
+            # retrieved individually. The master keypairs are shared by
+            # the audits of all the subclouds.
             try:
-                m_resources = []
-                sc_resources = []
-                users = self.ks_client.users.list()
-                users_with_kps = set()
-                for user in users:
-                    user_keypairs = self.get_keypair_resources(
-                        self.m_nova_client, user.id)
-                    if user_keypairs:
-                        m_resources.extend(user_keypairs)
-                        users_with_kps.add(user.id)
+                self.initialize_sc_clients()
+                m_resources = self.get_cached_master_resources(resource_type)
+                if m_resources is None:
+                    return None, None, None
+                users_with_kps = sorted(set(
+                    keypair._info['keypair']['user_id']
+                    for keypair in m_resources))
                 db_resources = self.get_db_master_resources(resource_type)
                 # Query the subcloud for only the users-with-keypairs in the
                 # master cloud
-                for userid in users_with_kps:
-                    sc_user_keypairs = self.get_keypair_resources(
-                        self.sc_nova_client, userid)
-                    if sc_user_keypairs:
-                        sc_resources.extend(sc_user_keypairs)
-                LOG.info("get_all_resources: users_with_kps={}"
-                         .format(users_with_kps), extra=self.log_extra)
+                sc_resources = []
+                for sc_user_keypairs in self.fan_out(
+                        lambda userid: self.get_keypair_resources(
+                            self.sc_nova_client, userid),
+                        users_with_kps):
+                    sc_resources.extend(sc_user_keypairs)
+                LOG.info("get_all_resources: {} users_with_kps"
+                         .format(len(users_with_kps)), extra=self.log_extra)
                 return m_resources, db_resources, sc_resources
             except (keystone_exceptions.connection.ConnectTimeout,
                     keystone_exceptions.ConnectFailure) as e:
@@ -599,6 +612,16 @@ class ComputeSyncThread(SyncThread):
             keypair._info['keypair']['user_id'] = user_id
         return keypairs
 
+    def get_master_keypair_resources(self):
+        m_resources = []
+        users = self.ks_client.users.list()
+        for user_keypairs in self.fan_out(
+                lambda user: self.get_keypair_resources(self.m_nova_client,
+                                                        user.id),
+                users):
+            m_resources.extend(user_keypairs)
+        return m_resources
+
     def same_keypair(self, k1, k2):
         return (k1.name == k2.name
                 and k1.type == k2.type
@@ -110,6 +110,10 @@ class IdentitySyncThread(SyncThread):
                 []
         }
 
+        # Ids of the subcloud keystone resources, per resource type, cached
+        # for the duration of a sync pass
+        self.sc_identity_inventory = None
+
         self.log_extra = {"instance": "{}/{}: ".format(
             self.region_name, self.endpoint_type)}
         LOG.info("IdentitySyncThread initialized", extra=self.log_extra)
@@ -474,6 +478,8 @@ class IdentitySyncThread(SyncThread):
 
         # Persist the subcloud resource.
         user_ref_id = user_ref.get('user').get('id')
+        self._add_to_sc_identity_inventory(
+            consts.RESOURCE_TYPE_IDENTITY_USERS, user_ref_id)
         subcloud_rsrc_id = self.persist_db_subcloud_resource(rsrc.id,
                                                              user_ref_id)
         username = user_ref.get('local_user').get('name')
@@ -615,6 +621,9 @@ class IdentitySyncThread(SyncThread):
                  .format(rsrc.id, user_subcloud_rsrc.id,
                          user_subcloud_rsrc.subcloud_resource_id),
                  extra=self.log_extra)
+        self._remove_from_sc_identity_inventory(
+            consts.RESOURCE_TYPE_IDENTITY_USERS,
+            user_subcloud_rsrc.subcloud_resource_id)
         user_subcloud_rsrc.delete()
 
     def post_groups(self, request, rsrc):
@@ -653,6 +662,8 @@ class IdentitySyncThread(SyncThread):
 
         # Persist the subcloud resource.
         group_ref_id = group_ref.get('group').get('id')
+        self._add_to_sc_identity_inventory(
+            consts.RESOURCE_TYPE_IDENTITY_GROUPS, group_ref_id)
         subcloud_rsrc_id = self.persist_db_subcloud_resource(rsrc.id,
                                                              group_ref_id)
         groupname = group_ref.get('group').get('name')
@@ -789,6 +800,9 @@ class IdentitySyncThread(SyncThread):
                  .format(rsrc.id, group_subcloud_rsrc.id,
                          group_subcloud_rsrc.subcloud_resource_id),
                  extra=self.log_extra)
+        self._remove_from_sc_identity_inventory(
+            consts.RESOURCE_TYPE_IDENTITY_GROUPS,
+            group_subcloud_rsrc.subcloud_resource_id)
         group_subcloud_rsrc.delete()
 
     def post_projects(self, request, rsrc):
@@ -828,6 +842,8 @@ class IdentitySyncThread(SyncThread):
 
         # Persist the subcloud resource.
         project_ref_id = project_ref.get('project').get('id')
+        self._add_to_sc_identity_inventory(
+            consts.RESOURCE_TYPE_IDENTITY_PROJECTS, project_ref_id)
         subcloud_rsrc_id = self.persist_db_subcloud_resource(rsrc.id,
                                                              project_ref_id)
         projectname = project_ref.get('project').get('name')
@@ -966,6 +982,9 @@ class IdentitySyncThread(SyncThread):
                  .format(rsrc.id, project_subcloud_rsrc.id,
                          project_subcloud_rsrc.subcloud_resource_id),
                  extra=self.log_extra)
+        self._remove_from_sc_identity_inventory(
+            consts.RESOURCE_TYPE_IDENTITY_PROJECTS,
+            project_subcloud_rsrc.subcloud_resource_id)
         project_subcloud_rsrc.delete()
 
     def post_roles(self, request, rsrc):
@@ -1004,6 +1023,8 @@ class IdentitySyncThread(SyncThread):
 
         # Persist the subcloud resource.
         role_ref_id = role_ref.get('role').get('id')
+        self._add_to_sc_identity_inventory(
+            consts.RESOURCE_TYPE_IDENTITY_ROLES, role_ref_id)
         subcloud_rsrc_id = self.persist_db_subcloud_resource(rsrc.id,
                                                              role_ref_id)
         rolename = role_ref.get('role').get('name')
@@ -1138,6 +1159,9 @@ class IdentitySyncThread(SyncThread):
                  .format(rsrc.id, role_subcloud_rsrc.id,
                          role_subcloud_rsrc.subcloud_resource_id),
                  extra=self.log_extra)
+        self._remove_from_sc_identity_inventory(
+            consts.RESOURCE_TYPE_IDENTITY_ROLES,
+            role_subcloud_rsrc.subcloud_resource_id)
         role_subcloud_rsrc.delete()
 
     def post_project_role_assignments(self, request, rsrc):
@@ -1158,47 +1182,33 @@ class IdentitySyncThread(SyncThread):
 
         # Ensure that we have already synced the project, user and role
         # prior to syncing the assignment
-        sc_role = None
         sc_ks_client = self.get_ks_client(self.region_name)
-        sc_role_list = sc_ks_client.roles.list()
-        for role in sc_role_list:
-            if role.id == role_id:
-                sc_role = role
-                break
-        if not sc_role:
+        inventory = self._get_sc_identity_inventory(sc_ks_client)
+        if not self._has_assignment_references(inventory, project_id,
+                                               actor_id, role_id):
+            # The references may have been created in the subcloud outside
+            # of this sync pass, check again against a fresh inventory
+            inventory = self._get_sc_identity_inventory(sc_ks_client,
+                                                        refresh=True)
+
+        if role_id not in inventory[consts.RESOURCE_TYPE_IDENTITY_ROLES]:
             LOG.error("Unable to assign role to user on project reference {}:"
                       "{}, cannot find equivalent Keystone Role in subcloud."
                       .format(rsrc, role_id),
                       extra=self.log_extra)
             raise exceptions.SyncRequestFailed
 
-        sc_proj = None
-        # refresh client in case the token expires in between API calls
-        sc_proj_list = sc_ks_client.projects.list()
-        for proj in sc_proj_list:
-            if proj.id == project_id:
-                sc_proj = proj
-                break
-        if not sc_proj:
+        if project_id not in \
+                inventory[consts.RESOURCE_TYPE_IDENTITY_PROJECTS]:
             LOG.error("Unable to assign role to user on project reference {}:"
                       "{}, cannot find equivalent Keystone Project in subcloud"
                       .format(rsrc, project_id),
                       extra=self.log_extra)
             raise exceptions.SyncRequestFailed
 
-        sc_user = None
-        sc_user_list = self._get_all_users(sc_ks_client)
-        for user in sc_user_list:
-            if user.id == actor_id:
-                sc_user = user
-                break
-        sc_group = None
-        sc_group_list = self._get_all_groups(sc_ks_client)
-        for group in sc_group_list:
-            if group.id == actor_id:
-                sc_group = group
-                break
-        if not sc_user and not sc_group:
+        is_user = actor_id in inventory[consts.RESOURCE_TYPE_IDENTITY_USERS]
+        is_group = actor_id in inventory[consts.RESOURCE_TYPE_IDENTITY_GROUPS]
+        if not is_user and not is_group:
             LOG.error("Unable to assign role to user/group on project reference {}:"
                       "{}, cannot find equivalent Keystone User/Group in subcloud."
                       .format(rsrc, actor_id),
@@ -1206,33 +1216,30 @@ class IdentitySyncThread(SyncThread):
             raise exceptions.SyncRequestFailed
 
         # Create role assignment
-        if sc_user:
+        if is_user:
             sc_ks_client.roles.grant(
-                sc_role,
-                user=sc_user,
-                project=sc_proj)
+                role_id,
+                user=actor_id,
+                project=project_id)
             role_ref = sc_ks_client.role_assignments.list(
-                user=sc_user,
-                project=sc_proj,
-                role=sc_role)
-        elif sc_group:
+                user=actor_id,
+                project=project_id,
+                role=role_id)
+        else:
             sc_ks_client.roles.grant(
-                sc_role,
-                group=sc_group,
-                project=sc_proj)
+                role_id,
+                group=actor_id,
+                project=project_id)
             role_ref = sc_ks_client.role_assignments.list(
-                group=sc_group,
-                project=sc_proj,
-                role=sc_role)
+                group=actor_id,
+                project=project_id,
+                role=role_id)
 
         if role_ref:
             LOG.info("Added Keystone role assignment: {}:{}"
                      .format(rsrc.id, role_ref), extra=self.log_extra)
             # Persist the subcloud resource.
-            if sc_user:
-                sc_rid = sc_proj.id + '_' + sc_user.id + '_' + sc_role.id
-            elif sc_group:
-                sc_rid = sc_proj.id + '_' + sc_group.id + '_' + sc_role.id
+            sc_rid = project_id + '_' + actor_id + '_' + role_id
             subcloud_rsrc_id = self.persist_db_subcloud_resource(rsrc.id,
                                                                  sc_rid)
             LOG.info("Created Keystone role assignment {}:{} [{}]"
@@ -1240,7 +1247,7 @@ class IdentitySyncThread(SyncThread):
                      extra=self.log_extra)
         else:
             LOG.error("Unable to update Keystone role assignment {}:{} "
-                      .format(rsrc.id, sc_role), extra=self.log_extra)
+                      .format(rsrc.id, role_id), extra=self.log_extra)
             raise exceptions.SyncRequestFailed
 
     def put_project_role_assignments(self, request, rsrc):
@@ -1507,6 +1514,50 @@ class IdentitySyncThread(SyncThread):
                       extra=self.log_extra)
             return None
 
+    def _get_sc_identity_inventory(self, sc_ks_client, refresh=False):
+        """Return the ids of the subcloud roles, projects, users and groups
+
+        The inventory is retrieved from the subcloud once per sync pass,
+        when the first project role assignment is synced, and is kept up
+        to date by the requests of the same pass creating or deleting
+        those resources. It is dropped at the end of the pass.
+        """
+        if self.sc_identity_inventory is None or refresh:
+            users = self._get_all_users(sc_ks_client)
+            groups = self._get_all_groups(sc_ks_client)
+            self.sc_identity_inventory = {
+                consts.RESOURCE_TYPE_IDENTITY_ROLES:
+                    set(role.id for role in sc_ks_client.roles.list()),
+                consts.RESOURCE_TYPE_IDENTITY_PROJECTS:
+                    set(project.id for project
+                        in sc_ks_client.projects.list()),
+                consts.RESOURCE_TYPE_IDENTITY_USERS:
+                    set(user.id for user in users),
+                consts.RESOURCE_TYPE_IDENTITY_GROUPS:
+                    set(group.id for group in groups),
+            }
+        return self.sc_identity_inventory
+
+    @staticmethod
+    def _has_assignment_references(inventory, project_id, actor_id, role_id):
+        return (role_id in inventory[consts.RESOURCE_TYPE_IDENTITY_ROLES] and
+                project_id in
+                inventory[consts.RESOURCE_TYPE_IDENTITY_PROJECTS] and
+                (actor_id in inventory[consts.RESOURCE_TYPE_IDENTITY_USERS] or
+                 actor_id in inventory[consts.RESOURCE_TYPE_IDENTITY_GROUPS]))
+
+    def _add_to_sc_identity_inventory(self, resource_type, resource_id):
+        if self.sc_identity_inventory is not None:
+            self.sc_identity_inventory[resource_type].add(resource_id)
+
+    def _remove_from_sc_identity_inventory(self, resource_type, resource_id):
+        if self.sc_identity_inventory is not None:
+            self.sc_identity_inventory[resource_type].discard(resource_id)
+
+    def post_sync(self):
+        # Drop the subcloud identity inventory of this sync pass
+        self.sc_identity_inventory = None
+
     def _get_all_users(self, client):
         domains = client.domains.list()
         users = []
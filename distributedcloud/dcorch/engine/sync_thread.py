@@ -56,13 +56,24 @@ AUDIT_RESOURCE_EXTRA = 'extra_resource'
 
 AUDIT_LOCK_NAME = 'dcorch-audit'
 
+# Snapshot of the master cloud resources of one resource type, as cached
+# by the audit. Only valid while the version matches the current version
+# of the endpoint type and the snapshot is younger than the cache TTL.
+MasterResourceSnapshot = collections.namedtuple(
+    'MasterResourceSnapshot', ['version', 'timestamp', 'resources'])
+
 
 class SyncThread(object):
     """Manages tasks related to resource management."""
 
     MAX_RETRY = 3
-    # used by the audit to cache the master resources
-    master_resources_dict = collections.defaultdict(dict)
+    # used by the audit to cache the master resources, shared by the
+    # audits of all the subclouds. Maps (endpoint_type, resource_type)
+    # to a MasterResourceSnapshot.
+    master_resources_dict = {}
+    # version of the cached master resources per endpoint type, bumped
+    # whenever a change to the master cloud is recorded
+    master_resources_version = collections.defaultdict(int)
 
     def __init__(self, subcloud_name, endpoint_type=None, engine_id=None):
         super(SyncThread, self).__init__()
@@ -215,6 +226,17 @@ class SyncThread(object):
                      extra=self.log_extra)
         return None
 
+    def get_db_subcloud_resources(self):
+        # Bulk load all the subcloud resources of this subcloud, indexed
+        # by the "id" field of the resource in the DB. This is used by the
+        # audit instead of looking up each resource in a separate query.
+        subcloud = Subcloud.get_by_name(self.ctxt, self.subcloud_name)
+        subcloud_rsrcs = \
+            subcloud_resource.SubcloudResourceList.get_by_subcloud_id(
+                self.ctxt, subcloud.id)
+        return {subcloud_rsrc.resource_id: subcloud_rsrc
+                for subcloud_rsrc in subcloud_rsrcs}
+
     def persist_db_subcloud_resource(self, db_rsrc_id, subcloud_rsrc_id):
         # This function can be invoked after creating a subcloud resource.
         # Persist the subcloud resource to the DB for later
@@ -416,6 +438,8 @@ class SyncThread(object):
                          .format(len(actual_sync_requests)))
                 # del sync_requests[:] #This fails due to:
                 # 'OrchRequestList' object does not support item deletion
+            finally:
+                self.post_sync()
 
             sync_requests = orchrequest.OrchRequestList.get_by_attrs(
                 self.ctxt, self.endpoint_type,
@@ -472,21 +496,21 @@ class SyncThread(object):
                          extra=self.log_extra)
                 return
 
-            # Skip resources with outstanding sync requests
+            # Skip resources with outstanding sync requests. Only the
+            # source resource ids of the pending requests are needed here.
             region_name = self.subcloud_name
-            sync_requests = []
             states = [
                 consts.ORCH_REQUEST_QUEUED,
                 consts.ORCH_REQUEST_IN_PROGRESS,
             ]
-            sync_requests = orchrequest.OrchRequestList.get_by_attrs(
-                self.ctxt, self.endpoint_type, resource_type=resource_type,
-                target_region_name=region_name, states=states)
-            abort_resources = [req.orch_job.source_resource_id
-                               for req in sync_requests]
-            if len(sync_requests) > 0:
+            abort_resources = \
+                db_api.orch_request_get_source_resource_ids_by_attrs(
+                    self.ctxt, self.endpoint_type,
+                    resource_type=resource_type,
+                    target_region_name=region_name, states=states)
+            if len(abort_resources) > 0:
                 LOG.info("Will not audit {}. {} sync request(s) pending"
-                         .format(abort_resources, len(sync_requests)),
+                         .format(abort_resources, len(abort_resources)),
                          extra=self.log_extra)
 
             num_of_audit_jobs = 0
@@ -505,12 +529,15 @@ class SyncThread(object):
                 LOG.debug("Auditing {}: master={} db={} sc={}".format(
                     resource_type, m_resources, db_resources, sc_resources),
                     extra=self.log_extra)
+                # Load the subcloud resource mappings once for this pass,
+                # they are shared by audit_find_missing and audit_find_extra
+                subcloud_rsrcs = self.get_db_subcloud_resources()
                 num_of_audit_jobs += self.audit_find_missing(
                     resource_type, m_resources, db_resources, sc_resources,
-                    abort_resources)
+                    abort_resources, subcloud_rsrcs)
                 num_of_audit_jobs += self.audit_find_extra(
                     resource_type, m_resources, db_resources, sc_resources,
-                    abort_resources)
+                    abort_resources, subcloud_rsrcs)
             except Exception:
                 LOG.exception("Unexpected error while auditing %s",
                               resource_type)
@@ -540,29 +567,62 @@ class SyncThread(object):
             # todo: if we had an "unable to sync this
             # subcloud/endpoint" alarm raised, then clear it
             pass
-        else:
-            # set sync_request for this subcloud/endpoint
-            db_api.subcloud_sync_update(
-                self.ctxt, self.subcloud_name, self.endpoint_type,
-                values={'sync_request': consts.SYNC_STATUS_REQUESTED})
 
         LOG.debug("{}: done sync audit".format(
             threading.currentThread().getName()), extra=self.log_extra)
+        # set sync_request for this subcloud/endpoint, once whether or not
+        # audit jobs were created
         from dcorch.engine.generic_sync_manager import GenericSyncManager
         GenericSyncManager.set_sync_request(self.ctxt, self.subcloud_name,
                                             self.endpoint_type)
         self.post_audit()
 
-    @lockutils.synchronized(AUDIT_LOCK_NAME)
+    def post_sync(self):
+        # The specific SyncThread subclasses may drop the state cached
+        # while processing the sync requests of a sync pass
+        pass
+
     def post_audit(self):
-        # reset the cached master resources
-        SyncThread.master_resources_dict = collections.defaultdict(dict)
+        # The cached master resources are kept across subcloud audits, they
+        # are dropped on expiry or when the master cloud changes.
         # The specific SyncThread subclasses may perform additional post
         # audit actions
+        pass
+
+    @classmethod
+    @lockutils.synchronized(AUDIT_LOCK_NAME)
+    def invalidate_master_resources(cls, endpoint_type):
+        # A change to the master cloud resources of this endpoint type was
+        # recorded, so the cached snapshots are now stale.
+        cls.master_resources_version[endpoint_type] += 1
+        for key in list(cls.master_resources_dict.keys()):
+            if key[0] == endpoint_type:
+                del cls.master_resources_dict[key]
+        LOG.debug("Invalidated master resources of {}, version {}".format(
+            endpoint_type, cls.master_resources_version[endpoint_type]))
+
+    def _index_db_resources(self, db_resources):
+        # Index the dcorch DB resources by master id. A list is kept per
+        # master id so that duplicate entries are matched one at a time.
+        db_resources_by_master_id = collections.defaultdict(
+            collections.deque)
+        for db_resource in db_resources:
+            db_resources_by_master_id[db_resource.master_id].append(
+                db_resource)
+        return db_resources_by_master_id
+
+    def _index_sc_resources(self, resource_type, sc_resources):
+        # Index the subcloud resources by their subcloud resource id,
+        # preserving the order in which the subcloud returned them.
+        sc_resources_by_id = collections.defaultdict(list)
+        for sc_r in sc_resources:
+            sc_id = self.get_resource_id(resource_type, sc_r)
+            sc_resources_by_id[sc_id].append(sc_r)
+        return sc_resources_by_id
 
     def audit_find_missing(self, resource_type, m_resources,
                            db_resources, sc_resources,
-                           abort_resources):
+                           abort_resources, subcloud_rsrcs=None):
         """Find missing resources in subcloud.
 
         - Input param db_resources is modified in this routine
@@ -570,8 +630,19 @@ class SyncThread(object):
           master cloud. At the end, db_resources will have a
           list of resources that are present in dcorch DB, but
           not present in the master cloud.
+        - Input param subcloud_rsrcs is the map of resource id to
+          subcloud resource returned by get_db_subcloud_resources().
+          It is loaded here if not provided by the caller.
         """
         num_of_audit_jobs = 0
+        if subcloud_rsrcs is None:
+            subcloud_rsrcs = self.get_db_subcloud_resources()
+        # Build the lookup indexes once, rather than scanning the DB and
+        # subcloud resource lists for every master resource.
+        db_resources_by_master_id = self._index_db_resources(db_resources)
+        sc_resources_by_id = self._index_sc_resources(resource_type,
+                                                      sc_resources)
+        matched_db_resources = set()
         for m_r in m_resources:
             master_id = self.get_resource_id(resource_type, m_r)
             if master_id in abort_resources:
@@ -583,11 +654,9 @@ class SyncThread(object):
 
             missing_resource = False
             m_rsrc_db = None
-            for db_resource in db_resources:
-                if db_resource.master_id == master_id:
-                    m_rsrc_db = db_resource
-                    db_resources.remove(db_resource)
-                    break
+            if db_resources_by_master_id.get(master_id):
+                m_rsrc_db = db_resources_by_master_id[master_id].popleft()
+                matched_db_resources.add(id(m_rsrc_db))
 
             if m_rsrc_db:
                 # resource from master cloud is present in DB.
@@ -607,25 +676,24 @@ class SyncThread(object):
                 # If present: look for actual resource in the
                 # subcloud and compare the resource details.
                 # If not present: create resource in subcloud.
-                db_sc_resource = self.get_db_subcloud_resource(m_rsrc_db.id)
+                db_sc_resource = subcloud_rsrcs.get(m_rsrc_db.id)
                 if db_sc_resource:
                     if not db_sc_resource.is_managed():
                         LOG.info("Resource {} is not managed"
                                  .format(master_id), extra=self.log_extra)
                         continue
                     sc_rsrc_present = False
-                    for sc_r in sc_resources:
-                        sc_id = self.get_resource_id(resource_type, sc_r)
-                        if sc_id == db_sc_resource.subcloud_resource_id:
-                            if self.same_resource(resource_type,
-                                                  m_r_updated, sc_r):
-                                LOG.debug("Resource type {} {} is in-sync"
-                                          .format(resource_type, master_id),
-                                          extra=self.log_extra)
-                                num_of_audit_jobs += self.audit_dependants(
-                                    resource_type, m_r, sc_r)
-                                sc_rsrc_present = True
-                                break
+                    for sc_r in sc_resources_by_id.get(
+                            db_sc_resource.subcloud_resource_id, []):
+                        if self.same_resource(resource_type,
+                                              m_r_updated, sc_r):
+                            LOG.debug("Resource type {} {} is in-sync"
+                                      .format(resource_type, master_id),
+                                      extra=self.log_extra)
+                            num_of_audit_jobs += self.audit_dependants(
+                                resource_type, m_r, sc_r)
+                            sc_rsrc_present = True
+                            break
                     if not sc_rsrc_present:
                         LOG.info(
                             "Subcloud resource {} found in master cloud & DB, "
@@ -674,21 +742,30 @@ class SyncThread(object):
                 # Resource implementation should handle this.
                 num_of_audit_jobs += self.audit_dependants(
                     resource_type, m_r, None)
+        # Only keep the resources that are in the DB but not in master cloud
+        db_resources[:] = [db_resource for db_resource in db_resources
+                           if id(db_resource) not in matched_db_resources]
         if(num_of_audit_jobs != 0):
             LOG.info("audit_find_missing {} num_of_audit_jobs".
                      format(num_of_audit_jobs), extra=self.log_extra)
         return num_of_audit_jobs
 
     def audit_find_extra(self, resource_type, m_resources,
-                         db_resources, sc_resources, abort_resources):
+                         db_resources, sc_resources, abort_resources,
+                         subcloud_rsrcs=None):
         """Find extra resources in subcloud.
 
         - Input param db_resources is expected to be a
           list of resources that are present in dcorch DB, but
           not present in the master cloud.
+        - Input param subcloud_rsrcs is the map of resource id to
+          subcloud resource returned by get_db_subcloud_resources().
+          It is loaded here if not provided by the caller.
         """
 
         num_of_audit_jobs = 0
+        if subcloud_rsrcs is None:
+            subcloud_rsrcs = self.get_db_subcloud_resources()
         # At this point, db_resources contains resources present in DB,
         # but not in master cloud
         for db_resource in db_resources:
@@ -703,7 +780,7 @@ class SyncThread(object):
 
                 LOG.debug("Extra resource ({}) in DB".format(db_resource.id),
                           extra=self.log_extra)
-                subcloud_rsrc = self.get_db_subcloud_resource(db_resource.id)
+                subcloud_rsrc = subcloud_rsrcs.get(db_resource.id)
                 if subcloud_rsrc:
                     if not subcloud_rsrc.is_managed():
                         LOG.info("Resource {} is not managed"
@@ -784,12 +861,19 @@ class SyncThread(object):
 
     @lockutils.synchronized(AUDIT_LOCK_NAME)
     def get_cached_master_resources(self, resource_type):
-        if resource_type in SyncThread.master_resources_dict:
-            m_resources = SyncThread.master_resources_dict[resource_type]
-        else:
-            m_resources = self.get_master_resources(resource_type)  # pylint: disable=E1128
-            if m_resources is not None:
-                SyncThread.master_resources_dict[resource_type] = m_resources
+        key = (self.endpoint_type, resource_type)
+        version = SyncThread.master_resources_version[self.endpoint_type]
+        snapshot = SyncThread.master_resources_dict.get(key)
+        if snapshot and snapshot.version == version and \
+                timeutils.delta_seconds(snapshot.timestamp,
+                                        timeutils.utcnow()) < \
+                cfg.CONF.master_resource_cache_ttl:
+            return snapshot.resources
+
+        m_resources = self.get_master_resources(resource_type)  # pylint: disable=E1128
+        if m_resources is not None:
+            SyncThread.master_resources_dict[key] = MasterResourceSnapshot(
+                version, timeutils.utcnow(), m_resources)
         return m_resources
 
     def get_subcloud_resources(self, resource_type):
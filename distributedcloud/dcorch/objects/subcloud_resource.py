@@ -103,3 +103,10 @@ class SubcloudResourceList(ovo_base.ObjectListBase, base.OrchestratorObject):
             context, resource_id)
         return ovo_base.obj_make_list(
             context, cls(context), SubcloudResource, subcloud_resources)
+
+    @classmethod
+    def get_by_subcloud_id(cls, context, subcloud_id):
+        subcloud_resources = db_api.subcloud_resources_get_by_subcloud(
+            context, subcloud_id)
+        return ovo_base.obj_make_list(
+            context, cls(context), SubcloudResource, subcloud_resources)
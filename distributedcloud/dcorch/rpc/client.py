@@ -126,3 +126,10 @@ class EngineClient(object):
     def sync_request(self, ctxt, endpoint_type):
         return self.cast(
             ctxt, self.make_msg('sync_request', endpoint_type=endpoint_type))
+
+    # The master cloud resources of this endpoint type have changed, drop
+    # the master resources cached by the audit in every engine worker.
+    def invalidate_master_resources(self, ctxt, endpoint_type):
+        client = self._client.prepare(fanout=True)
+        return client.cast(ctxt, 'invalidate_master_resources',
+                           endpoint_type=endpoint_type)
@@ -0,0 +1,231 @@
+# Copyright (c) 2022 Wind River Systems, Inc.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+from concurrent import futures
+import io
+import json
+import socket
+import threading
+import time
+
+from oslo_log import log as logging
+from paste.proxy import TransparentProxy
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+from dccommon.tests import utils as test_utils
+from dcorch.api.proxy.apps import proxy
+
+from dcorch.tests import base
+
+LOG = logging.getLogger(__name__)
+
+# Load generated by the benchmark
+NUM_REQUESTS = 2000
+CONCURRENCY = 16
+
+LARGE_BODY_SIZE = 1024 * 1024
+
+
+class FakeServiceHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Keep-alive service echoing the requests it receives."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._reply()
+
+    def do_POST(self):
+        self._reply()
+
+    def _reply(self):
+        self.server.client_ports.add(self.client_address[1])
+        length = int(self.headers.get('content-length') or 0)
+        data = self.rfile.read(length)
+        extra_headers = b''
+        if self.path.startswith('/large'):
+            body = b'x' * LARGE_BODY_SIZE
+        elif self.path.startswith('/cookies'):
+            body = b'{}'
+            extra_headers = (b'Set-Cookie: a=1; Path=/\r\n'
+                             b'Set-Cookie: b=2; Path=/\r\n')
+        else:
+            body = json.dumps({
+                'method': self.command,
+                'path': self.path,
+                'body': data.decode(),
+                'x-auth-token': self.headers.get('x-auth-token'),
+                'x-forwarded-for': self.headers.get('x-forwarded-for'),
+                'content-type': self.headers.get('content-type')}).encode()
+        # Headers and body are sent at once as the OpenStack services do
+        self.wfile.write(b'HTTP/1.1 200 OK\r\n'
+                         b'Content-Type: application/json\r\n' +
+                         extra_headers +
+                         b'Content-Length: %d\r\n\r\n' % len(body) + body)
+
+
+class FakeService(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0),
+                                           FakeServiceHandler)
+        self.client_ports = set()
+
+
+def call_app(app, environ):
+    status = {}
+
+    def start_response(status_line, headers, exc_info=None):
+        status['status'] = status_line
+        status['headers'] = dict(headers)
+
+    app_iter = app(environ, start_response)
+    try:
+        body = b''.join(app_iter)
+    finally:
+        if hasattr(app_iter, 'close'):
+            app_iter.close()
+    return status['status'], status['headers'], body
+
+
+class TestProxy(base.OrchestratorTestCase):
+    def setUp(self):
+        super(TestProxy, self).setUp()
+        self.service = FakeService()
+        thread = threading.Thread(target=self.service.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.service.server_close)
+        self.addCleanup(self.service.shutdown)
+
+        self.proxy = proxy.Proxy()
+        self.proxy.pools = proxy.ConnectionPools()
+        self.addCleanup(self.proxy.pools.close_all)
+
+    def get_environ(self, method='GET', path='/v2.1/flavors', body=b'',
+                    port=None):
+        return {
+            'REQUEST_METHOD': method,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': path,
+            'QUERY_STRING': 'is_public=None',
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(body),
+            'HTTP_HOST': '127.0.0.1:%d' % (
+                port or self.service.server_address[1]),
+            'HTTP_X_AUTH_TOKEN': 'fake-token',
+            'REMOTE_ADDR': '192.168.204.1',
+            'CONTENT_TYPE': 'application/json' if body else '',
+            'CONTENT_LENGTH': str(len(body)) if body else ''}
+
+    def test_forward_request(self):
+        status, headers, body = call_app(
+            self.proxy, self.get_environ('POST', body=b'{"flavor": {}}'))
+
+        self.assertEqual('200 OK', status)
+        self.assertEqual('application/json', headers['Content-Type'])
+        self.assertEqual({'method': 'POST',
+                          'path': '/v2.1/flavors?is_public=None',
+                          'body': '{"flavor": {}}',
+                          'x-auth-token': 'fake-token',
+                          'x-forwarded-for': '192.168.204.1',
+                          'content-type': 'application/json'},
+                         json.loads(body))
+
+    def test_forward_large_bodies(self):
+        request_body = b'y' * LARGE_BODY_SIZE
+        status, _, body = call_app(
+            self.proxy, self.get_environ('POST', body=request_body))
+        self.assertEqual(request_body.decode(), json.loads(body)['body'])
+
+        status, _, body = call_app(self.proxy,
+                                   self.get_environ(path='/large'))
+        self.assertEqual(LARGE_BODY_SIZE, len(body))
+
+    def test_connection_reused(self):
+        for _ in range(20):
+            status, _, _ = call_app(self.proxy, self.get_environ())
+            self.assertEqual('200 OK', status)
+        self.assertEqual(1, len(self.service.client_ports))
+
+    def test_response_not_fully_read(self):
+        app_iter = self.proxy(self.get_environ(path='/large'),
+                              lambda status, headers, exc_info=None: None)
+        next(iter(app_iter))
+        app_iter.close()
+
+        # The connection left with unread data is not reused
+        status, _, body = call_app(self.proxy, self.get_environ())
+        self.assertEqual('200 OK', status)
+        self.assertEqual('GET', json.loads(body)['method'])
+        self.assertEqual(2, len(self.service.client_ports))
+
+    def test_service_unreachable(self):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+
+        status, _, _ = call_app(self.proxy, self.get_environ(port=port))
+        self.assertEqual('502 Bad Gateway', status)
+
+    def test_forward_repeated_headers(self):
+        headers = []
+
+        def start_response(status_line, response_headers, exc_info=None):
+            headers.extend(response_headers)
+
+        app_iter = self.proxy(self.get_environ(path='/cookies'),
+                              start_response)
+        b''.join(app_iter)
+        app_iter.close()
+
+        self.assertEqual(['a=1; Path=/', 'b=2; Path=/'],
+                         [value for header, value in headers
+                          if header.lower() == 'set-cookie'])
+
+    @test_utils.benchmark
+    def test_forward_benchmark(self):
+        def run(app):
+            latencies = []
+
+            def send(_):
+                start = time.time()
+                status, _, _ = call_app(app, self.get_environ())
+                latencies.append(time.time() - start)
+                return status
+
+            start = time.time()
+            with futures.ThreadPoolExecutor(CONCURRENCY) as executor:
+                statuses = list(executor.map(send, range(NUM_REQUESTS)))
+            elapsed = time.time() - start
+            self.assertEqual(['200 OK'] * NUM_REQUESTS, statuses)
+            latencies.sort()
+            return (NUM_REQUESTS / elapsed,
+                    latencies[int(NUM_REQUESTS * 0.99)] * 1000)
+
+        transparent_rps, transparent_p99 = run(TransparentProxy())
+        self.service.client_ports.clear()
+        pooled_rps, pooled_p99 = run(self.proxy)
+
+        LOG.info("%d requests, %d concurrent: TransparentProxy %.0f req/s "
+                 "p99 %.1fms, pooled proxy %.0f req/s p99 %.1fms" %
+                 (NUM_REQUESTS, CONCURRENCY, transparent_rps,
+                  transparent_p99, pooled_rps, pooled_p99))
+        # A connection per concurrent request at most
+        self.assertLessEqual(len(self.service.client_ports), CONCURRENCY)
@@ -0,0 +1,94 @@
+# Copyright (c) 2022 Wind River Systems, Inc.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+import io
+import os
+import shutil
+import tempfile
+
+from dcorch.api.proxy.common import utils as proxy_utils
+from dcorch.common import config
+
+from dcorch.tests import base
+
+config.register_options()
+
+BOUNDARY = 'fakeboundary'
+
+
+def multipart_part(name, data, filename=None):
+    disposition = 'form-data; name="%s"' % name
+    if filename:
+        disposition += '; filename="%s"' % filename
+    return (b'--%s\r\nContent-Disposition: %s\r\n\r\n' %
+            (BOUNDARY.encode(), disposition.encode()) + data + b'\r\n')
+
+
+class TestProxyUploads(base.OrchestratorTestCase):
+    def setUp(self):
+        super(TestProxyUploads, self).setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+        self.iso = os.urandom(256 * 1024)
+        self.body = (multipart_part('path_to_iso', self.iso, 'load.iso') +
+                     multipart_part('path_to_sig', b'signature', 'load.sig') +
+                     multipart_part('active', b'true') +
+                     b'--%s--\r\n' % BOUNDARY.encode())
+        self.environ = {
+            'REQUEST_METHOD': 'POST',
+            'CONTENT_TYPE': 'multipart/form-data; boundary=%s' % BOUNDARY,
+            'CONTENT_LENGTH': str(len(self.body)),
+            'wsgi.input': io.BytesIO(self.body)}
+
+    def test_spool_request_body(self):
+        self.assertTrue(proxy_utils.is_streamed_body(self.environ))
+
+        body_file = proxy_utils.spool_request_body(self.environ, self.tmpdir)
+
+        # The request is forwarded from the spooled body
+        self.assertEqual(self.body, self.environ['wsgi.input'].read())
+        proxy_utils.cleanup(self.environ)
+        self.assertFalse(os.path.exists(body_file.name))
+
+    def test_parse_multipart_files(self):
+        form = proxy_utils.parse_multipart_files(
+            self.environ, self.environ['wsgi.input'],
+            lambda filename: os.path.join(self.tmpdir, filename))
+
+        self.assertEqual('true', form['active'])
+        # The iso was written to its path while the body was parsed
+        iso_path = os.path.join(self.tmpdir, 'load.iso')
+        self.assertEqual(iso_path, form['path_to_iso'].file.name)
+
+        sig_path = os.path.join(self.tmpdir, 'load.sig')
+        proxy_utils.save_upload(form['path_to_iso'], iso_path)
+        proxy_utils.save_upload(form['path_to_sig'], sig_path)
+        with open(iso_path, 'rb') as f:
+            self.assertEqual(self.iso, f.read())
+        with open(sig_path, 'rb') as f:
+            self.assertEqual(b'signature', f.read())
+
+    def test_link_or_copy_file(self):
+        src = os.path.join(self.tmpdir, 'src')
+        dst = os.path.join(self.tmpdir, 'dst')
+        with open(src, 'wb') as f:
+            f.write(self.iso)
+        with open(dst, 'wb') as f:
+            f.write(b'stale')
+
+        proxy_utils.link_or_copy_file(src, dst)
+
+        with open(dst, 'rb') as f:
+            self.assertEqual(self.iso, f.read())
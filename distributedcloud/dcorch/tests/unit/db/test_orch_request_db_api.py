@@ -14,17 +14,21 @@
 # under the License.
 
 import datetime
+import mock
 import oslo_db
 import sqlalchemy
 
 from oslo_config import cfg
+from oslo_db import exception as oslo_db_exception
 from oslo_db import options
 from oslo_utils import timeutils
 from oslo_utils import uuidutils
 
+from dccommon.tests import utils as test_utils
 from dcorch.common import config
 from dcorch.common import consts
 from dcorch.common import exceptions
+from dcorch.common import utils as dcorch_utils
 from dcorch.db import api as api
 from dcorch.db.sqlalchemy import api as db_api
 from dcorch.tests import base
@@ -130,6 +134,105 @@ class DBAPIOrchRequestTest(base.OrchestratorTestCase):
         self.assertEqual(resource.id,
                          created_orch_jobs[0].get('resource_id'))
 
+    def test_orch_job_enqueue_all_subclouds(self):
+        for region_name in ['subcloud1', 'subcloud2', 'subcloud3']:
+            self.create_subcloud(self.ctx, region_name)
+
+        orch_job = db_api.orch_job_enqueue(
+            self.ctx, consts.RESOURCE_TYPE_SYSINV_DNS, 'master-dns',
+            consts.ENDPOINT_TYPE_PLATFORM, consts.OPERATION_TYPE_PATCH,
+            {'resource_info': '{}'})
+        self.assertIsNotNone(orch_job)
+
+        resource = db_api.resource_get_by_type_and_master_id(
+            self.ctx, consts.RESOURCE_TYPE_SYSINV_DNS, 'master-dns')
+        self.assertEqual(resource.id, orch_job.resource_id)
+
+        orch_requests = db_api.orch_request_get_all(
+            self.ctx, orch_job_id=orch_job.id)
+        self.assertEqual(['subcloud1', 'subcloud2', 'subcloud3'],
+                         sorted(r.target_region_name for r in orch_requests))
+        for orch_request in orch_requests:
+            self.assertEqual(consts.ORCH_REQUEST_QUEUED, orch_request.state)
+            self.assertIsNotNone(orch_request.uuid)
+
+    def test_orch_job_enqueue_existing_resource(self):
+        resource = self.create_resource(self.ctx,
+                                        consts.RESOURCE_TYPE_SYSINV_DNS,
+                                        master_id='master-dns')
+
+        orch_job = db_api.orch_job_enqueue(
+            self.ctx, consts.RESOURCE_TYPE_SYSINV_DNS, 'master-dns',
+            consts.ENDPOINT_TYPE_PLATFORM, consts.OPERATION_TYPE_PATCH,
+            {}, target_region_names=['RegionOne'])
+
+        self.assertEqual(resource.id, orch_job.resource_id)
+        self.assertEqual('master-dns', orch_job.source_resource_id)
+        orch_requests = db_api.orch_request_get_all(
+            self.ctx, orch_job_id=orch_job.id)
+        self.assertEqual(1, len(orch_requests))
+        self.assertEqual('RegionOne', orch_requests[0].target_region_name)
+
+    def test_orch_job_enqueue_batches(self):
+        region_names = ['subcloud%d' % i for i in range(
+            db_api.ORCH_REQUEST_INSERT_BATCH_SIZE * 2 + 1)]
+
+        orch_job = db_api.orch_job_enqueue(
+            self.ctx, consts.RESOURCE_TYPE_SYSINV_DNS, 'master-dns',
+            consts.ENDPOINT_TYPE_PLATFORM, consts.OPERATION_TYPE_PATCH,
+            {}, target_region_names=region_names)
+
+        orch_requests = db_api.orch_request_get_all(
+            self.ctx, orch_job_id=orch_job.id)
+        self.assertEqual(len(region_names), len(orch_requests))
+
+    def test_enqueue_work_duplicate_entry(self):
+        self.create_subcloud(self.ctx, 'subcloud1')
+
+        # The resource is still found to be a duplicate on the retry
+        with mock.patch.object(
+                db_api, '_orch_job_enqueue',
+                side_effect=oslo_db_exception.DBDuplicateEntry) as \
+                mock_enqueue:
+            dcorch_utils.enqueue_work(
+                self.ctx, consts.ENDPOINT_TYPE_PLATFORM,
+                consts.RESOURCE_TYPE_SYSINV_DNS, 'master-dns',
+                consts.OPERATION_TYPE_CREATE)
+            self.assertEqual(2, mock_enqueue.call_count)
+
+            self.assertRaises(oslo_db_exception.DBDuplicateEntry,
+                              dcorch_utils.enqueue_work,
+                              self.ctx, consts.ENDPOINT_TYPE_PLATFORM,
+                              consts.RESOURCE_TYPE_SYSINV_DNS, 'master-dns',
+                              consts.OPERATION_TYPE_DELETE)
+
+        self.assertEqual([], db_api.orch_job_get_all(self.ctx))
+
+    def test_enqueue_work_duplicate_entry_retried(self):
+        self.create_subcloud(self.ctx, 'subcloud1')
+        enqueue = db_api._orch_job_enqueue
+        # The resource is created concurrently, and found on the retry
+        side_effects = [oslo_db_exception.DBDuplicateEntry()]
+
+        def _orch_job_enqueue(*args, **kwargs):
+            if side_effects:
+                raise side_effects.pop()
+            return enqueue(*args, **kwargs)
+
+        with mock.patch.object(db_api, '_orch_job_enqueue',
+                               side_effect=_orch_job_enqueue):
+            dcorch_utils.enqueue_work(
+                self.ctx, consts.ENDPOINT_TYPE_PLATFORM,
+                consts.RESOURCE_TYPE_SYSINV_DNS, 'master-dns',
+                consts.OPERATION_TYPE_CREATE)
+
+        orch_jobs = db_api.orch_job_get_all(self.ctx)
+        self.assertEqual(1, len(orch_jobs))
+        orch_requests = db_api.orch_request_get_all(
+            self.ctx, orch_job_id=orch_jobs[0].id)
+        self.assertEqual(['subcloud1'],
+                         [r.target_region_name for r in orch_requests])
+
     def test_primary_key_subcloud(self):
         self.create_subcloud(self.ctx, SUBCLOUD_NAME_REGION_ONE)
         self.assertRaises(oslo_db.exception.DBDuplicateEntry,
@@ -484,3 +587,46 @@ class DBAPIOrchRequestTest(base.OrchestratorTestCase):
         self.assertEqual(expected_count, len(orch_jobs))
         resources = db_api.resource_get_all(self.ctx)
         self.assertEqual(expected_count, len(resources))
+
+    def create_fleet_orch_requests(self, num_subclouds, num_jobs):
+        region_names = ['subcloud%d' % i for i in range(num_subclouds)]
+        for i in range(num_jobs):
+            db_api.orch_job_enqueue(
+                self.ctx, consts.RESOURCE_TYPE_IDENTITY_USERS,
+                'user-%d' % i, consts.ENDPOINT_TYPE_IDENTITY,
+                consts.OPERATION_TYPE_POST,
+                {'resource_info': '{}', 'source_resource_id': 'user-%d' % i},
+                target_region_names=region_names)
+
+    def test_orch_request_get_by_attrs_query_count(self):
+        # The sync of one subcloud must not load the orch requests of the
+        # other subclouds through the orch_job relationship.
+        self.create_fleet_orch_requests(num_subclouds=50, num_jobs=10)
+
+        with test_utils.count_statements(get_engine()) as statements:
+            orch_requests = db_api.orch_request_get_by_attrs(
+                self.ctx, consts.ENDPOINT_TYPE_IDENTITY,
+                target_region_name='subcloud0',
+                states=[consts.ORCH_REQUEST_QUEUED])
+
+        self.assertEqual(10, len(orch_requests))
+        self.assertEqual(1, len(statements))
+        for orch_request in orch_requests:
+            self.assertEqual(orch_request.orch_job_id,
+                             orch_request.orch_job.id)
+            self.assertNotIn('orchrequests', orch_request.orch_job.__dict__)
+
+    def test_orch_request_get_source_resource_ids_by_attrs(self):
+        self.create_fleet_orch_requests(num_subclouds=50, num_jobs=10)
+
+        with test_utils.count_statements(get_engine()) as statements:
+            source_resource_ids = \
+                db_api.orch_request_get_source_resource_ids_by_attrs(
+                    self.ctx, consts.ENDPOINT_TYPE_IDENTITY,
+                    resource_type=consts.RESOURCE_TYPE_IDENTITY_USERS,
+                    target_region_name='subcloud0',
+                    states=[consts.ORCH_REQUEST_QUEUED])
+
+        self.assertEqual(['user-%d' % i for i in range(10)],
+                         source_resource_ids)
+        self.assertEqual(1, len(statements))
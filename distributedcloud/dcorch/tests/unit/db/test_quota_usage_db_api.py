@@ -0,0 +1,126 @@
+# Copyright (c) 2022 Wind River Systems, Inc.
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+
+import sqlalchemy
+
+from oslo_config import cfg
+from oslo_db import options
+from oslo_utils import timeutils
+
+from dcorch.common import config
+from dcorch.common import consts
+from dcorch.common import utils as dcorch_utils
+from dcorch.db import api as api
+from dcorch.db.sqlalchemy import api as db_api
+from dcorch.tests import base
+from dcorch.tests import utils
+
+config.register_options()
+get_engine = api.get_engine
+
+USAGES = {'cores': 4, 'ram': 2048, 'network': 2}
+
+
+class DBAPIQuotaUsageTest(base.OrchestratorTestCase):
+    def setup_dummy_db(self):
+        options.cfg.set_defaults(options.database_opts,
+                                 sqlite_synchronous=False)
+        options.set_defaults(cfg.CONF, connection="sqlite://")
+        engine = get_engine()
+        db_api.db_sync(engine)
+        engine.connect()
+
+    @staticmethod
+    def reset_dummy_db():
+        engine = get_engine()
+        meta = sqlalchemy.MetaData()
+        meta.reflect(bind=engine)
+
+        for table in reversed(meta.sorted_tables):
+            if table.name == 'migrate_version':
+                continue
+            engine.execute(table.delete())
+
+    def setUp(self):
+        super(DBAPIQuotaUsageTest, self).setUp()
+
+        self.setup_dummy_db()
+        self.addCleanup(self.reset_dummy_db)
+        self.ctx = utils.dummy_context()
+
+    def test_quota_usage_update(self):
+        db_api.quota_usage_update(self.ctx, 'project1', None, USAGES)
+        db_api.quota_usage_update(self.ctx, 'project1', 'user1',
+                                  {'cores': 1})
+
+        usage = db_api.quota_usage_get(self.ctx, 'project1', None)
+        self.assertEqual(USAGES, usage.usages)
+        self.assertIsNotNone(usage.updated_at)
+        usage = db_api.quota_usage_get(self.ctx, 'project1', 'user1')
+        self.assertEqual({'cores': 1}, usage.usages)
+        self.assertIsNone(db_api.quota_usage_get(self.ctx, 'project2', None))
+
+        # The existing usage is updated in place
+        db_api.quota_usage_update(self.ctx, 'project1', None, {'cores': 2})
+        usage = db_api.quota_usage_get(self.ctx, 'project1', None)
+        self.assertEqual({'cores': 2}, usage.usages)
+
+    def test_quota_usage_update_refreshes_unchanged_usage(self):
+        db_api.quota_usage_update(self.ctx, 'project1', None, USAGES)
+        first_update = db_api.quota_usage_get(
+            self.ctx, 'project1', None).updated_at
+
+        timeutils.set_time_override(
+            first_update + datetime.timedelta(seconds=60))
+        self.addCleanup(timeutils.clear_time_override)
+        db_api.quota_usage_update(self.ctx, 'project1', None, USAGES)
+        usage = db_api.quota_usage_get(self.ctx, 'project1', None)
+        self.assertGreater(usage.updated_at, first_update)
+
+    def test_quota_usage_purge(self):
+        db_api.quota_usage_update(self.ctx, 'project1', None, USAGES)
+        db_api.quota_usage_update(self.ctx, 'project2', None, USAGES)
+        usage = db_api.quota_usage_get(self.ctx, 'project2', None)
+
+        db_api.quota_usage_purge(self.ctx, usage.updated_at)
+        self.assertIsNotNone(db_api.quota_usage_get(self.ctx, 'project2',
+                                                    None))
+        db_api.quota_usage_purge(
+            self.ctx, usage.updated_at + datetime.timedelta(seconds=1))
+        self.assertIsNone(db_api.quota_usage_get(self.ctx, 'project2', None))
+
+    def test_get_cached_quota_usage(self):
+        self.assertIsNone(dcorch_utils.get_cached_quota_usage(
+            self.ctx, consts.ENDPOINT_TYPE_COMPUTE, 'project1', None))
+
+        db_api.quota_usage_update(self.ctx, 'project1', None, USAGES)
+        self.assertEqual(
+            {'cores': 4, 'ram': 2048},
+            dcorch_utils.get_cached_quota_usage(
+                self.ctx, consts.ENDPOINT_TYPE_COMPUTE, 'project1', None))
+        self.assertEqual(
+            {'network': 2},
+            dcorch_utils.get_cached_quota_usage(
+                self.ctx, consts.ENDPOINT_TYPE_NETWORK, 'project1', None))
+
+        # Stale usage is not served
+        timeutils.set_time_override(
+            timeutils.utcnow() + datetime.timedelta(
+                seconds=cfg.CONF.quota_usage_cache_ttl + 1))
+        self.addCleanup(timeutils.clear_time_override)
+        self.assertIsNone(dcorch_utils.get_cached_quota_usage(
+            self.ctx, consts.ENDPOINT_TYPE_COMPUTE, 'project1', None))
@@ -22,6 +22,7 @@ from oslo_db import options
 
 from dcmanager.common import consts as dcm_consts
 from dcorch.common import config
+from dcorch.common import consts
 from dcorch.common import exceptions
 from dcorch.db import api as api
 from dcorch.db.sqlalchemy import api as db_api
@@ -192,6 +193,76 @@ class DBAPISubcloudTest(base.OrchestratorTestCase):
             self.assertEqual(dcm_consts.AVAILABILITY_OFFLINE,
                              by_status.availability_status)
 
+    def test_subcloud_sync_get_pending(self):
+        for region_name, availability_status in (
+                ('RegionOne', dcm_consts.AVAILABILITY_ONLINE),
+                ('RegionTwo', dcm_consts.AVAILABILITY_OFFLINE)):
+            subcloud = self.create_subcloud(
+                self.ctx, region_name,
+                availability_status=availability_status)
+            for endpoint_type, sync_request in (
+                    ('platform', consts.SYNC_STATUS_REQUESTED),
+                    ('identity', consts.SYNC_STATUS_FAILED),
+                    ('keystone', consts.SYNC_STATUS_COMPLETED)):
+                db_api.subcloud_sync_create(
+                    self.ctx, region_name, endpoint_type,
+                    values={'subcloud_id': subcloud.id,
+                            'sync_request': sync_request})
+
+        pending = db_api.subcloud_sync_get_pending(
+            self.ctx,
+            [consts.SYNC_STATUS_REQUESTED, consts.SYNC_STATUS_FAILED],
+            availability_status=dcm_consts.AVAILABILITY_ONLINE)
+
+        self.assertEqual([('RegionOne', 'identity'),
+                          ('RegionOne', 'platform')], sorted(pending))
+
+    def test_subcloud_sync_update_all(self):
+        for region_name, management_state in (
+                ('RegionOne', dcm_consts.MANAGEMENT_MANAGED),
+                ('RegionTwo', dcm_consts.MANAGEMENT_UNMANAGED)):
+            subcloud = self.create_subcloud(
+                self.ctx, region_name, management_state=management_state)
+            for endpoint_type in ('platform', 'identity'):
+                db_api.subcloud_sync_create(
+                    self.ctx, region_name, endpoint_type,
+                    values={'subcloud_id': subcloud.id,
+                            'sync_request': consts.SYNC_STATUS_COMPLETED})
+
+        count = db_api.subcloud_sync_update_all(
+            self.ctx, dcm_consts.MANAGEMENT_MANAGED, 'platform',
+            values={'sync_request': consts.SYNC_STATUS_REQUESTED})
+
+        self.assertEqual(1, count)
+        pending = db_api.subcloud_sync_get_pending(
+            self.ctx, [consts.SYNC_STATUS_REQUESTED])
+        self.assertEqual([('RegionOne', 'platform')], pending)
+
+    def test_subcloud_sync_update_endpoints(self):
+        subcloud = self.create_subcloud(self.ctx, 'RegionOne')
+        for endpoint_type in ('platform', 'identity', 'keystone'):
+            db_api.subcloud_sync_create(
+                self.ctx, 'RegionOne', endpoint_type,
+                values={'subcloud_id': subcloud.id,
+                        'audit_status': consts.AUDIT_STATUS_COMPLETED})
+
+        db_api.subcloud_sync_update_endpoints(
+            self.ctx, 'RegionOne', ['platform', 'identity'],
+            values={'audit_status': consts.AUDIT_STATUS_NONE})
+
+        for endpoint_type, audit_status in (
+                ('platform', consts.AUDIT_STATUS_NONE),
+                ('identity', consts.AUDIT_STATUS_NONE),
+                ('keystone', consts.AUDIT_STATUS_COMPLETED)):
+            subcloud_sync = db_api.subcloud_sync_get(
+                self.ctx, 'RegionOne', endpoint_type)
+            self.assertEqual(audit_status, subcloud_sync.audit_status)
+
+        self.assertRaises(exceptions.SubcloudSyncNotFound,
+                          db_api.subcloud_sync_update_endpoints,
+                          self.ctx, 'RegionTwo', ['platform'],
+                          values={'audit_status': consts.AUDIT_STATUS_NONE})
+
     def test_subcloud_duplicate_region_names(self):
         region_name = 'RegionOne'
         subcloud = self.create_subcloud(self.ctx, region_name)
@@ -0,0 +1,104 @@
+# Copyright (c) 2022 Wind River Systems, Inc.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+import mock
+
+from dcorch.common import consts
+from dcorch.engine.sync_services import compute
+from dcorch.engine import sync_thread
+
+from dcorch.tests import base
+
+
+class FakeUser(object):
+    def __init__(self, id):
+        self.id = id
+
+
+class FakeKeypair(object):
+    def __init__(self, name):
+        self.name = name
+        self._info = {'keypair': {'name': name}}
+
+
+class FakeFlavor(object):
+    def __init__(self, id, is_public):
+        self.id = id
+        self.is_public = is_public
+
+    def get_keys(self):
+        return {'key': self.id}
+
+
+class TestComputeSyncThreadAudit(base.OrchestratorTestCase):
+    def setUp(self):
+        super(TestComputeSyncThreadAudit, self).setUp()
+
+        p = mock.patch.object(sync_thread, 'dcmanager_rpc_client')
+        p.start()
+        self.addCleanup(p.stop)
+
+        p = mock.patch.object(compute.ComputeSyncThread, 'initialize')
+        p.start()
+        self.addCleanup(p.stop)
+
+        self.addCleanup(sync_thread.SyncThread.master_resources_dict.clear)
+
+        self.ks_client = mock.MagicMock()
+        self.ks_client.users.list.return_value = [
+            FakeUser('user%d' % i) for i in range(10)]
+        self.m_nova_client = mock.MagicMock()
+        self.m_nova_client.keypairs.list.side_effect = \
+            lambda user_id: [FakeKeypair('kp')] if user_id == 'user1' else []
+
+    def create_sync_thread(self, subcloud_name):
+        sync_obj = compute.ComputeSyncThread(subcloud_name)
+        sync_obj.ks_client = self.ks_client
+        sync_obj.m_nova_client = self.m_nova_client
+        sync_obj.sc_nova_client = mock.MagicMock()
+        sync_obj.sc_nova_client.keypairs.list.return_value = []
+        sync_obj.initialize_sc_clients = mock.MagicMock()
+        sync_obj.get_db_master_resources = mock.MagicMock(return_value=[])
+        return sync_obj
+
+    def test_master_keypairs_shared_across_subclouds(self):
+        for subcloud_name in ['subcloud1', 'subcloud2']:
+            sync_obj = self.create_sync_thread(subcloud_name)
+            m_resources, _, sc_resources = sync_obj.get_all_resources(
+                consts.RESOURCE_TYPE_COMPUTE_KEYPAIR)
+
+            self.assertEqual(['kp'], [kp.name for kp in m_resources])
+            self.assertEqual(
+                'user1', m_resources[0]._info['keypair']['user_id'])
+            # Only the users with keypairs in the master are queried
+            sync_obj.sc_nova_client.keypairs.list.assert_called_once_with(
+                'user1')
+
+        # The master keypairs were read once for both subclouds
+        self.ks_client.users.list.assert_called_once()
+        self.assertEqual(10, self.m_nova_client.keypairs.list.call_count)
+
+    def test_flavor_resources(self):
+        sync_obj = self.create_sync_thread('subcloud1')
+        nc = mock.MagicMock()
+        nc.flavors.list.return_value = [FakeFlavor('f1', True),
+                                        FakeFlavor('f2', False)]
+        nc.flavor_access.list.return_value = ['access']
+
+        flavors = sync_obj.get_flavor_resources(nc)
+
+        self.assertEqual([[], ['access']], [f.attach_fa for f in flavors])
+        self.assertEqual([{'key': 'f1'}, {'key': 'f2'}],
+                         [f.attach_es for f in flavors])
+        nc.flavor_access.list.assert_called_once_with(flavor='f2')
@@ -209,3 +209,81 @@ class TestGenericSyncManager(base.OrchestratorTestCase):
             management_state=dcm_consts.MANAGEMENT_MANAGED,
             availability_status=dcm_consts.AVAILABILITY_ONLINE,
             initial_sync_state=consts.INITIAL_SYNC_STATE_REQUESTED)
+
+    def test_sync_subclouds(self):
+        for name, sync_request in (
+                ('subcloud1', consts.SYNC_STATUS_REQUESTED),
+                ('subcloud2', consts.SYNC_STATUS_COMPLETED)):
+            subcloud = self.create_subcloud_static(
+                self.ctx, name=name,
+                initial_sync_state=consts.INITIAL_SYNC_STATE_COMPLETED)
+            db_api.subcloud_sync_create(
+                self.ctx, name, consts.ENDPOINT_TYPE_PLATFORM,
+                values={'subcloud_id': subcloud.id,
+                        'sync_request': sync_request})
+
+        gsm = generic_sync_manager.GenericSyncManager(self.engine_id)
+        gsm.init_from_db(self.ctx)
+        for name in ('subcloud1', 'subcloud2'):
+            gsm.sync_objs[name] = {
+                consts.ENDPOINT_TYPE_PLATFORM: mock.MagicMock()}
+        gsm.sync_scheduler = mock.MagicMock()
+
+        gsm.sync_subclouds(self.engine_id)
+
+        # Only the endpoint with a pending sync request is queued
+        gsm.sync_scheduler.submit.assert_called_once_with(
+            'subcloud1', consts.ENDPOINT_TYPE_PLATFORM, gsm._sync_subcloud,
+            gsm.context, self.engine_id, 'subcloud1',
+            consts.ENDPOINT_TYPE_PLATFORM)
+
+    def test_sync_subcloud(self):
+        subcloud = self.create_subcloud_static(
+            self.ctx, name='subcloud1',
+            initial_sync_state=consts.INITIAL_SYNC_STATE_COMPLETED)
+        db_api.subcloud_sync_create(
+            self.ctx, 'subcloud1', consts.ENDPOINT_TYPE_PLATFORM,
+            values={'subcloud_id': subcloud.id,
+                    'sync_request': consts.SYNC_STATUS_REQUESTED})
+
+        gsm = generic_sync_manager.GenericSyncManager(self.engine_id)
+        sync_obj = mock.MagicMock()
+        gsm.sync_objs['subcloud1'] = {
+            consts.ENDPOINT_TYPE_PLATFORM: sync_obj}
+
+        gsm._sync_subcloud(self.ctx, self.engine_id, 'subcloud1',
+                           consts.ENDPOINT_TYPE_PLATFORM)
+        sync_obj.sync.assert_called_once_with(self.engine_id)
+        subcloud_sync = db_api.subcloud_sync_get(
+            self.ctx, 'subcloud1', consts.ENDPOINT_TYPE_PLATFORM)
+        self.assertEqual(consts.SYNC_STATUS_COMPLETED,
+                         subcloud_sync.sync_request)
+
+        # The sync is no longer required when its turn comes again
+        gsm._sync_subcloud(self.ctx, self.engine_id, 'subcloud1',
+                           consts.ENDPOINT_TYPE_PLATFORM)
+        sync_obj.sync.assert_called_once_with(self.engine_id)
+
+    def test_sync_request_wakes_sync_job(self):
+        for name, management_state in (
+                ('subcloud1', dcm_consts.MANAGEMENT_MANAGED),
+                ('subcloud2', dcm_consts.MANAGEMENT_UNMANAGED)):
+            subcloud = self.create_subcloud_static(
+                self.ctx, name=name, management_state=management_state)
+            db_api.subcloud_sync_create(
+                self.ctx, name, consts.ENDPOINT_TYPE_PLATFORM,
+                values={'subcloud_id': subcloud.id})
+
+        gsm = generic_sync_manager.GenericSyncManager(self.engine_id)
+        self.assertFalse(gsm.sync_wakeup.ready())
+
+        gsm.sync_request(self.ctx, consts.ENDPOINT_TYPE_PLATFORM)
+
+        # Only the managed subcloud is requested to sync
+        self.assertEqual(
+            [('subcloud1', consts.ENDPOINT_TYPE_PLATFORM)],
+            db_api.subcloud_sync_get_pending(
+                self.ctx, [consts.SYNC_STATUS_REQUESTED]))
+        self.assertTrue(gsm.sync_wakeup.ready())
+        # Waking an already woken engine is harmless
+        gsm.wakeup_sync()
@@ -0,0 +1,106 @@
+# Copyright (c) 2022 Wind River Systems, Inc.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+import mock
+
+from dcorch.common import consts
+from dcorch.common import exceptions
+from dcorch.engine.sync_services import identity
+from dcorch.engine import sync_thread
+
+from dcorch.tests import base
+
+SUBCLOUD_NAME = 'subcloud1'
+
+
+class FakeKeystoneResource(object):
+    def __init__(self, id):
+        self.id = id
+
+
+class FakeResource(object):
+    def __init__(self, id, master_id):
+        self.id = id
+        self.master_id = master_id
+
+
+class TestIdentitySyncThreadInventory(base.OrchestratorTestCase):
+    def setUp(self):
+        super(TestIdentitySyncThreadInventory, self).setUp()
+
+        p = mock.patch.object(sync_thread, 'dcmanager_rpc_client')
+        p.start()
+        self.addCleanup(p.stop)
+
+        p = mock.patch.object(identity, 'sdk')
+        p.start()
+        self.addCleanup(p.stop)
+
+        self.sc_ks_client = mock.MagicMock()
+        self.sc_ks_client.roles.list.return_value = [
+            FakeKeystoneResource('role1')]
+        self.sc_ks_client.projects.list.return_value = [
+            FakeKeystoneResource('project1')]
+        self.sc_ks_client.domains.list.return_value = [
+            FakeKeystoneResource('domain1')]
+        self.sc_ks_client.users.list.return_value = [
+            FakeKeystoneResource('user1')]
+        self.sc_ks_client.groups.list.return_value = [
+            FakeKeystoneResource('group1')]
+
+        self.sync_obj = identity.IdentitySyncThread(SUBCLOUD_NAME)
+        self.sync_obj.get_ks_client = mock.MagicMock(
+            return_value=self.sc_ks_client)
+        self.sync_obj.persist_db_subcloud_resource = mock.MagicMock()
+
+    def test_inventory_retrieved_once_per_sync_pass(self):
+        for index, actor_id in enumerate(['user1', 'group1', 'user1']):
+            rsrc = FakeResource(index, 'project1_%s_role1' % actor_id)
+            self.sync_obj.post_project_role_assignments(mock.MagicMock(),
+                                                        rsrc)
+
+        self.sc_ks_client.roles.list.assert_called_once()
+        self.sc_ks_client.projects.list.assert_called_once()
+        self.assertEqual(3, self.sc_ks_client.roles.grant.call_count)
+        self.sc_ks_client.roles.grant.assert_any_call(
+            'role1', group='group1', project='project1')
+
+        # The inventory is dropped at the end of the sync pass
+        self.sync_obj.post_sync()
+        self.sync_obj.post_project_role_assignments(
+            mock.MagicMock(), FakeResource(4, 'project1_user1_role1'))
+        self.assertEqual(2, self.sc_ks_client.roles.list.call_count)
+
+    def test_inventory_updated_by_created_resources(self):
+        self.sync_obj.post_project_role_assignments(
+            mock.MagicMock(), FakeResource(1, 'project1_user1_role1'))
+
+        self.sync_obj._add_to_sc_identity_inventory(
+            consts.RESOURCE_TYPE_IDENTITY_USERS, 'user2')
+        self.sync_obj.post_project_role_assignments(
+            mock.MagicMock(), FakeResource(2, 'project1_user2_role1'))
+
+        self.sc_ks_client.users.list.assert_called_once()
+        self.sc_ks_client.roles.grant.assert_called_with(
+            'role1', user='user2', project='project1')
+
+    def test_inventory_refreshed_on_missing_reference(self):
+        self.sync_obj.post_project_role_assignments(
+            mock.MagicMock(), FakeResource(1, 'project1_user1_role1'))
+
+        self.assertRaises(exceptions.SyncRequestFailed,
+                          self.sync_obj.post_project_role_assignments,
+                          mock.MagicMock(),
+                          FakeResource(2, 'project2_user1_role1'))
+        self.assertEqual(2, self.sc_ks_client.projects.list.call_count)
@@ -0,0 +1,141 @@
+# Copyright (c) 2022 Wind River Systems, Inc.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+import collections
+
+import mock
+
+from dccommon import consts as dccommon_consts
+from dcorch.engine import quota_manager
+from dcorch.tests import base
+
+MASTER = dccommon_consts.VIRTUAL_MASTER_CLOUD
+REGIONS = [MASTER, 'subcloud1', 'subcloud2']
+
+# Usage of each project in each region
+USAGES = {
+    'project1': {MASTER: {'cores': 1}, 'subcloud1': {'cores': 2},
+                 'subcloud2': {'cores': 3}},
+    'project2': {MASTER: {'cores': 0}, 'subcloud1': {'cores': 5},
+                 'subcloud2': {'cores': 0}},
+}
+
+
+class FakeResource(object):
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+
+class FakeOpenStackDriver(object):
+    calls = collections.Counter()
+
+    def __init__(self, region_name=MASTER):
+        self.region_name = region_name
+
+    def _prefix(self):
+        # The ids of the projects differ between the regions
+        return '' if self.region_name == MASTER else self.region_name + '-'
+
+    def get_enabled_projects(self, id_only=True):
+        self.calls[('list_projects', self.region_name)] += 1
+        return [FakeResource(self._prefix() + name, name)
+                for name in USAGES]
+
+    def get_enabled_users(self, id_only=True):
+        self.calls[('list_users', self.region_name)] += 1
+        return []
+
+    def get_all_regions_for_project(self, project_id):
+        return list(REGIONS)
+
+    def get_resource_usages(self, project_id, user_id):
+        self.calls[('usage', self.region_name)] += 1
+        name = project_id[len(self._prefix()):]
+        return USAGES[name][self.region_name], {}, {}
+
+
+class TestQuotaManager(base.OrchestratorTestCase):
+    def setUp(self):
+        super(TestQuotaManager, self).setUp()
+
+        FakeOpenStackDriver.calls.clear()
+        p = mock.patch.object(quota_manager.sdk, 'OpenStackDriver',
+                              FakeOpenStackDriver)
+        p.start()
+        self.addCleanup(p.stop)
+
+        p = mock.patch.object(quota_manager, 'endpoint_cache')
+        p.start()
+        self.addCleanup(p.stop)
+
+        p = mock.patch.object(quota_manager, 'db_api')
+        p.start()
+        self.addCleanup(p.stop)
+
+        self.qm = quota_manager.QuotaManager()
+        self.qm.get_overall_tenant_quota_limits = mock.MagicMock(
+            return_value={'cores': 20})
+        self.qm.update_quota_limits = mock.MagicMock()
+
+    def test_balance_projects_reads_each_region_once(self):
+        self.qm._balance_projects([('project1', None), ('project2', None)])
+
+        for region in REGIONS:
+            # The projects are found by name in the region with a single
+            # listing, then the usage is read for each of them
+            self.assertEqual(
+                1, FakeOpenStackDriver.calls[('list_projects', region)])
+            self.assertEqual(2, FakeOpenStackDriver.calls[('usage', region)])
+        # No users to look up
+        self.assertEqual(0, FakeOpenStackDriver.calls[('list_users', MASTER)])
+
+        # Total usage: 6 cores for project1 and 5 for project2
+        self.qm.update_quota_limits.assert_has_calls([
+            mock.call('subcloud1-project1', None,
+                      {'nova': {'cores': 16}, 'cinder': {}, 'neutron': {}},
+                      'subcloud1'),
+            mock.call('subcloud2-project1', None,
+                      {'nova': {'cores': 17}, 'cinder': {}, 'neutron': {}},
+                      'subcloud2'),
+            mock.call('subcloud1-project2', None,
+                      {'nova': {'cores': 20}, 'cinder': {}, 'neutron': {}},
+                      'subcloud1'),
+            mock.call('subcloud2-project2', None,
+                      {'nova': {'cores': 15}, 'cinder': {}, 'neutron': {}},
+                      'subcloud2'),
+        ], any_order=True)
+        self.assertEqual(4, self.qm.update_quota_limits.call_count)
+        self.assertEqual({'cores': 6},
+                         self.qm.total_project_usages[('project1', None)])
+
+    def test_balance_projects_skips_incomplete_usage(self):
+        failing_regions = ['subcloud2']
+        get_resource_usages = FakeOpenStackDriver.get_resource_usages
+
+        def fake_get_resource_usages(driver, project_id, user_id):
+            if (driver.region_name in failing_regions and
+                    project_id.endswith('project1')):
+                raise Exception('Unreachable')
+            return get_resource_usages(driver, project_id, user_id)
+
+        with mock.patch.object(FakeOpenStackDriver, 'get_resource_usages',
+                               fake_get_resource_usages):
+            self.qm._balance_projects([('project1', None),
+                                       ('project2', None)])
+
+        # Only the limits of project2 are updated
+        self.assertEqual(2, self.qm.update_quota_limits.call_count)
+        for call in self.qm.update_quota_limits.call_args_list:
+            self.assertTrue(call[0][0].endswith('project2'))
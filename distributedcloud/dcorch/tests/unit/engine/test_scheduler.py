@@ -0,0 +1,126 @@
+# Copyright (c) 2022 Wind River Systems, Inc.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+import eventlet
+import mock
+
+from dcorch.engine import scheduler
+
+from dcorch.tests import base
+
+
+class TestWorkQueueScheduler(base.OrchestratorTestCase):
+    def setUp(self):
+        super(TestWorkQueueScheduler, self).setUp()
+        self.events = []
+        self.running = 0
+        self.max_running = 0
+
+    def work(self, name, duration=0):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        self.events.append(name)
+        try:
+            eventlet.sleep(duration)
+        finally:
+            self.running -= 1
+
+    def test_concurrency_bounded(self):
+        work_scheduler = scheduler.WorkQueueScheduler('Test', 2)
+        for i in range(6):
+            work_scheduler.submit('subcloud%d' % i, 'sync', self.work,
+                                  'subcloud%d' % i, 0.01)
+
+        self.assertEqual(4, work_scheduler.get_stats()['queued'])
+        work_scheduler.waitall()
+
+        self.assertEqual(2, self.max_running)
+        self.assertEqual(['subcloud%d' % i for i in range(6)], self.events)
+        stats = work_scheduler.get_stats()
+        self.assertEqual(0, stats['queued'])
+        self.assertEqual(6, stats['started'])
+        self.assertGreater(stats['wait_max'], 0)
+
+    def test_slow_subcloud_does_not_hold_back_others(self):
+        work_scheduler = scheduler.WorkQueueScheduler('Test', 2)
+        work_scheduler.submit('slow', 'sync', self.work, 'slow', 0.5)
+        for i in range(4):
+            work_scheduler.submit('subcloud%d' % i, 'sync', self.work,
+                                  'subcloud%d' % i)
+
+        # The other subclouds go through the second greenthread while the
+        # slow subcloud is still running
+        eventlet.sleep(0.1)
+        self.assertEqual(['slow'] + ['subcloud%d' % i for i in range(4)],
+                         self.events)
+        self.assertEqual(1, work_scheduler.get_stats()['running'])
+        work_scheduler.waitall()
+
+    def test_work_coalesced_per_subcloud_endpoint(self):
+        work_scheduler = scheduler.WorkQueueScheduler('Test', 10)
+
+        self.assertTrue(work_scheduler.submit(
+            'subcloud1', 'platform', self.work, 'platform-1', 0.01))
+        # Queued while the same work is running
+        self.assertFalse(work_scheduler.submit(
+            'subcloud1', 'platform', self.work, 'platform-2'))
+        # The same work of another subcloud is queued
+        self.assertTrue(work_scheduler.submit(
+            'subcloud2', 'platform', self.work, 'platform-3'))
+        work_scheduler.waitall()
+
+        self.assertEqual(['platform-1', 'platform-3'], self.events)
+
+    def test_subcloud_endpoints_run_concurrently(self):
+        work_scheduler = scheduler.WorkQueueScheduler('Test', 10)
+
+        self.assertTrue(work_scheduler.submit(
+            'subcloud1', 'identity', self.work, 'identity', 0.5))
+        self.assertTrue(work_scheduler.submit(
+            'subcloud1', 'platform', self.work, 'platform', 0.5))
+
+        # Both endpoints of the subcloud run at the same time
+        eventlet.sleep(0.1)
+        self.assertEqual(['identity', 'platform'], self.events)
+        self.assertEqual(2, work_scheduler.get_stats()['running'])
+        work_scheduler.waitall()
+
+        self.assertEqual(2, self.max_running)
+
+    def test_deadline(self):
+        on_timeout = mock.MagicMock()
+        work_scheduler = scheduler.WorkQueueScheduler(
+            'Test', 10, deadline=0.01, on_timeout=on_timeout)
+
+        work_scheduler.submit('subcloud1', 'platform', self.work,
+                              'subcloud1', 10)
+        work_scheduler.submit('subcloud2', 'platform', self.work,
+                              'subcloud2')
+        work_scheduler.waitall()
+
+        on_timeout.assert_called_once_with('subcloud1', 'platform')
+        self.assertEqual(1, work_scheduler.get_stats()['timeouts'])
+        self.assertEqual(0, self.running)
+
+    def test_failed_work(self):
+        work_scheduler = scheduler.WorkQueueScheduler('Test', 1)
+        failed_work = mock.MagicMock(side_effect=Exception('fake'))
+
+        work_scheduler.submit('subcloud1', 'platform', failed_work)
+        work_scheduler.submit('subcloud2', 'platform', self.work,
+                              'subcloud2')
+        work_scheduler.waitall()
+
+        failed_work.assert_called_once_with()
+        self.assertEqual(['subcloud2'], self.events)
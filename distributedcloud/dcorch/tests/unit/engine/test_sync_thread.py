@@ -0,0 +1,233 @@
+# Copyright (c) 2022 Wind River Systems, Inc.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+import datetime
+import mock
+
+from oslo_utils import timeutils
+
+from dcmanager.common import consts as dcm_consts
+from dcorch.common import config
+from dcorch.common import consts
+from dcorch.db.sqlalchemy import api as db_api
+from dcorch.engine import sync_thread
+
+from dcorch.tests import base
+
+config.register_options()
+
+SUBCLOUD_NAME = 'subcloud1'
+RESOURCE_TYPE = consts.RESOURCE_TYPE_IDENTITY_USERS
+
+
+class FakeResource(object):
+    def __init__(self, id, name=None):
+        self.id = id
+        self.name = name
+
+
+class FakeSyncThread(sync_thread.SyncThread):
+    def same_resource(self, resource_type, m_resource, sc_resource):
+        return m_resource.name == sc_resource.name
+
+
+class TestSyncThreadAudit(base.OrchestratorTestCase):
+    def setUp(self):
+        super(TestSyncThreadAudit, self).setUp()
+
+        # Mock the context
+        p = mock.patch.object(sync_thread, 'context')
+        self.mock_context = p.start()
+        self.mock_context.get_admin_context.return_value = self.ctx
+        self.addCleanup(p.stop)
+
+        # Mock the dcmanager rpc client
+        p = mock.patch.object(sync_thread, 'dcmanager_rpc_client')
+        self.mock_dcmanager_rpc_client = p.start()
+        self.addCleanup(p.stop)
+
+        self.subcloud = db_api.subcloud_create(
+            self.ctx, SUBCLOUD_NAME,
+            values={'software_version': '10.04',
+                    'capabilities': {},
+                    'management_state': dcm_consts.MANAGEMENT_MANAGED,
+                    'availability_status': dcm_consts.AVAILABILITY_ONLINE})
+        self.sync_obj = FakeSyncThread(SUBCLOUD_NAME,
+                                       consts.ENDPOINT_TYPE_IDENTITY)
+        self.sync_obj.audit_action = mock.MagicMock(return_value=1)
+
+    def create_db_resource(self, master_id, subcloud_resource_id=None):
+        rsrc = db_api.resource_create(self.ctx, RESOURCE_TYPE,
+                                      values={'master_id': master_id})
+        if subcloud_resource_id:
+            db_api.subcloud_resource_create(
+                self.ctx, self.subcloud.id, rsrc.id,
+                values={'subcloud_resource_id': subcloud_resource_id})
+        return rsrc
+
+    def get_db_resources(self):
+        return self.sync_obj.get_db_master_resources(RESOURCE_TYPE)
+
+    def test_get_db_subcloud_resources(self):
+        rsrc = self.create_db_resource('master-1', 'sc-1')
+        self.create_db_resource('master-2')
+
+        subcloud_rsrcs = self.sync_obj.get_db_subcloud_resources()
+
+        self.assertEqual([rsrc.id], list(subcloud_rsrcs.keys()))
+        self.assertEqual('sc-1',
+                         subcloud_rsrcs[rsrc.id].subcloud_resource_id)
+
+    def test_audit_find_missing_in_sync(self):
+        self.create_db_resource('master-1', 'sc-1')
+        self.create_db_resource('master-2', 'sc-2')
+        m_resources = [FakeResource('master-1', 'a'),
+                       FakeResource('master-2', 'b')]
+        sc_resources = [FakeResource('sc-2', 'b'),
+                        FakeResource('sc-1', 'a')]
+        db_resources = self.get_db_resources()
+
+        num_of_audit_jobs = self.sync_obj.audit_find_missing(
+            RESOURCE_TYPE, m_resources, db_resources, sc_resources, [])
+
+        self.assertEqual(0, num_of_audit_jobs)
+        self.assertEqual([], db_resources)
+        self.sync_obj.audit_action.assert_not_called()
+
+    def test_audit_find_missing_resource_mismatch(self):
+        self.create_db_resource('master-1', 'sc-1')
+        m_resources = [FakeResource('master-1', 'a')]
+        sc_resources = [FakeResource('sc-1', 'changed')]
+        db_resources = self.get_db_resources()
+
+        num_of_audit_jobs = self.sync_obj.audit_find_missing(
+            RESOURCE_TYPE, m_resources, db_resources, sc_resources, [])
+
+        self.assertEqual(1, num_of_audit_jobs)
+        self.sync_obj.audit_action.assert_called_once_with(
+            RESOURCE_TYPE, sync_thread.AUDIT_RESOURCE_MISSING,
+            m_resources[0])
+
+    def test_audit_find_missing_and_extra(self):
+        self.create_db_resource('master-1', 'sc-1')
+        extra = self.create_db_resource('master-2', 'sc-2')
+        m_resources = [FakeResource('master-1', 'a'),
+                       FakeResource('master-3', 'c')]
+        sc_resources = [FakeResource('sc-1', 'a'),
+                        FakeResource('sc-2', 'b')]
+        db_resources = self.get_db_resources()
+        subcloud_rsrcs = self.sync_obj.get_db_subcloud_resources()
+
+        num_of_audit_jobs = self.sync_obj.audit_find_missing(
+            RESOURCE_TYPE, m_resources, db_resources, sc_resources, [],
+            subcloud_rsrcs)
+        self.assertEqual(1, num_of_audit_jobs)
+        # Only the resource absent from the master cloud is left
+        self.assertEqual([extra.id], [r.id for r in db_resources])
+
+        num_of_audit_jobs = self.sync_obj.audit_find_extra(
+            RESOURCE_TYPE, m_resources, db_resources, sc_resources, [],
+            subcloud_rsrcs)
+        self.assertEqual(1, num_of_audit_jobs)
+        self.sync_obj.audit_action.assert_called_with(
+            RESOURCE_TYPE, sync_thread.AUDIT_RESOURCE_EXTRA, db_resources[0])
+
+    def test_audit_find_missing_aborted_resource(self):
+        self.create_db_resource('master-1', 'sc-1')
+        m_resources = [FakeResource('master-1', 'a')]
+        sc_resources = [FakeResource('sc-1', 'changed')]
+        db_resources = self.get_db_resources()
+
+        num_of_audit_jobs = self.sync_obj.audit_find_missing(
+            RESOURCE_TYPE, m_resources, db_resources, sc_resources,
+            ['master-1'])
+
+        # The aborted resource is counted and kept for audit_find_extra
+        self.assertEqual(1, num_of_audit_jobs)
+        self.assertEqual(1, len(db_resources))
+        self.sync_obj.audit_action.assert_not_called()
+
+
+class TestSyncThreadMasterResourceCache(base.OrchestratorTestCase):
+    def setUp(self):
+        super(TestSyncThreadMasterResourceCache, self).setUp()
+
+        # Mock the dcmanager rpc client
+        p = mock.patch.object(sync_thread, 'dcmanager_rpc_client')
+        self.mock_dcmanager_rpc_client = p.start()
+        self.addCleanup(p.stop)
+
+        # Start every test with an empty cache
+        p = mock.patch.object(sync_thread.SyncThread,
+                              'master_resources_dict', {})
+        p.start()
+        self.addCleanup(p.stop)
+
+        self.m_resources = [FakeResource('master-1', 'a')]
+
+    def create_sync_obj(self, subcloud_name,
+                        endpoint_type=consts.ENDPOINT_TYPE_IDENTITY):
+        sync_obj = FakeSyncThread(subcloud_name, endpoint_type)
+        sync_obj.get_master_resources = mock.MagicMock(
+            return_value=self.m_resources)
+        return sync_obj
+
+    def test_master_resources_shared_across_subclouds(self):
+        sync_obj_1 = self.create_sync_obj('subcloud1')
+        sync_obj_2 = self.create_sync_obj('subcloud2')
+
+        sync_obj_1.get_cached_master_resources(RESOURCE_TYPE)
+        sync_obj_1.post_audit()
+        m_resources = sync_obj_2.get_cached_master_resources(RESOURCE_TYPE)
+
+        self.assertEqual(self.m_resources, m_resources)
+        sync_obj_1.get_master_resources.assert_called_once_with(
+            RESOURCE_TYPE)
+        sync_obj_2.get_master_resources.assert_not_called()
+
+    def test_master_resources_cached_per_endpoint_type(self):
+        sync_obj_1 = self.create_sync_obj('subcloud1')
+        sync_obj_2 = self.create_sync_obj(
+            'subcloud1', consts.ENDPOINT_TYPE_PLATFORM)
+
+        sync_obj_1.get_cached_master_resources(RESOURCE_TYPE)
+        sync_obj_2.get_cached_master_resources(RESOURCE_TYPE)
+
+        sync_obj_2.get_master_resources.assert_called_once_with(
+            RESOURCE_TYPE)
+
+    def test_master_resources_invalidated(self):
+        sync_obj_1 = self.create_sync_obj('subcloud1')
+        sync_obj_2 = self.create_sync_obj('subcloud2')
+
+        sync_obj_1.get_cached_master_resources(RESOURCE_TYPE)
+        sync_thread.SyncThread.invalidate_master_resources(
+            consts.ENDPOINT_TYPE_IDENTITY)
+        sync_obj_2.get_cached_master_resources(RESOURCE_TYPE)
+
+        sync_obj_2.get_master_resources.assert_called_once_with(
+            RESOURCE_TYPE)
+
+    def test_master_resources_expired(self):
+        sync_obj_1 = self.create_sync_obj('subcloud1')
+        sync_obj_2 = self.create_sync_obj('subcloud2')
+
+        sync_obj_1.get_cached_master_resources(RESOURCE_TYPE)
+        expired = timeutils.utcnow() + datetime.timedelta(
+            seconds=config.cfg.CONF.master_resource_cache_ttl)
+        with mock.patch.object(timeutils, 'utcnow', return_value=expired):
+            sync_obj_2.get_cached_master_resources(RESOURCE_TYPE)
+
+        sync_obj_2.get_master_resources.assert_called_once_with(
+            RESOURCE_TYPE)